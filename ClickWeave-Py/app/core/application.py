@@ -5,15 +5,23 @@ Application - Main application class that integrates all core components.
 import os
 import logging
 import threading
-from typing import Optional, Dict, Any, List
+from typing import Optional, Callable, Dict, Any, List
 from datetime import datetime
 import uuid
 import json
 
-from .click_engine import ClickEngine
-from .macro_engine import MacroEngine
+from .engine_pool import EnginePool, RunHandle
+from .event_bus import EventBus, EventType
+from .execution_history import ExecutionHistory, ProfileRunStats
+from .failsafe import FailsafeMonitor
+from .input_backend import create_input_backend
 from .hotkey_manager import HotkeyManager
+from .log_writer import ExecutionLogWriter, CsvLogSink, SQLiteLogSink
 from .pixel_watcher import PixelWatcher
+from .profile_store import ProfileStore, ProfileSummary
+from .profile_watcher import ProfileWatcher
+from .storage import SQLiteStorage, SQLiteProfileStore
+from .screen_capture import FrameService
 from .scheduler import AutomationScheduler
 from ..models.models import (
     Profile, AppSettings, ExecutionLog, ApplicationState,
@@ -30,18 +38,25 @@ class ClickWeaveApplication:
     """
     
     def __init__(self):
+        # Component events reach the handlers below on the bus's dispatcher thread
+        self.event_bus = EventBus()
+        
         # Initialize core components
-        self.click_engine = ClickEngine()
-        self.macro_engine = MacroEngine()
         self.hotkey_manager = HotkeyManager()
-        self.pixel_watcher = PixelWatcher()
+        
+        # One frame capture service shared by pixel consumers
+        self.frame_service = FrameService()
+        self.pixel_watcher = PixelWatcher(frame_service=self.frame_service)
         self.scheduler = AutomationScheduler()
         
+        # Concurrent runs, one engine each, sharing one failsafe monitor
+        self.failsafe_monitor = FailsafeMonitor()
+        self.engine_pool = EnginePool(failsafe_monitor=self.failsafe_monitor, event_bus=self.event_bus)
+        
         # Application state
-        self._profiles: Dict[str, Profile] = {}
         self._settings: AppSettings = AppSettings()
         self._application_state = ApplicationState()
-        self._execution_logs: List[ExecutionLog] = []
+        self._execution_history = ExecutionHistory()
         
         # Thread safety
         self._lock = threading.Lock()
@@ -50,28 +65,58 @@ class ClickWeaveApplication:
         self._setup_callbacks()
         self._load_settings()
         self._create_data_directories()
+        self._execution_history.resize(self._settings.max_log_entries)
+        self.engine_pool.set_max_runs(self._settings.max_concurrent_runs)
+        
+        # Profile library; profiles are parsed on first use
+        self.storage: Optional[SQLiteStorage] = None
+        if self._settings.storage_backend == 'sqlite':
+            self.storage = SQLiteStorage(self._settings.database_path)
+            self.profile_store = SQLiteProfileStore(self.storage)
+        else:
+            self.profile_store = ProfileStore(self._settings.profiles_directory)
+        
+        # Picks up profile files changed by other tools (files backend only)
+        self.profile_watcher: Optional[ProfileWatcher] = None
+        if self.storage is None and self._settings.watch_profiles:
+            self.profile_watcher = ProfileWatcher(self.profile_store, self.scheduler)
+            self.profile_watcher.register_callback('profile_changed', self._publisher(EventType.PROFILE_FILE_CHANGED))
+        
+        # Execution logs are written on a background thread
+        self.log_writer = ExecutionLogWriter(
+            SQLiteLogSink(self.storage) if self.storage is not None
+            else CsvLogSink(self._settings.logs_directory)
+        )
+    
+    def _publisher(self, event_type: EventType, key: Optional[str] = None) -> Callable[[Any], None]:
+        """Component callback that hands its data to the event bus."""
+        def publish(data: Any = None) -> None:
+            self.event_bus.publish(event_type, data, key=data.get(key) if key and data else None)
+        return publish
     
     def _setup_callbacks(self) -> None:
         """Set up callbacks between components."""
-        # Hotkey callbacks
-        self.hotkey_manager.register_callback('start_stop', self._on_start_stop_hotkey)
-        self.hotkey_manager.register_callback('pause_resume', self._on_pause_resume_hotkey)
+        # Hotkeys; emergency stop acts at once instead of queueing behind other events
+        self.hotkey_manager.register_callback('start_stop', self._publisher(EventType.HOTKEY_START_STOP))
+        self.hotkey_manager.register_callback('pause_resume', self._publisher(EventType.HOTKEY_PAUSE_RESUME))
         self.hotkey_manager.register_callback('emergency_stop', self._on_emergency_stop_hotkey)
+        self.event_bus.subscribe(EventType.HOTKEY_START_STOP, self._on_start_stop_hotkey)
+        self.event_bus.subscribe(EventType.HOTKEY_PAUSE_RESUME, self._on_pause_resume_hotkey)
         
-        # Engine callbacks
-        self.click_engine.register_callback('started', self._on_automation_started)
-        self.click_engine.register_callback('stopped', self._on_automation_stopped)
-        self.click_engine.register_callback('paused', self._on_automation_paused)
-        self.click_engine.register_callback('resumed', self._on_automation_resumed)
+        # Run events, published by the engine pool
+        self.event_bus.subscribe(EventType.RUN_STARTED, self._on_automation_started)
+        self.event_bus.subscribe(EventType.RUN_STOPPED, self._on_automation_stopped)
+        self.event_bus.subscribe(EventType.RUN_PAUSED, self._on_automation_paused)
+        self.event_bus.subscribe(EventType.RUN_RESUMED, self._on_automation_resumed)
         
-        self.macro_engine.register_callback('started', self._on_automation_started)
-        self.macro_engine.register_callback('stopped', self._on_automation_stopped)
-        self.macro_engine.register_callback('paused', self._on_automation_paused)
-        self.macro_engine.register_callback('resumed', self._on_automation_resumed)
-        
-        # Scheduler callbacks
-        self.scheduler.register_callback('profile_triggered', self._on_scheduled_profile_triggered)
-        self.scheduler.register_callback('schedule_error', self._on_schedule_error)
+        # Scheduler and trigger events
+        self.scheduler.register_callback('profile_triggered',
+                                         self._publisher(EventType.SCHEDULE_TRIGGERED, key='profile_id'))
+        self.scheduler.register_callback('schedule_error', self._publisher(EventType.SCHEDULE_ERROR))
+        self.event_bus.subscribe(EventType.SCHEDULE_TRIGGERED, self._on_scheduled_profile_triggered)
+        self.event_bus.subscribe(EventType.SCHEDULE_ERROR, self._on_schedule_error)
+        self.event_bus.subscribe(EventType.PIXEL_TRIGGERED, self._on_pixel_trigger)
+        self.event_bus.subscribe(EventType.PROFILE_FILE_CHANGED, self._on_profile_file_changed)
     
     def _create_data_directories(self) -> None:
         """Create necessary data directories."""
@@ -103,63 +148,80 @@ class ClickWeaveApplication:
         except Exception as e:
             logger.error(f"Failed to save settings: {e}")
     
-    def _on_start_stop_hotkey(self) -> None:
-        """Handle start/stop hotkey."""
-        with self._lock:
-            if self.is_automation_running():
-                self.stop_automation()
+    def _on_start_stop_hotkey(self, data: Any = None) -> None:
+        """Handle start/stop hotkey (on the dispatcher thread, which serializes presses)."""
+        if self.is_automation_running():
+            self.stop_automation()
+        else:
+            # Find the last active profile or first available profile
+            active_profile = self.get_active_profile()
+            if active_profile:
+                self.start_automation(active_profile.id)
+    
+    def _on_pause_resume_hotkey(self, data: Any = None) -> None:
+        """Handle pause/resume hotkey."""
+        if self.is_automation_running():
+            if self.is_automation_paused():
+                self.resume_automation()
             else:
-                # Find the last active profile or first available profile
-                active_profile = self.get_active_profile()
-                if active_profile:
-                    self.start_automation(active_profile.id)
+                self.pause_automation()
     
-    def _on_pause_resume_hotkey(self) -> None:
-        """Handle pause/resume hotkey."""
-        with self._lock:
-            if self.is_automation_running():
-                if self.is_automation_paused():
-                    self.resume_automation()
-                else:
-                    self.pause_automation()
-    
-    def _on_emergency_stop_hotkey(self) -> None:
-        """Handle emergency stop hotkey."""
-        with self._lock:
-            self.emergency_stop()
+    def _on_emergency_stop_hotkey(self, data: Any = None) -> None:
+        """Handle emergency stop hotkey (on the hotkey thread)."""
+        self.emergency_stop()
+    
+    def _update_running_state(self) -> None:
+        """Mirror the running profiles into the application state (call with the lock held)."""
+        runs = self.engine_pool.runs()
+        self._application_state.is_running = bool(runs)
+        self._application_state.active_profile_ids = [run.profile_id for run in runs]
+        self._application_state.active_profile_id = runs[-1].profile_id if runs else None
     
-    def _on_automation_started(self, profile: Profile) -> None:
+    def _on_automation_started(self, data: Dict[str, Any]) -> None:
         """Handle automation started event."""
+        run: RunHandle = data['run']
         with self._lock:
-            self._application_state.is_running = True
-            self._application_state.active_profile_id = profile.id
+            self._update_running_state()
             self._application_state.last_action_time = datetime.now()
-            logger.info(f"Automation started: {profile.name}")
+            logger.info(f"Automation started: {run.profile.name}")
     
     def _on_automation_stopped(self, data: Dict[str, Any]) -> None:
         """Handle automation stopped event."""
+        run: RunHandle = data['run']
         with self._lock:
-            self._application_state.is_running = False
-            self._application_state.active_profile_id = None
+            self._update_running_state()
             
-            # Add execution log
-            if hasattr(self.click_engine, 'execution_log') and self.click_engine.execution_log:
-                self._add_execution_log(self.click_engine.execution_log)
-            elif hasattr(self.macro_engine, 'execution_log') and self.macro_engine.execution_log:
-                self._add_execution_log(self.macro_engine.execution_log)
+            # Add the run's execution log
+            if run.execution_log:
+                self._add_execution_log(run.execution_log)
             
-            reason = data.get('reason', 'unknown')
-            logger.info(f"Automation stopped: {reason}")
+            logger.info(f"Automation stopped: {run.profile.name} ({data.get('reason', 'unknown')})")
     
-    def _on_automation_paused(self, profile: Optional[Profile]) -> None:
+    def _on_automation_paused(self, data: Dict[str, Any]) -> None:
         """Handle automation paused event."""
-        logger.info("Automation paused")
+        logger.info(f"Automation paused: {data['run'].profile.name}")
     
-    def _on_automation_resumed(self, profile: Optional[Profile]) -> None:
+    def _on_automation_resumed(self, data: Dict[str, Any]) -> None:
         """Handle automation resumed event."""
         with self._lock:
             self._application_state.last_action_time = datetime.now()
-        logger.info("Automation resumed")
+        logger.info(f"Automation resumed: {data['run'].profile.name}")
+    
+    def _publish_pixel_trigger(self, data: Dict[str, Any]) -> None:
+        """Pixel watcher callback: queue the fire, coalesced per profile, and return to watching."""
+        self.event_bus.publish(EventType.PIXEL_TRIGGERED, data, key=data.get('trigger_id'))
+    
+    def _on_pixel_trigger(self, data: Dict[str, Any]) -> None:
+        """Handle a pixel or region trigger firing."""
+        profile_id = data.get('trigger_id')
+        
+        # Fires while the profile is running are dropped without touching the lock
+        if profile_id and self.is_automation_running(profile_id):
+            return
+        
+        if profile_id:
+            logger.info(f"Pixel trigger fired: {profile_id}")
+            self.start_automation(profile_id)
     
     def _on_scheduled_profile_triggered(self, data: Dict[str, Any]) -> None:
         """Handle scheduled profile trigger."""
@@ -174,70 +236,52 @@ class ClickWeaveApplication:
         profile_id = data.get('profile_id', 'Unknown')
         logger.error(f"Scheduler error for profile {profile_id}: {error}")
     
+    def _on_profile_file_changed(self, data: Dict[str, Any]) -> None:
+        """Handle a profile file added, changed or deleted on disk."""
+        with self._lock:
+            self._application_state.total_profiles = len(self.profile_store)
+    
     def _add_execution_log(self, log: ExecutionLog) -> None:
         """Add execution log to history."""
-        self._execution_logs.append(log)
-        
-        # Limit log entries
-        if len(self._execution_logs) > self._settings.max_log_entries:
-            self._execution_logs = self._execution_logs[-self._settings.max_log_entries:]
-        
-        # Save to CSV
-        self._save_execution_log_to_csv(log)
-    
-    def _save_execution_log_to_csv(self, log: ExecutionLog) -> None:
-        """Save execution log to CSV file."""
-        try:
-            import csv
-            from datetime import datetime
-            
-            csv_path = os.path.join(
-                self._settings.logs_directory,
-                f"execution_log_{datetime.now().strftime('%Y_%m')}.csv"
-            )
-            
-            # Check if file exists to add header
-            file_exists = os.path.exists(csv_path)
-            
-            with open(csv_path, 'a', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Add header if new file
-                if not file_exists:
-                    writer.writerow([
-                        'ID', 'Profile Name', 'Start Time', 'End Time', 
-                        'Total Clicks', 'Total Steps', 'Average Interval (ms)',
-                        'Duration (s)', 'Stopped By', 'Error Message'
-                    ])
-                
-                # Add log entry
-                writer.writerow(log.to_csv_row())
+        self._execution_history.append(log)
         
-        except Exception as e:
-            logger.error(f"Failed to save execution log to CSV: {e}")
+        # Queue for the background writer
+        self.log_writer.submit(log)
     
     def initialize(self) -> bool:
         """Initialize the application."""
         try:
             logger.info("Initializing ClickWeave application...")
             
-            # Load profiles
-            self.load_all_profiles()
+            # Start delivering component events
+            self.event_bus.start()
+            
+            # Import existing files into a new database, then index profiles
+            if self.storage is not None:
+                self.storage.migrate_from_files(self._settings.profiles_directory, self._settings.logs_directory)
+            self.index_profiles()
+            
+            # Start writing execution logs
+            self.log_writer.start()
             
             # Configure safety settings
-            self.click_engine.set_failsafe(
-                self._settings.failsafe_enabled,
-                self._settings.failsafe_corner
-            )
+            self._apply_failsafe_settings(self._settings)
+            
+            # Configure input backend
+            self._apply_input_backend(self._settings.input_backend)
             
             # Start scheduler
             self.scheduler.start()
             
+            # Watch the profile directory
+            if self.profile_watcher is not None:
+                self.profile_watcher.start()
+            
             # Register hotkeys
             self.register_hotkeys()
             
             # Update application state
-            self._application_state.total_profiles = len(self._profiles)
+            self._application_state.total_profiles = len(self.profile_store)
             self._application_state.hotkey_status = self.hotkey_manager.get_status()
             
             logger.info("ClickWeave application initialized successfully")
@@ -254,10 +298,22 @@ class ClickWeaveApplication:
             
             # Stop all automation
             self.emergency_stop()
+            self.engine_pool.wait_idle(timeout=2.0)
             
             # Stop components
             self.pixel_watcher.stop()
             self.scheduler.stop()
+            self.failsafe_monitor.stop()
+            self.frame_service.close()
+            if self.profile_watcher is not None:
+                self.profile_watcher.stop()
+            
+            # Handle the remaining events, such as the final run logs
+            self.event_bus.stop()
+            self.profile_store.close()
+            self.log_writer.close()
+            if self.storage is not None:
+                self.storage.close()
             
             # Unregister hotkeys
             self.hotkey_manager.unregister_hotkeys()
@@ -270,6 +326,27 @@ class ClickWeaveApplication:
         except Exception as e:
             logger.error(f"Error during application shutdown: {e}")
     
+    def _apply_failsafe_settings(self, settings: AppSettings) -> None:
+        """Configure the engines and the shared failsafe monitor."""
+        self.engine_pool.set_failsafe(settings.failsafe_enabled, settings.failsafe_corner)
+        self.failsafe_monitor.configure(settings.failsafe_enabled, settings.failsafe_corner)
+        
+        if settings.failsafe_enabled:
+            self.failsafe_monitor.start()
+        else:
+            self.failsafe_monitor.stop()
+    
+    def _apply_input_backend(self, backend_name: str) -> None:
+        """Create the configured input backend and share it between engines."""
+        try:
+            backend = create_input_backend(backend_name)
+        except Exception as e:
+            logger.error(f"Failed to create input backend '{backend_name}', falling back to pyautogui: {e}")
+            backend = create_input_backend('pyautogui')
+        
+        self.engine_pool.set_input_backend(backend)
+        logger.info(f"Using input backend: {backend.name}")
+    
     def create_profile(self, name: str, description: str = "") -> Profile:
         """Create a new automation profile."""
         profile = Profile(
@@ -278,25 +355,20 @@ class ClickWeaveApplication:
             description=description
         )
         
-        with self._lock:
-            self._profiles[profile.id] = profile
-            self._application_state.total_profiles = len(self._profiles)
-        
         self.save_profile(profile)
         logger.info(f"Created new profile: {name}")
         return profile
     
     def save_profile(self, profile: Profile) -> bool:
-        """Save a profile to disk."""
+        """Save a profile; the store writes it to disk shortly afterwards."""
         try:
-            profile_path = os.path.join(
-                self._settings.profiles_directory,
-                f"{profile.id}.json"
-            )
-            profile.to_json_file(profile_path)
+            # Bump the modification time so compiled macro programs are rebuilt
+            profile.modified_at = datetime.now()
+            
+            self.profile_store.save(profile)
             
             with self._lock:
-                self._profiles[profile.id] = profile
+                self._application_state.total_profiles = len(self.profile_store)
             
             logger.debug(f"Saved profile: {profile.name}")
             return True
@@ -306,75 +378,41 @@ class ClickWeaveApplication:
             return False
     
     def load_profile(self, profile_id: str) -> Optional[Profile]:
-        """Load a profile from disk."""
-        try:
-            profile_path = os.path.join(
-                self._settings.profiles_directory,
-                f"{profile_id}.json"
-            )
-            
-            if not os.path.exists(profile_path):
-                logger.warning(f"Profile file not found: {profile_path}")
-                return None
-            
-            profile = Profile.from_json_file(profile_path)
-            
-            with self._lock:
-                self._profiles[profile.id] = profile
-            
-            return profile
-        
-        except Exception as e:
-            logger.error(f"Failed to load profile {profile_id}: {e}")
-            return None
+        """Load a profile from disk, replacing any cached copy."""
+        return self.profile_store.load(profile_id)
     
-    def load_all_profiles(self) -> int:
-        """Load all profiles from disk."""
+    def index_profiles(self) -> int:
+        """Bring the profile index up to date with the files on disk."""
         try:
-            profiles_dir = self._settings.profiles_directory
-            if not os.path.exists(profiles_dir):
-                return 0
-            
-            loaded_count = 0
-            for filename in os.listdir(profiles_dir):
-                if filename.endswith('.json'):
-                    profile_id = filename[:-5]  # Remove .json extension
-                    if self.load_profile(profile_id):
-                        loaded_count += 1
+            count = self.profile_store.refresh()
             
             with self._lock:
-                self._application_state.total_profiles = len(self._profiles)
+                self._application_state.total_profiles = count
             
-            logger.info(f"Loaded {loaded_count} profiles")
-            return loaded_count
+            logger.info(f"Indexed {count} profiles")
+            return count
         
         except Exception as e:
-            logger.error(f"Failed to load profiles: {e}")
+            logger.error(f"Failed to index profiles: {e}")
             return 0
     
     def delete_profile(self, profile_id: str) -> bool:
         """Delete a profile."""
         try:
-            # Stop automation if this profile is running
-            if self._application_state.active_profile_id == profile_id:
-                self.stop_automation()
+            # Stop automation if this profile is running, and its trigger either way
+            if self.is_automation_running(profile_id):
+                self.stop_automation(profile_id)
+            else:
+                self._disarm_triggers(profile_id)
             
             # Unschedule if scheduled
             self.scheduler.unschedule_profile(profile_id)
             
-            # Remove from memory
+            # Remove from the index and delete the file
+            self.profile_store.delete(profile_id)
+            
             with self._lock:
-                if profile_id in self._profiles:
-                    del self._profiles[profile_id]
-                self._application_state.total_profiles = len(self._profiles)
-            
-            # Delete file
-            profile_path = os.path.join(
-                self._settings.profiles_directory,
-                f"{profile_id}.json"
-            )
-            if os.path.exists(profile_path):
-                os.remove(profile_path)
+                self._application_state.total_profiles = len(self.profile_store)
             
             logger.info(f"Deleted profile: {profile_id}")
             return True
@@ -385,16 +423,24 @@ class ClickWeaveApplication:
     
     def get_profile(self, profile_id: str) -> Optional[Profile]:
         """Get a profile by ID."""
-        return self._profiles.get(profile_id)
+        return self.profile_store.get(profile_id)
     
     def get_all_profiles(self) -> List[Profile]:
-        """Get all profiles."""
-        return list(self._profiles.values())
+        """Get all profiles. This parses every profile; listings should use get_profile_summaries()."""
+        return self.profile_store.load_all()
+    
+    def get_profile_summaries(self) -> List[ProfileSummary]:
+        """Get the index entries of all profiles, sorted by name."""
+        return self.profile_store.summaries()
+    
+    def get_profile_count(self) -> int:
+        """Get the number of profiles."""
+        return len(self.profile_store)
     
     def get_active_profile(self) -> Optional[Profile]:
         """Get the currently active profile."""
         if self._application_state.active_profile_id:
-            return self._profiles.get(self._application_state.active_profile_id)
+            return self.profile_store.get(self._application_state.active_profile_id)
         return None
     
     def start_automation(self, profile_id: str) -> bool:
@@ -404,26 +450,21 @@ class ClickWeaveApplication:
             logger.error(f"Profile not found: {profile_id}")
             return False
         
-        if self.is_automation_running():
-            logger.warning("Automation is already running")
-            return False
-        
         try:
-            # Start appropriate engine based on profile content
-            if profile.macro_steps:
-                success = self.macro_engine.start(profile)
-            else:
-                success = self.click_engine.start(profile)
+            # The pool picks the engine based on profile content
+            success = self.engine_pool.start(profile) is not None
             
             if success:
                 # Set up pixel triggers if configured
                 if (profile.trigger_type == TriggerType.PIXEL_COLOR and 
                     profile.pixel_trigger and profile.pixel_trigger.enabled):
                     self.pixel_watcher.add_trigger(profile_id, profile.pixel_trigger)
-                    self.pixel_watcher.register_callback(
-                        profile_id, 
-                        lambda data: self.start_automation(profile_id)
-                    )
+                    self.pixel_watcher.register_callback(profile_id, self._publish_pixel_trigger)
+                    self.pixel_watcher.start()
+                elif (profile.trigger_type == TriggerType.REGION and
+                      profile.region_trigger and profile.region_trigger.enabled):
+                    self.pixel_watcher.add_region_trigger(profile_id, profile.region_trigger)
+                    self.pixel_watcher.register_callback(profile_id, self._publish_pixel_trigger)
                     self.pixel_watcher.start()
             
             return success
@@ -432,20 +473,13 @@ class ClickWeaveApplication:
             logger.error(f"Failed to start automation for profile {profile_id}: {e}")
             return False
     
-    def stop_automation(self) -> bool:
-        """Stop current automation."""
+    def stop_automation(self, profile_id: Optional[str] = None) -> bool:
+        """Stop one profile's automation, or all of it."""
         try:
-            success = True
-            
-            if self.click_engine.is_running:
-                success &= self.click_engine.stop()
+            success = self.engine_pool.stop(profile_id)
             
-            if self.macro_engine.is_running:
-                success &= self.macro_engine.stop()
-            
-            # Stop pixel watching
-            if self.pixel_watcher.is_running():
-                self.pixel_watcher.stop()
+            # Stopped profiles must not be started again by their pixel or region triggers
+            self._disarm_triggers(profile_id)
             
             return success
         
@@ -453,27 +487,33 @@ class ClickWeaveApplication:
             logger.error(f"Failed to stop automation: {e}")
             return False
     
-    def pause_automation(self) -> bool:
-        """Pause current automation."""
+    def _disarm_triggers(self, profile_id: Optional[str] = None) -> None:
+        """
+        Remove one profile's pixel or region trigger, or all of them, and stop
+        pixel watching once none are left. Runs that end by themselves keep
+        their trigger armed, so it can start the profile again.
+        """
+        if profile_id is None:
+            self.pixel_watcher.clear_triggers()
+        else:
+            self.pixel_watcher.remove_trigger(profile_id)
+        
+        if not self.pixel_watcher.has_triggers() and self.pixel_watcher.is_running():
+            self.pixel_watcher.stop()
+    
+    def pause_automation(self, profile_id: Optional[str] = None) -> bool:
+        """Pause one profile's automation, or all of it."""
         try:
-            if self.click_engine.is_running:
-                return self.click_engine.pause()
-            elif self.macro_engine.is_running:
-                return self.macro_engine.pause()
-            return False
+            return self.engine_pool.pause(profile_id)
         
         except Exception as e:
             logger.error(f"Failed to pause automation: {e}")
             return False
     
-    def resume_automation(self) -> bool:
-        """Resume current automation."""
+    def resume_automation(self, profile_id: Optional[str] = None) -> bool:
+        """Resume one profile's automation, or all of it."""
         try:
-            if self.click_engine.is_running:
-                return self.click_engine.resume()
-            elif self.macro_engine.is_running:
-                return self.macro_engine.resume()
-            return False
+            return self.engine_pool.resume(profile_id)
         
         except Exception as e:
             logger.error(f"Failed to resume automation: {e}")
@@ -482,11 +522,9 @@ class ClickWeaveApplication:
     def emergency_stop(self) -> bool:
         """Emergency stop all automation."""
         try:
-            success = True
-            
-            success &= self.click_engine.emergency_stop()
-            success &= self.macro_engine.emergency_stop()
+            success = self.engine_pool.emergency_stop()
             
+            self.pixel_watcher.clear_triggers()
             if self.pixel_watcher.is_running():
                 success &= self.pixel_watcher.stop()
             
@@ -496,13 +534,17 @@ class ClickWeaveApplication:
             logger.error(f"Failed to emergency stop: {e}")
             return False
     
-    def is_automation_running(self) -> bool:
-        """Check if any automation is running."""
-        return self.click_engine.is_running or self.macro_engine.is_running
+    def is_automation_running(self, profile_id: Optional[str] = None) -> bool:
+        """Check if the profile (or any automation) is running."""
+        return self.engine_pool.is_running(profile_id)
+    
+    def is_automation_paused(self, profile_id: Optional[str] = None) -> bool:
+        """Check if the profile (or any running automation) is paused."""
+        return self.engine_pool.is_paused(profile_id)
     
-    def is_automation_paused(self) -> bool:
-        """Check if automation is paused."""
-        return self.click_engine.is_paused or self.macro_engine.is_paused
+    def get_runs(self) -> List[RunHandle]:
+        """Get the handles of the running profiles, oldest first."""
+        return self.engine_pool.runs()
     
     def register_hotkeys(self) -> bool:
         """Register global hotkeys."""
@@ -522,10 +564,16 @@ class ClickWeaveApplication:
                 self.hotkey_manager.update_hotkeys(new_settings)
             
             # Update safety settings
-            self.click_engine.set_failsafe(
-                new_settings.failsafe_enabled,
-                new_settings.failsafe_corner
-            )
+            self._apply_failsafe_settings(new_settings)
+            
+            # Update input backend if it changed
+            if new_settings.input_backend != self._settings.input_backend:
+                self._apply_input_backend(new_settings.input_backend)
+            
+            if new_settings.max_log_entries != self._execution_history.capacity:
+                self._execution_history.resize(new_settings.max_log_entries)
+            
+            self.engine_pool.set_max_runs(new_settings.max_concurrent_runs)
             
             self._settings = new_settings
             self._save_settings()
@@ -549,8 +597,23 @@ class ClickWeaveApplication:
         return self._application_state
     
     def get_execution_logs(self) -> List[ExecutionLog]:
-        """Get execution log history."""
-        return self._execution_logs.copy()
+        """Get execution log history, oldest first. Prefer get_execution_history() for paged reads."""
+        return [record.to_log() for record in self._execution_history.iter_records(newest_first=False)]
+    
+    def get_execution_history(self) -> ExecutionHistory:
+        """Get the in-memory execution history (paged and filtered reads)."""
+        return self._execution_history
+    
+    def get_profile_run_stats(self, profile_id: str) -> Optional[ProfileRunStats]:
+        """Get the run counters of a profile since startup."""
+        return self._execution_history.profile_stats(profile_id)
+    
+    def get_recent_execution_logs(self, profile_id: Optional[str] = None, limit: int = 100) -> List[ExecutionLog]:
+        """Get the latest execution logs (of one profile), newest first."""
+        if self.storage is not None:
+            return self.storage.recent_execution_logs(profile_id=profile_id, limit=limit)
+        
+        return [record.to_log() for record in self._execution_history.page(limit=limit, profile_id=profile_id)]
     
     def get_stats(self) -> Dict[str, Any]:
         """Get comprehensive application statistics."""
@@ -559,13 +622,19 @@ class ClickWeaveApplication:
                 'is_running': self.is_automation_running(),
                 'is_paused': self.is_automation_paused(),
                 'active_profile_id': self._application_state.active_profile_id,
-                'total_profiles': len(self._profiles),
+                'active_profile_ids': list(self._application_state.active_profile_ids),
+                'total_profiles': len(self.profile_store),
                 'hotkeys_registered': self.hotkey_manager.is_registered()
             },
-            'click_engine': self.click_engine.get_stats(),
-            'macro_engine': self.macro_engine.get_stats(),
+            'profile_store': self.profile_store.get_stats(),
+            'storage': self.storage.get_stats() if self.storage is not None else None,
+            'profile_watcher': self.profile_watcher.get_stats() if self.profile_watcher is not None else None,
+            'log_writer': self.log_writer.get_stats(),
+            'engine_pool': self.engine_pool.get_stats(),
+            'event_bus': self.event_bus.get_stats(),
             'pixel_watcher': self.pixel_watcher.get_stats(),
-            'scheduler': self.scheduler.get_stats()
+            'scheduler': self.scheduler.get_stats(),
+            'failsafe': self.failsafe_monitor.get_stats()
         }
         
         return stats
\ No newline at end of file
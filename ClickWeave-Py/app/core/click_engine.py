@@ -5,13 +5,18 @@ ClickEngine - Core mouse automation engine with precise timing and safety featur
 import time
 import threading
 from typing import Optional, Callable, Dict, Any
-import pyautogui
-from pynput import mouse
 import logging
 
+from .event_bus import EventBus, EventType
+from .failsafe import FailsafeMonitor
+from .input_arbiter import InputArbiter, ArbitratedBackend
+from .input_backend import InputBackend, PyAutoGUIBackend, create_input_backend
+from .motion import MotionPlanner
+from .run_state import RunState
+from .timing import DeadlineScheduler, wait_until
 from ..models.models import (
     Profile, ClickType, Coordinates, TimingConfig, ClickLimits,
-    ExecutionLog, ApplicationState
+    ExecutionLog, ApplicationState, MotionConfig
 )
 
 
@@ -23,26 +28,80 @@ class ClickEngine:
     Core engine for mouse automation with precise timing and safety controls.
     """
     
-    def __init__(self):
+    # Progress events also published on the event bus
+    BUS_EVENTS = (EventType.CLICK,)
+    
+    def __init__(self, backend: Optional[InputBackend] = None):
         self._running = False
         self._paused = False
-        self._stop_event = threading.Event()
-        self._pause_event = threading.Event()
+        self._state = RunState()
         self._worker_thread: Optional[threading.Thread] = None
         self._current_profile: Optional[Profile] = None
         self._execution_log: Optional[ExecutionLog] = None
         self._click_count = 0
         self._start_time: Optional[float] = None
         self._last_click_time: Optional[float] = None
+        self._schedule: Optional[DeadlineScheduler] = None
         self._callbacks: Dict[str, Callable] = {}
+        self._event_bus: Optional[EventBus] = None
+        
+        # Input backends (default is created lazily on first use)
+        self._default_backend: Optional[InputBackend] = backend
+        self._profile_backends: Dict[str, InputBackend] = {}
+        self._backend: Optional[InputBackend] = backend
+        self._arbiter: Optional[InputArbiter] = None
+        self._motion = MotionPlanner()
         
         # Safety settings
         self._failsafe_enabled = True
         self._failsafe_corner = "top-left"
+        self._failsafe_monitor: Optional[FailsafeMonitor] = None
+        self._failsafe_key = f"click_engine_{id(self)}"
+        self._failsafe_tripped = False
+    
+    def set_failsafe_monitor(self, monitor: Optional[FailsafeMonitor]) -> None:
+        """Share an event-driven failsafe monitor instead of polling the cursor."""
+        if self._failsafe_monitor is not None:
+            self._failsafe_monitor.unregister_callback(self._failsafe_key)
         
-        # Configure pyautogui
-        pyautogui.FAILSAFE = False  # We handle failsafe manually
-        pyautogui.PAUSE = 0.01  # Minimal pause between pyautogui commands
+        self._failsafe_monitor = monitor
+        if monitor is not None:
+            monitor.register_callback(self._failsafe_key, self._on_failsafe)
+    
+    def _on_failsafe(self, data: Dict[str, Any]) -> None:
+        """Handle the failsafe monitor firing (called from the listener thread)."""
+        if self._running and self._failsafe_enabled and not self._state.is_stopped:
+            self._failsafe_tripped = True
+            self._state.stop()
+    
+    def set_input_backend(self, backend: InputBackend) -> None:
+        """Set the default input backend used when a profile does not override it."""
+        self._default_backend = backend
+        if not self._running:
+            self._backend = backend
+    
+    def _resolve_backend(self, profile: Profile) -> InputBackend:
+        """Get the input backend for a profile, creating it if needed."""
+        if profile.input_backend:
+            backend = self._profile_backends.get(profile.input_backend)
+            if backend is None:
+                backend = create_input_backend(profile.input_backend)
+                self._profile_backends[profile.input_backend] = backend
+            return backend
+        
+        if self._default_backend is None:
+            self._default_backend = PyAutoGUIBackend()
+        return self._default_backend
+    
+    def set_input_arbiter(self, arbiter: Optional[InputArbiter]) -> None:
+        """Share the input device with other engines, taking turns at the profile's input_priority."""
+        self._arbiter = arbiter
+    
+    def _arbitrate(self, backend: InputBackend, profile: Profile) -> InputBackend:
+        """Wrap the backend in turns on the shared arbiter, if there is one."""
+        if self._arbiter is None:
+            return backend
+        return ArbitratedBackend(backend, self._arbiter, profile.input_priority)
     
     def set_failsafe(self, enabled: bool, corner: str = "top-left") -> None:
         """Configure failsafe settings."""
@@ -54,20 +113,43 @@ class ClickEngine:
         self._callbacks[event] = callback
     
     def _trigger_callback(self, event: str, data: Any = None) -> None:
-        """Trigger registered callback."""
+        """Trigger registered callback, and publish progress events on the event bus."""
         if event in self._callbacks:
             try:
                 self._callbacks[event](data)
             except Exception as e:
                 logger.error(f"Callback error for {event}: {e}")
+        
+        bus = self._event_bus
+        if bus is not None and event in self.BUS_EVENTS and self._current_profile is not None:
+            bus.publish(event, data, key=self._current_profile.id)
+    
+    def set_event_bus(self, bus: Optional[EventBus]) -> None:
+        """Publish progress events on an event bus, keyed by profile id."""
+        self._event_bus = bus
+    
+    def _listening(self, event: str) -> bool:
+        """Whether an event reaches anyone, so hot paths only build payloads that are used."""
+        bus = self._event_bus
+        return event in self._callbacks or (bus is not None and bus.has_subscribers(event))
     
     def _check_failsafe(self) -> bool:
         """Check if mouse is in failsafe corner."""
         if not self._failsafe_enabled:
             return False
         
-        x, y = pyautogui.position()
-        screen_width, screen_height = pyautogui.size()
+        monitor = self._failsafe_monitor
+        if monitor is not None:
+            if monitor.is_running():
+                # Pointer events are pushed to us; no display round trips needed
+                return self._failsafe_tripped or monitor.in_corner
+            
+            # Listener unavailable: poll the position but reuse cached geometry
+            x, y = self._backend.position()
+            return monitor.check_position(x, y)
+        
+        x, y = self._backend.position()
+        screen_width, screen_height = self._backend.screen_size()
         
         # Define corner regions (50x50 pixels)
         corner_size = 50
@@ -83,40 +165,47 @@ class ClickEngine:
         
         return False
     
-    def _perform_click(self, coordinates: Coordinates, click_type: ClickType) -> bool:
+    def _perform_click(self, coordinates: Coordinates, click_type: ClickType,
+                       motion: Optional[MotionConfig] = None) -> bool:
         """Perform a single click operation."""
         try:
-            # Move to coordinates if specified
-            if coordinates:
-                pyautogui.moveTo(coordinates.x, coordinates.y, duration=0.1)
-                time.sleep(0.05)  # Small delay after movement
+            backend = self._backend
+            motion = motion or MotionConfig()
             
-            # Perform the click based on type
-            if click_type == ClickType.LEFT:
-                pyautogui.click(button='left')
-            elif click_type == ClickType.RIGHT:
-                pyautogui.click(button='right')
-            elif click_type == ClickType.MIDDLE:
-                pyautogui.click(button='middle')
-            elif click_type == ClickType.DOUBLE:
-                pyautogui.doubleClick(button='left')
-            elif click_type == ClickType.HOLD:
-                pyautogui.mouseDown(button='left')
-                time.sleep(0.5)  # Hold for 500ms
-                pyautogui.mouseUp(button='left')
+            with backend.exclusive():
+                # Move to coordinates if specified, settling only after a real move
+                if coordinates:
+                    if self._motion.move(backend, coordinates.x, coordinates.y, motion, self._state.stop_event):
+                        self._motion.settle(motion, self._state.stop_event)
+                
+                # Perform the click based on type
+                if click_type == ClickType.LEFT:
+                    backend.click('left')
+                elif click_type == ClickType.RIGHT:
+                    backend.click('right')
+                elif click_type == ClickType.MIDDLE:
+                    backend.click('middle')
+                elif click_type == ClickType.DOUBLE:
+                    backend.click('left', clicks=2)
+                elif click_type == ClickType.HOLD:
+                    backend.mouse_down('left')
+                    wait_until(time.perf_counter() + motion.hold_ms / 1000.0, self._state.stop_event)
+                    backend.mouse_up('left')
             
             self._click_count += 1
             self._last_click_time = time.perf_counter()
             
-            # Trigger click callback
-            self._trigger_callback('click', {
-                'coordinates': coordinates,
-                'click_type': click_type,
-                'click_count': self._click_count
-            })
+            # Report the click only if someone listens; this runs for every click
+            if self._listening('click'):
+                self._trigger_callback('click', {
+                    'profile_id': self._current_profile.id,
+                    'coordinates': coordinates,
+                    'click_type': click_type,
+                    'click_count': self._click_count
+                })
             
             return True
-            
+        
         except Exception as e:
             logger.error(f"Click operation failed: {e}")
             return False
@@ -140,62 +229,83 @@ class ClickEngine:
         
         return False
     
+    def _mark_finished(self) -> None:
+        """Reset running state when the worker ends on its own."""
+        self._running = False
+        self._paused = False
+        if self._current_profile:
+            self._current_profile.is_active = False
+            self._current_profile.is_paused = False
+    
     def _execution_loop(self, profile: Profile) -> None:
         """Main execution loop for clicking automation."""
         logger.info(f"Starting click automation for profile: {profile.name}")
         
+        schedule = DeadlineScheduler(profile.timing.interval_ms / 1000.0)
+        self._schedule = schedule
+        schedule.start()
+        limits_reached = False
+        
         try:
-            while not self._stop_event.is_set():
-                # Check for pause
-                if self._pause_event.is_set():
-                    time.sleep(0.1)
+            while not self._state.is_stopped:
+                # Block while paused, then move the timeline forward by the
+                # time spent paused
+                if self._state.is_paused:
+                    schedule.shift(self._state.wait_if_paused())
+                    continue
+                
+                # Wait for the current deadline; a pause or stop wakes us early
+                if not self._state.sleep_until(schedule.deadline):
                     continue
                 
                 # Check failsafe
                 if self._check_failsafe():
-                    logger.warning("Failsafe triggered - stopping automation")
-                    self._trigger_callback('stopped', {'reason': 'failsafe'})
+                    self._failsafe_tripped = True
                     break
                 
                 # Check limits
                 if self._check_limits(profile):
-                    logger.info("Execution limits reached")
-                    self._trigger_callback('stopped', {'reason': 'limits_reached'})
+                    limits_reached = True
                     break
                 
                 # Perform click
                 if profile.coordinates:
-                    success = self._perform_click(profile.coordinates, profile.click_type)
+                    schedule.record_fire()
+                    success = self._perform_click(profile.coordinates, profile.click_type, profile.motion)
                     if not success:
                         logger.error("Click operation failed")
                         break
                 
-                # Wait for next interval with jitter
-                interval = profile.timing.get_jittered_interval()
-                
-                # Use precise timing with event checking
-                end_time = time.perf_counter() + interval
-                while time.perf_counter() < end_time:
-                    if self._stop_event.is_set():
-                        break
-                    if self._pause_event.is_set():
-                        # Wait until unpaused
-                        while self._pause_event.is_set() and not self._stop_event.is_set():
-                            time.sleep(0.01)
-                        # Recalculate end time after unpause
-                        remaining = end_time - time.perf_counter()
-                        if remaining > 0:
-                            end_time = time.perf_counter() + remaining
-                    time.sleep(0.01)  # Small sleep to prevent busy waiting
+                # Next absolute deadline, with jitter around it
+                schedule.advance(profile.timing.get_jitter_offset())
+            
+            if self._failsafe_tripped:
+                logger.warning("Failsafe triggered - stopping automation")
+                if self._execution_log:
+                    self._execution_log.stopped_by = "failsafe"
+                self._mark_finished()
+                self._trigger_callback('stopped', {'reason': 'failsafe'})
+            elif limits_reached:
+                logger.info("Execution limits reached")
+                if self._execution_log:
+                    self._execution_log.stopped_by = "limits"
+                self._mark_finished()
+                self._trigger_callback('stopped', {'reason': 'limits_reached'})
+            elif not self._state.is_stopped:
+                # A failed click; stop() and emergency_stop() report their own reason
+                self._mark_finished()
+                self._trigger_callback('stopped', {'reason': 'error'})
         
         except Exception as e:
             logger.error(f"Execution loop error: {e}")
+            self._mark_finished()
             self._trigger_callback('stopped', {'reason': 'error', 'error': str(e)})
         
         finally:
             # Finalize execution log
             if self._execution_log:
-                self._execution_log.end_time = time.time()
+                from datetime import datetime
+                self._execution_log.end_time = datetime.now()
                 self._execution_log.total_clicks = self._click_count
                 if self._click_count > 0 and self._start_time:
                     duration = time.perf_counter() - self._start_time
@@ -210,10 +320,12 @@ class ClickEngine:
             return False
         
         try:
+            self._backend = self._arbitrate(self._resolve_backend(profile), profile)
+            
             # Reset state
-            self._stop_event.clear()
-            self._pause_event.clear()
+            self._state.reset()
             self._current_profile = profile
+            self._failsafe_tripped = False
             self._click_count = 0
             self._start_time = time.perf_counter()
             
@@ -227,18 +339,24 @@ class ClickEngine:
                 start_time=datetime.now()
             )
             
+            # Running before the worker exists: a short run may finish (and report it) right away
+            self._running = True
+            profile.is_active = True
+            self._trigger_callback('started', profile)
+            
             # Start worker thread
             self._worker_thread = threading.Thread(
                 target=self._execution_loop,
                 args=(profile,),
                 daemon=True
             )
-            self._worker_thread.start()
-            
-            self._running = True
-            profile.is_active = True
+            try:
+                self._worker_thread.start()
+            except Exception:
+                self._mark_finished()
+                self._trigger_callback('stopped', {'reason': 'error'})
+                raise
             
-            self._trigger_callback('started', profile)
             logger.info(f"Click automation started for profile: {profile.name}")
             return True
         
@@ -253,7 +371,7 @@ class ClickEngine:
         
         try:
             logger.info("Stopping click automation...")
-            self._stop_event.set()
+            self._state.stop()
             
             # Wait for worker thread to finish
             if self._worker_thread and self._worker_thread.is_alive():
@@ -283,7 +401,7 @@ class ClickEngine:
         if not self._running or self._paused:
             return False
         
-        self._pause_event.set()
+        self._state.pause()
         self._paused = True
         if self._current_profile:
             self._current_profile.is_paused = True
@@ -297,7 +415,7 @@ class ClickEngine:
         if not self._running or not self._paused:
             return False
         
-        self._pause_event.clear()
+        self._state.resume()
         self._paused = False
         if self._current_profile:
             self._current_profile.is_paused = False
@@ -310,7 +428,7 @@ class ClickEngine:
         """Emergency stop - immediate termination."""
         logger.warning("Emergency stop triggered!")
         
-        self._stop_event.set()
+        self._state.stop()
         self._running = False
         self._paused = False
         
@@ -324,6 +442,14 @@ class ClickEngine:
         self._trigger_callback('stopped', {'reason': 'emergency'})
         return True
     
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the worker thread to exit; returns False if it is still running."""
+        worker = self._worker_thread
+        if worker is None or worker is threading.current_thread():
+            return True
+        worker.join(timeout)
+        return not worker.is_alive()
+    
     @property
     def is_running(self) -> bool:
         """Check if click automation is running."""
@@ -363,4 +489,9 @@ class ClickEngine:
             if self._click_count > 0:
                 stats['average_interval_ms'] = (stats['elapsed_seconds'] / self._click_count) * 1000
         
+        if self._schedule:
+            stats['timing'] = self._schedule.get_stats()
+        stats['run_state'] = self._state.get_stats()
+        stats['motion'] = self._motion.get_stats()
+        
         return stats
\ No newline at end of file
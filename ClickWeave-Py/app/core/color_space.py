@@ -0,0 +1,120 @@
+"""
+ColorSpace - Vectorized sRGB to CIELAB conversion and perceptual color distances.
+"""
+
+from typing import Tuple, Union, Sequence
+
+import numpy as np
+
+from ..models.models import ColorMetric
+
+
+# sRGB 8-bit value -> linear light, precomputed once for every channel value
+SRGB_TO_LINEAR = np.where(
+    np.arange(256) / 255.0 <= 0.04045,
+    np.arange(256) / 255.0 / 12.92,
+    ((np.arange(256) / 255.0 + 0.055) / 1.055) ** 2.4
+)
+
+# Linear sRGB -> XYZ (D65), with each row divided by the reference white so
+# the result is ready for the Lab transfer function
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041]
+]) / _D65_WHITE[:, None]
+
+_EPSILON = (6.0 / 29.0) ** 3
+_KAPPA = 1.0 / (3.0 * (6.0 / 29.0) ** 2)
+
+ColorArray = Union[np.ndarray, Sequence[Tuple[int, int, int]], Tuple[int, int, int]]
+
+
+def rgb_to_lab(colors: ColorArray) -> np.ndarray:
+    """
+    Convert 8-bit sRGB colors (shape [..., 3]) to CIELAB. Fractional values
+    (e.g. mean colors) are rounded to the nearest 8-bit level.
+    """
+    colors = np.asarray(colors)
+    if not np.issubdtype(colors.dtype, np.integer):
+        colors = np.rint(colors)
+    linear = SRGB_TO_LINEAR[colors.astype(np.intp)]
+    xyz = linear @ _RGB_TO_XYZ.T
+    
+    f = np.where(xyz > _EPSILON, np.cbrt(xyz), xyz * _KAPPA + 4.0 / 29.0)
+    lab = np.empty_like(f)
+    lab[..., 0] = 116.0 * f[..., 1] - 16.0
+    lab[..., 1] = 500.0 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200.0 * (f[..., 1] - f[..., 2])
+    return lab
+
+
+def delta_e76(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """CIE76 color difference (Euclidean distance in Lab)."""
+    return np.sqrt(((lab1 - lab2) ** 2).sum(axis=-1))
+
+
+def delta_e2000(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """CIEDE2000 color difference (Sharma, Wu and Dalal formulation)."""
+    lab1, lab2 = np.broadcast_arrays(np.asarray(lab1, dtype=np.float64), np.asarray(lab2, dtype=np.float64))
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+    
+    c_bar7 = ((np.hypot(a1, b1) + np.hypot(a2, b2)) / 2.0) ** 7
+    g = 0.5 * (1.0 - np.sqrt(c_bar7 / (c_bar7 + 25.0 ** 7)))
+    a1p, a2p = (1.0 + g) * a1, (1.0 + g) * a2
+    c1p, c2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360.0
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360.0
+    
+    chroma = c1p * c2p
+    dh = h2p - h1p
+    dh = np.where(dh > 180.0, dh - 360.0, np.where(dh < -180.0, dh + 360.0, dh))
+    dh = np.where(chroma == 0, 0.0, dh)
+    
+    d_l = L2 - L1
+    d_c = c2p - c1p
+    d_h = 2.0 * np.sqrt(chroma) * np.sin(np.radians(dh / 2.0))
+    
+    l_bar = (L1 + L2) / 2.0
+    c_bar = (c1p + c2p) / 2.0
+    h_sum = h1p + h2p
+    h_bar = np.where(np.abs(h1p - h2p) <= 180.0, h_sum / 2.0,
+                     np.where(h_sum < 360.0, (h_sum + 360.0) / 2.0, (h_sum - 360.0) / 2.0))
+    h_bar = np.where(chroma == 0, h_sum, h_bar)
+    
+    t = (1.0 - 0.17 * np.cos(np.radians(h_bar - 30.0)) + 0.24 * np.cos(np.radians(2.0 * h_bar)) +
+         0.32 * np.cos(np.radians(3.0 * h_bar + 6.0)) - 0.20 * np.cos(np.radians(4.0 * h_bar - 63.0)))
+    d_theta = 30.0 * np.exp(-(((h_bar - 275.0) / 25.0) ** 2))
+    c_bar7 = c_bar ** 7
+    r_c = 2.0 * np.sqrt(c_bar7 / (c_bar7 + 25.0 ** 7))
+    s_l = 1.0 + 0.015 * (l_bar - 50.0) ** 2 / np.sqrt(20.0 + (l_bar - 50.0) ** 2)
+    s_c = 1.0 + 0.045 * c_bar
+    s_h = 1.0 + 0.015 * c_bar * t
+    r_t = -np.sin(np.radians(2.0 * d_theta)) * r_c
+    
+    l_term, c_term, h_term = d_l / s_l, d_c / s_c, d_h / s_h
+    return np.sqrt(l_term ** 2 + c_term ** 2 + h_term ** 2 + r_t * c_term * h_term)
+
+
+# Perceptual metrics by their Lab difference function
+DELTA_E = {
+    ColorMetric.DELTA_E76: delta_e76,
+    ColorMetric.DELTA_E2000: delta_e2000
+}
+
+
+def color_distance(colors: ColorArray, targets: ColorArray, metric: ColorMetric) -> np.ndarray:
+    """
+    Distance between RGB colors and targets (broadcast over [..., 3]).
+    RGB is the largest per-channel difference, so 'distance <= tolerance'
+    is the classic per-channel tolerance check; the other metrics are ΔE.
+    """
+    if metric == ColorMetric.RGB:
+        colors, targets = np.asarray(colors), np.asarray(targets)
+        exact = np.issubdtype(colors.dtype, np.integer) and np.issubdtype(targets.dtype, np.integer)
+        dtype = np.int16 if exact else np.float64
+        return np.abs(colors.astype(dtype) - targets.astype(dtype)).max(axis=-1)
+    
+    return DELTA_E[metric](rgb_to_lab(colors), rgb_to_lab(targets))
\ No newline at end of file
@@ -0,0 +1,381 @@
+"""
+EnginePool - Runs several profiles at once, one engine per run.
+"""
+
+import time
+import uuid
+import threading
+from datetime import datetime
+from typing import Optional, Callable, Dict, Any, List, Union
+import logging
+
+from .click_engine import ClickEngine
+from .event_bus import EventBus, EventType
+from .failsafe import FailsafeMonitor
+from .input_arbiter import InputArbiter
+from .input_backend import InputBackend
+from .macro_engine import MacroEngine
+from ..models.models import Profile, ExecutionLog
+
+
+logger = logging.getLogger(__name__)
+
+
+Engine = Union[ClickEngine, MacroEngine]
+
+
+# Run events as published on the event bus
+RUN_EVENTS = {
+    'started': EventType.RUN_STARTED,
+    'stopped': EventType.RUN_STOPPED,
+    'paused': EventType.RUN_PAUSED,
+    'resumed': EventType.RUN_RESUMED
+}
+
+
+class RunHandle:
+    """
+    One run of a profile in the pool. Control calls go to the run's engine
+    while it runs; afterwards the handle keeps the run's execution log and
+    final statistics, as the engine is reused for other runs.
+    """
+    
+    __slots__ = ('id', 'profile', 'kind', 'started_at', 'execution_log', 'stop_reason',
+                 '_engine', '_final_stats', '_finished')
+    
+    def __init__(self, profile: Profile, kind: str, engine: Engine):
+        self.id = str(uuid.uuid4())
+        self.profile = profile
+        self.kind = kind
+        self.started_at = datetime.now()
+        self.execution_log: Optional[ExecutionLog] = None
+        self.stop_reason: Optional[str] = None
+        self._engine: Optional[Engine] = engine
+        self._final_stats: Optional[Dict[str, Any]] = None
+        self._finished = threading.Event()
+    
+    @property
+    def profile_id(self) -> str:
+        return self.profile.id
+    
+    @property
+    def priority(self) -> int:
+        return self.profile.input_priority
+    
+    @property
+    def is_running(self) -> bool:
+        return not self._finished.is_set()
+    
+    @property
+    def is_paused(self) -> bool:
+        engine = self._engine
+        return engine is not None and self.is_running and engine.is_paused
+    
+    def stop(self) -> bool:
+        """Stop the run; returns True if it is (now) stopped."""
+        engine = self._engine
+        if engine is None or not self.is_running:
+            return True
+        return engine.stop()
+    
+    def pause(self) -> bool:
+        engine = self._engine
+        return engine is not None and self.is_running and engine.pause()
+    
+    def resume(self) -> bool:
+        engine = self._engine
+        return engine is not None and self.is_running and engine.resume()
+    
+    def emergency_stop(self) -> bool:
+        engine = self._engine
+        if engine is None or not self.is_running:
+            return True
+        return engine.emergency_stop()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the run to finish; returns False on timeout."""
+        return self._finished.wait(timeout)
+    
+    def _finish(self, reason: str) -> None:
+        """Record the end of the run and let go of the engine."""
+        self.stop_reason = reason
+        self._final_stats = self._engine.get_stats()
+        self._engine = None
+        self._finished.set()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistics of this run: live while running, final afterwards."""
+        engine = self._engine
+        stats = engine.get_stats() if engine is not None else dict(self._final_stats or {})
+        stats.update({
+            'run_id': self.id,
+            'profile_id': self.profile.id,
+            'kind': self.kind,
+            'priority': self.priority,
+            'started_at': self.started_at,
+            'stop_reason': self.stop_reason
+        })
+        return stats
+
+
+class EnginePool:
+    """
+    Runs up to max_runs profiles concurrently. Each run gets its own click
+    or macro engine, taken from a pool of idle engines (so compiled macro
+    programs stay cached) or created on demand, and its own RunHandle and
+    ExecutionLog. A profile runs at most once at a time.
+    
+    All engines share the one input device through an InputArbiter: each
+    action takes a turn at its profile's input_priority, so concurrent runs
+    never interleave within a move-and-click or a key chord.
+    
+    With an event bus, run events are also published as RUN_STARTED and
+    so on, and engines publish their progress events (click, step_executed,
+    iteration_completed) on it, so subscribers never run on engine threads.
+    """
+    
+    MAX_RUNS = 4
+    
+    # How long a reused engine may take to wind down its previous worker
+    JOIN_TIMEOUT = 2.0
+    
+    def __init__(self, max_runs: Optional[int] = None, backend: Optional[InputBackend] = None,
+                 failsafe_monitor: Optional[FailsafeMonitor] = None, event_bus: Optional[EventBus] = None):
+        self._max_runs = max_runs or self.MAX_RUNS
+        self._backend = backend
+        self._failsafe_monitor = failsafe_monitor
+        self._event_bus = event_bus
+        self._failsafe_enabled = True
+        self._failsafe_corner = "top-left"
+        self._arbiter = InputArbiter()
+        self._callbacks: Dict[str, Callable] = {}
+        self._lock = threading.Lock()
+        
+        self._idle: Dict[str, List[Engine]] = {'click': [], 'macro': []}
+        self._runs: Dict[str, RunHandle] = {}  # Running, by profile id
+        self._engine_runs: Dict[int, RunHandle] = {}  # Running, by id(engine)
+        self._engines_created = 0
+        
+        # Statistics
+        self._started = 0
+        self._finished = 0
+        self._rejected = 0
+    
+    def register_callback(self, event: str, callback: Callable) -> None:
+        """Register callback for run events (started, stopped, paused, resumed)."""
+        self._callbacks[event] = callback
+    
+    def _trigger_callback(self, event: str, data: Any = None) -> None:
+        """Trigger registered callback and publish the run event on the event bus."""
+        if event in self._callbacks:
+            try:
+                self._callbacks[event](data)
+            except Exception as e:
+                logger.error(f"Callback error for {event}: {e}")
+        
+        if self._event_bus is not None:
+            self._event_bus.publish(RUN_EVENTS[event], data, key=data['run'].id)
+    
+    def set_input_backend(self, backend: InputBackend) -> None:
+        """Set the input device backend used by runs started from now on."""
+        with self._lock:
+            self._backend = backend
+    
+    def set_failsafe(self, enabled: bool, corner: str = "top-left") -> None:
+        """Configure the failsafe of runs started from now on."""
+        with self._lock:
+            self._failsafe_enabled = enabled
+            self._failsafe_corner = corner
+    
+    def set_max_runs(self, max_runs: int) -> None:
+        """Change the number of concurrent runs; running ones are not affected."""
+        with self._lock:
+            self._max_runs = max(1, max_runs)
+    
+    @property
+    def max_runs(self) -> int:
+        return self._max_runs
+    
+    @property
+    def event_bus(self) -> Optional[EventBus]:
+        """The bus run and progress events are published on, if any."""
+        return self._event_bus
+    
+    @property
+    def arbiter(self) -> InputArbiter:
+        """The arbiter serializing access to the input device."""
+        return self._arbiter
+    
+    def _create_engine(self, kind: str) -> Engine:
+        engine = MacroEngine() if kind == 'macro' else ClickEngine()
+        engine.set_failsafe_monitor(self._failsafe_monitor)
+        engine.set_input_arbiter(self._arbiter)
+        engine.set_event_bus(self._event_bus)
+        for event in ('started', 'stopped', 'paused', 'resumed'):
+            engine.register_callback(event, lambda data, event=event: self._on_engine_event(engine, event, data))
+        self._engines_created += 1
+        return engine
+    
+    def _acquire_engine(self, kind: str) -> Engine:
+        """
+        Take an idle engine of the kind whose previous worker has exited, or
+        create one. Workers are joined without the lock, so a slow one does
+        not hold up the other runs' events and queries.
+        """
+        while True:
+            with self._lock:
+                idle = self._idle[kind]
+                if not idle:
+                    return self._create_engine(kind)
+                engine = idle.pop()
+            if engine.join(self.JOIN_TIMEOUT):
+                return engine
+            logger.warning(f"Discarding a {kind} engine whose previous run did not wind down")
+    
+    def start(self, profile: Profile) -> Optional[RunHandle]:
+        """Start a run of the profile; returns None if it cannot run now."""
+        kind = 'macro' if profile.macro_steps else 'click'
+        with self._lock:
+            if not self._admit(profile):
+                return None
+        
+        engine = self._acquire_engine(kind)
+        
+        with self._lock:
+            # Checked again: another start may have run while the engine was acquired
+            if not self._admit(profile):
+                self._idle[kind].append(engine)
+                return None
+            
+            if self._backend is not None:
+                engine.set_input_backend(self._backend)
+            if kind == 'macro':
+                engine.set_failsafe(self._failsafe_enabled)
+            else:
+                engine.set_failsafe(self._failsafe_enabled, self._failsafe_corner)
+            
+            # Registered first: the engine reports 'started' from within start()
+            run = RunHandle(profile, kind, engine)
+            self._runs[profile.id] = run
+            self._engine_runs[id(engine)] = run
+        
+        if not engine.start(profile):
+            with self._lock:
+                # Unless the engine already reported the failed run as stopped
+                if self._engine_runs.pop(id(engine), None) is not None:
+                    self._runs.pop(profile.id, None)
+                    self._idle[kind].append(engine)
+            return None
+        
+        with self._lock:
+            self._started += 1
+        return run
+    
+    def _admit(self, profile: Profile) -> bool:
+        """Whether the profile may start a run now (call with the lock held)."""
+        if profile.id in self._runs:
+            logger.warning(f"Profile is already running: {profile.name}")
+            return False
+        if len(self._runs) >= self._max_runs:
+            self._rejected += 1
+            logger.warning(f"Not starting {profile.name}: {self._max_runs} profiles are already running")
+            return False
+        return True
+    
+    def _on_engine_event(self, engine: Engine, event: str, data: Any) -> None:
+        """Translate an engine event into a run event."""
+        with self._lock:
+            run = self._engine_runs.get(id(engine))
+            if run is None:
+                return  # A duplicate stop report of a finished run
+            
+            if event == 'started':
+                run.execution_log = engine.execution_log
+            elif event == 'stopped':
+                run.execution_log = engine.execution_log
+                del self._engine_runs[id(engine)]
+                self._runs.pop(run.profile_id, None)
+                run._finish(data.get('reason', 'unknown') if isinstance(data, dict) else 'unknown')
+                self._idle[run.kind].append(engine)
+                self._finished += 1
+        
+        payload = {'run': run, 'profile': run.profile}
+        if event == 'stopped':
+            payload['reason'] = run.stop_reason
+            payload['execution_log'] = run.execution_log
+        self._trigger_callback(event, payload)
+    
+    def runs(self) -> List[RunHandle]:
+        """The running runs, oldest first."""
+        with self._lock:
+            return sorted(self._runs.values(), key=lambda run: run.started_at)
+    
+    def get_run(self, profile_id: str) -> Optional[RunHandle]:
+        """The run of a profile, if it is running."""
+        with self._lock:
+            return self._runs.get(profile_id)
+    
+    def is_running(self, profile_id: Optional[str] = None) -> bool:
+        """Whether the profile (or any profile) is running."""
+        with self._lock:
+            return profile_id in self._runs if profile_id is not None else bool(self._runs)
+    
+    def is_paused(self, profile_id: Optional[str] = None) -> bool:
+        """Whether the profile (or any running profile) is paused."""
+        return any(run.is_paused for run in self._select(profile_id))
+    
+    def _select(self, profile_id: Optional[str]) -> List[RunHandle]:
+        if profile_id is None:
+            return self.runs()
+        run = self.get_run(profile_id)
+        return [run] if run is not None else []
+    
+    def stop(self, profile_id: Optional[str] = None) -> bool:
+        """Stop the profile's run, or all runs."""
+        success = True
+        for run in self._select(profile_id):
+            success &= run.stop()
+        return success
+    
+    def pause(self, profile_id: Optional[str] = None) -> bool:
+        """Pause the profile's run, or all runs; returns True if any run was paused."""
+        return any([run.pause() for run in self._select(profile_id)])
+    
+    def resume(self, profile_id: Optional[str] = None) -> bool:
+        """Resume the profile's run, or all runs; returns True if any run was resumed."""
+        return any([run.resume() for run in self._select(profile_id)])
+    
+    def emergency_stop(self) -> bool:
+        """Stop every run immediately."""
+        success = True
+        for run in self.runs():
+            success &= run.emergency_stop()
+        return success
+    
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until no run is running; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            runs = self.runs()
+            if not runs:
+                return True
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not runs[0].wait(remaining):
+                return False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics, including those of every running run."""
+        runs = self.runs()
+        with self._lock:
+            stats = {
+                'max_runs': self._max_runs,
+                'running': len(runs),
+                'idle_engines': sum(len(engines) for engines in self._idle.values()),
+                'engines_created': self._engines_created,
+                'started': self._started,
+                'finished': self._finished,
+                'rejected': self._rejected
+            }
+        stats['input'] = self._arbiter.get_stats()
+        stats['runs'] = [run.get_stats() for run in runs]
+        return stats
\ No newline at end of file
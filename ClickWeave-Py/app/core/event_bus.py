@@ -0,0 +1,283 @@
+"""
+EventBus - Decouples event producers from their handlers with a dispatcher thread.
+"""
+
+import time
+import threading
+from collections import deque
+from enum import Enum
+from typing import Optional, Callable, Dict, Any, List, Tuple, Deque
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class EventType(str, Enum):
+    """Events published on the bus."""
+    RUN_STARTED = "run_started"
+    RUN_STOPPED = "run_stopped"
+    RUN_PAUSED = "run_paused"
+    RUN_RESUMED = "run_resumed"
+    CLICK = "click"
+    STEP_EXECUTED = "step_executed"
+    ITERATION_COMPLETED = "iteration_completed"
+    HOTKEY_START_STOP = "hotkey_start_stop"
+    HOTKEY_PAUSE_RESUME = "hotkey_pause_resume"
+    PIXEL_TRIGGERED = "pixel_triggered"
+    SCHEDULE_TRIGGERED = "schedule_triggered"
+    SCHEDULE_ERROR = "schedule_error"
+    PROFILE_FILE_CHANGED = "profile_file_changed"
+
+
+class EventPolicy(str, Enum):
+    """What happens to an event that finds its queue full or already pending."""
+    DROP = "drop"  # Queue in order; drop new events once max_queued are waiting
+    COALESCE = "coalesce"  # One pending event per key; a newer one replaces its data in place
+
+
+class EventSpec:
+    """Queueing policy of one event type."""
+    
+    __slots__ = ('policy', 'max_queued')
+    
+    def __init__(self, policy: EventPolicy = EventPolicy.DROP, max_queued: int = 1024):
+        self.policy = policy
+        self.max_queued = max(1, max_queued)
+
+
+# Run lifecycle events must not be lost; progress events only matter by their latest value,
+# and trigger fires for a profile that is already waiting to start add nothing
+DEFAULT_SPECS: Dict[EventType, EventSpec] = {
+    EventType.RUN_STARTED: EventSpec(EventPolicy.DROP, 1024),
+    EventType.RUN_STOPPED: EventSpec(EventPolicy.DROP, 1024),
+    EventType.RUN_PAUSED: EventSpec(EventPolicy.DROP, 256),
+    EventType.RUN_RESUMED: EventSpec(EventPolicy.DROP, 256),
+    EventType.CLICK: EventSpec(EventPolicy.COALESCE, 64),
+    EventType.STEP_EXECUTED: EventSpec(EventPolicy.COALESCE, 64),
+    EventType.ITERATION_COMPLETED: EventSpec(EventPolicy.COALESCE, 64),
+    EventType.HOTKEY_START_STOP: EventSpec(EventPolicy.DROP, 4),
+    EventType.HOTKEY_PAUSE_RESUME: EventSpec(EventPolicy.DROP, 4),
+    EventType.PIXEL_TRIGGERED: EventSpec(EventPolicy.COALESCE, 256),
+    EventType.SCHEDULE_TRIGGERED: EventSpec(EventPolicy.COALESCE, 256),
+    EventType.SCHEDULE_ERROR: EventSpec(EventPolicy.DROP, 64),
+    EventType.PROFILE_FILE_CHANGED: EventSpec(EventPolicy.COALESCE, 1024),
+}
+
+
+class _Channel:
+    """Subscribers, pending events and counters of one event type."""
+    
+    __slots__ = ('event_type', 'spec', 'handlers', 'queued', 'pending',
+                 'published', 'delivered', 'dropped', 'coalesced', 'errors')
+    
+    def __init__(self, event_type: EventType, spec: EventSpec):
+        self.event_type = event_type
+        self.spec = spec
+        
+        # Replaced, never mutated, so publishers and the dispatcher read it without the lock
+        self.handlers: Tuple[Callable, ...] = ()
+        self.queued = 0
+        self.pending: Dict[Any, List[Any]] = {}  # Coalescing: key -> queued entry
+        
+        # Statistics
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+
+
+class EventBus:
+    """
+    Delivers events to subscribers on one dispatcher thread, in publish
+    order, so producers such as engine workers, hotkey and watcher threads
+    never run handlers themselves and never wait on the locks handlers take.
+    
+    publish() checks for subscribers without taking a lock, so events that
+    nobody listens to cost a dictionary lookup; producers on hot paths ask
+    has_subscribers() first and skip building the payload altogether.
+    Otherwise publishing holds the bus lock only to enqueue. Each event type
+    has a bounded queue and a policy (see EventSpec): DROP types keep every
+    event until max_queued are waiting, COALESCE types keep one pending
+    event per key and update it in place with the newest data.
+    
+    Handlers run one at a time, so a handler may publish, or call code that
+    publishes, without deadlocking; it should not wait for later events.
+    """
+    
+    def __init__(self, specs: Optional[Dict[EventType, EventSpec]] = None):
+        self._specs = dict(DEFAULT_SPECS)
+        if specs:
+            self._specs.update(specs)
+        self._channels: Dict[EventType, _Channel] = {}
+        self._queue: Deque[List[Any]] = deque()  # Entries: [channel, data, key]
+        self._condition = threading.Condition(threading.Lock())
+        self._dispatcher: Optional[threading.Thread] = None
+        self._dispatching = False
+        self._closed = False
+    
+    def subscribe(self, event_type: EventType, handler: Callable[[Any], None]) -> None:
+        """Call handler(data) on the dispatcher thread for every event of the type."""
+        event_type = EventType(event_type)
+        with self._condition:
+            channel = self._channels.get(event_type)
+            if channel is None:
+                channel = _Channel(event_type, self._specs.get(event_type, EventSpec()))
+                self._channels[event_type] = channel
+            channel.handlers = channel.handlers + (handler,)
+    
+    def unsubscribe(self, event_type: EventType, handler: Callable[[Any], None]) -> bool:
+        """Remove a handler; returns False if it was not subscribed."""
+        with self._condition:
+            channel = self._channels.get(event_type)
+            if channel is None or handler not in channel.handlers:
+                return False
+            handlers = list(channel.handlers)
+            handlers.remove(handler)
+            channel.handlers = tuple(handlers)
+            return True
+    
+    def has_subscribers(self, event_type: EventType) -> bool:
+        """Whether events of the type are delivered to anyone (no locking)."""
+        channel = self._channels.get(event_type)
+        return channel is not None and bool(channel.handlers)
+    
+    def publish(self, event_type: EventType, data: Any = None, key: Any = None) -> bool:
+        """
+        Queue an event for the subscribers of its type without waiting for
+        them. key identifies what a COALESCE event is about (such as a
+        profile id). Returns False if nobody subscribes or it was dropped.
+        """
+        channel = self._channels.get(event_type)
+        if channel is None or not channel.handlers:
+            return False
+        
+        with self._condition:
+            if channel.spec.policy is EventPolicy.COALESCE:
+                entry = channel.pending.get(key)
+                if entry is not None:
+                    entry[1] = data
+                    channel.coalesced += 1
+                    return True
+            if channel.queued >= channel.spec.max_queued:
+                channel.dropped += 1
+                return False
+            
+            entry = [channel, data, key]
+            if channel.spec.policy is EventPolicy.COALESCE:
+                channel.pending[key] = entry
+            channel.queued += 1
+            channel.published += 1
+            self._queue.append(entry)
+            self._condition.notify_all()
+        return True
+    
+    def start(self) -> None:
+        """Start the dispatcher thread; events published earlier are delivered then."""
+        with self._condition:
+            if self._dispatcher is not None and self._dispatcher.is_alive():
+                return
+            self._closed = False
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="EventBus", daemon=True)
+            self._dispatcher.start()
+    
+    def stop(self, timeout: float = 2.0) -> None:
+        """Deliver what is queued, then end the dispatcher thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            dispatcher = self._dispatcher
+        if dispatcher is not None and dispatcher is not threading.current_thread():
+            dispatcher.join(timeout)
+    
+    @property
+    def is_running(self) -> bool:
+        dispatcher = self._dispatcher
+        return dispatcher is not None and dispatcher.is_alive()
+    
+    def _take(self) -> Tuple[_Channel, Any]:
+        """Dequeue the next event (call with the lock held and the queue not empty)."""
+        channel, data, key = self._queue.popleft()
+        channel.queued -= 1
+        if channel.spec.policy is EventPolicy.COALESCE:
+            del channel.pending[key]
+        self._dispatching = True
+        return channel, data
+    
+    def _deliver(self, channel: _Channel, data: Any) -> None:
+        """Call the channel's handlers; errors are logged and do not stop the others."""
+        errors = 0
+        for handler in channel.handlers:
+            try:
+                handler(data)
+            except Exception as e:
+                errors += 1
+                logger.error(f"Event handler error for {channel.event_type.value}: {e}")
+        
+        with self._condition:
+            channel.delivered += 1
+            channel.errors += errors
+            self._dispatching = False
+            if not self._queue:
+                self._condition.notify_all()
+    
+    def _dispatch_loop(self) -> None:
+        """Deliver events in order until stopped and drained."""
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                channel, data = self._take()
+            self._deliver(channel, data)
+    
+    def dispatch_pending(self) -> int:
+        """Deliver queued events on the calling thread (when no dispatcher runs); returns how many."""
+        delivered = 0
+        while True:
+            with self._condition:
+                if not self._queue:
+                    return delivered
+                channel, data = self._take()
+            self._deliver(channel, data)
+            delivered += 1
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued event has been handled; returns False on timeout."""
+        if self._dispatcher is threading.current_thread():
+            return not self._queue
+        if not self.is_running:
+            self.dispatch_pending()
+            return True
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._queue or self._dispatching:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bus statistics, per event type."""
+        with self._condition:
+            return {
+                'running': self.is_running,
+                'queued': len(self._queue),
+                'events': {
+                    channel.event_type.value: {
+                        'subscribers': len(channel.handlers),
+                        'policy': channel.spec.policy.value,
+                        'queued': channel.queued,
+                        'published': channel.published,
+                        'delivered': channel.delivered,
+                        'dropped': channel.dropped,
+                        'coalesced': channel.coalesced,
+                        'errors': channel.errors
+                    }
+                    for channel in self._channels.values()
+                }
+            }
\ No newline at end of file
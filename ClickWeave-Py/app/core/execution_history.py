@@ -0,0 +1,303 @@
+"""
+ExecutionHistory - Fixed-capacity in-memory history of execution logs.
+"""
+
+import threading
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterator
+
+from ..models.models import ExecutionLog
+
+
+class LogRecord:
+    """Compact copy of one execution log."""
+    
+    __slots__ = ('seq', 'id', 'profile_id', 'profile_name', 'start_time', 'end_time', 'total_clicks',
+                 'total_steps', 'average_interval_ms', 'stopped_by', 'error_message')
+    
+    def __init__(self, seq: int, log: ExecutionLog):
+        self.seq = seq
+        self.id = log.id
+        self.profile_id = log.profile_id
+        self.profile_name = log.profile_name
+        self.start_time = log.start_time
+        self.end_time = log.end_time
+        self.total_clicks = log.total_clicks
+        self.total_steps = log.total_steps
+        self.average_interval_ms = log.average_interval_ms
+        self.stopped_by = log.stopped_by
+        self.error_message = log.error_message
+    
+    def to_log(self) -> ExecutionLog:
+        """Rebuild the ExecutionLog model."""
+        return ExecutionLog.model_construct(
+            id=self.id, profile_id=self.profile_id, profile_name=self.profile_name,
+            start_time=self.start_time, end_time=self.end_time, total_clicks=self.total_clicks,
+            total_steps=self.total_steps, average_interval_ms=self.average_interval_ms,
+            stopped_by=self.stopped_by, error_message=self.error_message
+        )
+
+
+class ProfileRunStats:
+    """Running totals of one profile's executions since startup."""
+    
+    __slots__ = ('runs', 'clicks', 'steps', 'errors', '_interval_sum', '_interval_runs', 'last_start')
+    
+    def __init__(self):
+        self.runs = 0
+        self.clicks = 0
+        self.steps = 0
+        self.errors = 0
+        self._interval_sum = 0.0
+        self._interval_runs = 0
+        self.last_start: Optional[datetime] = None
+    
+    def add(self, record: LogRecord) -> None:
+        self.runs += 1
+        self.clicks += record.total_clicks
+        self.steps += record.total_steps
+        if record.error_message:
+            self.errors += 1
+        if record.average_interval_ms is not None:
+            self._interval_sum += record.average_interval_ms
+            self._interval_runs += 1
+        self.last_start = record.start_time
+    
+    @property
+    def mean_interval_ms(self) -> Optional[float]:
+        """Mean of the runs' average intervals."""
+        if not self._interval_runs:
+            return None
+        return self._interval_sum / self._interval_runs
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'runs': self.runs,
+            'clicks': self.clicks,
+            'steps': self.steps,
+            'errors': self.errors,
+            'mean_interval_ms': self.mean_interval_ms,
+            'last_start': self.last_start
+        }
+
+
+class _SeqIndex:
+    """Sequence numbers in append order; removal only from the oldest end."""
+    
+    __slots__ = ('_seqs', '_head')
+    
+    def __init__(self):
+        self._seqs: List[int] = []
+        self._head = 0
+    
+    def append(self, seq: int) -> None:
+        self._seqs.append(seq)
+    
+    def popleft(self) -> None:
+        self._head += 1
+        # Compact once the dead prefix dominates, keeping removal amortized O(1)
+        if self._head > 32 and self._head * 2 > len(self._seqs):
+            del self._seqs[:self._head]
+            self._head = 0
+    
+    def __len__(self) -> int:
+        return len(self._seqs) - self._head
+    
+    def __getitem__(self, i: int) -> int:
+        return self._seqs[self._head + i]
+
+
+class ExecutionHistory:
+    """
+    The last `capacity` execution logs in a ring buffer. Appending is O(1):
+    the oldest record is overwritten and dropped from the profile and
+    stop-reason indexes, which only ever lose their oldest entry. Reads page
+    or iterate over the buffer in place; nothing is copied wholesale.
+    
+    Per-profile counters (runs, clicks, mean interval, ...) are updated on
+    append and cover every run since startup, not just the retained ones.
+    """
+    
+    def __init__(self, capacity: int = 1000):
+        self._capacity = capacity
+        self._slots: List[Optional[LogRecord]] = [None] * capacity
+        self._next_seq = 0
+        self._lock = threading.Lock()
+        
+        self._by_profile: Dict[str, _SeqIndex] = {}
+        self._by_stopped: Dict[str, _SeqIndex] = {}
+        self._profile_stats: Dict[str, ProfileRunStats] = {}
+    
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+    
+    def _oldest_seq(self) -> int:
+        return max(0, self._next_seq - self._capacity)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._next_seq - self._oldest_seq()
+    
+    def append(self, log: ExecutionLog) -> LogRecord:
+        """Add a log, evicting the oldest one when full."""
+        with self._lock:
+            seq = self._next_seq
+            record = LogRecord(seq, log)
+            slot = seq % self._capacity
+            
+            evicted = self._slots[slot]
+            if evicted is not None:
+                self._unindex(self._by_profile, evicted.profile_id)
+                self._unindex(self._by_stopped, evicted.stopped_by)
+            
+            self._slots[slot] = record
+            self._by_profile.setdefault(record.profile_id, _SeqIndex()).append(seq)
+            self._by_stopped.setdefault(record.stopped_by, _SeqIndex()).append(seq)
+            self._profile_stats.setdefault(record.profile_id, ProfileRunStats()).add(record)
+            self._next_seq = seq + 1
+            return record
+    
+    @staticmethod
+    def _unindex(index: Dict[str, _SeqIndex], key: str) -> None:
+        seqs = index[key]
+        seqs.popleft()
+        if not seqs:
+            del index[key]
+    
+    def _select(self, profile_id: Optional[str], stopped_by: Optional[str]) -> Optional[_SeqIndex]:
+        """The smallest index matching the filters, or None for all records."""
+        candidates = []
+        if profile_id is not None:
+            candidates.append(self._by_profile.get(profile_id, _SeqIndex()))
+        if stopped_by is not None:
+            candidates.append(self._by_stopped.get(stopped_by, _SeqIndex()))
+        if not candidates:
+            return None
+        return min(candidates, key=len)
+    
+    @staticmethod
+    def _matches(record: LogRecord, profile_id: Optional[str], stopped_by: Optional[str]) -> bool:
+        return ((profile_id is None or record.profile_id == profile_id) and
+                (stopped_by is None or record.stopped_by == stopped_by))
+    
+    def iter_records(self, profile_id: Optional[str] = None, stopped_by: Optional[str] = None,
+                     newest_first: bool = True) -> Iterator[LogRecord]:
+        """
+        Iterate over retained records, optionally filtered. Records appended
+        while iterating are not visited; records evicted meanwhile are skipped.
+        """
+        if profile_id is not None or stopped_by is not None:
+            yield from self._iter_index(profile_id, stopped_by, newest_first)
+            return
+        
+        with self._lock:
+            first, last = self._oldest_seq(), self._next_seq - 1
+        seqs = range(last, first - 1, -1) if newest_first else range(first, last + 1)
+        
+        for seq in seqs:
+            with self._lock:
+                if seq < self._oldest_seq():
+                    if newest_first:
+                        return
+                    continue
+                record = self._slots[seq % self._capacity]
+            yield record
+    
+    def _iter_index(self, profile_id: Optional[str], stopped_by: Optional[str],
+                    newest_first: bool) -> Iterator[LogRecord]:
+        """Walk an index by sequence number, re-locating after evictions."""
+        with self._lock:
+            limit = self._next_seq
+        cursor: Optional[int] = limit if newest_first else None
+        while True:
+            with self._lock:
+                index = self._select(profile_id, stopped_by)
+                record = None
+                if len(index):
+                    position = self._locate(index, cursor, newest_first)
+                    if position is not None and index[position] < limit:
+                        seq = index[position]
+                        cursor = seq
+                        record = self._slots[seq % self._capacity]
+            if record is None:
+                return
+            if self._matches(record, profile_id, stopped_by):
+                yield record
+    
+    @staticmethod
+    def _locate(index: _SeqIndex, cursor: Optional[int], newest_first: bool) -> Optional[int]:
+        """Position of the sequence number following cursor in iteration order."""
+        n = len(index)
+        if cursor is None:
+            return n - 1 if newest_first else 0
+        
+        # First position whose seq is greater than cursor
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if index[mid] <= cursor:
+                lo = mid + 1
+            else:
+                hi = mid
+        if newest_first:
+            position = lo - 1
+            if position >= 0 and index[position] == cursor:
+                position -= 1
+            return position if position >= 0 else None
+        return lo if lo < n else None
+    
+    def page(self, offset: int = 0, limit: int = 50, profile_id: Optional[str] = None,
+             stopped_by: Optional[str] = None, newest_first: bool = True) -> List[LogRecord]:
+        """One page of records, optionally filtered."""
+        with self._lock:
+            index = self._select(profile_id, stopped_by)
+            if index is None:
+                first, last = self._oldest_seq(), self._next_seq - 1
+                seqs = (range(last - offset, max(first, last - offset - limit + 1) - 1, -1) if newest_first
+                        else range(first + offset, min(last + 1, first + offset + limit)))
+                return [self._slots[seq % self._capacity] for seq in seqs]
+            
+            records = []
+            n = len(index)
+            positions = range(n - 1, -1, -1) if newest_first else range(n)
+            skipped = 0
+            for position in positions:
+                record = self._slots[index[position] % self._capacity]
+                if not self._matches(record, profile_id, stopped_by):
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                records.append(record)
+                if len(records) >= limit:
+                    break
+            return records
+    
+    def profile_stats(self, profile_id: str) -> Optional[ProfileRunStats]:
+        """Counters of one profile's runs since startup."""
+        with self._lock:
+            return self._profile_stats.get(profile_id)
+    
+    def count(self, profile_id: Optional[str] = None, stopped_by: Optional[str] = None) -> int:
+        """Number of retained records matching the filters."""
+        if profile_id is not None and stopped_by is not None:
+            return sum(1 for _ in self.iter_records(profile_id, stopped_by))
+        with self._lock:
+            index = self._select(profile_id, stopped_by)
+            return len(index) if index is not None else self._next_seq - self._oldest_seq()
+    
+    def resize(self, capacity: int) -> None:
+        """Change the capacity, keeping the newest records."""
+        with self._lock:
+            records = [self._slots[seq % self._capacity] for seq in range(self._oldest_seq(), self._next_seq)]
+            records = records[-capacity:]
+            self._capacity = capacity
+            self._slots = [None] * capacity
+            self._by_profile, self._by_stopped = {}, {}
+            for seq, record in enumerate(records):
+                record.seq = seq
+                self._slots[seq] = record
+                self._by_profile.setdefault(record.profile_id, _SeqIndex()).append(seq)
+                self._by_stopped.setdefault(record.stopped_by, _SeqIndex()).append(seq)
+            self._next_seq = len(records)
\ No newline at end of file
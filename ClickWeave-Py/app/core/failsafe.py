@@ -0,0 +1,226 @@
+"""
+FailsafeMonitor - Event-driven failsafe corner detection shared by all engines.
+"""
+
+import time
+import threading
+from typing import Optional, Callable, Dict, Any, Tuple
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def _primary_screen_size() -> Tuple[int, int]:
+    """Query the primary monitor size through mss."""
+    import mss
+    with mss.mss() as sct:
+        monitor = sct.monitors[1] if len(sct.monitors) > 1 else sct.monitors[0]
+        return (monitor['width'], monitor['height'])
+
+
+class FailsafeMonitor:
+    """
+    Listens to pointer motion and fires registered callbacks the moment the
+    pointer enters the failsafe corner, instead of polling the cursor
+    position and screen size on every engine iteration.
+    """
+    
+    # Size of the corner region in pixels
+    CORNER_SIZE = 50
+    
+    # Screen geometry is re-queried at most this often unless the pointer is
+    # seen outside the cached bounds (which means the display configuration
+    # changed)
+    GEOMETRY_MAX_AGE_SECONDS = 30.0
+    
+    CORNERS = ("top-left", "top-right", "bottom-left", "bottom-right")
+    
+    # How long start() waits for the pointer listener to become ready
+    START_TIMEOUT = 2.0
+    
+    def __init__(self, geometry_provider: Optional[Callable[[], Tuple[int, int]]] = None):
+        self._geometry_provider = geometry_provider or _primary_screen_size
+        self._enabled = True
+        self._corner = "top-left"
+        self._listener = None
+        self._running = False
+        self._callbacks: Dict[str, Callable] = {}
+        self._lock = threading.Lock()
+        
+        # Cached geometry
+        self._screen_size: Optional[Tuple[int, int]] = None
+        self._geometry_time = 0.0
+        self._geometry_refreshes = 0
+        
+        # Pointer state
+        self._in_corner = False
+        self._trigger_count = 0
+    
+    def configure(self, enabled: bool, corner: str = "top-left") -> None:
+        """Configure failsafe settings."""
+        if corner not in self.CORNERS:
+            logger.warning(f"Unknown failsafe corner '{corner}', using top-left")
+            corner = "top-left"
+        
+        self._enabled = enabled
+        self._corner = corner
+        self._in_corner = False
+    
+    def register_callback(self, name: str, callback: Callable) -> None:
+        """Register a callback invoked when the failsafe fires."""
+        with self._lock:
+            self._callbacks[name] = callback
+    
+    def unregister_callback(self, name: str) -> None:
+        """Remove a failsafe callback."""
+        with self._lock:
+            self._callbacks.pop(name, None)
+    
+    def invalidate_geometry(self) -> None:
+        """Force the screen geometry to be re-queried on the next event."""
+        self._screen_size = None
+    
+    def _get_screen_size(self, x: int, y: int) -> Tuple[int, int]:
+        """Get cached screen geometry, refreshing it only when it looks stale."""
+        now = time.monotonic()
+        size = self._screen_size
+        if (size is None or x >= size[0] or y >= size[1] or
+                now - self._geometry_time > self.GEOMETRY_MAX_AGE_SECONDS):
+            try:
+                size = self._geometry_provider()
+                self._geometry_refreshes += 1
+            except Exception as e:
+                logger.error(f"Failed to query screen geometry: {e}")
+                size = size or (x + 1, y + 1)
+            self._screen_size = size
+            self._geometry_time = now
+        return size
+    
+    def is_in_corner(self, x: int, y: int) -> bool:
+        """Check whether a position lies in the configured failsafe corner."""
+        width, height = self._get_screen_size(x, y)
+        corner_size = self.CORNER_SIZE
+        
+        if self._corner == "top-left":
+            return x <= corner_size and y <= corner_size
+        elif self._corner == "top-right":
+            return x >= width - corner_size and y <= corner_size
+        elif self._corner == "bottom-left":
+            return x <= corner_size and y >= height - corner_size
+        elif self._corner == "bottom-right":
+            return x >= width - corner_size and y >= height - corner_size
+        
+        return False
+    
+    def check_position(self, x: int, y: int) -> bool:
+        """
+        Process a pointer position. Fires callbacks when the pointer enters
+        the corner and returns whether it is currently inside.
+        """
+        if not self._enabled:
+            return False
+        
+        inside = self.is_in_corner(int(x), int(y))
+        entered = inside and not self._in_corner
+        self._in_corner = inside
+        
+        if entered:
+            self._fire(x, y)
+        return inside
+    
+    def _fire(self, x: int, y: int) -> None:
+        """Invoke all failsafe callbacks."""
+        self._trigger_count += 1
+        logger.warning(f"Failsafe corner reached at ({x}, {y})")
+        
+        with self._lock:
+            callbacks = list(self._callbacks.items())
+        
+        data = {'x': x, 'y': y, 'corner': self._corner}
+        for name, callback in callbacks:
+            try:
+                callback(data)
+            except Exception as e:
+                logger.error(f"Failsafe callback error for {name}: {e}")
+    
+    def _on_move(self, x: int, y: int) -> None:
+        """Pointer listener handler."""
+        self.check_position(x, y)
+    
+    def start(self) -> bool:
+        """Start listening to pointer events."""
+        if self._running:
+            return True
+        
+        try:
+            from pynput import mouse
+            listener = mouse.Listener(on_move=self._on_move)
+            listener.daemon = True
+            listener.start()
+            if not self._wait_ready(listener):
+                listener.stop()
+                logger.warning("Failsafe monitor listener did not start, engines will poll instead")
+                return False
+            
+            self._listener = listener
+            self._running = True
+            logger.info("Failsafe monitor started")
+            return True
+        
+        except Exception as e:
+            logger.warning(f"Failsafe monitor unavailable, engines will poll instead: {e}")
+            self._listener = None
+            return False
+    
+    def _wait_ready(self, listener: Any) -> bool:
+        """Wait until the listener receives events; False if it died or timed out first."""
+        # listener.wait() never returns for a listener that fails to start, so wait on the side
+        waiter = threading.Thread(target=listener.wait, daemon=True)
+        waiter.start()
+        waiter.join(self.START_TIMEOUT)
+        return not waiter.is_alive() and listener.is_alive()
+    
+    def stop(self) -> bool:
+        """Stop listening to pointer events."""
+        if not self._running:
+            return True
+        
+        try:
+            if self._listener:
+                self._listener.stop()
+            self._listener = None
+            self._running = False
+            logger.info("Failsafe monitor stopped")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error stopping failsafe monitor: {e}")
+            return False
+    
+    def is_running(self) -> bool:
+        """Check if the pointer listener is running (and has not died, e.g. on a lost display)."""
+        listener = self._listener
+        return self._running and listener is not None and listener.is_alive()
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether the failsafe is enabled."""
+        return self._enabled
+    
+    @property
+    def in_corner(self) -> bool:
+        """Whether the pointer was last seen inside the failsafe corner."""
+        return self._in_corner
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get monitor statistics."""
+        return {
+            'is_running': self._running,
+            'enabled': self._enabled,
+            'corner': self._corner,
+            'screen_size': self._screen_size,
+            'geometry_refreshes': self._geometry_refreshes,
+            'trigger_count': self._trigger_count,
+            'subscribers': len(self._callbacks)
+        }
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+InputArbiter - Serialized, prioritized access to the physical input device.
+"""
+
+import time
+import heapq
+import itertools
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+from .input_backend import InputBackend
+
+
+class InputArbiter:
+    """
+    Lets concurrent runs take turns on the one mouse and keyboard. A turn
+    covers one action (a move and its click, a key chord) so actions of
+    different runs never interleave. Waiting runs queue by priority, then
+    first come, first served; the holder's thread performs its own action,
+    so an uncontended turn costs a lock round trip and no thread handoff.
+    
+    Turns are reentrant: primitive calls made while the thread already
+    holds a turn pass straight through.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._owner: Optional[int] = None
+        self._depth = 0
+        self._sequence = itertools.count()
+        
+        # Waiting threads: (-priority, sequence, thread ident)
+        self._waiters: List[Tuple[int, int, int]] = []
+        
+        # Statistics
+        self._turns = 0
+        self._contended = 0
+        self._wait_seconds = 0.0
+    
+    def acquire(self, priority: int = 0) -> None:
+        """Wait for a turn on the device."""
+        me = threading.get_ident()
+        with self._condition:
+            if self._owner == me:
+                self._depth += 1
+                return
+            
+            if self._owner is None and not self._waiters:
+                self._owner = me
+                self._depth = 1
+                self._turns += 1
+                return
+            
+            entry = (-priority, next(self._sequence), me)
+            heapq.heappush(self._waiters, entry)
+            self._contended += 1
+            waiting_since = time.perf_counter()
+            while self._owner is not None or self._waiters[0] is not entry:
+                self._condition.wait()
+            
+            heapq.heappop(self._waiters)
+            self._owner = me
+            self._depth = 1
+            self._turns += 1
+            self._wait_seconds += time.perf_counter() - waiting_since
+    
+    def release(self) -> None:
+        """End the current turn (or one nesting level of it)."""
+        with self._condition:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("Releasing an input turn the thread does not hold")
+            self._depth -= 1
+            if self._depth == 0:
+                self._owner = None
+                if self._waiters:
+                    self._condition.notify_all()
+    
+    def turn(self, priority: int = 0) -> '_Turn':
+        """Context manager holding a turn for its block."""
+        return _Turn(self, priority)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get arbitration statistics."""
+        with self._condition:
+            return {
+                'turns': self._turns,
+                'contended': self._contended,
+                'waiting': len(self._waiters),
+                'wait_seconds': self._wait_seconds
+            }
+
+
+class _Turn:
+    """One held turn; see InputArbiter.turn()."""
+    
+    __slots__ = ('_arbiter', '_priority')
+    
+    def __init__(self, arbiter: InputArbiter, priority: int):
+        self._arbiter = arbiter
+        self._priority = priority
+    
+    def __enter__(self) -> None:
+        self._arbiter.acquire(self._priority)
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self._arbiter.release()
+
+
+class ArbitratedBackend(InputBackend):
+    """
+    Input backend of one run: forwards to the shared backend, taking a turn
+    on the arbiter at the run's priority for every action. Engines hold a
+    turn across compound actions with exclusive(). Cursor and screen
+    queries are reads and do not wait for a turn.
+    """
+    
+    def __init__(self, backend: InputBackend, arbiter: InputArbiter, priority: int = 0):
+        self._backend = backend
+        self._arbiter = arbiter
+        self._turn = _Turn(arbiter, priority)
+    
+    @property
+    def name(self) -> str:
+        return self._backend.name
+    
+    @property
+    def backend(self) -> InputBackend:
+        """The shared backend actions are forwarded to."""
+        return self._backend
+    
+    def exclusive(self) -> _Turn:
+        return self._turn
+    
+    def position(self) -> Tuple[int, int]:
+        return self._backend.position()
+    
+    def screen_size(self) -> Tuple[int, int]:
+        return self._backend.screen_size()
+    
+    def _warp(self, x: int, y: int) -> None:
+        with self._turn:
+            self._backend._warp(x, y)
+    
+    def move_to(self, x: int, y: int, duration: float = 0.0) -> None:
+        with self._turn:
+            self._backend.move_to(x, y, duration)
+    
+    def mouse_down(self, button: str = 'left') -> None:
+        with self._turn:
+            self._backend.mouse_down(button)
+    
+    def mouse_up(self, button: str = 'left') -> None:
+        with self._turn:
+            self._backend.mouse_up(button)
+    
+    def click(self, button: str = 'left', clicks: int = 1) -> None:
+        with self._turn:
+            self._backend.click(button, clicks)
+    
+    def resolve_key(self, key: str) -> Any:
+        return self._backend.resolve_key(key)
+    
+    def key_down(self, key: str) -> None:
+        with self._turn:
+            self._backend.key_down(key)
+    
+    def key_up(self, key: str) -> None:
+        with self._turn:
+            self._backend.key_up(key)
+    
+    def press(self, key: str) -> None:
+        with self._turn:
+            self._backend.press(key)
+    
+    def scroll(self, amount: int) -> None:
+        with self._turn:
+            self._backend.scroll(amount)
+    
+    def close(self) -> None:
+        """The shared backend is closed by its owner."""
+        pass
\ No newline at end of file
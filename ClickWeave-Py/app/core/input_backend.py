@@ -0,0 +1,434 @@
+"""
+InputBackend - Pluggable mouse and keyboard injection backends.
+"""
+
+import time
+import threading
+import contextlib
+from typing import Optional, Dict, Any, List, Tuple, Type
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+# Returned by exclusive() when the device is not shared
+_NOT_SHARED = contextlib.nullcontext()
+
+
+class InputBackend:
+    """
+    Interface for injecting mouse and keyboard input.
+    
+    Engines only talk to this interface, so the per-call cost is whatever the
+    concrete backend needs and nothing more.
+    """
+    
+    name = "base"
+    
+    # Interval between interpolated points when a move has a duration
+    MOVE_STEP_SECONDS = 0.01
+    
+    def position(self) -> Tuple[int, int]:
+        """Get the current cursor position."""
+        raise NotImplementedError
+    
+    def screen_size(self) -> Tuple[int, int]:
+        """Get the primary screen size."""
+        raise NotImplementedError
+    
+    def _warp(self, x: int, y: int) -> None:
+        """Move the cursor instantly."""
+        raise NotImplementedError
+    
+    def move_to(self, x: int, y: int, duration: float = 0.0) -> None:
+        """Move the cursor, interpolating linearly when a duration is given."""
+        if duration <= 0:
+            self._warp(x, y)
+            return
+        
+        start_x, start_y = self.position()
+        steps = max(1, int(duration / self.MOVE_STEP_SECONDS))
+        start = time.perf_counter()
+        for i in range(1, steps + 1):
+            t = i / steps
+            self._warp(round(start_x + (x - start_x) * t), round(start_y + (y - start_y) * t))
+            delay = start + t * duration - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    
+    def mouse_down(self, button: str = 'left') -> None:
+        """Press a mouse button."""
+        raise NotImplementedError
+    
+    def mouse_up(self, button: str = 'left') -> None:
+        """Release a mouse button."""
+        raise NotImplementedError
+    
+    def click(self, button: str = 'left', clicks: int = 1) -> None:
+        """Click a mouse button one or more times."""
+        for _ in range(clicks):
+            self.mouse_down(button)
+            self.mouse_up(button)
+    
+    def resolve_key(self, key: str) -> Any:
+        """
+        Resolve a key name to the backend's native key token ahead of time.
+        The key methods accept either names or resolved tokens.
+        """
+        return key
+    
+    def key_down(self, key: str) -> None:
+        """Press a key."""
+        raise NotImplementedError
+    
+    def key_up(self, key: str) -> None:
+        """Release a key."""
+        raise NotImplementedError
+    
+    def press(self, key: str) -> None:
+        """Press and release a key."""
+        self.key_down(key)
+        self.key_up(key)
+    
+    def scroll(self, amount: int) -> None:
+        """Scroll at the current cursor position (positive is up)."""
+        raise NotImplementedError
+    
+    def exclusive(self) -> Any:
+        """
+        Context manager keeping the device to this caller for a compound
+        action. Only backends shared between concurrent runs (see
+        ArbitratedBackend) need to do anything.
+        """
+        return _NOT_SHARED
+    
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+        pass
+
+
+class PyAutoGUIBackend(InputBackend):
+    """Backend built on pyautogui (portable, highest per-call overhead)."""
+    
+    name = "pyautogui"
+    
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+        
+        # Failsafe and pacing are handled by the engines
+        pyautogui.FAILSAFE = False
+        pyautogui.PAUSE = 0.0
+    
+    def position(self) -> Tuple[int, int]:
+        x, y = self._pyautogui.position()
+        return (x, y)
+    
+    def screen_size(self) -> Tuple[int, int]:
+        width, height = self._pyautogui.size()
+        return (width, height)
+    
+    def _warp(self, x: int, y: int) -> None:
+        self._pyautogui.moveTo(x, y)
+    
+    def move_to(self, x: int, y: int, duration: float = 0.0) -> None:
+        self._pyautogui.moveTo(x, y, duration=duration)
+    
+    def mouse_down(self, button: str = 'left') -> None:
+        self._pyautogui.mouseDown(button=button)
+    
+    def mouse_up(self, button: str = 'left') -> None:
+        self._pyautogui.mouseUp(button=button)
+    
+    def click(self, button: str = 'left', clicks: int = 1) -> None:
+        self._pyautogui.click(button=button, clicks=clicks)
+    
+    def key_down(self, key: str) -> None:
+        self._pyautogui.keyDown(key)
+    
+    def key_up(self, key: str) -> None:
+        self._pyautogui.keyUp(key)
+    
+    def press(self, key: str) -> None:
+        self._pyautogui.press(key)
+    
+    def scroll(self, amount: int) -> None:
+        self._pyautogui.scroll(amount)
+
+
+class PynputBackend(InputBackend):
+    """Backend built on pynput controllers (no pacing or failsafe bookkeeping)."""
+    
+    name = "pynput"
+    
+    KEY_ALIASES = {
+        'control': 'ctrl',
+        'command': 'cmd',
+        'win': 'cmd',
+        'windows': 'cmd',
+        'return': 'enter',
+        'escape': 'esc',
+        'del': 'delete',
+        'pgup': 'page_up',
+        'pageup': 'page_up',
+        'pgdn': 'page_down',
+        'pagedown': 'page_down'
+    }
+    
+    def __init__(self):
+        from pynput import mouse, keyboard
+        self._mouse = mouse.Controller()
+        self._keyboard = keyboard.Controller()
+        self._buttons = {
+            'left': mouse.Button.left,
+            'right': mouse.Button.right,
+            'middle': mouse.Button.middle
+        }
+        self._key_type = keyboard.Key
+        self._key_code_type = keyboard.KeyCode
+        self._screen_size: Optional[Tuple[int, int]] = None
+    
+    def _to_key(self, key: Any) -> Any:
+        if not isinstance(key, str):
+            return key
+        
+        name = key.lower()
+        name = self.KEY_ALIASES.get(name, name)
+        if hasattr(self._key_type, name):
+            return getattr(self._key_type, name)
+        if len(key) == 1:
+            return self._key_code_type.from_char(key)
+        raise ValueError(f"Unsupported key: {key}")
+    
+    def resolve_key(self, key: str) -> Any:
+        return self._to_key(key)
+    
+    def position(self) -> Tuple[int, int]:
+        x, y = self._mouse.position
+        return (int(x), int(y))
+    
+    def screen_size(self) -> Tuple[int, int]:
+        if self._screen_size is None:
+            import mss
+            with mss.mss() as sct:
+                monitor = sct.monitors[1] if len(sct.monitors) > 1 else sct.monitors[0]
+                self._screen_size = (monitor['width'], monitor['height'])
+        return self._screen_size
+    
+    def _warp(self, x: int, y: int) -> None:
+        self._mouse.position = (x, y)
+    
+    def mouse_down(self, button: str = 'left') -> None:
+        self._mouse.press(self._buttons[button])
+    
+    def mouse_up(self, button: str = 'left') -> None:
+        self._mouse.release(self._buttons[button])
+    
+    def click(self, button: str = 'left', clicks: int = 1) -> None:
+        self._mouse.click(self._buttons[button], clicks)
+    
+    def key_down(self, key: str) -> None:
+        self._keyboard.press(self._to_key(key))
+    
+    def key_up(self, key: str) -> None:
+        self._keyboard.release(self._to_key(key))
+    
+    def scroll(self, amount: int) -> None:
+        self._mouse.scroll(0, amount)
+
+
+class XTestBackend(InputBackend):
+    """
+    Linux backend that injects events directly through the X11 XTEST
+    extension, flushing without waiting for a server round trip.
+    """
+    
+    name = "xtest"
+    
+    BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+    SCROLL_UP = 4
+    SCROLL_DOWN = 5
+    
+    KEYSYM_ALIASES = {
+        'ctrl': 'Control_L',
+        'control': 'Control_L',
+        'alt': 'Alt_L',
+        'shift': 'Shift_L',
+        'cmd': 'Super_L',
+        'command': 'Super_L',
+        'win': 'Super_L',
+        'windows': 'Super_L',
+        'enter': 'Return',
+        'return': 'Return',
+        'esc': 'Escape',
+        'escape': 'Escape',
+        'tab': 'Tab',
+        'space': 'space',
+        'backspace': 'BackSpace',
+        'delete': 'Delete',
+        'del': 'Delete',
+        'insert': 'Insert',
+        'home': 'Home',
+        'end': 'End',
+        'pageup': 'Prior',
+        'pgup': 'Prior',
+        'pagedown': 'Next',
+        'pgdn': 'Next',
+        'up': 'Up',
+        'down': 'Down',
+        'left': 'Left',
+        'right': 'Right'
+    }
+    
+    def __init__(self, display_name: Optional[str] = None):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        self._display = display.Display(display_name)
+        if not self._display.has_extension('XTEST'):
+            raise RuntimeError("X server does not support the XTEST extension")
+        self._root = self._display.screen().root
+        self._keycodes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def _keycode(self, key: Any) -> int:
+        if isinstance(key, int):
+            return key
+        
+        keycode = self._keycodes.get(key)
+        if keycode is not None:
+            return keycode
+        
+        name = self.KEYSYM_ALIASES.get(key.lower(), key)
+        if len(name) > 1 and name[0] in 'fF' and name[1:].isdigit():
+            name = name.upper()
+        keysym = self._XK.string_to_keysym(name)
+        if keysym == 0:
+            raise ValueError(f"Unsupported key: {key}")
+        
+        keycode = self._display.keysym_to_keycode(keysym)
+        self._keycodes[key] = keycode
+        return keycode
+    
+    def resolve_key(self, key: str) -> Any:
+        return self._keycode(key)
+    
+    def _fake(self, event_type: int, detail: int = 0, **kwargs) -> None:
+        with self._lock:
+            self._xtest.fake_input(self._display, event_type, detail, **kwargs)
+            self._display.flush()
+    
+    def position(self) -> Tuple[int, int]:
+        with self._lock:
+            pointer = self._root.query_pointer()
+        return (pointer.root_x, pointer.root_y)
+    
+    def screen_size(self) -> Tuple[int, int]:
+        screen = self._display.screen()
+        return (screen.width_in_pixels, screen.height_in_pixels)
+    
+    def _warp(self, x: int, y: int) -> None:
+        self._fake(self._X.MotionNotify, x=x, y=y)
+    
+    def mouse_down(self, button: str = 'left') -> None:
+        self._fake(self._X.ButtonPress, self.BUTTONS[button])
+    
+    def mouse_up(self, button: str = 'left') -> None:
+        self._fake(self._X.ButtonRelease, self.BUTTONS[button])
+    
+    def key_down(self, key: str) -> None:
+        self._fake(self._X.KeyPress, self._keycode(key))
+    
+    def key_up(self, key: str) -> None:
+        self._fake(self._X.KeyRelease, self._keycode(key))
+    
+    def scroll(self, amount: int) -> None:
+        button = self.SCROLL_UP if amount > 0 else self.SCROLL_DOWN
+        for _ in range(abs(amount)):
+            self._fake(self._X.ButtonPress, button)
+            self._fake(self._X.ButtonRelease, button)
+    
+    def close(self) -> None:
+        try:
+            self._display.close()
+        except Exception:
+            pass
+
+
+class RecordingBackend(InputBackend):
+    """
+    In-memory backend that records every call instead of touching the
+    display. Used for tests and headless benchmarks.
+    """
+    
+    name = "recording"
+    
+    def __init__(self, screen_size: Tuple[int, int] = (1920, 1080)):
+        self._screen_size = screen_size
+        self._position = (screen_size[0] // 2, screen_size[1] // 2)
+        self.events: List[Tuple[float, str, Tuple[Any, ...]]] = []
+    
+    def _record(self, action: str, *args: Any) -> None:
+        self.events.append((time.perf_counter(), action, args))
+    
+    def actions(self, action: Optional[str] = None) -> List[Tuple[Any, ...]]:
+        """Get recorded call arguments, optionally filtered by action."""
+        return [(name,) + args for _, name, args in self.events if action is None or name == action]
+    
+    def clear(self) -> None:
+        """Discard recorded events."""
+        self.events.clear()
+    
+    def set_position(self, x: int, y: int) -> None:
+        """Simulate the user moving the cursor."""
+        self._position = (x, y)
+    
+    def position(self) -> Tuple[int, int]:
+        return self._position
+    
+    def screen_size(self) -> Tuple[int, int]:
+        return self._screen_size
+    
+    def _warp(self, x: int, y: int) -> None:
+        self._position = (x, y)
+        self._record('move', x, y)
+    
+    def mouse_down(self, button: str = 'left') -> None:
+        self._record('mouse_down', button)
+    
+    def mouse_up(self, button: str = 'left') -> None:
+        self._record('mouse_up', button)
+    
+    def click(self, button: str = 'left', clicks: int = 1) -> None:
+        self._record('click', button, clicks)
+    
+    def key_down(self, key: str) -> None:
+        self._record('key_down', key)
+    
+    def key_up(self, key: str) -> None:
+        self._record('key_up', key)
+    
+    def press(self, key: str) -> None:
+        self._record('press', key)
+    
+    def scroll(self, amount: int) -> None:
+        self._record('scroll', amount)
+
+
+INPUT_BACKENDS: Dict[str, Type[InputBackend]] = {
+    PyAutoGUIBackend.name: PyAutoGUIBackend,
+    PynputBackend.name: PynputBackend,
+    XTestBackend.name: XTestBackend,
+    RecordingBackend.name: RecordingBackend
+}
+
+
+def create_input_backend(name: str) -> InputBackend:
+    """Create an input backend by name."""
+    backend_class = INPUT_BACKENDS.get(name.lower())
+    if backend_class is None:
+        raise ValueError(f"Unknown input backend: {name}")
+    return backend_class()
\ No newline at end of file
@@ -0,0 +1,274 @@
+"""
+LogWriter - Background execution-log writer with batching and rotation.
+"""
+
+import os
+import csv
+import time
+import queue
+import threading
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable, TextIO
+import logging
+
+from ..models.models import ExecutionLog
+
+
+logger = logging.getLogger(__name__)
+
+
+CSV_HEADER = [
+    'ID', 'Profile Name', 'Start Time', 'End Time',
+    'Total Clicks', 'Total Steps', 'Average Interval (ms)',
+    'Duration (s)', 'Stopped By', 'Error Message'
+]
+
+
+class CsvLogSink:
+    """
+    Appends execution logs to monthly CSV files. The current file stays
+    open between batches; a new file is started when the month changes or
+    the file grows past max_bytes (execution_log_2024_05.csv, then
+    execution_log_2024_05_1.csv, ...).
+    """
+    
+    def __init__(self, directory: str, max_bytes: int = 10 * 1024 * 1024,
+                 clock: Callable[[], datetime] = datetime.now):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._file: Optional[TextIO] = None
+        self._writer = None
+        self._month: Optional[str] = None
+        self._part = 0
+        self.rotations = 0
+    
+    @property
+    def path(self) -> Optional[str]:
+        """Path of the file currently being written."""
+        return self._file.name if self._file else None
+    
+    def _file_name(self, month: str, part: int) -> str:
+        suffix = f"_{part}" if part else ""
+        return os.path.join(self._directory, f"execution_log_{month}{suffix}.csv")
+    
+    def _open(self, month: str, part: int) -> None:
+        """Open a log file for appending, writing the header if it is new."""
+        self._close_file()
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._file_name(month, part)
+        self._file = open(path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._month, self._part = month, part
+        if self._file.tell() == 0:
+            self._writer.writerow(CSV_HEADER)
+    
+    def _open_month(self, month: str) -> None:
+        """Continue the newest file of a month that is not full yet."""
+        part = 0
+        while os.path.exists(self._file_name(month, part + 1)):
+            part += 1
+        if os.path.exists(self._file_name(month, part)) and \
+                os.path.getsize(self._file_name(month, part)) >= self._max_bytes:
+            part += 1
+        self._open(month, part)
+    
+    def write(self, logs: List[ExecutionLog]) -> None:
+        """Append a batch of logs and flush the file."""
+        month = self._clock().strftime('%Y_%m')
+        if self._file is None or month != self._month:
+            if self._file is not None:
+                self.rotations += 1
+            self._open_month(month)
+        
+        for log in logs:
+            if self._file.tell() >= self._max_bytes:
+                self.rotations += 1
+                self._open(month, self._part + 1)
+            self._writer.writerow(log.to_csv_row())
+        self._file.flush()
+    
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+    
+    def close(self) -> None:
+        """Close the current file."""
+        self._close_file()
+
+
+class SQLiteLogSink:
+    """Writes execution log batches to SQLiteStorage in one transaction each."""
+    
+    def __init__(self, storage: Any):
+        self._storage = storage
+    
+    def write(self, logs: List[ExecutionLog]) -> None:
+        self._storage.save_execution_logs(logs)
+
+
+class _FlushRequest:
+    """Queue marker asking the writer thread to write out what it has."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class ExecutionLogWriter:
+    """
+    Writes execution logs on a background thread so run completion never
+    waits on disk I/O. Logs go through a bounded queue and are written in
+    batches, when BATCH_SIZE logs are pending or FLUSH_INTERVAL seconds
+    after the oldest pending one. close() writes everything still queued.
+    
+    The sink is anything with write(logs), such as CsvLogSink or
+    SQLiteLogSink, and optionally close().
+    """
+    
+    BATCH_SIZE = 64
+    FLUSH_INTERVAL = 1.0
+    QUEUE_SIZE = 1024
+    
+    # How long submit() waits for room in a full queue before dropping
+    PUT_TIMEOUT = 0.05
+    
+    def __init__(self, sink: Any, batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 queue_size: Optional[int] = None):
+        self._sink = sink
+        self._batch_size = batch_size or self.BATCH_SIZE
+        self._flush_interval = self.FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size or self.QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        
+        # Statistics
+        self._submitted = 0
+        self._written = 0
+        self._batches = 0
+        self._dropped = 0
+        self._errors = 0
+    
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer_loop, name="ExecutionLogWriter", daemon=True)
+        self._thread.start()
+    
+    def submit(self, log: ExecutionLog) -> bool:
+        """Queue a log for writing; returns False if it had to be dropped."""
+        if self._closed:
+            logger.error(f"Execution log {log.id} submitted after close, dropped")
+            self._dropped += 1
+            return False
+        
+        try:
+            self._queue.put(log, timeout=self.PUT_TIMEOUT)
+        except queue.Full:
+            logger.error(f"Execution log queue full, dropped log {log.id}")
+            self._dropped += 1
+            return False
+        
+        self._submitted += 1
+        return True
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything submitted so far has been written."""
+        if not (self._thread and self._thread.is_alive()):
+            self._drain()
+            return True
+        
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+    
+    def _write(self, batch: List[ExecutionLog]) -> None:
+        if not batch:
+            return
+        try:
+            self._sink.write(batch)
+            self._written += len(batch)
+            self._batches += 1
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"Failed to write {len(batch)} execution logs: {e}")
+    
+    def _drain(self) -> None:
+        """Write everything queued, on the calling thread."""
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _FlushRequest):
+                item.done.set()
+            elif item is not None:
+                batch.append(item)
+            if len(batch) >= self._batch_size:
+                self._write(batch)
+                batch = []
+        self._write(batch)
+    
+    def _writer_loop(self) -> None:
+        """Collect logs into batches and write them."""
+        batch: List[ExecutionLog] = []
+        deadline: Optional[float] = None
+        
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # Flush interval elapsed
+            
+            if isinstance(item, ExecutionLog):
+                if not batch:
+                    deadline = time.monotonic() + self._flush_interval
+                batch.append(item)
+                if len(batch) < self._batch_size:
+                    continue
+            
+            self._write(batch)
+            batch, deadline = [], None
+            
+            if isinstance(item, _FlushRequest):
+                item.done.set()
+            elif item is None:
+                break
+    
+    def close(self, timeout: float = 5.0) -> None:
+        """Write all queued logs, stop the thread and close the sink."""
+        if self._closed:
+            return
+        self._closed = True
+        
+        if self._thread and self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=timeout)
+                self._thread.join(timeout)
+            except queue.Full:
+                logger.error("Execution log writer is not draining its queue")
+        self._drain()
+        
+        close = getattr(self._sink, 'close', None)
+        if close:
+            try:
+                close()
+            except Exception as e:
+                logger.error(f"Error closing execution log sink: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer statistics."""
+        return {
+            'submitted': self._submitted,
+            'written': self._written,
+            'batches': self._batches,
+            'pending': self._queue.qsize(),
+            'dropped': self._dropped,
+            'errors': self._errors,
+            'rotations': getattr(self._sink, 'rotations', 0)
+        }
\ No newline at end of file
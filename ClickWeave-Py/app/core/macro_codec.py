@@ -0,0 +1,300 @@
+"""
+MacroCodec - Compact binary encoding of macro steps.
+"""
+
+import json
+import mmap
+import uuid
+import struct
+import hashlib
+from typing import Optional, Dict, Any, List, Union, Iterable
+
+import numpy as np
+from pydantic import BaseModel, TypeAdapter
+
+from ..models.models import (
+    MacroStep, MacroStepType, ClickType, Coordinates, construct_trusted, trusted_factory, gc_paused
+)
+
+
+MAGIC = b'CWMS'
+VERSION = 1
+
+# magic, version, id layout, count, widths of the dx, dy, delay, scroll and loop columns
+_HEADER = struct.Struct('<4sHHI5s3x')
+
+ID_STRINGS = 0  # Offsets into a UTF-8 blob
+ID_UUIDS = 1  # 16 raw bytes per id, for canonical UUID strings
+
+# Step flags
+ENABLED = 0x01
+HAS_COORDINATES = 0x02
+HAS_CLICK_TYPE = 0x04
+HAS_DELAY = 0x08
+HAS_SCROLL_AMOUNT = 0x10
+
+STEP_TYPES = list(MacroStepType)
+CLICK_TYPES = list(ClickType)
+_STEP_TYPE_CODES = {step_type: code for code, step_type in enumerate(STEP_TYPES)}
+_CLICK_TYPE_CODES = {click_type: code for code, click_type in enumerate(CLICK_TYPES)}
+
+
+class _Extras:
+    """
+    The fields of a model that have no column. A step stores those that
+    differ from their default in the JSON extras, by field name, so fields
+    added to the models round-trip without changes here.
+    """
+    
+    def __init__(self, model: type, columns: Iterable[str]):
+        fields = {name: field for name, field in model.model_fields.items() if name not in columns}
+        self.names = tuple(fields)
+        self._unset = {name: field.get_default(call_default_factory=True) for name, field in fields.items()}
+        # Fields missing from the extras: defaults as is, default factories called per model
+        self.defaults = {name: field.default for name, field in fields.items() if field.default_factory is None}
+        self.factories = [(name, field.default_factory) for name, field in fields.items()
+                          if field.default_factory is not None]
+        self._dump = {name: TypeAdapter(field.annotation).dump_python for name, field in fields.items()}
+    
+    def encode(self, model: BaseModel, extra: Dict[str, Any]) -> None:
+        """Add the model's values that differ from their defaults to extra, as JSON values."""
+        for name in self.names:
+            value = getattr(model, name)
+            if value != self._unset[name]:
+                extra[name] = self._dump[name](value, mode='json')
+
+
+# Coordinates extras share the step's extras, so their names must differ from the step fields
+_STEP_EXTRAS = _Extras(MacroStep, ('id', 'type', 'enabled', 'coordinates', 'click_type', 'delay_ms',
+                                   'scroll_amount', 'loop_count'))
+_COORDINATE_EXTRAS = _Extras(Coordinates, ('x', 'y'))
+
+_INT_WIDTHS = [np.int8, np.int16, np.int32, np.int64]
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def steps_digest(blob: Buffer) -> str:
+    """Content hash of an encoded steps blob."""
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+def _narrowest(values: np.ndarray) -> np.dtype:
+    """Smallest signed integer type holding every value."""
+    if len(values):
+        low, high = int(values.min()), int(values.max())
+        for dtype in _INT_WIDTHS:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return np.dtype(dtype).newbyteorder('<')
+    return np.dtype(np.int8)
+
+
+def _pad(size: int) -> int:
+    """Round a section size up to 8-byte alignment."""
+    return (size + 7) & ~7
+
+
+def _format_uuids(raw: bytes) -> List[str]:
+    """Canonical strings of packed 16-byte UUIDs; string slicing is several times faster than uuid.UUID."""
+    h = raw.hex()
+    return [f"{h[j:j + 8]}-{h[j + 8:j + 12]}-{h[j + 12:j + 16]}-{h[j + 16:j + 20]}-{h[j + 20:j + 32]}"
+            for j in range(0, len(h), 32)]
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        return len(value) == 36 and str(uuid.UUID(value)) == value
+    except ValueError:
+        return False
+
+
+def encode_macro_steps(steps: List[MacroStep]) -> bytes:
+    """
+    Pack macro steps into fixed-width columns:
+        
+        header | type | flags | click type | dx | dy | delay | scroll | loop | ids | extras
+    
+    Coordinates are delta-encoded against the previous step that has
+    coordinates, and every integer column gets the narrowest type its
+    values fit, so recorded mouse paths mostly take a byte or two per
+    value. Rarely used fields (key, modifiers, scroll direction, window,
+    motion override, and any field added to MacroStep or Coordinates since)
+    go into a small JSON section keyed by step index.
+    """
+    n = len(steps)
+    kinds = np.empty(n, dtype=np.uint8)
+    flags = np.zeros(n, dtype=np.uint8)
+    clicks = np.zeros(n, dtype=np.uint8)
+    xs = np.zeros(n, dtype=np.int64)
+    ys = np.zeros(n, dtype=np.int64)
+    delays = np.zeros(n, dtype=np.int64)
+    scrolls = np.zeros(n, dtype=np.int64)
+    loops = np.empty(n, dtype=np.int64)
+    has_coordinates = np.zeros(n, dtype=bool)
+    extras: Dict[str, Dict[str, Any]] = {}
+    
+    for i, step in enumerate(steps):
+        kinds[i] = _STEP_TYPE_CODES[step.type]
+        flag = ENABLED if step.enabled else 0
+        extra = {}
+        if step.coordinates is not None:
+            flag |= HAS_COORDINATES
+            has_coordinates[i] = True
+            xs[i], ys[i] = step.coordinates.x, step.coordinates.y
+            _COORDINATE_EXTRAS.encode(step.coordinates, extra)
+        if step.click_type is not None:
+            flag |= HAS_CLICK_TYPE
+            clicks[i] = _CLICK_TYPE_CODES[step.click_type]
+        if step.delay_ms is not None:
+            flag |= HAS_DELAY
+            delays[i] = step.delay_ms
+        if step.scroll_amount is not None:
+            flag |= HAS_SCROLL_AMOUNT
+            scrolls[i] = step.scroll_amount
+        loops[i] = step.loop_count
+        flags[i] = flag
+        
+        _STEP_EXTRAS.encode(step, extra)
+        if extra:
+            extras[str(i)] = extra
+    
+    # Deltas between consecutive steps that have coordinates; 0 elsewhere
+    dxs = np.zeros(n, dtype=np.int64)
+    dys = np.zeros(n, dtype=np.int64)
+    dxs[has_coordinates] = np.diff(xs[has_coordinates], prepend=0)
+    dys[has_coordinates] = np.diff(ys[has_coordinates], prepend=0)
+    
+    columns = [dxs, dys, delays, scrolls, loops]
+    widths = [_narrowest(column) for column in columns]
+    
+    ids = [step.id for step in steps]
+    if ids and all(_is_uuid(step_id) for step_id in ids):
+        id_layout = ID_UUIDS
+        id_section = b''.join(uuid.UUID(step_id).bytes for step_id in ids)
+    else:
+        id_layout = ID_STRINGS
+        encoded = [step_id.encode('utf-8') for step_id in ids]
+        offsets = np.zeros(n + 1, dtype='<u4')
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        id_section = offsets.tobytes() + b''.join(encoded)
+    
+    extras_section = json.dumps(extras, separators=(',', ':'), ensure_ascii=False).encode('utf-8') if extras else b''
+    
+    parts = [_HEADER.pack(MAGIC, VERSION, id_layout, n, ''.join(width.char for width in widths).encode('ascii'))]
+    for column in [kinds, flags, clicks] + [column.astype(width) for column, width in zip(columns, widths)]:
+        data = column.tobytes()
+        parts.append(data + b'\0' * (_pad(len(data)) - len(data)))
+    parts.append(struct.pack('<I', len(id_section)) + id_section)
+    parts.append(b'\0' * (_pad(len(id_section) + 4) - len(id_section) - 4))
+    parts.append(extras_section)
+    return b''.join(parts)
+
+
+def decode_macro_steps(buffer: Buffer) -> List[MacroStep]:
+    """Unpack steps encoded by encode_macro_steps(); columns are read in place."""
+    magic, version, id_layout, n, width_chars = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a macro steps file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported macro steps version {version}")
+    
+    offset = _HEADER.size
+    
+    def column(dtype: Any) -> np.ndarray:
+        nonlocal offset
+        dtype = np.dtype(dtype).newbyteorder('<')
+        values = np.frombuffer(buffer, dtype=dtype, count=n, offset=offset)
+        offset += _pad(n * dtype.itemsize)
+        return values
+    
+    kinds = column(np.uint8).tolist()
+    flags = column(np.uint8)
+    clicks = column(np.uint8).tolist()
+    dxs, dys, delays, scrolls, loops = [column(char) for char in width_chars.decode('ascii')]
+    xs = np.cumsum(dxs, dtype=np.int64).tolist()
+    ys = np.cumsum(dys, dtype=np.int64).tolist()
+    delays, scrolls, loops = delays.tolist(), scrolls.tolist(), loops.tolist()
+    
+    (id_size,) = struct.unpack_from('<I', buffer, offset)
+    id_section = bytes(buffer[offset + 4:offset + 4 + id_size])
+    offset += _pad(id_size + 4)
+    if id_layout == ID_UUIDS:
+        ids = _format_uuids(id_section[:n * 16])
+    else:
+        offsets = np.frombuffer(id_section, dtype='<u4', count=n + 1).tolist()
+        blob = id_section[(n + 1) * 4:]
+        ids = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(n)]
+    
+    extras_section = bytes(buffer[offset:])
+    extras = {int(i): extra for i, extra in json.loads(extras_section).items()} if extras_section else {}
+    
+    # Absent values become None column-wide, so the loop below only picks values
+    enabled = (flags & ENABLED).astype(bool).tolist()
+    step_types = [STEP_TYPES[kind] for kind in kinds]
+    flag_list = flags.tolist()
+    click_types = [CLICK_TYPES[click] if flag & HAS_CLICK_TYPE else None for click, flag in zip(clicks, flag_list)]
+    delays = [delay if flag & HAS_DELAY else None for delay, flag in zip(delays, flag_list)]
+    scrolls = [scroll if flag & HAS_SCROLL_AMOUNT else None for scroll, flag in zip(scrolls, flag_list)]
+    has_coordinates = (flags & HAS_COORDINATES).astype(bool).tolist()
+    
+    # Steps without extras are built from typed values without any conversion; the
+    # JSON values of the others are converted, and missing fields filled, by construct_trusted()
+    build_step = trusted_factory(MacroStep)
+    build_coordinates = trusted_factory(Coordinates)
+    step_defaults, step_factories = _STEP_EXTRAS.defaults, _STEP_EXTRAS.factories
+    coordinate_defaults, coordinate_factories = _COORDINATE_EXTRAS.defaults, _COORDINATE_EXTRAS.factories
+    with gc_paused(n):
+        steps = []
+        append = steps.append
+        for i in range(n):
+            extra = extras.get(i)
+            if extra is None:
+                coordinates = None
+                if has_coordinates[i]:
+                    coordinates = {'x': xs[i], 'y': ys[i], **coordinate_defaults}
+                    for name, factory in coordinate_factories:
+                        coordinates[name] = factory()
+                    coordinates = build_coordinates(coordinates)
+                data = {
+                    'id': ids[i],
+                    'type': step_types[i],
+                    'enabled': enabled[i],
+                    'coordinates': coordinates,
+                    'click_type': click_types[i],
+                    'delay_ms': delays[i],
+                    'scroll_amount': scrolls[i],
+                    'loop_count': loops[i],
+                    **step_defaults
+                }
+                for name, factory in step_factories:
+                    data[name] = factory()
+                append(build_step(data))
+            else:
+                coordinates = None
+                if has_coordinates[i]:
+                    coordinates = {'x': xs[i], 'y': ys[i]}
+                    for name in _COORDINATE_EXTRAS.names:
+                        if name in extra:
+                            coordinates[name] = extra.pop(name)
+                extra.update({
+                    'id': ids[i],
+                    'type': step_types[i],
+                    'enabled': enabled[i],
+                    'coordinates': coordinates,
+                    'click_type': click_types[i],
+                    'delay_ms': delays[i],
+                    'scroll_amount': scrolls[i],
+                    'loop_count': loops[i]
+                })
+                append(construct_trusted(MacroStep, extra))
+    return steps
+
+
+def read_macro_steps(path: str, digest: Optional[str] = None) -> List[MacroStep]:
+    """Map a .steps file into memory and decode it, checking its digest if given."""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if digest is not None and steps_digest(mapped) != digest:
+                raise ValueError(f"Macro steps file {path} does not match its checksum")
+            return decode_macro_steps(mapped)
\ No newline at end of file
@@ -4,14 +4,19 @@ MacroEngine - Advanced macro automation with support for complex sequences.
 
 import time
 import threading
-from typing import Optional, Callable, Dict, Any, List
-import pyautogui
-from pynput import keyboard
+from typing import Optional, Callable, Dict, Any, Tuple
 import logging
 
+from .event_bus import EventBus, EventType
+from .failsafe import FailsafeMonitor
+from .input_arbiter import InputArbiter, ArbitratedBackend
+from .input_backend import InputBackend, PyAutoGUIBackend, create_input_backend
+from .macro_program import MacroOp, MacroProgram, MacroProgramCache, MacroCompileError
+from .motion import MotionPlanner
+from .run_state import RunState
+from .timing import PlaybackTimeline, wait_until
 from ..models.models import (
-    Profile, MacroStep, MacroStepType, ClickType, Coordinates,
-    ExecutionLog
+    Profile, ExecutionLog, MotionConfig, MacroRepeatMode
 )
 
 
@@ -23,268 +28,338 @@ class MacroEngine:
     Advanced macro engine for executing complex automation sequences.
     """
     
-    def __init__(self):
+    # Progress events also published on the event bus
+    BUS_EVENTS = (EventType.STEP_EXECUTED, EventType.ITERATION_COMPLETED)
+    
+    def __init__(self, backend: Optional[InputBackend] = None):
         self._running = False
         self._paused = False
-        self._stop_event = threading.Event()
-        self._pause_event = threading.Event()
+        self._state = RunState()
         self._worker_thread: Optional[threading.Thread] = None
         self._current_profile: Optional[Profile] = None
         self._execution_log: Optional[ExecutionLog] = None
         self._step_count = 0
+        self._iteration_count = 0
+        self._limits_reached = False
         self._start_time: Optional[float] = None
+        self._timeline = PlaybackTimeline()
         self._callbacks: Dict[str, Callable] = {}
+        self._event_bus: Optional[EventBus] = None
+        
+        # Input backends (default is created lazily on first use)
+        self._default_backend: Optional[InputBackend] = backend
+        self._profile_backends: Dict[str, InputBackend] = {}
+        self._backend: Optional[InputBackend] = backend
+        self._arbiter: Optional[InputArbiter] = None
+        self._motion = MotionPlanner()
         
-        # Configure pyautogui
-        pyautogui.FAILSAFE = False
-        pyautogui.PAUSE = 0.01
+        # Compiled programs and the handlers bound into them
+        self._programs = MacroProgramCache()
+        self._handlers = {
+            MacroOp.CLICK: self._run_click,
+            MacroOp.MOVE: self._run_move,
+            MacroOp.DELAY: self._run_delay,
+            MacroOp.KEY: self._run_key,
+            MacroOp.SCROLL: self._run_scroll
+        }
+        
+        # Safety settings
+        self._failsafe_enabled = True
+        self._failsafe_monitor: Optional[FailsafeMonitor] = None
+        self._failsafe_key = f"macro_engine_{id(self)}"
+        self._failsafe_tripped = False
+    
+    def set_failsafe(self, enabled: bool) -> None:
+        """Enable or disable the failsafe for macro execution."""
+        self._failsafe_enabled = enabled
+    
+    def set_failsafe_monitor(self, monitor: Optional[FailsafeMonitor]) -> None:
+        """Share an event-driven failsafe monitor with the other engines."""
+        if self._failsafe_monitor is not None:
+            self._failsafe_monitor.unregister_callback(self._failsafe_key)
+        
+        self._failsafe_monitor = monitor
+        if monitor is not None:
+            monitor.register_callback(self._failsafe_key, self._on_failsafe)
+    
+    def _on_failsafe(self, data: Dict[str, Any]) -> None:
+        """Handle the failsafe monitor firing (called from the listener thread)."""
+        if self._running and self._failsafe_enabled and not self._state.is_stopped:
+            self._failsafe_tripped = True
+            self._state.stop()
+    
+    def _check_failsafe(self) -> bool:
+        """Check if the failsafe has fired."""
+        if not self._failsafe_enabled or self._failsafe_monitor is None:
+            return False
+        
+        monitor = self._failsafe_monitor
+        if monitor.is_running():
+            return self._failsafe_tripped or monitor.in_corner
+        
+        # Listener unavailable: poll the position but reuse cached geometry
+        x, y = self._backend.position()
+        return monitor.check_position(x, y)
+    
+    def set_input_backend(self, backend: InputBackend) -> None:
+        """Set the default input backend used when a profile does not override it."""
+        self._default_backend = backend
+        if not self._running:
+            self._backend = backend
+    
+    def _resolve_backend(self, profile: Profile) -> InputBackend:
+        """Get the input backend for a profile, creating it if needed."""
+        if profile.input_backend:
+            backend = self._profile_backends.get(profile.input_backend)
+            if backend is None:
+                backend = create_input_backend(profile.input_backend)
+                self._profile_backends[profile.input_backend] = backend
+            return backend
+        
+        if self._default_backend is None:
+            self._default_backend = PyAutoGUIBackend()
+        return self._default_backend
+    
+    def set_input_arbiter(self, arbiter: Optional[InputArbiter]) -> None:
+        """Share the input device with other engines, taking turns at the profile's input_priority."""
+        self._arbiter = arbiter
+    
+    def _arbitrate(self, backend: InputBackend, profile: Profile) -> InputBackend:
+        """Wrap the backend in turns on the shared arbiter, if there is one."""
+        if self._arbiter is None:
+            return backend
+        return ArbitratedBackend(backend, self._arbiter, profile.input_priority)
     
     def register_callback(self, event: str, callback: Callable) -> None:
-        """Register callback for events (started, stopped, paused, resumed, step_executed)."""
+        """Register callback for events (started, stopped, paused, resumed, step_executed, iteration_completed)."""
         self._callbacks[event] = callback
     
     def _trigger_callback(self, event: str, data: Any = None) -> None:
-        """Trigger registered callback."""
+        """Trigger registered callback, and publish progress events on the event bus."""
         if event in self._callbacks:
             try:
                 self._callbacks[event](data)
             except Exception as e:
                 logger.error(f"Callback error for {event}: {e}")
+        
+        bus = self._event_bus
+        if bus is not None and event in self.BUS_EVENTS and self._current_profile is not None:
+            bus.publish(event, data, key=self._current_profile.id)
     
-    def _execute_click_step(self, step: MacroStep) -> bool:
-        """Execute a click macro step."""
-        try:
-            if not step.coordinates:
-                logger.error("Click step missing coordinates")
-                return False
-            
-            # Move to coordinates
-            pyautogui.moveTo(step.coordinates.x, step.coordinates.y, duration=0.1)
-            time.sleep(0.05)
-            
-            # Perform click based on type
-            if step.click_type == ClickType.LEFT:
-                pyautogui.click(button='left')
-            elif step.click_type == ClickType.RIGHT:
-                pyautogui.click(button='right')
-            elif step.click_type == ClickType.MIDDLE:
-                pyautogui.click(button='middle')
-            elif step.click_type == ClickType.DOUBLE:
-                pyautogui.doubleClick(button='left')
-            elif step.click_type == ClickType.HOLD:
-                pyautogui.mouseDown(button='left')
-                time.sleep(0.5)
-                pyautogui.mouseUp(button='left')
-            
-            logger.debug(f"Executed click: {step.click_type} at ({step.coordinates.x}, {step.coordinates.y})")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Click step execution failed: {e}")
-            return False
+    def set_event_bus(self, bus: Optional[EventBus]) -> None:
+        """Publish progress events on an event bus, keyed by profile id."""
+        self._event_bus = bus
     
-    def _execute_move_step(self, step: MacroStep) -> bool:
-        """Execute a move macro step."""
-        try:
-            if not step.coordinates:
-                logger.error("Move step missing coordinates")
-                return False
-            
-            pyautogui.moveTo(step.coordinates.x, step.coordinates.y, duration=0.2)
-            logger.debug(f"Moved to ({step.coordinates.x}, {step.coordinates.y})")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Move step execution failed: {e}")
-            return False
+    def _listening(self, event: str) -> bool:
+        """Whether an event reaches anyone, so hot paths only build payloads that are used."""
+        bus = self._event_bus
+        return event in self._callbacks or (bus is not None and bus.has_subscribers(event))
     
-    def _execute_delay_step(self, step: MacroStep) -> bool:
-        """Execute a delay macro step."""
-        try:
-            if step.delay_ms is None:
-                logger.error("Delay step missing delay_ms")
-                return False
-            
-            delay_seconds = step.delay_ms / 1000.0
-            
-            # Use precise timing with event checking
-            end_time = time.perf_counter() + delay_seconds
-            while time.perf_counter() < end_time:
-                if self._stop_event.is_set():
-                    return False
-                if self._pause_event.is_set():
-                    # Wait until unpaused
-                    while self._pause_event.is_set() and not self._stop_event.is_set():
-                        time.sleep(0.01)
-                    # Recalculate end time after unpause
-                    remaining = end_time - time.perf_counter()
-                    if remaining > 0:
-                        end_time = time.perf_counter() + remaining
-                time.sleep(0.01)
-            
-            logger.debug(f"Delayed for {step.delay_ms}ms")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Delay step execution failed: {e}")
-            return False
+    def _run_click(self, x: int, y: int, button: str, clicks: int, hold: bool,
+                   motion: MotionConfig) -> bool:
+        """Execute a compiled click instruction."""
+        backend = self._backend
+        
+        # Move to coordinates, settling only after a real move
+        if self._motion.move(backend, x, y, motion, self._state.stop_event):
+            self._motion.settle(motion, self._state.stop_event)
+        
+        if hold:
+            backend.mouse_down(button)
+            wait_until(time.perf_counter() + motion.hold_ms / 1000.0, self._state.stop_event)
+            backend.mouse_up(button)
+        else:
+            backend.click(button, clicks=clicks)
+        
+        logger.debug(f"Executed click: {button} x{clicks} at ({x}, {y})")
+        return True
     
-    def _execute_key_step(self, step: MacroStep) -> bool:
-        """Execute a key press macro step."""
-        try:
-            if not step.key:
-                logger.error("Key step missing key")
-                return False
-            
-            # Handle modifiers
-            modifiers_pressed = []
-            for modifier in step.modifiers:
-                mod_key = modifier.lower()
-                if mod_key in ['ctrl', 'control']:
-                    pyautogui.keyDown('ctrl')
-                    modifiers_pressed.append('ctrl')
-                elif mod_key in ['alt']:
-                    pyautogui.keyDown('alt')
-                    modifiers_pressed.append('alt')
-                elif mod_key in ['shift']:
-                    pyautogui.keyDown('shift')
-                    modifiers_pressed.append('shift')
-                elif mod_key in ['cmd', 'command', 'win', 'windows']:
-                    pyautogui.keyDown('cmd')
-                    modifiers_pressed.append('cmd')
-            
-            # Press the main key
-            pyautogui.press(step.key)
-            
-            # Release modifiers in reverse order
-            for modifier in reversed(modifiers_pressed):
-                pyautogui.keyUp(modifier)
-            
-            logger.debug(f"Executed key press: {'+'.join(step.modifiers + [step.key])}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Key step execution failed: {e}")
-            return False
+    def _run_move(self, x: int, y: int, motion: MotionConfig) -> bool:
+        """Execute a compiled move instruction."""
+        self._motion.move(self._backend, x, y, motion, self._state.stop_event)
+        logger.debug(f"Moved to ({x}, {y})")
+        return True
     
-    def _execute_scroll_step(self, step: MacroStep) -> bool:
-        """Execute a scroll macro step."""
-        try:
-            if not step.scroll_direction or step.scroll_amount is None:
-                logger.error("Scroll step missing direction or amount")
-                return False
-            
-            # Get current mouse position for scrolling
-            x, y = pyautogui.position()
-            
-            if step.scroll_direction.lower() == 'up':
-                pyautogui.scroll(step.scroll_amount, x=x, y=y)
-            elif step.scroll_direction.lower() == 'down':
-                pyautogui.scroll(-step.scroll_amount, x=x, y=y)
-            else:
-                logger.error(f"Invalid scroll direction: {step.scroll_direction}")
-                return False
-            
-            logger.debug(f"Scrolled {step.scroll_direction} by {step.scroll_amount}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Scroll step execution failed: {e}")
-            return False
+    def _run_delay(self, delay_seconds: float) -> bool:
+        """Execute a compiled delay instruction (realised by the playback timeline)."""
+        logger.debug(f"Delaying for {delay_seconds * 1000:.0f}ms")
+        return True
     
-    def _execute_macro_step(self, step: MacroStep) -> bool:
-        """Execute a single macro step."""
-        if not step.enabled:
-            logger.debug(f"Skipping disabled step: {step.id}")
-            return True
+    def _run_key(self, key: Any, modifiers: Tuple[Any, ...]) -> bool:
+        """Execute a compiled key instruction (keys are already resolved)."""
+        backend = self._backend
         
-        # Execute the step based on its type
-        success = False
-        if step.type == MacroStepType.CLICK:
-            success = self._execute_click_step(step)
-        elif step.type == MacroStepType.MOVE:
-            success = self._execute_move_step(step)
-        elif step.type == MacroStepType.DELAY:
-            success = self._execute_delay_step(step)
-        elif step.type == MacroStepType.KEY:
-            success = self._execute_key_step(step)
-        elif step.type == MacroStepType.SCROLL:
-            success = self._execute_scroll_step(step)
-        else:
-            logger.error(f"Unknown step type: {step.type}")
+        for modifier in modifiers:
+            backend.key_down(modifier)
+        
+        backend.press(key)
+        
+        # Release modifiers in reverse order
+        for modifier in reversed(modifiers):
+            backend.key_up(modifier)
+        
+        logger.debug(f"Executed key press: {key} with {len(modifiers)} modifier(s)")
+        return True
+    
+    def _run_scroll(self, amount: int) -> bool:
+        """Execute a compiled scroll instruction (positive scrolls up)."""
+        self._backend.scroll(amount)
+        logger.debug(f"Scrolled by {amount}")
+        return True
+    
+    def _check_limits(self, profile: Profile) -> bool:
+        """Check if execution limits have been reached (max_clicks counts executed steps)."""
+        if not profile.limits.has_limits():
             return False
         
-        if success:
-            self._step_count += 1
-            self._trigger_callback('step_executed', {
-                'step': step,
-                'step_count': self._step_count
-            })
+        if profile.limits.max_clicks and self._step_count >= profile.limits.max_clicks:
+            logger.info(f"Step limit reached: {self._step_count}")
+            return True
+        
+        if profile.limits.max_duration_seconds and self._start_time:
+            elapsed = time.perf_counter() - self._start_time
+            if elapsed >= profile.limits.max_duration_seconds:
+                logger.info(f"Duration limit reached: {elapsed:.2f}s")
+                return True
         
-        return success
+        return False
     
-    def _execute_macro_sequence(self, steps: List[MacroStep]) -> bool:
-        """Execute a sequence of macro steps."""
-        try:
-            for step in steps:
-                if self._stop_event.is_set():
-                    logger.info("Macro execution stopped by user")
+    def _wait_for_timeline(self) -> bool:
+        """Wait until the current timeline deadline, shifting it by any paused time."""
+        while not self._state.is_stopped:
+            if self._state.is_paused:
+                self._timeline.shift(self._state.wait_if_paused())
+                continue
+            
+            # A pause or stop wakes the sleep early
+            if self._state.sleep_until(self._timeline.deadline):
+                return True
+        
+        return False
+    
+    def _play_sequence(self, profile: Profile, program: MacroProgram) -> bool:
+        """Play the compiled program once on the playback timeline."""
+        for instruction in program.instructions:
+            handler = instruction.handler
+            args = instruction.args
+            
+            for iteration in range(instruction.repeat):
+                # Configured delay between loop iterations
+                if iteration > 0:
+                    self._timeline.advance(instruction.loop_delay)
+                
+                if not self._wait_for_timeline():
+                    return False
+                
+                if self._check_failsafe():
+                    self._failsafe_tripped = True
+                    return False
+                
+                if self._check_limits(profile):
+                    self._limits_reached = True
                     return False
                 
-                # Wait for unpause
-                while self._pause_event.is_set() and not self._stop_event.is_set():
-                    time.sleep(0.01)
+                self._timeline.record_start()
+                try:
+                    with self._backend.exclusive():
+                        success = handler(*args)
+                except Exception as e:
+                    logger.error(f"{instruction.op.name.title()} step execution failed: {e}")
+                    success = False
                 
-                if self._stop_event.is_set():
+                if not success:
+                    logger.error(f"Macro step execution failed: {instruction.step.id}")
                     return False
                 
-                # Execute step multiple times if loop_count > 1
-                for loop_iteration in range(step.loop_count):
-                    if self._stop_event.is_set():
-                        return False
-                    
-                    while self._pause_event.is_set() and not self._stop_event.is_set():
-                        time.sleep(0.01)
-                    
-                    if self._stop_event.is_set():
-                        return False
-                    
-                    success = self._execute_macro_step(step)
-                    if not success:
-                        logger.error(f"Macro step execution failed: {step.id}")
-                        return False
-                    
-                    # Small delay between loop iterations
-                    if loop_iteration < step.loop_count - 1:
-                        time.sleep(0.05)
-            
+                self._step_count += 1
+                if self._listening('step_executed'):
+                    self._trigger_callback('step_executed', {
+                        'profile_id': profile.id,
+                        'step': instruction.step,
+                        'step_count': self._step_count
+                    })
+                
+                # The next step starts when this one is nominally finished
+                self._timeline.advance(instruction.duration)
+        
+        return True
+    
+    def _sequence_finished(self, profile: Profile, program: MacroProgram) -> bool:
+        """Check whether the configured sequence repeats are done."""
+        repeat = profile.macro_repeat
+        
+        if repeat.mode == MacroRepeatMode.ONCE or not program.instructions:
             return True
-            
-        except Exception as e:
-            logger.error(f"Macro sequence execution failed: {e}")
-            return False
+        if repeat.mode == MacroRepeatMode.COUNT:
+            return self._iteration_count >= repeat.count
+        if repeat.mode == MacroRepeatMode.DURATION:
+            return time.perf_counter() - self._start_time >= repeat.duration_seconds
+        return False
+    
+    def _mark_finished(self) -> None:
+        """Reset running state when the worker ends on its own."""
+        self._running = False
+        self._paused = False
+        if self._current_profile:
+            self._current_profile.is_active = False
+            self._current_profile.is_paused = False
     
-    def _execution_loop(self, profile: Profile) -> None:
+    def _execution_loop(self, profile: Profile, program: MacroProgram) -> None:
         """Main execution loop for macro automation."""
         logger.info(f"Starting macro automation for profile: {profile.name}")
         
         try:
-            if not profile.macro_steps:
-                logger.warning("Profile has no macro steps to execute")
-                return
-            
-            # Execute macro sequence once
-            success = self._execute_macro_sequence(profile.macro_steps)
+            self._timeline.start()
+            interval = profile.macro_repeat.interval_ms / 1000.0
+            
+            # Play the sequence until the repeat mode, limits or a stop end it
+            while True:
+                success = self._play_sequence(profile, program)
+                if not success:
+                    break
+                
+                self._iteration_count += 1
+                if self._listening('iteration_completed'):
+                    self._trigger_callback('iteration_completed', {
+                        'profile_id': profile.id,
+                        'iteration': self._iteration_count,
+                        'step_count': self._step_count
+                    })
+                
+                if self._sequence_finished(profile, program):
+                    # Let a trailing delay run out before reporting completion
+                    success = self._wait_for_timeline()
+                    break
+                
+                self._timeline.advance(interval)
             
             if success:
-                logger.info("Macro sequence completed successfully")
+                logger.info(f"Macro sequence completed after {self._iteration_count} iteration(s)")
+                self._mark_finished()
                 self._trigger_callback('stopped', {'reason': 'completed'})
+            elif self._failsafe_tripped:
+                logger.warning("Failsafe triggered - stopping macro automation")
+                if self._execution_log:
+                    self._execution_log.stopped_by = "failsafe"
+                self._mark_finished()
+                self._trigger_callback('stopped', {'reason': 'failsafe'})
+            elif self._limits_reached:
+                logger.info("Execution limits reached")
+                if self._execution_log:
+                    self._execution_log.stopped_by = "limits"
+                self._mark_finished()
+                self._trigger_callback('stopped', {'reason': 'limits_reached'})
+            elif self._state.is_stopped:
+                # stop() and emergency_stop() report their own reason
+                logger.info("Macro execution stopped by user")
             else:
                 logger.error("Macro sequence execution failed")
+                self._mark_finished()
                 self._trigger_callback('stopped', {'reason': 'error'})
         
         except Exception as e:
             logger.error(f"Execution loop error: {e}")
+            self._mark_finished()
             self._trigger_callback('stopped', {'reason': 'error', 'error': str(e)})
         
         finally:
@@ -310,11 +385,22 @@ class MacroEngine:
             return False
         
         try:
+            # Programs are compiled for the device backend itself, so they stay cached across runs
+            backend = self._resolve_backend(profile)
+            try:
+                program = self._programs.get(profile, backend, self._handlers)
+            except MacroCompileError as e:
+                logger.error(f"Cannot start macro automation: {e}")
+                return False
+            self._backend = self._arbitrate(backend, profile)
+            
             # Reset state
-            self._stop_event.clear()
-            self._pause_event.clear()
+            self._state.reset()
             self._current_profile = profile
+            self._failsafe_tripped = False
+            self._limits_reached = False
             self._step_count = 0
+            self._iteration_count = 0
             self._start_time = time.perf_counter()
             
             # Create execution log
@@ -327,18 +413,24 @@ class MacroEngine:
                 start_time=datetime.now()
             )
             
+            # Running before the worker exists: a short macro may finish (and report it) right away
+            self._running = True
+            profile.is_active = True
+            self._trigger_callback('started', profile)
+            
             # Start worker thread
             self._worker_thread = threading.Thread(
                 target=self._execution_loop,
-                args=(profile,),
+                args=(profile, program),
                 daemon=True
             )
-            self._worker_thread.start()
-            
-            self._running = True
-            profile.is_active = True
+            try:
+                self._worker_thread.start()
+            except Exception:
+                self._mark_finished()
+                self._trigger_callback('stopped', {'reason': 'error'})
+                raise
             
-            self._trigger_callback('started', profile)
             logger.info(f"Macro automation started for profile: {profile.name}")
             return True
         
@@ -353,7 +445,7 @@ class MacroEngine:
         
         try:
             logger.info("Stopping macro automation...")
-            self._stop_event.set()
+            self._state.stop()
             
             # Wait for worker thread to finish
             if self._worker_thread and self._worker_thread.is_alive():
@@ -383,7 +475,7 @@ class MacroEngine:
         if not self._running or self._paused:
             return False
         
-        self._pause_event.set()
+        self._state.pause()
         self._paused = True
         if self._current_profile:
             self._current_profile.is_paused = True
@@ -397,7 +489,7 @@ class MacroEngine:
         if not self._running or not self._paused:
             return False
         
-        self._pause_event.clear()
+        self._state.resume()
         self._paused = False
         if self._current_profile:
             self._current_profile.is_paused = False
@@ -410,7 +502,7 @@ class MacroEngine:
         """Emergency stop - immediate termination."""
         logger.warning("Emergency stop triggered!")
         
-        self._stop_event.set()
+        self._state.stop()
         self._running = False
         self._paused = False
         
@@ -424,6 +516,14 @@ class MacroEngine:
         self._trigger_callback('stopped', {'reason': 'emergency'})
         return True
     
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the worker thread to exit; returns False if it is still running."""
+        worker = self._worker_thread
+        if worker is None or worker is threading.current_thread():
+            return True
+        worker.join(timeout)
+        return not worker.is_alive()
+    
     @property
     def is_running(self) -> bool:
         """Check if macro automation is running."""
@@ -444,6 +544,11 @@ class MacroEngine:
         """Get current step count."""
         return self._step_count
     
+    @property
+    def iteration_count(self) -> int:
+        """Get number of completed sequence iterations."""
+        return self._iteration_count
+    
     @property
     def execution_log(self) -> Optional[ExecutionLog]:
         """Get current execution log."""
@@ -455,6 +560,7 @@ class MacroEngine:
             'is_running': self._running,
             'is_paused': self._paused,
             'step_count': self._step_count,
+            'iteration_count': self._iteration_count,
             'profile_name': self._current_profile.name if self._current_profile else None,
         }
         
@@ -463,4 +569,9 @@ class MacroEngine:
             if self._step_count > 0:
                 stats['average_step_interval_ms'] = (stats['elapsed_seconds'] / self._step_count) * 1000
         
+        stats['timeline'] = self._timeline.get_stats()
+        stats['run_state'] = self._state.get_stats()
+        stats['motion'] = self._motion.get_stats()
+        stats['programs'] = self._programs.get_stats()
+        
         return stats
\ No newline at end of file
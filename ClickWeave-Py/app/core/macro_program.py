@@ -0,0 +1,249 @@
+"""
+MacroProgram - Compiles macro steps into a flat, pre-validated instruction program.
+"""
+
+import operator
+import threading
+from datetime import datetime
+from enum import IntEnum
+from typing import Optional, Callable, Dict, Any, Tuple
+
+from .input_backend import InputBackend
+from ..models.models import (
+    Profile, MacroStep, MacroStepType, ClickType, MotionConfig, MotionMode
+)
+
+
+class MacroCompileError(ValueError):
+    """Raised when a macro step cannot be compiled."""
+    pass
+
+
+class MacroOp(IntEnum):
+    """Instruction opcodes."""
+    CLICK = 0
+    MOVE = 1
+    DELAY = 2
+    KEY = 3
+    SCROLL = 4
+
+
+# Click type -> (button, clicks, hold)
+CLICK_ARGS = {
+    ClickType.LEFT: ('left', 1, False),
+    ClickType.RIGHT: ('right', 1, False),
+    ClickType.MIDDLE: ('middle', 1, False),
+    ClickType.DOUBLE: ('left', 2, False),
+    ClickType.HOLD: ('left', 1, True)
+}
+
+# Accepted modifier spellings -> canonical key name
+MODIFIER_KEYS = {
+    'ctrl': 'ctrl',
+    'control': 'ctrl',
+    'alt': 'alt',
+    'shift': 'shift',
+    'cmd': 'cmd',
+    'command': 'cmd',
+    'win': 'cmd',
+    'windows': 'cmd'
+}
+
+
+class MacroInstruction:
+    """
+    A single compiled instruction. The handler is bound at compile time and
+    called as handler(*args), repeat times in a row. duration is the nominal
+    time one execution occupies on the playback timeline.
+    """
+    
+    __slots__ = ('op', 'handler', 'args', 'repeat', 'loop_delay', 'duration', 'step')
+    
+    def __init__(self, op: MacroOp, handler: Callable[..., bool], args: Tuple[Any, ...],
+                 repeat: int, loop_delay: float, duration: float, step: MacroStep):
+        object.__setattr__(self, 'op', op)
+        object.__setattr__(self, 'handler', handler)
+        object.__setattr__(self, 'args', args)
+        object.__setattr__(self, 'repeat', repeat)
+        object.__setattr__(self, 'loop_delay', loop_delay)
+        object.__setattr__(self, 'duration', duration)
+        object.__setattr__(self, 'step', step)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("MacroInstruction is immutable")
+    
+    def __repr__(self) -> str:
+        return f"MacroInstruction({self.op.name}, args={self.args}, repeat={self.repeat})"
+
+
+class MacroProgram:
+    """Immutable compiled form of a profile's macro steps."""
+    
+    __slots__ = ('profile_id', 'modified_at', 'steps', 'backend', 'instructions', 'total_actions',
+                 'nominal_duration')
+    
+    def __init__(self, profile_id: str, modified_at: datetime, backend: InputBackend,
+                 instructions: Tuple[MacroInstruction, ...], steps: Tuple[MacroStep, ...] = ()):
+        object.__setattr__(self, 'profile_id', profile_id)
+        object.__setattr__(self, 'modified_at', modified_at)
+        object.__setattr__(self, 'steps', steps)
+        object.__setattr__(self, 'backend', backend)
+        object.__setattr__(self, 'instructions', instructions)
+        object.__setattr__(self, 'total_actions', sum(i.repeat for i in instructions))
+        object.__setattr__(self, 'nominal_duration', sum(
+            i.duration * i.repeat + i.loop_delay * (i.repeat - 1) for i in instructions
+        ))
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("MacroProgram is immutable")
+    
+    def __len__(self) -> int:
+        return len(self.instructions)
+    
+    def __iter__(self):
+        return iter(self.instructions)
+
+
+def _travel_seconds(motion: MotionConfig) -> float:
+    """Nominal cursor travel time for a motion config."""
+    if motion.mode == MotionMode.INSTANT:
+        return 0.0
+    return motion.duration_ms / 1000.0
+
+
+def _compile_step(step: MacroStep, profile: Profile, backend: InputBackend,
+                  handlers: Dict[MacroOp, Callable[..., bool]]) -> MacroInstruction:
+    """Compile one enabled step."""
+    motion: MotionConfig = step.motion if step.motion is not None else profile.motion
+    loop_delay = motion.loop_delay_ms / 1000.0
+    
+    if step.type == MacroStepType.CLICK:
+        if step.coordinates is None:
+            raise MacroCompileError(f"Click step {step.id} is missing coordinates")
+        button, clicks, hold = CLICK_ARGS[step.click_type or ClickType.LEFT]
+        op = MacroOp.CLICK
+        args = (step.coordinates.x, step.coordinates.y, button, clicks, hold, motion)
+        duration = _travel_seconds(motion) + motion.settle_ms / 1000.0
+        if hold:
+            duration += motion.hold_ms / 1000.0
+    
+    elif step.type == MacroStepType.MOVE:
+        if step.coordinates is None:
+            raise MacroCompileError(f"Move step {step.id} is missing coordinates")
+        op = MacroOp.MOVE
+        args = (step.coordinates.x, step.coordinates.y, motion)
+        duration = _travel_seconds(motion)
+    
+    elif step.type == MacroStepType.DELAY:
+        if step.delay_ms is None:
+            raise MacroCompileError(f"Delay step {step.id} is missing delay_ms")
+        op = MacroOp.DELAY
+        args = (step.delay_ms / 1000.0,)
+        duration = step.delay_ms / 1000.0
+    
+    elif step.type == MacroStepType.KEY:
+        if not step.key:
+            raise MacroCompileError(f"Key step {step.id} is missing key")
+        
+        modifiers = []
+        for modifier in step.modifiers:
+            name = MODIFIER_KEYS.get(modifier.lower())
+            if name is None:
+                raise MacroCompileError(f"Key step {step.id} has unknown modifier '{modifier}'")
+            resolved = backend.resolve_key(name)
+            if resolved not in modifiers:
+                modifiers.append(resolved)
+        
+        op = MacroOp.KEY
+        args = (backend.resolve_key(step.key), tuple(modifiers))
+        duration = 0.0
+    
+    elif step.type == MacroStepType.SCROLL:
+        if not step.scroll_direction or step.scroll_amount is None:
+            raise MacroCompileError(f"Scroll step {step.id} is missing direction or amount")
+        
+        direction = step.scroll_direction.lower()
+        if direction == 'up':
+            amount = step.scroll_amount
+        elif direction == 'down':
+            amount = -step.scroll_amount
+        else:
+            raise MacroCompileError(f"Scroll step {step.id} has invalid direction '{step.scroll_direction}'")
+        
+        op = MacroOp.SCROLL
+        args = (amount,)
+        duration = 0.0
+    
+    else:
+        raise MacroCompileError(f"Step {step.id} has unknown type '{step.type}'")
+    
+    return MacroInstruction(op, handlers[op], args, step.loop_count, loop_delay, duration, step)
+
+
+def compile_macro(profile: Profile, backend: InputBackend,
+                  handlers: Dict[MacroOp, Callable[..., bool]]) -> MacroProgram:
+    """
+    Compile a profile's macro steps: disabled steps are stripped, arguments
+    are validated and normalized, keys are resolved through the backend and
+    handlers are bound.
+    """
+    instructions = tuple(
+        _compile_step(step, profile, backend, handlers)
+        for step in profile.macro_steps
+        if step.enabled
+    )
+    return MacroProgram(profile.id, profile.modified_at, backend, instructions, tuple(profile.macro_steps))
+
+
+class MacroProgramCache:
+    """
+    Caches compiled programs per profile. An entry is reused only for the
+    very step objects it was compiled from, so a profile loaded again from
+    disk is always recompiled whatever its modified_at says; in-app edits
+    to those steps bump modified_at, which must also be unchanged, as must
+    the backend the program was compiled for.
+    """
+    
+    def __init__(self):
+        self._programs: Dict[str, MacroProgram] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+    
+    def get(self, profile: Profile, backend: InputBackend,
+            handlers: Dict[MacroOp, Callable[..., bool]]) -> MacroProgram:
+        """Get the compiled program for a profile, compiling it if needed."""
+        with self._lock:
+            program = self._programs.get(profile.id)
+            if (program is not None and program.modified_at == profile.modified_at
+                    and program.backend is backend and self._same_steps(program, profile)):
+                self._hits += 1
+                return program
+        
+        program = compile_macro(profile, backend, handlers)
+        
+        with self._lock:
+            self._programs[profile.id] = program
+            self._misses += 1
+        return program
+    
+    @staticmethod
+    def _same_steps(program: MacroProgram, profile: Profile) -> bool:
+        steps = profile.macro_steps
+        return len(program.steps) == len(steps) and all(map(operator.is_, program.steps, steps))
+    
+    def invalidate(self, profile_id: Optional[str] = None) -> None:
+        """Drop one cached program, or all of them."""
+        with self._lock:
+            if profile_id is None:
+                self._programs.clear()
+            else:
+                self._programs.pop(profile_id, None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            'cached_programs': len(self._programs),
+            'hits': self._hits,
+            'misses': self._misses
+        }
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Motion - Precomputed cursor paths for linear and curved moves.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+from .input_backend import InputBackend
+from .timing import wait_until
+from ..models.models import MotionConfig, MotionMode
+
+
+# A path point: (x, y, offset in seconds from the start of the move)
+PathPoint = Tuple[int, int, float]
+
+
+class MotionPlanner:
+    """
+    Plans cursor moves according to a MotionConfig and replays them through
+    an input backend. Paths are computed once and cached, so repeated moves
+    between the same points cost only the backend calls.
+    """
+    
+    # Time between consecutive path points (100 Hz)
+    POINT_INTERVAL_SECONDS = 0.01
+    
+    def __init__(self, cache_size: int = 256):
+        self._cache_size = cache_size
+        self._paths: "OrderedDict[Tuple[Any, ...], Tuple[PathPoint, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._cache_hits = 0
+        self._moves_skipped = 0
+    
+    @staticmethod
+    def _ease_in_out(t: float) -> float:
+        """Smoothstep easing for natural acceleration and deceleration."""
+        return t * t * (3 - 2 * t)
+    
+    def _compute_path(self, start: Tuple[int, int], end: Tuple[int, int],
+                      config: MotionConfig) -> Tuple[PathPoint, ...]:
+        """Compute the points of a move from start to end."""
+        duration = config.duration_ms / 1000.0
+        steps = max(1, int(round(duration / self.POINT_INTERVAL_SECONDS)))
+        (x0, y0), (x1, y1) = start, end
+        
+        if config.mode == MotionMode.CURVED:
+            # Quadratic Bezier with the control point pushed off the midpoint,
+            # perpendicular to the direction of travel
+            dx, dy = x1 - x0, y1 - y0
+            bulge = config.curvature
+            cx = (x0 + x1) / 2 - dy * bulge
+            cy = (y0 + y1) / 2 + dx * bulge
+        
+        points = []
+        for i in range(1, steps + 1):
+            t = i / steps
+            if config.mode == MotionMode.CURVED:
+                s = self._ease_in_out(t)
+                u = 1 - s
+                x = u * u * x0 + 2 * u * s * cx + s * s * x1
+                y = u * u * y0 + 2 * u * s * cy + s * s * y1
+            else:
+                x = x0 + (x1 - x0) * t
+                y = y0 + (y1 - y0) * t
+            points.append((int(round(x)), int(round(y)), t * duration))
+        
+        # Always land exactly on the target
+        points[-1] = (x1, y1, duration)
+        return tuple(points)
+    
+    def plan(self, start: Tuple[int, int], end: Tuple[int, int],
+             config: MotionConfig) -> Tuple[PathPoint, ...]:
+        """Get the (cached) path for a move."""
+        if config.mode == MotionMode.INSTANT or config.duration_ms == 0:
+            return ((end[0], end[1], 0.0),)
+        
+        key = (start, end, config.mode, config.duration_ms, config.curvature)
+        with self._lock:
+            path = self._paths.get(key)
+            if path is not None:
+                self._paths.move_to_end(key)
+                self._cache_hits += 1
+                return path
+        
+        path = self._compute_path(start, end, config)
+        
+        with self._lock:
+            self._paths[key] = path
+            if len(self._paths) > self._cache_size:
+                self._paths.popitem(last=False)
+        
+        return path
+    
+    def move(self, backend: InputBackend, x: int, y: int, config: MotionConfig,
+             stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        Move the cursor to (x, y). Returns True if the cursor was moved, False
+        if the move was skipped because the cursor was already on target.
+        """
+        if config.skip_if_at_target:
+            start = backend.position()
+            if start == (x, y):
+                self._moves_skipped += 1
+                return False
+        elif config.mode == MotionMode.INSTANT or config.duration_ms == 0:
+            start = (x, y)
+        else:
+            start = backend.position()
+        
+        path = self.plan(start, (x, y), config)
+        if len(path) == 1:
+            backend.move_to(x, y)
+            return True
+        
+        # Replay on an absolute timeline so per-point cost does not add up
+        origin = time.perf_counter()
+        for px, py, offset in path:
+            if not wait_until(origin + offset, stop_event):
+                break
+            backend.move_to(px, py)
+        
+        return True
+    
+    def settle(self, config: MotionConfig, stop_event: Optional[threading.Event] = None) -> bool:
+        """Wait for the configured settle time after a move."""
+        if config.settle_ms <= 0:
+            return True
+        return wait_until(time.perf_counter() + config.settle_ms / 1000.0, stop_event)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get path cache statistics."""
+        return {
+            'cached_paths': len(self._paths),
+            'cache_hits': self._cache_hits,
+            'moves_skipped': self._moves_skipped
+        }
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+PixelTriggers - Compiled, vectorized evaluation of pixel trigger sets.
+"""
+
+import time
+from typing import Optional, Dict, Any, List, Tuple, Sequence
+import logging
+
+import numpy as np
+
+from .color_space import DELTA_E, rgb_to_lab
+from .screen_capture import FrameSet, Region
+from ..models.models import PixelTrigger, ColorCondition, ColorMetric, TriggerEdge
+
+
+logger = logging.getLogger(__name__)
+
+
+# Condition codes used in the compiled arrays
+CONDITION_CODES = {
+    ColorCondition.EXACT: 0,
+    ColorCondition.SIMILAR: 1,
+    ColorCondition.CHANGED: 2
+}
+
+EDGE_CODES = {
+    TriggerEdge.RISING: 0,
+    TriggerEdge.FALLING: 1,
+    TriggerEdge.LEVEL: 2
+}
+
+# Per-trigger firing state carried across recompiles:
+# (last raw result, consecutive samples with that result, debounced state, last fire time)
+TriggerState = Tuple[bool, int, bool, float]
+
+
+class TriggerEdgeState:
+    """
+    Firing state of a set of triggers, kept in flat arrays so one vectorized
+    update per sample handles every trigger.
+    
+    A trigger's debounced state only changes after debounce_samples
+    consecutive samples agree; it fires on the rising or falling edge of that
+    state (or on every sample while true in LEVEL mode), and never more often
+    than its cooldown allows.
+    """
+    
+    def __init__(self, ids: Sequence[str], triggers: Sequence[Any]):
+        n = len(ids)
+        self.ids = list(ids)
+        
+        edges = np.array([EDGE_CODES[trigger.edge] for trigger in triggers], dtype=np.uint8).reshape(n)
+        self.rising = edges == EDGE_CODES[TriggerEdge.RISING]
+        self.falling = edges == EDGE_CODES[TriggerEdge.FALLING]
+        self.level = edges == EDGE_CODES[TriggerEdge.LEVEL]
+        self.debounce = np.array([trigger.debounce_samples for trigger in triggers], dtype=np.int32).reshape(n)
+        self.cooldowns = np.array([trigger.cooldown_ms / 1000.0 for trigger in triggers]).reshape(n)
+        
+        self._raw = np.zeros(n, dtype=bool)
+        self._run = np.zeros(n, dtype=np.int32)
+        self._state = np.zeros(n, dtype=bool)
+        self._last_fire = np.full(n, -np.inf)
+    
+    @property
+    def raw(self) -> np.ndarray:
+        """Raw condition results of the last sample."""
+        return self._raw
+    
+    def update(self, raw: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """
+        Feed one sample of raw condition results through debounce, edge
+        detection and cooldown. Returns the mask of triggers that fire.
+        """
+        if now is None:
+            now = time.perf_counter()
+        
+        # Debounce: the state follows the raw result once it has been stable
+        # for the required number of consecutive samples
+        self._run = np.where(raw == self._raw, self._run + 1, 1)
+        self._raw = raw
+        state = np.where(self._run >= self.debounce, raw, self._state)
+        
+        fire = ((self.rising & state & ~self._state) |
+                (self.falling & ~state & self._state) |
+                (self.level & state))
+        self._state = state
+        
+        fire &= (now - self._last_fire) >= self.cooldowns
+        self._last_fire[fire] = now
+        return fire
+    
+    def export_state(self) -> Dict[str, TriggerState]:
+        """Get the firing state of every trigger, keyed by trigger id."""
+        return {
+            trigger_id: (bool(self._raw[i]), int(self._run[i]), bool(self._state[i]), float(self._last_fire[i]))
+            for i, trigger_id in enumerate(self.ids)
+        }
+    
+    def import_state(self, states: Dict[str, TriggerState]) -> None:
+        """Restore firing state for triggers carried over from a previous compile."""
+        for i, trigger_id in enumerate(self.ids):
+            state = states.get(trigger_id)
+            if state is not None:
+                self._raw[i], self._run[i], self._state[i], self._last_fire[i] = state
+
+
+class CompiledTriggerSet:
+    """
+    A set of pixel triggers compiled into NumPy arrays (coordinates, target
+    colors, tolerances and condition codes). Each frame is evaluated with one
+    gather per captured region and one vectorized tolerance comparison.
+    Triggers using a perceptual metric compare in Lab instead, against
+    target Lab colors converted once at compile time.
+    
+    CHANGED triggers compare against their initial color and fire when it no
+    longer matches; without an initial color they never fire. Firing goes
+    through a TriggerEdgeState (edge, debounce and cooldown).
+    
+    When every frame holding a trigger has the same fingerprint as in the
+    previous sample, the colors and condition results are reused instead of
+    gathered and compared again. Targets (including CHANGED initial colors)
+    are fixed for the life of the set, so the reused results are exact.
+    """
+    
+    # Number of region layouts whose gather indices are kept
+    LAYOUT_CACHE_SIZE = 8
+    
+    def __init__(self, triggers: Sequence[Tuple[str, PixelTrigger]],
+                 initial_colors: Optional[Dict[str, Tuple[int, int, int]]] = None):
+        initial_colors = initial_colors or {}
+        n = len(triggers)
+        
+        self.ids: List[str] = [trigger_id for trigger_id, _ in triggers]
+        self.triggers: List[PixelTrigger] = [trigger for _, trigger in triggers]
+        
+        self.xs = np.empty(n, dtype=np.int64)
+        self.ys = np.empty(n, dtype=np.int64)
+        self.targets = np.zeros((n, 3), dtype=np.int16)
+        self.tolerances = np.empty(n, dtype=np.int16)
+        self.conditions = np.empty(n, dtype=np.uint8)
+        self.valid = np.ones(n, dtype=bool)
+        self.edge_state = TriggerEdgeState(self.ids, self.triggers)
+        
+        for i, (trigger_id, trigger) in enumerate(triggers):
+            self.xs[i] = trigger.coordinates.x
+            self.ys[i] = trigger.coordinates.y
+            self.tolerances[i] = trigger.color.tolerance
+            self.conditions[i] = CONDITION_CODES[trigger.condition]
+            
+            if trigger.condition == ColorCondition.CHANGED:
+                initial = initial_colors.get(trigger_id)
+                if initial is None:
+                    self.valid[i] = False
+                else:
+                    self.targets[i] = initial
+            else:
+                self.targets[i] = trigger.color.to_rgb_tuple()
+        
+        self.inverted = self.conditions == CONDITION_CODES[ColorCondition.CHANGED]
+        
+        # Perceptual triggers per metric: (trigger indices, target Lab colors)
+        self._perceptual: Dict[ColorMetric, Tuple[np.ndarray, np.ndarray]] = {}
+        for metric in DELTA_E:
+            index = np.array([i for i, trigger in enumerate(self.triggers) if trigger.color.metric == metric],
+                             dtype=np.intp)
+            if len(index):
+                self._perceptual[metric] = (index, rgb_to_lab(self.targets[index]))
+        
+        # Gather layouts per region layout: ([(point indices, rows, cols)], covered mask)
+        self._layouts: Dict[Tuple[Region, ...], Tuple[list, np.ndarray]] = {}
+        
+        # Last sample, reused while the frames it came from are unchanged
+        self._last_frames: Optional[tuple] = None
+        self._last_colors: Optional[np.ndarray] = None
+        self._last_raw: Optional[np.ndarray] = None
+        self.frames_skipped = 0
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @property
+    def points(self) -> List[Tuple[int, int]]:
+        """Trigger coordinates as (x, y) tuples."""
+        return list(zip(self.xs.tolist(), self.ys.tolist()))
+    
+    def _build_layout(self, frames: FrameSet, key: Tuple[Region, ...]) -> Tuple[list, np.ndarray]:
+        """Map each trigger to the captured region containing it."""
+        layout = []
+        unassigned = np.ones(len(self), dtype=bool)
+        
+        for frame in frames.frames:
+            inside = (unassigned &
+                      (self.xs >= frame.left) & (self.xs < frame.left + frame.width) &
+                      (self.ys >= frame.top) & (self.ys < frame.top + frame.height))
+            index = np.flatnonzero(inside)
+            unassigned &= ~inside
+            layout.append((index, self.ys[index] - frame.top, self.xs[index] - frame.left))
+        
+        if len(self._layouts) >= self.LAYOUT_CACHE_SIZE:
+            self._layouts.clear()
+        self._layouts[key] = (layout, ~unassigned)
+        return self._layouts[key]
+    
+    def _layout_for(self, frames: FrameSet) -> Tuple[list, np.ndarray]:
+        """Get the (cached) gather layout for a frame set."""
+        key = tuple(frame.region for frame in frames.frames)
+        return self._layouts.get(key) or self._build_layout(frames, key)
+    
+    def sample(self, frames: FrameSet) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gather the current RGB color of every trigger. Returns (colors, covered)
+        where covered marks triggers that lie inside a captured region.
+        """
+        layout, covered = self._layout_for(frames)
+        
+        colors = np.zeros((len(self), 3), dtype=np.int16)
+        for frame, (index, rows, cols) in zip(frames.frames, layout):
+            if len(index) == 0:
+                continue
+            pixels = np.frombuffer(frame.buffer, dtype=np.uint8).reshape(frame.height, frame.width, 4)
+            # BGRA -> RGB
+            colors[index] = pixels[rows, cols, 2::-1]
+        
+        return colors, covered
+    
+    def matches(self, colors: np.ndarray) -> np.ndarray:
+        """Vectorized tolerance comparison; True where each trigger's condition holds."""
+        within = (np.abs(colors - self.targets) <= self.tolerances[:, None]).all(axis=1)
+        for metric, (index, target_labs) in self._perceptual.items():
+            within[index] = DELTA_E[metric](rgb_to_lab(colors[index]), target_labs) <= self.tolerances[index]
+        return (within ^ self.inverted) & self.valid
+    
+    def update(self, raw: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """Feed one sample of raw condition results; returns the mask of triggers that fire."""
+        return self.edge_state.update(raw, now)
+    
+    def evaluate(self, frames: FrameSet, now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate all triggers against a captured frame set. Returns the
+        indices of triggers that fire and the sampled colors.
+        """
+        layout, _ = self._layout_for(frames)
+        used = tuple(frame.key for frame, (index, _, _) in zip(frames.frames, layout) if len(index))
+        
+        if used == self._last_frames:
+            self.frames_skipped += 1
+            colors, raw = self._last_colors, self._last_raw
+        else:
+            colors, covered = self.sample(frames)
+            raw = self.matches(colors) & covered
+            self._last_frames, self._last_colors, self._last_raw = used, colors, raw
+        
+        # Edge state still advances every sample (debounce, LEVEL fires, cooldowns)
+        fire = self.update(raw, now)
+        return np.flatnonzero(fire), colors
+    
+    def export_state(self) -> Dict[str, TriggerState]:
+        """Get the firing state of every trigger, keyed by trigger id."""
+        return self.edge_state.export_state()
+    
+    def import_state(self, states: Dict[str, TriggerState]) -> None:
+        """Restore firing state for triggers carried over from a previous compile."""
+        self.edge_state.import_state(states)
\ No newline at end of file
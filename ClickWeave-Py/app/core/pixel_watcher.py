@@ -3,42 +3,118 @@ PixelWatcher - Monitor pixel colors for automation triggers.
 """
 
 import time
+import heapq
 import threading
-from typing import Optional, Callable, Dict, Any, Tuple
+from typing import Optional, Callable, Dict, Any, List, Tuple
 import logging
-from PIL import ImageGrab
-import mss
 
+from .color_space import color_distance
+from .pixel_triggers import CompiledTriggerSet, TriggerState
+from .region_triggers import CompiledRegionSet, TemplateMatcher, load_template
+from .screen_capture import FrameService, Region
 from ..models.models import (
-    PixelTrigger, ColorInfo, ColorCondition, Coordinates
+    PixelTrigger, RegionTrigger, RegionRule, ColorInfo, ColorCondition, ColorMetric, Coordinates
 )
 
 
 logger = logging.getLogger(__name__)
 
 
+def _covers(outer: Region, inner: Region) -> bool:
+    """Check whether one region contains another."""
+    return (outer[0] <= inner[0] and outer[1] <= inner[1] and
+            inner[0] + inner[2] <= outer[0] + outer[2] and
+            inner[1] + inner[3] <= outer[1] + outer[3])
+
+
+class _SampleGroup:
+    """Triggers sharing one check interval, sampled together."""
+    
+    __slots__ = ('interval', 'compiled', 'regions', 'points', 'due', 'samples', 'first_sample', 'last_sample')
+    
+    def __init__(self, interval: float, compiled: CompiledTriggerSet, regions: CompiledRegionSet, due: float):
+        self.interval = interval
+        self.compiled = compiled
+        self.regions = regions
+        self.points = compiled.points
+        self.due = due
+        self.samples = 0
+        self.first_sample = 0.0
+        self.last_sample = 0.0
+    
+    def record_sample(self, now: float) -> None:
+        """Count a sample taken at now."""
+        if self.samples == 0:
+            self.first_sample = now
+        self.samples += 1
+        self.last_sample = now
+    
+    @property
+    def achieved_hz(self) -> float:
+        """Measured sample rate."""
+        if self.samples < 2 or self.last_sample <= self.first_sample:
+            return 0.0
+        return (self.samples - 1) / (self.last_sample - self.first_sample)
+    
+    @property
+    def ids(self) -> List[str]:
+        """Ids of the pixel and region triggers in the group."""
+        return self.compiled.ids + self.regions.ids
+
+
 class PixelWatcher:
     """
     Monitors pixel colors and triggers callbacks when conditions are met.
+    
+    Triggers are grouped by check interval and the groups are scheduled on a
+    heap, so each trigger is sampled only when it is due. Groups that fall
+    due together (within COALESCE_SECONDS) share one capture.
+    
+    Region triggers watch a rectangle instead of a pixel and are scheduled
+    the same way; template searches share TEMPLATE_BUDGET_SECONDS per tick.
     """
     
-    def __init__(self):
+    # Groups due this close to now are sampled early to share the capture
+    COALESCE_SECONDS = 0.005
+    
+    # Time template searches may take per tick
+    TEMPLATE_BUDGET_SECONDS = 0.010
+    
+    def __init__(self, frame_service: Optional[FrameService] = None):
         self._running = False
         self._stop_event = threading.Event()
+        self._wake_event = threading.Event()  # Set on stop or trigger changes
         self._worker_thread: Optional[threading.Thread] = None
         self._triggers: Dict[str, PixelTrigger] = {}
         self._callbacks: Dict[str, Callable] = {}
         self._initial_colors: Dict[str, Tuple[int, int, int]] = {}
+        self._region_triggers: Dict[str, RegionTrigger] = {}
+        self._templates: Dict[str, TemplateMatcher] = {}
         
-        # Use mss for faster screenshot capture
-        self._sct = mss.mss()
+        # Shared frame capture (one batched grab per tick for all triggers)
+        self._frames = frame_service or FrameService()
+        self._owns_frames = frame_service is None
+        self._ticks = 0
+        
+        # Compiled form of the enabled triggers, rebuilt when the set changes;
+        # every change bumps the generation so a compile racing it is discarded
+        self._generation = 0
+        self._compiled_generation: Optional[int] = None
+        self._groups: List[_SampleGroup] = []
+        self._schedule: List[Tuple[float, int]] = []
+        self._batch_regions: Dict[Tuple[int, ...], List[Region]] = {}
+        self._evaluation_time = 0.0
+        self._coalesced_samples = 0
+        self._late_samples = 0
+        self._fires = 0
+        self._frames_skipped = 0
     
     def register_callback(self, trigger_id: str, callback: Callable) -> None:
         """Register callback for when a trigger condition is met."""
         self._callbacks[trigger_id] = callback
     
     def add_trigger(self, trigger_id: str, trigger: PixelTrigger) -> None:
-        """Add a pixel trigger to monitor."""
+        """Add (or replace) a pixel trigger to monitor."""
         self._triggers[trigger_id] = trigger
         
         # Capture initial color for 'changed' condition
@@ -47,51 +123,204 @@ class PixelWatcher:
             if initial_color:
                 self._initial_colors[trigger_id] = initial_color
                 logger.debug(f"Captured initial color for trigger {trigger_id}: {initial_color}")
+        
+        self._invalidate()
+    
+    def add_region_trigger(self, trigger_id: str, trigger: RegionTrigger) -> None:
+        """Add (or replace) a region trigger to monitor."""
+        self._region_triggers[trigger_id] = trigger
+        self._templates.pop(trigger_id, None)
+        
+        # Load the template once; a trigger whose template fails to load never fires
+        if trigger.rule == RegionRule.TEMPLATE:
+            try:
+                self._templates[trigger_id] = TemplateMatcher(
+                    load_template(trigger.template_path), trigger.template_tolerance)
+            except Exception as e:
+                logger.error(f"Failed to load template for trigger {trigger_id}: {e}")
+        
+        self._invalidate()
     
     def remove_trigger(self, trigger_id: str) -> None:
-        """Remove a pixel trigger."""
+        """Remove a pixel or region trigger."""
         if trigger_id in self._triggers:
             del self._triggers[trigger_id]
+        if trigger_id in self._region_triggers:
+            del self._region_triggers[trigger_id]
+        if trigger_id in self._templates:
+            del self._templates[trigger_id]
         if trigger_id in self._callbacks:
             del self._callbacks[trigger_id]
         if trigger_id in self._initial_colors:
             del self._initial_colors[trigger_id]
+        self._invalidate()
     
     def clear_triggers(self) -> None:
         """Remove all triggers."""
         self._triggers.clear()
+        self._region_triggers.clear()
+        self._templates.clear()
         self._callbacks.clear()
         self._initial_colors.clear()
+        self._invalidate()
     
-    def _get_pixel_color(self, coordinates: Coordinates) -> Optional[Tuple[int, int, int]]:
-        """Get the RGB color of a pixel at the specified coordinates."""
-        try:
-            # Use mss for faster capture of a single pixel region
-            monitor = {
-                "top": coordinates.y,
-                "left": coordinates.x,
-                "width": 1,
-                "height": 1
-            }
+    def has_triggers(self) -> bool:
+        """Whether any pixel or region trigger is registered."""
+        return bool(self._triggers or self._region_triggers)
+    
+    def _invalidate(self) -> None:
+        """Have the monitoring loop recompile after a trigger change."""
+        self._generation += 1
+        self._wake_event.set()
+    
+    @property
+    def _compiled(self) -> bool:
+        """Whether the groups reflect the current triggers."""
+        return self._compiled_generation == self._generation
+    
+    def _compile(self) -> List[str]:
+        """
+        Compile the enabled triggers into interval groups and schedule them,
+        returning the compiled trigger ids. The result counts as current
+        only if no trigger changed while compiling; otherwise the loop
+        compiles again on its next pass.
+        """
+        generation = self._generation
+        active = [(trigger_id, trigger) for trigger_id, trigger in list(self._triggers.items())
+                  if trigger.enabled]
+        active_regions = [(trigger_id, trigger) for trigger_id, trigger in list(self._region_triggers.items())
+                          if trigger.enabled]
+        initial_colors = dict(self._initial_colors)
+        templates = dict(self._templates)
+        
+        # Keep edge/debounce/cooldown state for triggers that stay active
+        states: Dict[str, TriggerState] = {}
+        for group in self._groups:
+            states.update(group.compiled.export_state())
+            states.update(group.regions.export_state())
+        
+        by_interval: Dict[int, List[Tuple[str, PixelTrigger]]] = {}
+        for trigger_id, trigger in active:
+            by_interval.setdefault(trigger.check_interval_ms, []).append((trigger_id, trigger))
+        regions_by_interval: Dict[int, List[Tuple[str, RegionTrigger]]] = {}
+        for trigger_id, trigger in active_regions:
+            regions_by_interval.setdefault(trigger.check_interval_ms, []).append((trigger_id, trigger))
+        
+        # Every group is due immediately after a (re)compile
+        now = time.perf_counter()
+        self._groups = [
+            _SampleGroup(interval_ms / 1000.0,
+                         CompiledTriggerSet(by_interval.get(interval_ms, []), initial_colors),
+                         CompiledRegionSet(regions_by_interval.get(interval_ms, []), templates),
+                         now)
+            for interval_ms in sorted(set(by_interval) | set(regions_by_interval))
+        ]
+        for group in self._groups:
+            group.compiled.import_state(states)
+            group.regions.import_state(states)
+        self._schedule = [(now, index) for index in range(len(self._groups))]
+        heapq.heapify(self._schedule)
+        self._batch_regions = {}
+        
+        self._compiled_generation = generation
+        return [trigger_id for group in self._groups for trigger_id in group.compiled.ids + group.regions.ids]
+    
+    def _regions_for_batch(self, batch: List[int]) -> List[Region]:
+        """Get the capture regions for a set of groups sampled together."""
+        key = tuple(sorted(batch))
+        regions = self._batch_regions.get(key)
+        if regions is None:
+            points = [point for index in key for point in self._groups[index].points]
+            regions = self._frames.plan(points) if points else []
             
-            screenshot = self._sct.grab(monitor)
-            # Convert to PIL Image and get pixel
-            img = screenshot.copy()
-            pixel = img.getpixel((0, 0))
+            # Region triggers are grabbed as-is unless a point region already covers them
+            for index in key:
+                for rect in self._groups[index].regions.regions:
+                    if not any(_covers(region, rect) for region in regions):
+                        regions = regions + [rect]
+            self._batch_regions[key] = regions
+        return regions
+    
+    def _sample_due_groups(self) -> Optional[float]:
+        """
+        Sample every group that is due, sharing one capture. Returns the time
+        until the next group is due, or None if there is nothing to sample.
+        """
+        if not self._schedule:
+            return None
+        
+        now = time.perf_counter()
+        wait = self._schedule[0][0] - now
+        if wait > 0:
+            return wait
+        
+        # Collect the due groups, plus any due within the coalescing window
+        batch = []
+        while self._schedule and self._schedule[0][0] <= now + self.COALESCE_SECONDS:
+            due, index = heapq.heappop(self._schedule)
+            if due > now:
+                self._coalesced_samples += 1
+            batch.append(index)
+        
+        frames = self._frames.capture_regions(self._regions_for_batch(batch))
+        self._ticks += 1
+        template_deadline = time.perf_counter() + self.TEMPLATE_BUDGET_SECONDS
+        
+        for index in batch:
+            group = self._groups[index]
+            group.record_sample(now)
             
-            # Handle different pixel formats (RGB, RGBA, etc.)
-            if len(pixel) >= 3:
-                return (pixel[0], pixel[1], pixel[2])
-            else:
-                logger.warning(f"Unexpected pixel format at ({coordinates.x}, {coordinates.y}): {pixel}")
-                return None
+            if frames is not None:
+                started = time.perf_counter()
+                skipped = group.compiled.frames_skipped
+                fired, colors = group.compiled.evaluate(frames, now)
+                self._frames_skipped += group.compiled.frames_skipped - skipped
+                self._evaluation_time += time.perf_counter() - started
+                
+                for i in fired.tolist():
+                    trigger_id = group.compiled.ids[i]
+                    current_color = tuple(colors[i].tolist())
+                    logger.debug(f"Trigger fired for {trigger_id}: {current_color}")
+                    self._fires += 1
+                    self._trigger_callback(trigger_id, group.compiled.triggers[i], current_color)
                 
+                if len(group.regions):
+                    started = time.perf_counter()
+                    skipped = group.regions.frames_skipped
+                    fired, colors, locations = group.regions.evaluate(frames, now, template_deadline)
+                    self._frames_skipped += group.regions.frames_skipped - skipped
+                    self._evaluation_time += time.perf_counter() - started
+                    
+                    for i in fired.tolist():
+                        trigger_id = group.regions.ids[i]
+                        current_color = tuple(colors[i].tolist())
+                        logger.debug(f"Region trigger fired for {trigger_id}: {current_color} at {locations[i]}")
+                        self._fires += 1
+                        self._trigger_callback(trigger_id, group.regions.triggers[i], current_color, locations[i])
+            
+            # Next sample on the group's absolute timeline; skip missed slots
+            group.due += group.interval
+            if group.due < now:
+                self._late_samples += 1
+                group.due = now + group.interval
+            heapq.heappush(self._schedule, (group.due, index))
+        
+        return 0.0
+    
+    def _get_pixel_color(self, coordinates: Coordinates) -> Optional[Tuple[int, int, int]]:
+        """Get the RGB color of a pixel at the specified coordinates."""
+        try:
+            return self._frames.get_pixel(coordinates.x, coordinates.y)
         except Exception as e:
             logger.error(f"Failed to get pixel color at ({coordinates.x}, {coordinates.y}): {e}")
             return None
     
-    def _color_matches(self, color1: Tuple[int, int, int], color2: Tuple[int, int, int], tolerance: int) -> bool:
+    def _color_matches(self, color1: Tuple[int, int, int], color2: Tuple[int, int, int], tolerance: int,
+                       metric: ColorMetric = ColorMetric.RGB) -> bool:
         """Check if two colors match within tolerance."""
+        if metric != ColorMetric.RGB:
+            return bool(color_distance(color1, color2, metric) <= tolerance)
+        
         r_diff = abs(color1[0] - color2[0])
         g_diff = abs(color1[1] - color2[1])
         b_diff = abs(color1[2] - color2[2])
@@ -102,12 +331,13 @@ class PixelWatcher:
         """Check if a trigger condition is met."""
         target_color = trigger.color.to_rgb_tuple()
         tolerance = trigger.color.tolerance
+        metric = trigger.color.metric
         
         if trigger.condition == ColorCondition.EXACT:
-            return self._color_matches(current_color, target_color, tolerance)
+            return self._color_matches(current_color, target_color, tolerance, metric)
         
         elif trigger.condition == ColorCondition.SIMILAR:
-            return self._color_matches(current_color, target_color, tolerance)
+            return self._color_matches(current_color, target_color, tolerance, metric)
         
         elif trigger.condition == ColorCondition.CHANGED:
             initial_color = self._initial_colors.get(trigger_id)
@@ -116,13 +346,14 @@ class PixelWatcher:
                 return False
             
             # Check if color has changed from initial
-            return not self._color_matches(current_color, initial_color, tolerance)
+            return not self._color_matches(current_color, initial_color, tolerance, metric)
         
         else:
             logger.error(f"Unknown color condition: {trigger.condition}")
             return False
     
-    def _trigger_callback(self, trigger_id: str, trigger: PixelTrigger, current_color: Tuple[int, int, int]) -> None:
+    def _trigger_callback(self, trigger_id: str, trigger: Any, current_color: Tuple[int, int, int],
+                          location: Optional[Tuple[int, int]] = None) -> None:
         """Trigger callback for a matched condition."""
         if trigger_id in self._callbacks:
             try:
@@ -130,6 +361,7 @@ class PixelWatcher:
                     'trigger_id': trigger_id,
                     'trigger': trigger,
                     'current_color': current_color,
+                    'location': location,
                     'timestamp': time.time()
                 }
                 self._callbacks[trigger_id](callback_data)
@@ -142,43 +374,24 @@ class PixelWatcher:
         
         try:
             while not self._stop_event.is_set():
-                # Check each active trigger
-                for trigger_id, trigger in self._triggers.items():
-                    if not trigger.enabled:
-                        continue
-                    
-                    if self._stop_event.is_set():
-                        break
-                    
-                    try:
-                        # Get current pixel color
-                        current_color = self._get_pixel_color(trigger.coordinates)
-                        if current_color is None:
-                            continue
-                        
-                        # Check trigger condition
-                        if self._check_trigger_condition(trigger_id, trigger, current_color):
-                            logger.debug(f"Trigger condition met for {trigger_id}: {current_color}")
-                            self._trigger_callback(trigger_id, trigger, current_color)
-                        
-                    except Exception as e:
-                        logger.error(f"Error checking trigger {trigger_id}: {e}")
+                if not self._compiled:
+                    self._compile()
                 
-                # Wait for the check interval
-                if self._triggers:
-                    # Use the minimum check interval from all triggers
-                    min_interval = min(t.check_interval_ms for t in self._triggers.values() if t.enabled)
-                    sleep_time = min_interval / 1000.0
-                else:
-                    sleep_time = 0.1  # Default sleep time when no triggers
+                wait = self._sample_due_groups()
+                if wait is None:
+                    wait = 0.1  # Default sleep time when no triggers
                 
-                # Use event-based waiting for precise timing and quick stop response
-                self._stop_event.wait(timeout=sleep_time)
+                # Use event-based waiting for precise timing and quick response
+                # to stops and trigger changes
+                if wait > 0:
+                    self._wake_event.wait(timeout=wait)
+                    self._wake_event.clear()
         
         except Exception as e:
             logger.error(f"Pixel monitoring loop error: {e}")
         
         finally:
+            self._frames.release_thread()
             logger.info("Pixel monitoring stopped")
     
     def start(self) -> bool:
@@ -187,12 +400,15 @@ class PixelWatcher:
             logger.warning("Pixel watcher is already running")
             return True
         
-        if not self._triggers:
+        if not self._triggers and not self._region_triggers:
             logger.warning("No pixel triggers to monitor")
             return False
         
         try:
             self._stop_event.clear()
+            # Restart every trigger's sample timeline and firing state
+            self._compiled_generation = None
+            self._groups = []
             
             # Start monitoring thread
             self._worker_thread = threading.Thread(
@@ -217,6 +433,7 @@ class PixelWatcher:
         try:
             logger.info("Stopping pixel monitoring...")
             self._stop_event.set()
+            self._wake_event.set()
             
             # Wait for worker thread to finish
             if self._worker_thread and self._worker_thread.is_alive():
@@ -276,14 +493,37 @@ class PixelWatcher:
             'is_running': self._running,
             'total_triggers': len(self._triggers),
             'active_triggers': active_triggers,
-            'trigger_ids': list(self._triggers.keys())
+            'trigger_ids': list(self._triggers.keys()),
+            'region_triggers': len(self._region_triggers),
+            'templates': {trigger_id: matcher.get_stats() for trigger_id, matcher in list(self._templates.items())},
+            'ticks': self._ticks,
+            'mean_evaluation_us': (self._evaluation_time / self._ticks) * 1e6 if self._ticks else 0.0,
+            'coalesced_samples': self._coalesced_samples,
+            'fires': self._fires,
+            'frames_skipped': self._frames_skipped,
+            'late_samples': self._late_samples,
+            'sample_rates': self._get_sample_rates(),
+            'capture': self._frames.get_stats()
         }
     
+    def _get_sample_rates(self) -> Dict[str, Dict[str, Any]]:
+        """Requested versus achieved sample rate per trigger."""
+        rates = {}
+        for group in list(self._groups):
+            achieved = group.achieved_hz
+            for trigger_id in group.ids:
+                rates[trigger_id] = {
+                    'requested_hz': 1.0 / group.interval,
+                    'achieved_hz': achieved,
+                    'samples': group.samples
+                }
+        return rates
+    
     def __del__(self):
         """Cleanup when object is destroyed."""
         try:
             self.stop()
-            if hasattr(self, '_sct'):
-                self._sct.close()
+            if getattr(self, '_owns_frames', False):
+                self._frames.close()
         except:
             pass
\ No newline at end of file
@@ -0,0 +1,681 @@
+"""
+ProfileStore - Indexed profile library with lazily loaded, cached profiles.
+"""
+
+import os
+import re
+import json
+import glob
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple, Callable, Union
+import logging
+
+from .macro_codec import encode_macro_steps, read_macro_steps, steps_digest
+from ..models.models import Profile, TriggerType, MacroStep, MacroStorage, gc_paused
+
+
+logger = logging.getLogger(__name__)
+
+
+# Version of the profile data layout written by encode_profile()
+PROFILE_SCHEMA_VERSION = 1
+
+_TRUSTED_HEADER = re.compile(r'\{"schema_version":(\d+),"checksum":"([0-9a-f]{32})","modified_at":("[^"\\]*"),')
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def macro_steps_path(directory: str, profile_id: str, digest: str) -> str:
+    """Path of a profile's binary macro steps file, named after its content."""
+    return os.path.join(directory, f"{profile_id}.{digest[:16]}.steps")
+
+
+def encode_profile(profile: Profile, steps: Optional[bytes] = None) -> Tuple[str, str]:
+    """
+    Serialize a profile as compact JSON and return it with the hash of its
+    content. The text starts with the schema version, the content hash as
+    checksum and modified_at, which is left out of the hash because it is
+    bumped on every save even when nothing else changed:
+        
+        {"schema_version":1,"checksum":"...","modified_at":"...","id":...}
+    
+    Given the binary encoding of its macro steps (see macro_codec), the
+    steps are stored separately and the JSON refers to them by digest.
+    """
+    if steps is None:
+        data = profile.dict()
+    else:
+        data = profile.dict(exclude={'macro_steps'})
+        data['macro_steps'] = []
+        data['macro_steps_file'] = {'digest': steps_digest(steps), 'count': len(profile.macro_steps)}
+    modified_at = data.pop('modified_at')
+    content = json.dumps(data, separators=(',', ':'), default=str, ensure_ascii=False)
+    digest = _content_hash(content)
+    header = (f'{{"schema_version":{PROFILE_SCHEMA_VERSION},"checksum":"{digest}",'
+              f'"modified_at":{json.dumps(str(modified_at))},')
+    return header + content[1:], digest
+
+
+StepsLoader = Callable[[str, str], List[MacroStep]]
+
+
+def _load_steps(data: Dict[str, Any], load_steps: Optional[StepsLoader]) -> Optional[List[MacroStep]]:
+    """Macro steps referenced by a profile's macro_steps_file entry, which is removed."""
+    reference = data.pop('macro_steps_file', None)
+    if reference is None:
+        return None
+    if load_steps is None:
+        raise ValueError("Profile refers to a binary macro steps file, but there is no place to read it from")
+    return load_steps(data['id'], reference['digest'])
+
+
+def decode_profile(text: str, load_steps: Optional[StepsLoader] = None) -> Tuple[Profile, str, bool]:
+    """
+    Parse profile JSON and return the profile, its content hash and whether
+    it was trusted. Text written by encode_profile() with the current schema
+    version and an intact checksum is built without validation; anything
+    else (imported, hand-edited or older files) is fully validated.
+    
+    Binary macro steps are read with load_steps(profile_id, digest).
+    """
+    match = _TRUSTED_HEADER.match(text)
+    if match and int(match.group(1)) == PROFILE_SCHEMA_VERSION:
+        content = '{' + text[match.end():]
+        digest = _content_hash(content)
+        if digest == match.group(2):
+            data = json.loads(content)
+            steps = _load_steps(data, load_steps)
+            try:
+                data['modified_at'] = json.loads(match.group(3))
+                with gc_paused(len(data.get('macro_steps', ()))):
+                    profile = Profile.from_trusted_dict(data)
+                if steps is not None:
+                    profile.macro_steps = steps
+                return profile, digest, True
+            except Exception as e:
+                logger.warning(f"Validating profile with an unreadable trusted layout: {e}")
+    
+    data = json.loads(text)
+    steps = _load_steps(data, load_steps)
+    if steps is not None:
+        data['macro_steps'] = steps
+    profile = Profile(**data)
+    return profile, encode_profile(profile, encode_macro_steps(steps) if steps is not None else None)[1], False
+
+
+def _atomic_write(path: str, content: Union[str, bytes]) -> None:
+    """
+    Replace a file so readers see either the old or the new content, never
+    a partial write: write a temporary file next to it, fsync, rename.
+    """
+    temp_path = path + ".tmp"
+    try:
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    
+    # Make the rename itself durable
+    if hasattr(os, 'O_DIRECTORY'):
+        try:
+            fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+
+class ProfileSummary:
+    """
+    Index entry for one profile file: enough to list the profile without
+    parsing and validating it. The file's mtime and size tell whether the
+    entry is still current.
+    """
+    
+    __slots__ = ('id', 'name', 'description', 'trigger_type', 'modified_at', 'size', 'mtime_ns')
+    
+    def __init__(self, id: str, name: str, description: str, trigger_type: TriggerType,
+                 modified_at: datetime, size: int, mtime_ns: int):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.trigger_type = trigger_type
+        self.modified_at = modified_at
+        self.size = size
+        self.mtime_ns = mtime_ns
+    
+    @classmethod
+    def from_data(cls, profile_id: str, data: Dict[str, Any], stat: os.stat_result) -> 'ProfileSummary':
+        """Build a summary from raw (unvalidated) profile JSON."""
+        try:
+            trigger_type = TriggerType(data.get('trigger_type', TriggerType.MANUAL))
+        except ValueError:
+            trigger_type = TriggerType.MANUAL
+        
+        try:
+            modified_at = datetime.fromisoformat(str(data['modified_at']))
+        except (KeyError, ValueError):
+            modified_at = datetime.fromtimestamp(stat.st_mtime)
+        
+        return cls(profile_id, str(data.get('name', profile_id)), str(data.get('description', '')),
+                   trigger_type, modified_at, stat.st_size, stat.st_mtime_ns)
+    
+    @classmethod
+    def from_profile(cls, profile: Profile, stat: os.stat_result) -> 'ProfileSummary':
+        """Build a summary from a profile that was just written."""
+        return cls(profile.id, profile.name, profile.description, profile.trigger_type,
+                   profile.modified_at, stat.st_size, stat.st_mtime_ns)
+    
+    @classmethod
+    def from_row(cls, row: List[Any]) -> 'ProfileSummary':
+        """Decode an index row."""
+        profile_id, name, description, trigger_type, modified_at, size, mtime_ns = row
+        return cls(profile_id, name, description, TriggerType(trigger_type),
+                   datetime.fromisoformat(modified_at), size, mtime_ns)
+    
+    def to_row(self) -> List[Any]:
+        """Encode as a compact index row."""
+        return [self.id, self.name, self.description, self.trigger_type.value,
+                self.modified_at.isoformat(), self.size, self.mtime_ns]
+    
+    def is_current(self, stat: os.stat_result) -> bool:
+        """Check whether the file is unchanged since this entry was made."""
+        return self.size == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+
+class ProfileStore:
+    """
+    Profile library backed by one {id}.json file per profile.
+    
+    Listing the library reads only a compact index file; full Profile
+    objects are parsed and validated on first use and kept in an LRU cache.
+    refresh() brings the index up to date incrementally: only files whose
+    size or mtime changed are read again, and only for their summary fields.
+    
+    Saving is write-behind: save() marks the profile dirty and a background
+    thread writes it WRITE_DELAY seconds later, so a burst of saves costs
+    one write. Files are written compactly and atomically, and not at all
+    when the content (apart from modified_at) is unchanged. flush() and
+    close() write everything pending.
+    
+    Profiles with macro_storage BINARY keep their steps in a packed
+    {id}.{digest}.steps file next to the JSON, which names its digest. The
+    steps file is written first and never changed in place, so the JSON
+    always refers to a complete one; superseded files are removed after.
+    """
+    
+    INDEX_FILENAME = ".profile_index"
+    INDEX_VERSION = 1
+    WRITE_DELAY = 0.5
+    
+    def __init__(self, directory: str, cache_size: int = 32, write_delay: Optional[float] = None):
+        self._directory = directory
+        self._cache_size = cache_size
+        self._write_delay = self.WRITE_DELAY if write_delay is None else write_delay
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        
+        # Held while writing so writes of one profile never overlap or reorder
+        self._write_lock = threading.Lock()
+        
+        self._index: Dict[str, ProfileSummary] = {}
+        self._index_dirty = False
+        
+        # Parsed profiles, least recently used first
+        self._cache: 'OrderedDict[str, Profile]' = OrderedDict()
+        
+        # Saved profiles waiting to be written, with the time they are due
+        self._dirty: Dict[str, Profile] = {}
+        self._due: Dict[str, float] = {}
+        
+        # Content hash of each profile as last read or written
+        self._hashes: Dict[str, str] = {}
+        
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+        
+        # Statistics
+        self._summaries_read = 0
+        self._profiles_parsed = 0
+        self._trusted_loads = 0
+        self._cache_hits = 0
+        self._saves = 0
+        self._writes = 0
+        self._writes_skipped = 0
+        self._write_errors = 0
+    
+    @property
+    def directory(self) -> str:
+        """Directory holding the profile files."""
+        return self._directory
+    
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self._directory, f"{profile_id}.json")
+    
+    def _steps_path(self, profile_id: str, digest: str) -> str:
+        return macro_steps_path(self._directory, profile_id, digest)
+    
+    def _load_steps(self, profile_id: str, digest: str) -> List[MacroStep]:
+        """Map a binary macro steps file and decode it."""
+        return read_macro_steps(self._steps_path(profile_id, digest), digest)
+    
+    def _steps_files(self, profile_id: str) -> List[str]:
+        """All binary macro steps files of a profile."""
+        pattern = re.compile(re.escape(profile_id) + r'\.[0-9a-f]{16}\.steps')
+        paths = glob.glob(os.path.join(glob.escape(self._directory), glob.escape(profile_id) + '.*.steps'))
+        return [path for path in paths if pattern.fullmatch(os.path.basename(path))]
+    
+    def _index_path(self) -> str:
+        return os.path.join(self._directory, self.INDEX_FILENAME)
+    
+    def _read_index(self) -> Dict[str, ProfileSummary]:
+        """Read the stored index; a missing or unreadable one is empty."""
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.INDEX_VERSION:
+                return {}
+            return {row[0]: ProfileSummary.from_row(row) for row in data['profiles']}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable profile index: {e}")
+            return {}
+    
+    def _read_summary(self, profile_id: str, stat: os.stat_result) -> Optional[ProfileSummary]:
+        """Read the summary fields of a profile file without validating it."""
+        try:
+            with open(self._path(profile_id), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._summaries_read += 1
+            return ProfileSummary.from_data(profile_id, data, stat)
+        except Exception as e:
+            logger.error(f"Failed to index profile {profile_id}: {e}")
+            return None
+    
+    def refresh(self) -> int:
+        """
+        Bring the index up to date with the profile files on disk and
+        return the number of profiles. Cached profiles whose file changed
+        are dropped so the next get() reads them again. Pending writes go
+        out first so they are not mistaken for missing files.
+        """
+        self._write_pending()
+        if not os.path.isdir(self._directory):
+            with self._lock:
+                self._index = {}
+                self._cache.clear()
+                self._hashes.clear()
+            return 0
+        
+        with self._lock:
+            known = self._index or self._read_index()
+        
+        index: Dict[str, ProfileSummary] = {}
+        changed = False
+        with os.scandir(self._directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json') or not entry.is_file():
+                    continue
+                
+                profile_id = entry.name[:-5]  # Remove .json extension
+                stat = entry.stat()
+                summary = known.get(profile_id)
+                if summary is None or not summary.is_current(stat):
+                    summary = self._read_summary(profile_id, stat)
+                    changed = True
+                    if summary is None:
+                        continue
+                index[profile_id] = summary
+        
+        with self._lock:
+            changed = changed or index.keys() != known.keys()
+            for profile_id in list(self._cache):
+                if index.get(profile_id) is not known.get(profile_id):
+                    del self._cache[profile_id]
+            for profile_id in list(self._hashes):
+                if index.get(profile_id) is not known.get(profile_id):
+                    del self._hashes[profile_id]
+            self._index = index
+            self._index_dirty = self._index_dirty or changed
+        
+        self._write_index()
+        return len(index)
+    
+    def refresh_profile(self, profile_id: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Bring one profile's index entry up to date with its file, e.g. after
+        a change notification. Returns the kind of change ('added',
+        'modified', 'deleted', or None if the entry was already current)
+        and the file's raw data. A changed profile is dropped from the
+        cache so it is parsed again on next use; profiles with a pending
+        write are left alone, as the store's copy is newer.
+        """
+        with self._lock:
+            if profile_id in self._dirty:
+                return None, None
+            known = self._index.get(profile_id)
+        
+        path = self._path(profile_id)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            if known is None:
+                return None, None
+            with self._lock:
+                self._index.pop(profile_id, None)
+                self._cache.pop(profile_id, None)
+                self._hashes.pop(profile_id, None)
+                self._index_dirty = True
+            return 'deleted', None
+        
+        if known is not None and known.is_current(stat):
+            return None, None
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to index profile {profile_id}: {e}")
+            return None, None
+        
+        with self._lock:
+            self._summaries_read += 1
+            self._index[profile_id] = ProfileSummary.from_data(profile_id, data, stat)
+            self._cache.pop(profile_id, None)
+            self._hashes.pop(profile_id, None)
+            self._index_dirty = True
+        return ('added' if known is None else 'modified'), data
+    
+    def flush(self) -> None:
+        """Write pending profiles, then the index file if it changed."""
+        self._write_pending()
+        self._write_index()
+    
+    def close(self) -> None:
+        """Stop the writer thread and write everything pending."""
+        with self._wake:
+            self._closed = True
+            self._wake.notify_all()
+            writer = self._writer
+        if writer is not None and writer is not threading.current_thread():
+            writer.join()
+        self.flush()
+    
+    def _write_index(self) -> None:
+        """Write the index file if it changed."""
+        with self._lock:
+            if not self._index_dirty:
+                return
+            data = {
+                'version': self.INDEX_VERSION,
+                'profiles': [summary.to_row() for summary in self._index.values()]
+            }
+            self._index_dirty = False
+        
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            _atomic_write(self._index_path(), json.dumps(data, separators=(',', ':'), ensure_ascii=False))
+        except Exception as e:
+            logger.error(f"Failed to write profile index: {e}")
+            with self._lock:
+                self._index_dirty = True
+    
+    def summaries(self) -> List[ProfileSummary]:
+        """All indexed profiles, sorted by name."""
+        with self._lock:
+            summaries = list(self._index.values())
+        return sorted(summaries, key=lambda summary: (summary.name.lower(), summary.id))
+    
+    def get_summary(self, profile_id: str) -> Optional[ProfileSummary]:
+        """Get the index entry of a profile."""
+        with self._lock:
+            return self._index.get(profile_id)
+    
+    def _remember(self, profile: Profile) -> None:
+        """Put a profile in the cache, evicting the least recently used."""
+        self._cache[profile.id] = profile
+        self._cache.move_to_end(profile.id)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+    
+    def get(self, profile_id: str) -> Optional[Profile]:
+        """Get a profile, parsing its file on a cache miss."""
+        with self._lock:
+            profile = self._cache.get(profile_id)
+            if profile is not None:
+                self._cache.move_to_end(profile_id)
+                self._cache_hits += 1
+                return profile
+        
+        return self.load(profile_id)
+    
+    def _pending(self, profile_id: str) -> Optional[Profile]:
+        """A saved profile that is not written yet; it is newer than the file."""
+        with self._lock:
+            return self._dirty.get(profile_id)
+    
+    def load(self, profile_id: str) -> Optional[Profile]:
+        """Parse a profile from disk, bypassing (and refreshing) the cache."""
+        pending = self._pending(profile_id)
+        if pending is not None:
+            return pending
+        
+        path = self._path(profile_id)
+        try:
+            stat = os.stat(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                profile, digest, trusted = decode_profile(f.read(), self._load_steps)
+        except FileNotFoundError:
+            logger.warning(f"Profile file not found: {path}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to load profile {profile_id}: {e}")
+            return None
+        
+        with self._lock:
+            self._profiles_parsed += 1
+            self._trusted_loads += trusted
+            self._remember(profile)
+            self._hashes[profile_id] = digest
+            summary = self._index.get(profile_id)
+            if summary is None or not summary.is_current(stat):
+                self._index[profile_id] = ProfileSummary.from_profile(profile, stat)
+                self._index_dirty = True
+        return profile
+    
+    def load_all(self) -> List[Profile]:
+        """Parse every indexed profile (in index order). Prefer summaries()."""
+        profiles = []
+        for summary in self.summaries():
+            profile = self.get(summary.id)
+            if profile is not None:
+                profiles.append(profile)
+        return profiles
+    
+    def save(self, profile: Profile) -> None:
+        """
+        Mark a profile dirty and update the index and cache; the write
+        follows within WRITE_DELAY seconds. Saving it again meanwhile does
+        not delay the write, which always uses the latest state.
+        """
+        with self._wake:
+            if profile.id not in self._dirty:
+                self._due[profile.id] = time.monotonic() + self._write_delay
+            self._dirty[profile.id] = profile
+            self._saves += 1
+            self._remember(profile)
+            
+            # Placeholder entry until the file exists; it never matches a stat
+            summary = self._index.get(profile.id)
+            size, mtime_ns = (summary.size, summary.mtime_ns) if summary else (-1, -1)
+            self._index[profile.id] = ProfileSummary(profile.id, profile.name, profile.description,
+                                                     profile.trigger_type, profile.modified_at, size, mtime_ns)
+            
+            if self._write_delay <= 0 or self._closed:
+                write_now = True
+            else:
+                write_now = False
+                self._start_writer()
+                self._wake.notify()
+        
+        if write_now:
+            self._write_pending()
+    
+    def _start_writer(self) -> None:
+        """Start the writer thread if it is not running (call with the lock held)."""
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._writer_loop, name="ProfileWriter", daemon=True)
+            self._writer.start()
+    
+    def _writer_loop(self) -> None:
+        """Write dirty profiles as they become due."""
+        while True:
+            with self._wake:
+                while not self._dirty and not self._closed:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                delay = min(self._due.values()) - time.monotonic()
+                if delay > 0:
+                    self._wake.wait(delay)
+                    continue
+            
+            self._write_pending(due_only=True)
+            self._write_index()
+    
+    def _write_pending(self, due_only: bool = False) -> int:
+        """Write dirty profiles (only those that are due, if due_only); returns the number written."""
+        written = 0
+        with self._write_lock:
+            with self._lock:
+                now = time.monotonic()
+                profile_ids = [profile_id for profile_id, due in self._due.items() if not due_only or due <= now]
+                profiles = [self._dirty.pop(profile_id) for profile_id in profile_ids]
+                for profile_id in profile_ids:
+                    del self._due[profile_id]
+            
+            for profile in profiles:
+                if self._write_profile(profile):
+                    written += 1
+        return written
+    
+    def _write_profile(self, profile: Profile) -> bool:
+        """Write one profile unless its content is unchanged; returns True if it was written."""
+        text, digest, steps = self._encode(profile)
+        with self._lock:
+            summary = self._index.get(profile.id)
+            if summary is not None and summary.size >= 0 and self._hashes.get(profile.id) == digest:
+                self._writes_skipped += 1
+                return False
+        
+        try:
+            summary = self._write_data(profile, text, steps)
+        except Exception as e:
+            logger.error(f"Failed to write profile {profile.name}: {e}")
+            with self._lock:
+                self._write_errors += 1
+                # Keep it dirty so the next flush tries again
+                if profile.id in self._index and profile.id not in self._dirty:
+                    self._dirty[profile.id] = profile
+                    self._due[profile.id] = time.monotonic() + self._write_delay
+            return False
+        
+        with self._lock:
+            self._writes += 1
+            self._hashes[profile.id] = digest
+            if profile.id in self._index:
+                self._index[profile.id] = summary
+                self._index_dirty = True
+        return True
+    
+    def _encode(self, profile: Profile) -> Tuple[str, str, Optional[bytes]]:
+        """Encode a profile for writing: its JSON, content hash and binary macro steps, if any."""
+        steps = encode_macro_steps(profile.macro_steps) if profile.macro_storage == MacroStorage.BINARY else None
+        text, digest = encode_profile(profile, steps)
+        return text, digest, steps
+    
+    def _write_data(self, profile: Profile, text: str, steps: Optional[bytes] = None) -> ProfileSummary:
+        """Write a profile file (and its macro steps file) atomically and return its index entry."""
+        os.makedirs(self._directory, exist_ok=True)
+        steps_path = None
+        if steps is not None:
+            steps_path = self._steps_path(profile.id, steps_digest(steps))
+            if not os.path.exists(steps_path):
+                _atomic_write(steps_path, steps)
+        
+        path = self._path(profile.id)
+        _atomic_write(path, text)
+        summary = ProfileSummary.from_profile(profile, os.stat(path))
+        
+        for stale_path in self._steps_files(profile.id):
+            if stale_path != steps_path:
+                try:
+                    os.remove(stale_path)
+                except OSError as e:
+                    logger.warning(f"Failed to remove old macro steps file {stale_path}: {e}")
+        return summary
+    
+    def delete(self, profile_id: str) -> bool:
+        """Delete a profile; returns False if it did not exist."""
+        with self._write_lock:
+            with self._lock:
+                self._cache.pop(profile_id, None)
+                self._hashes.pop(profile_id, None)
+                self._due.pop(profile_id, None)
+                pending = self._dirty.pop(profile_id, None) is not None
+                if self._index.pop(profile_id, None) is not None:
+                    self._index_dirty = True
+            return self._remove_data(profile_id) or pending
+    
+    def _remove_data(self, profile_id: str) -> bool:
+        """Remove a profile file and its macro steps files; returns False if it did not exist."""
+        for steps_path in self._steps_files(profile_id):
+            os.remove(steps_path)
+        path = self._path(profile_id)
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+        return True
+    
+    def __contains__(self, profile_id: str) -> bool:
+        with self._lock:
+            return profile_id in self._index
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        with self._lock:
+            return {
+                'profiles': len(self._index),
+                'cached_profiles': len(self._cache),
+                'summaries_read': self._summaries_read,
+                'profiles_parsed': self._profiles_parsed,
+                'trusted_loads': self._trusted_loads,
+                'cache_hits': self._cache_hits,
+                'pending_writes': len(self._dirty),
+                'saves': self._saves,
+                'writes': self._writes,
+                'writes_skipped': self._writes_skipped,
+                'write_errors': self._write_errors
+            }
\ No newline at end of file
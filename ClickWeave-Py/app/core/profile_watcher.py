@@ -0,0 +1,365 @@
+"""
+ProfileWatcher - Live reload of profile files changed by other tools.
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from typing import Optional, Callable, Dict, Any, Set, Tuple
+import logging
+
+from ..models.models import Profile
+
+
+logger = logging.getLogger(__name__)
+
+
+class InotifyDirectoryWatcher:
+    """
+    Reports names of files written, moved or deleted in one directory,
+    using Linux inotify through libc. read() returns None when the kernel
+    queue overflowed and events were lost.
+    """
+    
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    
+    _EVENT = struct.Struct('iIII')  # wd, mask, cookie, name length
+    
+    def __init__(self, directory: str):
+        self._libc = self._load_libc()
+        if self._libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, f"Cannot watch {directory}")
+    
+    @staticmethod
+    def _load_libc():
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            if not (hasattr(libc, 'inotify_init1') and hasattr(libc, 'inotify_add_watch')):
+                return None
+            return libc
+        except OSError:
+            return None
+    
+    @classmethod
+    def is_available(cls) -> bool:
+        """Check whether inotify can be used on this system."""
+        return cls._load_libc() is not None
+    
+    def read(self, timeout: float) -> Optional[Set[str]]:
+        """Wait up to timeout seconds for events; returns the changed names."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        
+        names = set()
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            _, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            
+            if mask & (self.IN_Q_OVERFLOW | self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                return None
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+    
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingDirectoryWatcher:
+    """
+    Reports names of files added, changed or removed in one directory by
+    comparing (size, mtime) snapshots taken every read().
+    """
+    
+    def __init__(self, directory: str):
+        self._directory = directory
+        self._closed = threading.Event()
+        self._snapshot = self._scan()
+    
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        try:
+            with os.scandir(self._directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+                    except FileNotFoundError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return snapshot
+    
+    def read(self, timeout: float) -> Optional[Set[str]]:
+        """Wait timeout seconds, then return the names that changed meanwhile."""
+        if self._closed.wait(timeout):
+            return set()
+        
+        snapshot = self._scan()
+        previous, self._snapshot = self._snapshot, snapshot
+        return {name for name in previous.keys() | snapshot.keys() if previous.get(name) != snapshot.get(name)}
+    
+    def close(self) -> None:
+        self._closed.set()
+
+
+class ProfileWatcher:
+    """
+    Watches the profile directory and feeds added, modified and deleted
+    files into the ProfileStore one file at a time, so profiles dropped in
+    or edited by deployment tooling show up without a full rescan.
+    
+    Changes are collected until the directory has been quiet for
+    SETTLE_DELAY seconds. Only a profile that is (or is about to be)
+    scheduled is parsed right away; it is rescheduled only when its
+    schedule_trigger actually changed. The store's own writes are
+    recognized from the index and ignored.
+    
+    Uses inotify where available and falls back to polling.
+    """
+    
+    POLL_INTERVAL = 1.0
+    SETTLE_DELAY = 0.2
+    
+    # How often the inotify loop wakes up to check for stop()
+    READ_TIMEOUT = 0.5
+    
+    def __init__(self, store: Any, scheduler: Any = None, poll_interval: Optional[float] = None,
+                 use_inotify: bool = True):
+        self._store = store
+        self._scheduler = scheduler
+        self._poll_interval = poll_interval or self.POLL_INTERVAL
+        self._use_inotify = use_inotify
+        self._callbacks: Dict[str, Callable] = {}
+        
+        self._source = None
+        self._running = False
+        self._stop_event = threading.Event()
+        self._worker_thread: Optional[threading.Thread] = None
+        
+        # Statistics
+        self._changes = {'added': 0, 'modified': 0, 'deleted': 0}
+        self._ignored = 0
+        self._rescheduled = 0
+        self._rescans = 0
+    
+    def register_callback(self, callback_type: str, callback: Callable) -> None:
+        """Register callback for watcher events (profile_changed)."""
+        self._callbacks[callback_type] = callback
+    
+    def _trigger_callback(self, callback_type: str, data: Any = None) -> None:
+        """Trigger registered callback."""
+        if callback_type in self._callbacks:
+            try:
+                self._callbacks[callback_type](data)
+            except Exception as e:
+                logger.error(f"Error in profile watcher callback {callback_type}: {e}")
+    
+    @property
+    def mode(self) -> Optional[str]:
+        """'inotify', 'polling', or None when not running."""
+        if isinstance(self._source, InotifyDirectoryWatcher):
+            return 'inotify'
+        if isinstance(self._source, PollingDirectoryWatcher):
+            return 'polling'
+        return None
+    
+    def _open_source(self):
+        if self._use_inotify and InotifyDirectoryWatcher.is_available():
+            try:
+                return InotifyDirectoryWatcher(self._store.directory)
+            except OSError as e:
+                logger.warning(f"inotify unavailable, polling profile directory instead: {e}")
+        return PollingDirectoryWatcher(self._store.directory)
+    
+    def start(self) -> bool:
+        """Start watching the profile directory."""
+        if self._running:
+            logger.warning("Profile watcher is already running")
+            return True
+        
+        try:
+            os.makedirs(self._store.directory, exist_ok=True)
+            self._source = self._open_source()
+            self._stop_event.clear()
+            
+            self._worker_thread = threading.Thread(target=self._watch_loop, name="ProfileWatcher", daemon=True)
+            self._worker_thread.start()
+            
+            self._running = True
+            logger.info(f"Watching profile directory ({self.mode}): {self._store.directory}")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Failed to start profile watcher: {e}")
+            return False
+    
+    def stop(self) -> bool:
+        """Stop watching."""
+        if not self._running:
+            return True
+        
+        self._stop_event.set()
+        if isinstance(self._source, PollingDirectoryWatcher):
+            self._source.close()  # Wakes up the waiting read
+        if self._worker_thread and self._worker_thread.is_alive():
+            self._worker_thread.join(timeout=2.0)
+        self._source.close()
+        self._source = None
+        self._running = False
+        logger.info("Profile watcher stopped")
+        return True
+    
+    def is_running(self) -> bool:
+        """Check if the watcher is running."""
+        return self._running
+    
+    @staticmethod
+    def _profile_id(name: str) -> Optional[str]:
+        """Profile id of a file name, or None for other files (index, temporary files)."""
+        if name.endswith('.json') and not name.startswith('.'):
+            return name[:-5]
+        return None
+    
+    def _watch_loop(self) -> None:
+        """Collect changed profile files and apply them once the directory is quiet."""
+        source = self._source
+        inotify = isinstance(source, InotifyDirectoryWatcher)
+        pending: Set[str] = set()
+        deadline = 0.0
+        
+        while not self._stop_event.is_set():
+            if inotify:
+                timeout = self.SETTLE_DELAY if pending else self.READ_TIMEOUT
+            else:
+                timeout = self._poll_interval
+            try:
+                names = source.read(timeout)
+            except Exception as e:
+                logger.error(f"Error watching profile directory: {e}")
+                self._stop_event.wait(self._poll_interval)
+                continue
+            
+            if names is None:
+                # Events were lost; fall back to a full rescan
+                pending.clear()
+                self._rescan()
+                continue
+            
+            profile_ids = {profile_id for profile_id in map(self._profile_id, names) if profile_id}
+            if profile_ids:
+                pending |= profile_ids
+                deadline = time.monotonic() + self.SETTLE_DELAY
+            
+            if pending and time.monotonic() >= deadline and not self._stop_event.is_set():
+                self.apply_changes(pending)
+                pending = set()
+    
+    def _rescan(self) -> None:
+        self._rescans += 1
+        logger.warning("Profile change events were lost, rescanning profile directory")
+        try:
+            self._store.refresh()
+        except Exception as e:
+            logger.error(f"Failed to rescan profile directory: {e}")
+        self._trigger_callback('profile_changed', {'profile_id': None, 'change': 'rescanned'})
+    
+    def apply_changes(self, profile_ids: Set[str]) -> int:
+        """Feed changed profile files into the store; returns how many actually changed."""
+        changed = 0
+        for profile_id in sorted(profile_ids):
+            try:
+                if self._apply_change(profile_id):
+                    changed += 1
+            except Exception as e:
+                logger.error(f"Failed to reload profile {profile_id}: {e}")
+        return changed
+    
+    def _apply_change(self, profile_id: str) -> bool:
+        change, data = self._store.refresh_profile(profile_id)
+        if change is None:
+            self._ignored += 1
+            return False
+        
+        self._changes[change] += 1
+        logger.info(f"Profile file {change}: {profile_id}")
+        if self._scheduler is not None:
+            self._update_schedule(profile_id, data)
+        self._trigger_callback('profile_changed', {'profile_id': profile_id, 'change': change})
+        return True
+    
+    def _update_schedule(self, profile_id: str, data: Optional[Dict[str, Any]]) -> None:
+        """Reschedule a changed profile if its schedule_trigger differs from the scheduled one."""
+        scheduled = self._scheduler.get_scheduled_profiles().get(profile_id)
+        if data is None:
+            if scheduled is not None:
+                self._scheduler.unschedule_profile(profile_id)
+                self._rescheduled += 1
+            return
+        
+        # Without an enabled schedule on either side there is nothing to compare or parse
+        raw_trigger = data.get('schedule_trigger')
+        if scheduled is None and not (isinstance(raw_trigger, dict) and raw_trigger.get('enabled', True)):
+            return
+        
+        profile = self._store.get(profile_id)
+        if profile is None:
+            return
+        if self._active_trigger(scheduled) != self._active_trigger(profile):
+            self._scheduler.update_profile_schedule(profile)
+            self._rescheduled += 1
+    
+    @staticmethod
+    def _active_trigger(profile: Optional[Profile]):
+        if profile is None or profile.schedule_trigger is None or not profile.schedule_trigger.enabled:
+            return None
+        return profile.schedule_trigger
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get watcher statistics."""
+        return {
+            'running': self._running,
+            'mode': self.mode,
+            **self._changes,
+            'ignored': self._ignored,
+            'rescheduled': self._rescheduled,
+            'rescans': self._rescans
+        }
\ No newline at end of file
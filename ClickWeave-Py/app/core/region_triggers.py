@@ -0,0 +1,356 @@
+"""
+RegionTriggers - Region color rules and pyramid template matching.
+"""
+
+import time
+from typing import Optional, Dict, Any, List, Tuple, Sequence
+import logging
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .color_space import color_distance
+from .pixel_triggers import TriggerEdgeState, TriggerState
+from .screen_capture import Frame, FrameSet, Region
+from ..models.models import RegionTrigger, RegionRule
+
+
+logger = logging.getLogger(__name__)
+
+
+# Result of a template search: (matched, top-left of the match in the region).
+# matched is None when the search ran out of budget before deciding.
+TemplateResult = Tuple[Optional[bool], Optional[Tuple[int, int]]]
+
+
+def region_pixels(frame: Frame, region: Region) -> np.ndarray:
+    """BGR view (height x width x 3) of a region inside a captured frame, without copying."""
+    pixels = np.frombuffer(frame.buffer, dtype=np.uint8).reshape(frame.height, frame.width, 4)
+    left, top, width, height = region
+    y, x = top - frame.top, left - frame.left
+    return pixels[y:y + height, x:x + width, :3]
+
+
+def load_template(path: str) -> np.ndarray:
+    """Load a template image as a BGR uint8 array."""
+    from PIL import Image
+    
+    with Image.open(path) as image:
+        rgb = np.asarray(image.convert('RGB'), dtype=np.uint8)
+    return np.ascontiguousarray(rgb[..., ::-1])
+
+
+def downsample(image: np.ndarray) -> np.ndarray:
+    """
+    Halve an image by summing 2x2 blocks (an odd last row/column is dropped).
+    Sums stay exact integers: four levels of 8-bit pixels fit in uint16.
+    """
+    height, width = image.shape[0] // 2 * 2, image.shape[1] // 2 * 2
+    total = image[0:height:2, 0:width:2].astype(np.uint16)
+    total += image[1:height:2, 0:width:2]
+    total += image[0:height:2, 1:width:2]
+    total += image[1:height:2, 1:width:2]
+    return total
+
+
+def integral_image(image: np.ndarray) -> np.ndarray:
+    """Per-channel summed-area table with a leading row and column of zeros."""
+    table = np.zeros((image.shape[0] + 1, image.shape[1] + 1, image.shape[2]), dtype=np.int64)
+    np.cumsum(np.cumsum(image, axis=0, dtype=np.int64), axis=1, out=table[1:, 1:])
+    return table
+
+
+def window_sums(table: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Per-channel sums of every height x width window, indexed by top-left corner."""
+    return (table[height:, width:] - table[:-height, width:] -
+            table[height:, :-width] + table[:-height, :-width])
+
+
+class TemplateMatcher:
+    """
+    Finds a small template inside a region by sum of absolute differences (SAD).
+    
+    The last match location is checked first. Otherwise the region and the
+    template are reduced to image pyramids. On the coarsest level the best
+    MAX_CANDIDATES windows are found exactly, using the integral-image bound
+    |sum(window) - sum(template)| <= SAD to skip windows that cannot beat
+    them; the candidates are then refined in a small neighbourhood on each
+    finer level, and the best full-resolution window is a match if its mean
+    per-channel difference is within the tolerance. The search gives up when
+    the tick's deadline passes.
+    """
+    
+    # Pyramid levels (2x2 block sums) stop before the template gets smaller than this
+    MIN_TEMPLATE_SIZE = 4
+    MAX_LEVELS = 4
+    
+    # Candidates carried from one pyramid level to the next
+    MAX_CANDIDATES = 16
+    
+    # The coarse-level bound compares sums over up to BOUND_BLOCKS x BOUND_BLOCKS
+    # sub-blocks of the template; more blocks give a tighter bound
+    BOUND_BLOCKS = 4
+    
+    # Values compared per vectorized SAD batch (the deadline is checked between batches)
+    BATCH_VALUES = 1 << 20
+    
+    def __init__(self, template: np.ndarray, tolerance: int):
+        levels = [template]
+        while (len(levels) < self.MAX_LEVELS and
+               min(levels[-1].shape[:2]) // 2 >= self.MIN_TEMPLATE_SIZE):
+            levels.append(downsample(levels[-1]))
+        
+        self.levels = [level.astype(np.int32) for level in levels]
+        self.blocks = [self._bound_blocks(level) for level in self.levels]
+        self.tolerance = tolerance
+        self.hint: Optional[Tuple[int, int]] = None
+        
+        # Statistics
+        self.searches = 0
+        self.hint_hits = 0
+        self.budget_exhausted = 0
+    
+    def _bound_blocks(self, template: np.ndarray) -> List[Tuple[int, int, int, int, np.ndarray]]:
+        """Split a template level into sub-blocks as (y, x, height, width, channel sums)."""
+        height, width = template.shape[:2]
+        ys = np.linspace(0, height, min(self.BOUND_BLOCKS, height) + 1).astype(int)
+        xs = np.linspace(0, width, min(self.BOUND_BLOCKS, width) + 1).astype(int)
+        return [(int(y0), int(x0), int(y1 - y0), int(x1 - x0),
+                 template[y0:y1, x0:x1].sum(axis=(0, 1), dtype=np.int64))
+                for y0, y1 in zip(ys, ys[1:]) for x0, x1 in zip(xs, xs[1:])]
+    
+    @property
+    def limit(self) -> float:
+        """Largest full-resolution SAD still counted as a match."""
+        return float(self.tolerance * self.levels[0].size)
+    
+    def _sad(self, image: np.ndarray, level: int, ys: np.ndarray, xs: np.ndarray) -> np.ndarray:
+        """SAD of the template against the windows at (xs, ys)."""
+        template = self.levels[level]
+        windows = sliding_window_view(image, template.shape[:2], axis=(0, 1))
+        return np.abs(windows[ys, xs] - template.transpose(2, 0, 1)).sum(axis=(1, 2, 3))
+    
+    def _best(self, image: np.ndarray, level: int, ys: np.ndarray, xs: np.ndarray, deadline: float,
+              bounds: Optional[np.ndarray] = None) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Score windows in batches and keep the MAX_CANDIDATES best as
+        (sads, ys, xs). With ascending lower bounds on their SADs, scoring
+        stops at the first window that cannot beat the current candidates.
+        Returns None if the deadline passed.
+        """
+        batch = self.MAX_CANDIDATES * 4 if bounds is not None else len(ys)
+        batch = max(1, min(batch, self.BATCH_VALUES // self.levels[level].size))
+        sads = np.empty(0, dtype=np.int64)
+        kept = np.empty(0, dtype=np.intp)
+        
+        start = 0
+        while start < len(ys):
+            if len(sads) >= self.MAX_CANDIDATES and bounds is not None and bounds[start] > sads.max():
+                break
+            if time.perf_counter() > deadline:
+                return None
+            
+            index = np.arange(start, min(start + batch, len(ys)))
+            sads = np.concatenate([sads, self._sad(image, level, ys[index], xs[index])])
+            kept = np.concatenate([kept, index])
+            if len(sads) > self.MAX_CANDIDATES:
+                best = np.argpartition(sads, self.MAX_CANDIDATES)[:self.MAX_CANDIDATES]
+                sads, kept = sads[best], kept[best]
+            
+            start += batch
+            if bounds is not None:
+                batch = min(batch * 2, max(1, self.BATCH_VALUES // self.levels[level].size))
+        
+        return sads, ys[kept], xs[kept]
+    
+    def _search_coarse(self, image: np.ndarray, level: int,
+                       deadline: float) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Exact best windows of a level, pruned by the block-sum bound."""
+        height, width = self.levels[level].shape[:2]
+        rows, columns = image.shape[0] - height + 1, image.shape[1] - width + 1
+        table = integral_image(image)
+        
+        # Sum of |block sum difference| over the template's sub-blocks; each
+        # term is a lower bound on that block's SAD
+        bound = np.zeros((rows, columns, table.shape[2]), dtype=np.int64)
+        for y, x, h, w, target in self.blocks[level]:
+            sums = window_sums(table[y:, x:], h, w)[:rows, :columns]
+            sums -= target
+            bound += np.abs(sums)
+        bound = bound.sum(axis=2)
+        
+        # Score windows in order of their bound (successive elimination)
+        order = np.argsort(bound, axis=None)
+        return self._best(image, level, order // columns, order % columns, deadline, bound.ravel()[order])
+    
+    def match(self, region: np.ndarray, deadline: float = float('inf')) -> TemplateResult:
+        """Search a BGR region for the template."""
+        template_height, template_width = self.levels[0].shape[:2]
+        if template_height > region.shape[0] or template_width > region.shape[1]:
+            return False, None
+        
+        self.searches += 1
+        
+        # The last match location is the cheapest place to look
+        if self.hint is not None:
+            x, y = self.hint
+            if x <= region.shape[1] - template_width and y <= region.shape[0] - template_height:
+                if self._sad(region, 0, np.array([y]), np.array([x]))[0] <= self.limit:
+                    self.hint_hits += 1
+                    return True, self.hint
+        
+        pyramid = [region]
+        while (len(pyramid) < len(self.levels) and
+               all(p // 2 >= t for p, t in zip(pyramid[-1].shape[:2], self.levels[len(pyramid)].shape[:2]))):
+            pyramid.append(downsample(pyramid[-1]))
+        
+        top = len(pyramid) - 1
+        best = self._search_coarse(pyramid[top], top, deadline)
+        
+        # Refine around the candidates on each finer level
+        offsets = np.arange(-1, 3)
+        for level in range(top - 1, -1, -1):
+            if best is None:
+                break
+            
+            image = pyramid[level]
+            height, width = self.levels[level].shape[:2]
+            ys = (2 * best[1][:, None, None] + offsets[None, :, None]).clip(0, image.shape[0] - height)
+            xs = (2 * best[2][:, None, None] + offsets[None, None, :]).clip(0, image.shape[1] - width)
+            ys, xs = np.broadcast_arrays(ys, xs)
+            keys = np.unique(ys.ravel() * image.shape[1] + xs.ravel())
+            best = self._best(image, level, keys // image.shape[1], keys % image.shape[1], deadline)
+        
+        if best is None:
+            self.budget_exhausted += 1
+            return None, None
+        
+        sads, ys, xs = best
+        index = int(np.argmin(sads))
+        if sads[index] > self.limit:
+            return False, None
+        
+        self.hint = (int(xs[index]), int(ys[index]))
+        return True, self.hint
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get search statistics."""
+        return {
+            'searches': self.searches,
+            'hint_hits': self.hint_hits,
+            'budget_exhausted': self.budget_exhausted
+        }
+
+
+class CompiledRegionSet:
+    """
+    A set of region triggers sampled together. PERCENT and MEAN_COLOR rules
+    are NumPy reductions over each region's pixels; TEMPLATE rules search
+    with a TemplateMatcher under the tick's deadline. The first template
+    search of a sample always completes; later ones that run out of time keep
+    the trigger's previous result for that sample. The starting trigger
+    rotates every sample so no template is starved.
+    
+    A trigger whose frame has the same fingerprint as in its previous
+    sample reuses that sample's result without evaluating its rule.
+    """
+    
+    def __init__(self, triggers: Sequence[Tuple[str, RegionTrigger]],
+                 matchers: Optional[Dict[str, TemplateMatcher]] = None):
+        matchers = matchers or {}
+        
+        self.ids: List[str] = [trigger_id for trigger_id, _ in triggers]
+        self.triggers: List[RegionTrigger] = [trigger for _, trigger in triggers]
+        self.regions: List[Region] = [trigger.region.to_tuple() for trigger in self.triggers]
+        self.matchers: List[Optional[TemplateMatcher]] = [
+            matchers.get(trigger_id) if trigger.rule == RegionRule.TEMPLATE else None
+            for trigger_id, trigger in triggers
+        ]
+        self.edge_state = TriggerEdgeState(self.ids, self.triggers)
+        self._next = 0
+        
+        # Last conclusive sample per trigger, reused while its frame is unchanged
+        n = len(self.ids)
+        self._last_frames: List[Optional[tuple]] = [None] * n
+        self._last_colors = np.zeros((n, 3), dtype=np.int16)
+        self._last_locations: List[Optional[Tuple[int, int]]] = [None] * n
+        self.frames_skipped = 0
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @staticmethod
+    def _matches_color(trigger: RegionTrigger, pixels: np.ndarray) -> bool:
+        """Evaluate a PERCENT or MEAN_COLOR rule on BGR pixels."""
+        color = trigger.color
+        target = color.to_rgb_tuple()
+        
+        if trigger.rule == RegionRule.PERCENT:
+            within = color_distance(pixels[..., ::-1], target, color.metric) <= color.tolerance
+            return bool(within.mean() * 100.0 >= trigger.min_percent)
+        
+        mean = pixels.mean(axis=(0, 1))[::-1]
+        return bool(color_distance(mean, target, color.metric) <= color.tolerance)
+    
+    def evaluate(self, frames: FrameSet, now: Optional[float] = None,
+                 deadline: float = float('inf')) -> Tuple[np.ndarray, np.ndarray, List[Optional[Tuple[int, int]]]]:
+        """
+        Evaluate all region triggers against a captured frame set. Returns the
+        indices of triggers that fire, the mean RGB color of each region and,
+        for template rules, the screen position of the match.
+        """
+        raw = self.edge_state.raw.copy()
+        colors = self._last_colors
+        locations = self._last_locations
+        n = len(self)
+        
+        order = list(range(self._next, n)) + list(range(self._next))
+        self._next = (self._next + 1) % n if n else 0
+        searched = False
+        
+        for i in order:
+            region = self.regions[i]
+            frame = frames.frame_covering(region)
+            if frame is None:
+                raw[i] = False
+                self._last_frames[i] = None
+                continue
+            
+            # Unchanged pixels: the previous result (kept in raw) still holds
+            if frame.key == self._last_frames[i]:
+                self.frames_skipped += 1
+                continue
+            
+            self._last_frames[i] = frame.key
+            pixels = region_pixels(frame, region)
+            colors[i] = pixels.mean(axis=(0, 1))[::-1]
+            trigger = self.triggers[i]
+            
+            if trigger.rule != RegionRule.TEMPLATE:
+                raw[i] = self._matches_color(trigger, pixels)
+                continue
+            
+            matcher = self.matchers[i]
+            if matcher is None:
+                raw[i] = False
+                continue
+            
+            matched, location = matcher.match(pixels, deadline if searched else float('inf'))
+            searched = True
+            if matched is None:
+                # Out of budget: keep the previous result and search again next sample
+                self._last_frames[i] = None
+                continue
+            raw[i] = matched
+            locations[i] = (region[0] + location[0], region[1] + location[1]) if location else None
+        
+        fire = self.edge_state.update(raw, now)
+        return np.flatnonzero(fire), colors, list(locations)
+    
+    def export_state(self) -> Dict[str, TriggerState]:
+        """Get the firing state of every trigger, keyed by trigger id."""
+        return self.edge_state.export_state()
+    
+    def import_state(self, states: Dict[str, TriggerState]) -> None:
+        """Restore firing state for triggers carried over from a previous compile."""
+        self.edge_state.import_state(states)
\ No newline at end of file
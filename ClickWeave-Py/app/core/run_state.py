@@ -0,0 +1,129 @@
+"""
+RunState - Shared run/pause/stop state for the automation engines.
+"""
+
+import time
+import threading
+from typing import Dict, Any
+
+from .timing import SPIN_THRESHOLD_SECONDS
+
+
+class RunState:
+    """
+    Run/pause/stop state built on a Condition. Waiters block without polling
+    and are woken immediately when the engine is paused, resumed or stopped.
+    
+    The stop flag is also exposed as a threading.Event so it can be passed to
+    helpers that only need to be interruptible by a stop (motion, holds).
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._stop_event = threading.Event()
+        self._paused = False
+        
+        # Statistics
+        self._pauses = 0
+        self._paused_seconds = 0.0
+        self._wakeups = 0
+    
+    def reset(self) -> None:
+        """Clear stop and pause for a new run."""
+        with self._condition:
+            self._stop_event.clear()
+            self._paused = False
+            self._pauses = 0
+            self._paused_seconds = 0.0
+            self._wakeups = 0
+            self._condition.notify_all()
+    
+    def stop(self) -> None:
+        """Request a stop and wake all waiters."""
+        with self._condition:
+            self._stop_event.set()
+            self._condition.notify_all()
+    
+    def pause(self) -> bool:
+        """Pause; returns False if already paused or stopped."""
+        with self._condition:
+            if self._paused or self._stop_event.is_set():
+                return False
+            self._paused = True
+            self._pauses += 1
+            self._condition.notify_all()
+            return True
+    
+    def resume(self) -> bool:
+        """Resume; returns False if not paused."""
+        with self._condition:
+            if not self._paused:
+                return False
+            self._paused = False
+            self._condition.notify_all()
+            return True
+    
+    def wait_if_paused(self) -> float:
+        """
+        Block while paused (and not stopped). Returns the seconds spent
+        paused, so callers can shift their timelines by it.
+        """
+        with self._condition:
+            if not self._paused:
+                return 0.0
+            
+            paused_at = time.perf_counter()
+            while self._paused and not self._stop_event.is_set():
+                self._condition.wait()
+                self._wakeups += 1
+            
+            paused_for = time.perf_counter() - paused_at
+            self._paused_seconds += paused_for
+            return paused_for
+    
+    def sleep_until(self, deadline: float, spin_threshold: float = SPIN_THRESHOLD_SECONDS) -> bool:
+        """
+        Sleep until the perf_counter() deadline or a state change. Returns
+        True when the deadline was reached while running, False if the
+        engine was stopped or paused first.
+        """
+        with self._condition:
+            while True:
+                if self._stop_event.is_set() or self._paused:
+                    return False
+                
+                remaining = deadline - time.perf_counter()
+                if remaining <= spin_threshold:
+                    break
+                
+                self._condition.wait(remaining - spin_threshold)
+                self._wakeups += 1
+        
+        # Short spin for the final stretch; flags are read without the lock
+        while time.perf_counter() < deadline:
+            if self._stop_event.is_set() or self._paused:
+                return False
+        return True
+    
+    @property
+    def stop_event(self) -> threading.Event:
+        """Event set when a stop is requested."""
+        return self._stop_event
+    
+    @property
+    def is_stopped(self) -> bool:
+        """Whether a stop has been requested."""
+        return self._stop_event.is_set()
+    
+    @property
+    def is_paused(self) -> bool:
+        """Whether the run is paused."""
+        return self._paused
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get wait statistics."""
+        return {
+            'pauses': self._pauses,
+            'paused_seconds': self._paused_seconds,
+            'wakeups': self._wakeups
+        }
\ No newline at end of file
@@ -0,0 +1,406 @@
+"""
+ScreenCapture - Shared frame capture service with batched region grabs.
+"""
+
+import time
+import zlib
+import threading
+from typing import Optional, Callable, Dict, Any, List, Tuple, Iterable, Sequence
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+# A capture region: (left, top, width, height) in screen coordinates
+Region = Tuple[int, int, int, int]
+
+# Grabs a region and returns its BGRA pixel buffer (row-major, 4 bytes per pixel)
+Grabber = Callable[[Region], Any]
+
+
+class Frame:
+    """
+    One captured region. Pixels are BGRA, row-major, and are read straight
+    from the grabbed buffer through a memoryview without copying.
+    
+    The fingerprint is a CRC-32 of the buffer; consumers compare it with the
+    previous frame of the same region to skip work on unchanged pixels.
+    """
+    
+    __slots__ = ('left', 'top', 'width', 'height', 'buffer', 'timestamp', 'fingerprint')
+    
+    def __init__(self, region: Region, raw: Any, timestamp: float):
+        self.left, self.top, self.width, self.height = region
+        self.buffer = memoryview(raw)
+        self.timestamp = timestamp
+        self.fingerprint = zlib.crc32(self.buffer)
+    
+    @property
+    def region(self) -> Region:
+        """The captured region."""
+        return (self.left, self.top, self.width, self.height)
+    
+    @property
+    def key(self) -> Tuple[Region, int]:
+        """Region and fingerprint; equal keys mean identical pixels."""
+        return (self.region, self.fingerprint)
+    
+    def contains(self, x: int, y: int) -> bool:
+        """Check whether a screen position lies inside this frame."""
+        return (self.left <= x < self.left + self.width and
+                self.top <= y < self.top + self.height)
+    
+    def offset(self, x: int, y: int) -> int:
+        """Byte offset of a screen position in the buffer."""
+        return ((y - self.top) * self.width + (x - self.left)) * 4
+    
+    def pixel(self, x: int, y: int) -> Tuple[int, int, int]:
+        """RGB color at a screen position."""
+        o = self.offset(x, y)
+        buf = self.buffer
+        return (buf[o + 2], buf[o + 1], buf[o])
+
+
+class FrameSet:
+    """The frames captured in one tick."""
+    
+    __slots__ = ('frames', 'timestamp')
+    
+    def __init__(self, frames: List[Frame], timestamp: float):
+        self.frames = frames
+        self.timestamp = timestamp
+    
+    def frame_for(self, x: int, y: int) -> Optional[Frame]:
+        """Get the frame containing a screen position."""
+        for frame in self.frames:
+            if frame.contains(x, y):
+                return frame
+        return None
+    
+    def frame_covering(self, region: Region) -> Optional[Frame]:
+        """Get a frame containing a whole region."""
+        left, top, width, height = region
+        for frame in self.frames:
+            if frame.contains(left, top) and frame.contains(left + width - 1, top + height - 1):
+                return frame
+        return None
+    
+    def covers(self, points: Iterable[Tuple[int, int]]) -> bool:
+        """Check whether every point lies inside one of the frames."""
+        return all(self.frame_for(x, y) is not None for x, y in points)
+    
+    def pixel(self, x: int, y: int) -> Optional[Tuple[int, int, int]]:
+        """RGB color at a screen position, or None if it was not captured."""
+        frame = self.frame_for(x, y)
+        if frame is None:
+            return None
+        return frame.pixel(x, y)
+
+
+def _merge(a: Region, b: Region) -> Region:
+    """Bounding box of two regions."""
+    left = min(a[0], b[0])
+    top = min(a[1], b[1])
+    right = max(a[0] + a[2], b[0] + b[2])
+    bottom = max(a[1] + a[3], b[1] + b[3])
+    return (left, top, right - left, bottom - top)
+
+
+def _area(region: Region) -> int:
+    return region[2] * region[3]
+
+
+def plan_regions(points: Iterable[Tuple[int, int]], max_regions: int = 4,
+                 cell_size: int = 256, merge_slack: int = 256 * 256) -> List[Region]:
+    """
+    Group points into a few capture regions.
+    
+    Points are bucketed into grid cells, then the pair of boxes whose merge
+    wastes the fewest pixels is merged repeatedly. Merging stops once there
+    are at most max_regions boxes and every remaining merge would grab more
+    than merge_slack extra pixels (roughly the cost of one extra round trip).
+    """
+    cells: Dict[Tuple[int, int], Region] = {}
+    for x, y in points:
+        key = (x // cell_size, y // cell_size)
+        box = (x, y, 1, 1)
+        cells[key] = _merge(cells[key], box) if key in cells else box
+    
+    regions = list(cells.values())
+    while len(regions) > 1:
+        best = None
+        for i in range(len(regions)):
+            for j in range(i + 1, len(regions)):
+                merged = _merge(regions[i], regions[j])
+                waste = _area(merged) - _area(regions[i]) - _area(regions[j])
+                if best is None or waste < best[0]:
+                    best = (waste, i, j, merged)
+        
+        waste, i, j, merged = best
+        if len(regions) <= max_regions and waste > merge_slack:
+            break
+        
+        regions[i] = merged
+        del regions[j]
+    
+    return sorted(regions)
+
+
+def _mss_grabber() -> Grabber:
+    """Create a grabber backed by an mss instance."""
+    import mss
+    sct = mss.mss()
+    
+    def grab(region: Region) -> Any:
+        left, top, width, height = region
+        shot = sct.grab({"left": left, "top": top, "width": width, "height": height})
+        return shot.raw
+    
+    grab.close = sct.close
+    return grab
+
+
+def _close_grabber(grab: Grabber) -> None:
+    """Close a grabber, logging instead of raising."""
+    close = getattr(grab, 'close', None)
+    if close:
+        try:
+            close()
+        except Exception as e:
+            logger.error(f"Error closing capture context: {e}")
+
+
+class CapturePool:
+    """
+    Per-thread capture contexts. mss instances (X11 connections, GDI device
+    contexts) must only be used by the thread that created them, so every
+    thread gets its own, created on first use.
+    
+    The pool keeps track of all contexts so none are leaked: release()
+    closes the calling thread's context (capture threads call it on exit),
+    contexts of threads that have exited are closed the next time a context
+    is created, and close() retires all of them. A context still held by a
+    live thread is never closed from another thread; it is marked stale
+    and closed by its owner on its next use or release().
+    """
+    
+    def __init__(self, factory: Callable[[], Grabber] = _mss_grabber):
+        self._factory = factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        
+        # Bumped by close(); contexts from an older generation are stale
+        self._generation = 0
+        
+        # Open contexts by owning thread id: (thread, generation, grabber)
+        self._contexts: Dict[int, Tuple[threading.Thread, int, Grabber]] = {}
+        
+        # Statistics
+        self._created = 0
+        self._closed = 0
+    
+    def grabber(self) -> Grabber:
+        """Get the calling thread's capture context, creating it on first use."""
+        entry = getattr(self._local, 'entry', None)
+        if entry is not None and entry[0] == self._generation:
+            return entry[1]
+        
+        if entry is not None:
+            self.release()
+        self._reap()
+        
+        grab = self._factory()
+        with self._lock:
+            generation = self._generation
+            self._contexts[threading.get_ident()] = (threading.current_thread(), generation, grab)
+            self._created += 1
+        self._local.entry = (generation, grab)
+        return grab
+    
+    def release(self) -> None:
+        """Close the calling thread's capture context, if it has one."""
+        entry = getattr(self._local, 'entry', None)
+        if entry is None:
+            return
+        
+        self._local.entry = None
+        with self._lock:
+            owned = self._contexts.get(threading.get_ident())
+            if owned is not None and owned[2] is entry[1]:
+                del self._contexts[threading.get_ident()]
+            self._closed += 1
+        _close_grabber(entry[1])
+    
+    def _reap(self) -> None:
+        """Close the contexts of threads that have exited."""
+        with self._lock:
+            dead = [ident for ident, (thread, _, _) in self._contexts.items() if not thread.is_alive()]
+            grabbers = [self._contexts.pop(ident)[2] for ident in dead]
+            self._closed += len(grabbers)
+        
+        for grab in grabbers:
+            _close_grabber(grab)
+    
+    def close(self) -> None:
+        """
+        Retire every context. The calling thread's context and those of
+        exited threads are closed now; the rest are closed by their owners.
+        """
+        with self._lock:
+            self._generation += 1
+        self.release()
+        self._reap()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get context statistics."""
+        with self._lock:
+            return {
+                'open': len(self._contexts),
+                'created': self._created,
+                'closed': self._closed
+            }
+
+
+class FrameService:
+    """
+    Captures screen frames for pixel consumers. Each capture() plans a few
+    bounding regions around the requested points and grabs them in one pass,
+    instead of one round trip per point. Recent frames can be shared between
+    consumers (the pixel watcher, the coordinate picker, ...).
+    
+    Grabs run outside the service lock on a per-thread capture context (see
+    CapturePool), so a UI color pick never waits behind the watcher's grab.
+    An injected grabber is shared and its grabs are serialized instead.
+    """
+    
+    # Number of distinct point sets whose region plans are kept
+    PLAN_CACHE_SIZE = 16
+    
+    # Number of regions whose last fingerprint is kept
+    FINGERPRINT_CACHE_SIZE = 64
+    
+    def __init__(self, grabber: Optional[Grabber] = None, max_regions: int = 4,
+                 pool: Optional[CapturePool] = None):
+        self._grabber = grabber
+        self._pool = pool or CapturePool()
+        self._max_regions = max_regions
+        self._lock = threading.Lock()
+        self._grab_lock = threading.Lock()
+        
+        # Region plans, keyed by the point set
+        self._plan_cache: Dict[Tuple[Tuple[int, int], ...], List[Region]] = {}
+        
+        self._last: Optional[FrameSet] = None
+        
+        # Last fingerprint per region, to count grabs that returned identical pixels
+        self._fingerprints: Dict[Region, int] = {}
+        
+        # Statistics
+        self._captures = 0
+        self._grabs = 0
+        self._pixels_grabbed = 0
+        self._reused = 0
+        self._unchanged = 0
+        self._plans = 0
+        self._errors = 0
+    
+    def _grab_all(self, regions: Sequence[Region]) -> List[Frame]:
+        """Grab regions with the injected grabber or this thread's context."""
+        timestamp = time.perf_counter()
+        if self._grabber is None:
+            grab = self._pool.grabber()
+            return [Frame(region, grab(region), timestamp) for region in regions]
+        
+        with self._grab_lock:
+            return [Frame(region, self._grabber(region), timestamp) for region in regions]
+    
+    def plan(self, points: Sequence[Tuple[int, int]]) -> List[Region]:
+        """Get the (cached) capture regions for a point set."""
+        key = tuple(sorted(set(points)))
+        with self._lock:
+            plan = self._plan_cache.get(key)
+            if plan is None:
+                if len(self._plan_cache) >= self.PLAN_CACHE_SIZE:
+                    self._plan_cache.clear()
+                plan = plan_regions(key, self._max_regions)
+                self._plan_cache[key] = plan
+                self._plans += 1
+            return plan
+    
+    def capture_regions(self, regions: Sequence[Region]) -> Optional[FrameSet]:
+        """
+        Grab a precomputed set of regions (see plan()). Consumers polling
+        the same points every tick use this to skip re-planning. Returns
+        None if the grab failed.
+        """
+        try:
+            frames = self._grab_all(regions)
+        except Exception as e:
+            with self._lock:
+                self._errors += 1
+            logger.error(f"Screen capture failed: {e}")
+            return None
+        
+        timestamp = frames[0].timestamp if frames else time.perf_counter()
+        with self._lock:
+            for frame in frames:
+                self._grabs += 1
+                self._pixels_grabbed += frame.width * frame.height
+                if self._fingerprints.get(frame.region) == frame.fingerprint:
+                    self._unchanged += 1
+                elif len(self._fingerprints) >= self.FINGERPRINT_CACHE_SIZE:
+                    self._fingerprints.clear()
+                self._fingerprints[frame.region] = frame.fingerprint
+            
+            self._captures += 1
+            self._last = FrameSet(frames, timestamp)
+            return self._last
+    
+    def capture(self, points: Sequence[Tuple[int, int]], max_age: float = 0.0) -> Optional[FrameSet]:
+        """
+        Capture frames covering all points. A previous capture is reused if
+        it covers them and is at most max_age seconds old. Returns None if
+        the grab failed.
+        """
+        if not points:
+            return FrameSet([], time.perf_counter())
+        
+        last = self._last
+        if (max_age > 0 and last is not None and
+                time.perf_counter() - last.timestamp <= max_age and last.covers(points)):
+            self._reused += 1
+            return last
+        
+        return self.capture_regions(self.plan(points))
+    
+    def get_pixel(self, x: int, y: int, max_age: float = 0.0) -> Optional[Tuple[int, int, int]]:
+        """Get the RGB color of a single screen pixel."""
+        frames = self.capture([(x, y)], max_age)
+        if frames is None:
+            return None
+        return frames.pixel(x, y)
+    
+    def release_thread(self) -> None:
+        """Close the calling thread's capture context (call on thread exit)."""
+        self._pool.release()
+    
+    def close(self) -> None:
+        """Release the underlying capture resources."""
+        self._pool.close()
+        with self._lock:
+            self._last = None
+            self._fingerprints.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get capture statistics."""
+        return {
+            'captures': self._captures,
+            'grabs': self._grabs,
+            'pixels_grabbed': self._pixels_grabbed,
+            'reused_frames': self._reused,
+            'unchanged_grabs': self._unchanged,
+            'region_plans': self._plans,
+            'errors': self._errors,
+            'contexts': self._pool.get_stats()
+        }
\ No newline at end of file
@@ -0,0 +1,389 @@
+"""
+Storage - Optional SQLite backend for profiles and execution logs.
+"""
+
+import os
+import csv
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple
+import logging
+
+from .macro_codec import read_macro_steps
+from .profile_store import ProfileStore, ProfileSummary, encode_profile, decode_profile, macro_steps_path
+from ..models.models import Profile, ExecutionLog, TriggerType
+
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS profiles (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    trigger_type TEXT NOT NULL,
+    modified_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_name ON profiles (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS profiles_trigger_type ON profiles (trigger_type);
+CREATE INDEX IF NOT EXISTS profiles_modified_at ON profiles (modified_at);
+
+CREATE TABLE IF NOT EXISTS execution_logs (
+    id TEXT PRIMARY KEY,
+    profile_id TEXT NOT NULL,
+    profile_name TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    total_clicks INTEGER NOT NULL,
+    total_steps INTEGER NOT NULL,
+    average_interval_ms REAL,
+    stopped_by TEXT NOT NULL,
+    error_message TEXT
+);
+CREATE INDEX IF NOT EXISTS logs_profile_start ON execution_logs (profile_id, start_time);
+CREATE INDEX IF NOT EXISTS logs_stopped_by ON execution_logs (stopped_by, start_time);
+CREATE INDEX IF NOT EXISTS logs_start_time ON execution_logs (start_time);
+"""
+
+# Execution log columns, in table order
+LOG_COLUMNS = ('id', 'profile_id', 'profile_name', 'start_time', 'end_time', 'total_clicks',
+               'total_steps', 'average_interval_ms', 'stopped_by', 'error_message')
+
+
+def _profile_row(profile: Profile) -> tuple:
+    return (profile.id, profile.name, profile.description, profile.trigger_type.value,
+            profile.modified_at.isoformat(), encode_profile(profile)[0])
+
+
+def _log_row(log: ExecutionLog) -> tuple:
+    return (log.id, log.profile_id, log.profile_name, log.start_time.isoformat(),
+            log.end_time.isoformat() if log.end_time else None, log.total_clicks, log.total_steps,
+            log.average_interval_ms, log.stopped_by, log.error_message)
+
+
+def _log_from_row(row: sqlite3.Row) -> ExecutionLog:
+    return ExecutionLog(**{column: row[column] for column in LOG_COLUMNS})
+
+
+class SQLiteStorage:
+    """
+    Profiles and execution logs in one SQLite database in WAL mode, so
+    other processes can read the file while the app writes. Within the app
+    every access goes through one connection under one lock, held for a
+    whole transaction: a read waits for a running batch to commit, which
+    the batch methods keep short. Profiles are kept as their
+    JSON document plus indexed name, trigger type and modification time
+    columns; execution logs are one row per run, indexed by profile,
+    stop reason and start time.
+    
+    Single writes commit on their own; wrap several in transaction() (or
+    use the save_*s batch methods) to commit them together.
+    """
+    
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        
+        # Statistics
+        self._transactions = 0
+        self._profiles_written = 0
+        self._logs_written = 0
+    
+    @property
+    def path(self) -> str:
+        """Database file path."""
+        return self._path
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group writes into one transaction; nested calls join the outer one."""
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self._conn
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("COMMIT")
+                    self._transactions += 1
+    
+    # Profiles
+    
+    def save_profiles(self, profiles: Iterable[Profile]) -> int:
+        """Insert or replace profiles in one transaction."""
+        return self._save_profile_rows([_profile_row(profile) for profile in profiles])
+    
+    def _save_profile_rows(self, rows: List[tuple]) -> int:
+        with self.transaction() as conn:
+            conn.executemany("INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._profiles_written += len(rows)
+        return len(rows)
+    
+    def save_profile(self, profile: Profile) -> bool:
+        """Insert or replace a profile."""
+        try:
+            self.save_profiles([profile])
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save profile {profile.name}: {e}")
+            return False
+    
+    def load_profile_data(self, profile_id: str) -> Optional[str]:
+        """Get the stored JSON of a profile."""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM profiles WHERE id = ?", (profile_id,)).fetchone()
+        if row is None:
+            logger.warning(f"Profile not found: {profile_id}")
+            return None
+        return row['data']
+    
+    def load_profile(self, profile_id: str) -> Optional[Profile]:
+        """Load a profile, validating it unless the application wrote it."""
+        try:
+            text = self.load_profile_data(profile_id)
+            return decode_profile(text)[0] if text is not None else None
+        except Exception as e:
+            logger.error(f"Failed to load profile {profile_id}: {e}")
+            return None
+    
+    def delete_profile(self, profile_id: str) -> bool:
+        """Delete a profile; returns False if it did not exist."""
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM profiles WHERE id = ?", (profile_id,)).rowcount > 0
+    
+    def profile_summaries(self, trigger_type: Optional[TriggerType] = None) -> List[ProfileSummary]:
+        """Index entries of all profiles (optionally of one trigger type), sorted by name."""
+        query = "SELECT id, name, description, trigger_type, modified_at, length(data) AS size FROM profiles"
+        params: tuple = ()
+        if trigger_type is not None:
+            query += " WHERE trigger_type = ?"
+            params = (TriggerType(trigger_type).value,)
+        query += " ORDER BY name COLLATE NOCASE, id"
+        
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            ProfileSummary(row['id'], row['name'], row['description'], TriggerType(row['trigger_type']),
+                           datetime.fromisoformat(row['modified_at']), row['size'], 0)
+            for row in rows
+        ]
+    
+    # Execution logs
+    
+    def save_execution_logs(self, logs: Iterable[ExecutionLog]) -> int:
+        """Insert execution logs in one transaction."""
+        rows = [_log_row(log) for log in logs]
+        with self.transaction() as conn:
+            conn.executemany(f"INSERT OR REPLACE INTO execution_logs VALUES ({', '.join('?' * len(LOG_COLUMNS))})",
+                             rows)
+            self._logs_written += len(rows)
+        return len(rows)
+    
+    def save_execution_log(self, log: ExecutionLog) -> None:
+        """Insert one execution log."""
+        self.save_execution_logs([log])
+    
+    def recent_execution_logs(self, profile_id: Optional[str] = None, stopped_by: Optional[str] = None,
+                              limit: int = 100) -> List[ExecutionLog]:
+        """The latest execution logs, newest first, optionally filtered."""
+        conditions, params = [], []
+        if profile_id is not None:
+            conditions.append("profile_id = ?")
+            params.append(profile_id)
+        if stopped_by is not None:
+            conditions.append("stopped_by = ?")
+            params.append(stopped_by)
+        
+        query = "SELECT * FROM execution_logs"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY start_time DESC LIMIT ?"
+        params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [_log_from_row(row) for row in rows]
+    
+    # Migration
+    
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+    
+    def migrate_from_files(self, profiles_directory: str, logs_directory: str) -> Dict[str, int]:
+        """
+        Import the JSON profile files and monthly CSV logs once. Later calls
+        do nothing; the source files are left in place.
+        """
+        counts = {'profiles': 0, 'logs': 0, 'failed': 0}
+        if self._get_meta('migrated_from_files'):
+            return counts
+        
+        def load_steps(profile_id: str, digest: str):
+            return read_macro_steps(macro_steps_path(profiles_directory, profile_id, digest), digest)
+        
+        profiles = []
+        if os.path.isdir(profiles_directory):
+            for filename in sorted(os.listdir(profiles_directory)):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(profiles_directory, filename), 'r', encoding='utf-8') as f:
+                        profiles.append(decode_profile(f.read(), load_steps)[0])
+                except Exception as e:
+                    counts['failed'] += 1
+                    logger.error(f"Skipping profile {filename} during migration: {e}")
+        
+        # The CSV logs only record profile names
+        ids_by_name = {profile.name: profile.id for profile in profiles}
+        logs = []
+        if os.path.isdir(logs_directory):
+            for filename in sorted(os.listdir(logs_directory)):
+                if not (filename.startswith('execution_log_') and filename.endswith('.csv')):
+                    continue
+                with open(os.path.join(logs_directory, filename), 'r', newline='', encoding='utf-8') as f:
+                    reader = csv.reader(f)
+                    next(reader, None)  # Header
+                    for row in reader:
+                        try:
+                            logs.append(self._log_from_csv_row(row, ids_by_name))
+                        except Exception as e:
+                            counts['failed'] += 1
+                            logger.error(f"Skipping log row in {filename} during migration: {e}")
+        
+        with self.transaction() as conn:
+            counts['profiles'] = self.save_profiles(profiles)
+            counts['logs'] = self.save_execution_logs(logs)
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_from_files', ?)",
+                         (datetime.now().isoformat(),))
+        
+        logger.info(f"Migrated {counts['profiles']} profiles and {counts['logs']} execution logs to {self._path}")
+        return counts
+    
+    @staticmethod
+    def _log_from_csv_row(row: List[str], ids_by_name: Dict[str, str]) -> ExecutionLog:
+        """Rebuild an execution log from a row written by ExecutionLog.to_csv_row()."""
+        (log_id, profile_name, start_time, end_time, total_clicks, total_steps,
+         average_interval_ms, _duration, stopped_by, error_message) = row[:10]
+        return ExecutionLog(
+            id=log_id,
+            profile_id=ids_by_name.get(profile_name, ""),
+            profile_name=profile_name,
+            start_time=start_time,
+            end_time=end_time or None,
+            total_clicks=int(total_clicks),
+            total_steps=int(total_steps),
+            average_interval_ms=float(average_interval_ms) if average_interval_ms else None,
+            stopped_by=stopped_by,
+            error_message=error_message or None
+        )
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get storage statistics."""
+        return {
+            'path': self._path,
+            'transactions': self._transactions,
+            'profiles_written': self._profiles_written,
+            'logs_written': self._logs_written
+        }
+
+
+class SQLiteProfileStore(ProfileStore):
+    """
+    ProfileStore backed by SQLiteStorage: the index comes straight from the
+    indexed profile columns and profiles are still parsed lazily into the
+    LRU cache. Macro steps are always stored inline as JSON.
+    """
+    
+    def __init__(self, storage: SQLiteStorage, cache_size: int = 32, write_delay: Optional[float] = None):
+        super().__init__(storage.path, cache_size, write_delay)
+        self._storage = storage
+    
+    def refresh(self) -> int:
+        """Reload the index from the database, dropping changed cached profiles."""
+        self._write_pending()
+        index = {summary.id: summary for summary in self._storage.profile_summaries()}
+        self._summaries_read += len(index)
+        
+        with self._lock:
+            for profile_id in set(self._cache) | set(self._hashes):
+                old, new = self._index.get(profile_id), index.get(profile_id)
+                if old is None or new is None or (old.modified_at, old.size) != (new.modified_at, new.size):
+                    self._cache.pop(profile_id, None)
+                    self._hashes.pop(profile_id, None)
+            self._index = index
+        return len(index)
+    
+    def _write_index(self) -> None:
+        """Nothing to do; the index lives in the database."""
+    
+    def load(self, profile_id: str) -> Optional[Profile]:
+        """Parse a profile from the database, bypassing (and refreshing) the cache."""
+        pending = self._pending(profile_id)
+        if pending is not None:
+            return pending
+        
+        try:
+            text = self._storage.load_profile_data(profile_id)
+            if text is None:
+                return None
+            profile, digest, trusted = decode_profile(text)
+        except Exception as e:
+            logger.error(f"Failed to load profile {profile_id}: {e}")
+            return None
+        
+        with self._lock:
+            self._profiles_parsed += 1
+            self._trusted_loads += trusted
+            self._remember(profile)
+            self._hashes[profile_id] = digest
+        return profile
+    
+    def _encode(self, profile: Profile) -> Tuple[str, str, Optional[bytes]]:
+        """Encode a profile as a single JSON document."""
+        text, digest = encode_profile(profile)
+        return text, digest, None
+    
+    def _write_data(self, profile: Profile, text: str, steps: Optional[bytes] = None) -> ProfileSummary:
+        """Write a profile row and return its index entry."""
+        self._storage._save_profile_rows([(profile.id, profile.name, profile.description, profile.trigger_type.value,
+                                           profile.modified_at.isoformat(), text)])
+        return ProfileSummary(profile.id, profile.name, profile.description, profile.trigger_type,
+                              profile.modified_at, len(text), 0)
+    
+    def _remove_data(self, profile_id: str) -> bool:
+        """Delete a profile row; returns False if it did not exist."""
+        return self._storage.delete_profile(profile_id)
\ No newline at end of file
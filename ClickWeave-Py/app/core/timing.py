@@ -0,0 +1,215 @@
+"""
+Timing - Absolute-deadline scheduling and hybrid high-resolution waiting.
+"""
+
+import time
+import threading
+from typing import Optional, Dict, Any
+
+
+# Remaining time below which waits stop sleeping and spin on perf_counter().
+# OS sleep granularity (1-15 ms depending on platform) would otherwise
+# overshoot short deadlines.
+SPIN_THRESHOLD_SECONDS = 0.002
+
+
+def wait_until(deadline: float, stop_event: Optional[threading.Event] = None,
+               spin_threshold: float = SPIN_THRESHOLD_SECONDS) -> bool:
+    """
+    Block until the perf_counter() deadline is reached.
+    
+    Sleeps coarsely (interruptible by stop_event) until spin_threshold before
+    the deadline, then spins for the remainder. Returns False if stop_event
+    was set before the deadline, True otherwise.
+    """
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return True
+        
+        if stop_event is not None and stop_event.is_set():
+            return False
+        
+        if remaining > spin_threshold:
+            coarse = remaining - spin_threshold
+            if stop_event is not None:
+                if stop_event.wait(coarse):
+                    return False
+            else:
+                time.sleep(coarse)
+            continue
+        
+        # Short spin for the final stretch
+        while time.perf_counter() < deadline:
+            if stop_event is not None and stop_event.is_set():
+                return False
+        return True
+
+
+class DeadlineScheduler:
+    """
+    Computes fire times on an absolute timeline so per-action cost never
+    accumulates: fire N is due at origin + N * interval (plus jitter around
+    that deadline), regardless of how long earlier actions took.
+    """
+    
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._origin = 0.0
+        self._index = 0
+        self._deadline = 0.0
+        
+        # Drift statistics
+        self._fires = 0
+        self._missed = 0
+        self._last_drift = 0.0
+        self._total_drift = 0.0
+        self._max_drift = 0.0
+    
+    def start(self, now: Optional[float] = None) -> float:
+        """Anchor the timeline; the first fire is due immediately."""
+        self._origin = time.perf_counter() if now is None else now
+        self._index = 0
+        self._deadline = self._origin
+        self._fires = 0
+        self._missed = 0
+        self._last_drift = 0.0
+        self._total_drift = 0.0
+        self._max_drift = 0.0
+        return self._deadline
+    
+    def advance(self, jitter_offset: float = 0.0) -> float:
+        """Move to the next deadline and return it."""
+        self._index += 1
+        base = self._origin + self._index * self._interval
+        
+        # If we fell more than a whole interval behind (e.g. a slow click or a
+        # stalled system), skip the missed slots instead of bursting to catch up.
+        behind = time.perf_counter() - base
+        if behind > self._interval:
+            skipped = int(behind // self._interval)
+            self._index += skipped
+            self._missed += skipped
+            base = self._origin + self._index * self._interval
+        
+        # Jitter is applied around the deadline, but never reorders fires
+        self._deadline = max(base + jitter_offset, self._deadline)
+        return self._deadline
+    
+    def shift(self, seconds: float) -> None:
+        """Shift the whole timeline, e.g. by the time spent paused."""
+        self._origin += seconds
+        self._deadline += seconds
+    
+    def record_fire(self, fired_at: Optional[float] = None) -> float:
+        """Record when the current deadline actually fired; returns its drift."""
+        if fired_at is None:
+            fired_at = time.perf_counter()
+        
+        drift = fired_at - self._deadline
+        self._fires += 1
+        self._last_drift = drift
+        self._total_drift += drift
+        self._max_drift = max(self._max_drift, drift)
+        return drift
+    
+    @property
+    def interval(self) -> float:
+        """Nominal interval in seconds."""
+        return self._interval
+    
+    @property
+    def deadline(self) -> float:
+        """Current deadline (perf_counter seconds)."""
+        return self._deadline
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get drift statistics in milliseconds."""
+        return {
+            'scheduled_fires': self._fires,
+            'missed_deadlines': self._missed,
+            'last_drift_ms': self._last_drift * 1000,
+            'mean_drift_ms': (self._total_drift / self._fires) * 1000 if self._fires else 0.0,
+            'max_drift_ms': self._max_drift * 1000,
+            'cumulative_drift_ms': self._total_drift * 1000
+        }
+
+
+class PlaybackTimeline:
+    """
+    Absolute timeline for sequences of actions with nominal durations, such
+    as macro playback: each action starts at origin + offset, where offset is
+    the sum of the nominal durations before it. Overhead of one action is
+    absorbed by the next wait instead of accumulating over the run.
+    """
+    
+    # Lag beyond which the timeline is re-anchored instead of rushing through
+    # the backlog (e.g. after a stalled system)
+    RESYNC_SECONDS = 1.0
+    
+    def __init__(self):
+        self._origin = 0.0
+        self._offset = 0.0
+        
+        # Lag statistics
+        self._actions = 0
+        self._late = 0
+        self._resyncs = 0
+        self._total_lag = 0.0
+        self._max_lag = 0.0
+    
+    def start(self, now: Optional[float] = None) -> float:
+        """Anchor the timeline; the first action is due immediately."""
+        self._origin = time.perf_counter() if now is None else now
+        self._offset = 0.0
+        self._actions = 0
+        self._late = 0
+        self._resyncs = 0
+        self._total_lag = 0.0
+        self._max_lag = 0.0
+        return self._origin
+    
+    def advance(self, seconds: float) -> float:
+        """Advance the offset by a nominal duration and return the new deadline."""
+        self._offset += seconds
+        return self.deadline
+    
+    def shift(self, seconds: float) -> None:
+        """Shift the whole timeline, e.g. by the time spent paused."""
+        self._origin += seconds
+    
+    def record_start(self, started_at: Optional[float] = None) -> float:
+        """Record when the action due at the current deadline started; returns its lag."""
+        if started_at is None:
+            started_at = time.perf_counter()
+        
+        lag = started_at - self.deadline
+        self._actions += 1
+        if lag > SPIN_THRESHOLD_SECONDS:
+            self._late += 1
+            self._total_lag += lag
+            self._max_lag = max(self._max_lag, lag)
+            if lag > self.RESYNC_SECONDS:
+                self._origin += lag
+                self._resyncs += 1
+        return lag
+    
+    @property
+    def deadline(self) -> float:
+        """Deadline of the current action (perf_counter seconds)."""
+        return self._origin + self._offset
+    
+    @property
+    def offset(self) -> float:
+        """Current nominal offset from the origin in seconds."""
+        return self._offset
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lag statistics in milliseconds."""
+        return {
+            'timed_actions': self._actions,
+            'late_actions': self._late,
+            'resyncs': self._resyncs,
+            'mean_lag_ms': (self._total_lag / self._late) * 1000 if self._late else 0.0,
+            'max_lag_ms': self._max_lag * 1000
+        }
\ No newline at end of file
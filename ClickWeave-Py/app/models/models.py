@@ -2,10 +2,13 @@
 Data models for ClickWeave-Py application using Pydantic for validation and serialization.
 """
 
+import gc
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import List, Optional, Union, Dict, Any, Tuple
-from pydantic import BaseModel, Field, validator, root_validator
+from typing import List, Optional, Union, Dict, Any, Tuple, Callable, Iterator, get_origin, get_args
+from pydantic import BaseModel, Field, TypeAdapter, validator, root_validator
 import json
 
 
@@ -31,6 +34,7 @@ class TriggerType(str, Enum):
     """Types of triggers for automation."""
     MANUAL = "manual"
     PIXEL_COLOR = "pixel_color"
+    REGION = "region"
     SCHEDULED = "scheduled"
 
 
@@ -41,6 +45,48 @@ class ColorCondition(str, Enum):
     CHANGED = "changed"  # Color changed from initial
 
 
+class ColorMetric(str, Enum):
+    """How the distance between two colors is measured."""
+    RGB = "rgb"  # Largest per-channel difference
+    DELTA_E76 = "delta_e76"  # CIE76 perceptual difference
+    DELTA_E2000 = "delta_e2000"  # CIEDE2000 perceptual difference
+
+
+class TriggerEdge(str, Enum):
+    """When a pixel trigger fires relative to its condition."""
+    RISING = "rising"  # Once when the condition becomes true
+    FALLING = "falling"  # Once when the condition becomes false
+    LEVEL = "level"  # On every sample while the condition is true
+
+
+class RegionRule(str, Enum):
+    """How a region trigger evaluates its rectangle."""
+    PERCENT = "percent"  # Enough pixels within tolerance of a color
+    MEAN_COLOR = "mean_color"  # Average color within tolerance
+    TEMPLATE = "template"  # A small template image appears anywhere in the region
+
+
+class MotionMode(str, Enum):
+    """Cursor motion styles."""
+    INSTANT = "instant"  # Teleport to the target
+    LINEAR = "linear"
+    CURVED = "curved"
+
+
+class MacroRepeatMode(str, Enum):
+    """How often a macro sequence is played."""
+    ONCE = "once"
+    COUNT = "count"  # Play a fixed number of times
+    DURATION = "duration"  # Play until a duration has elapsed
+    INFINITE = "infinite"  # Play until stopped or limits are reached
+
+
+class MacroStorage(str, Enum):
+    """How a profile's macro steps are stored on disk."""
+    JSON = "json"  # Inline in the profile JSON
+    BINARY = "binary"  # Packed columns in a separate .steps file
+
+
 class Coordinates(BaseModel):
     """Screen coordinates with optional relative positioning."""
     x: int = Field(..., description="X coordinate")
@@ -52,20 +98,62 @@ class Coordinates(BaseModel):
         return f"({self.x}, {self.y}){rel_info}"
 
 
+class ScreenRegion(BaseModel):
+    """Screen rectangle."""
+    x: int = Field(..., description="Left edge")
+    y: int = Field(..., description="Top edge")
+    width: int = Field(..., ge=1, le=8192, description="Width in pixels")
+    height: int = Field(..., ge=1, le=8192, description="Height in pixels")
+    
+    def to_tuple(self) -> Tuple[int, int, int, int]:
+        return (self.x, self.y, self.width, self.height)
+    
+    def __str__(self) -> str:
+        return f"({self.x}, {self.y}) {self.width}x{self.height}"
+
+
 class ColorInfo(BaseModel):
     """RGB color information with tolerance."""
     r: int = Field(..., ge=0, le=255, description="Red component")
     g: int = Field(..., ge=0, le=255, description="Green component")
     b: int = Field(..., ge=0, le=255, description="Blue component")
     tolerance: int = Field(10, ge=0, le=255, description="Color matching tolerance")
+    metric: ColorMetric = Field(ColorMetric.RGB, description="Color distance used with the tolerance")
     
     def to_rgb_tuple(self) -> Tuple[int, int, int]:
         return (self.r, self.g, self.b)
     
     def __str__(self) -> str:
+        if self.metric != ColorMetric.RGB:
+            return f"RGB({self.r}, {self.g}, {self.b}) ΔE≤{self.tolerance} ({self.metric.value})"
         return f"RGB({self.r}, {self.g}, {self.b}) ±{self.tolerance}"
 
 
+class MotionConfig(BaseModel):
+    """Cursor motion and settle timing around clicks and moves."""
+    mode: MotionMode = Field(MotionMode.LINEAR, description="How the cursor travels to its target")
+    duration_ms: int = Field(100, ge=0, le=10000, description="Travel time for linear and curved moves")
+    settle_ms: int = Field(50, ge=0, le=10000, description="Pause after moving before clicking")
+    hold_ms: int = Field(500, ge=0, le=60000, description="Button hold time for HOLD clicks")
+    loop_delay_ms: int = Field(50, ge=0, le=60000, description="Pause between repeated step iterations")
+    skip_if_at_target: bool = Field(True, description="Skip the move when the cursor is already on target")
+    curvature: float = Field(0.25, ge=0.0, le=1.0, description="Curve bulge relative to travel distance")
+
+
+class MacroRepeat(BaseModel):
+    """Sequence-level repeat configuration for macros."""
+    mode: MacroRepeatMode = Field(MacroRepeatMode.ONCE, description="Sequence repeat mode")
+    count: int = Field(1, ge=1, description="Number of sequence plays in COUNT mode")
+    duration_seconds: Optional[int] = Field(None, ge=1, description="Play time in DURATION mode")
+    interval_ms: int = Field(0, ge=0, le=3600000, description="Pause between sequence plays")
+    
+    @validator('duration_seconds', always=True)
+    def validate_duration(cls, v, values):
+        if values.get('mode') == MacroRepeatMode.DURATION and v is None:
+            raise ValueError("duration_seconds is required for DURATION repeat")
+        return v
+
+
 class MacroStep(BaseModel):
     """Individual step in a macro sequence."""
     id: str = Field(..., description="Unique step identifier")
@@ -90,6 +178,9 @@ class MacroStep(BaseModel):
     # Loop control
     loop_count: int = Field(1, ge=1, description="Number of times to repeat this step")
     
+    # Motion override (uses the profile motion when not set)
+    motion: Optional[MotionConfig] = Field(None, description="Motion settings for this step")
+    
     @validator('click_type')
     def validate_click_type(cls, v, values):
         if values.get('type') == MacroStepType.CLICK and v is None:
@@ -122,6 +213,36 @@ class PixelTrigger(BaseModel):
     color: ColorInfo = Field(..., description="Target color information")
     condition: ColorCondition = Field(ColorCondition.EXACT, description="Color matching condition")
     check_interval_ms: int = Field(100, ge=50, le=5000, description="Check interval in milliseconds")
+    edge: TriggerEdge = Field(TriggerEdge.RISING, description="Fire on rising edge, falling edge or level")
+    debounce_samples: int = Field(1, ge=1, le=100, description="Consecutive samples required to change state")
+    cooldown_ms: int = Field(0, ge=0, le=3600000, description="Minimum time between fires")
+
+
+class RegionTrigger(BaseModel):
+    """Region-based trigger: a color rule or a template match over a rectangle."""
+    enabled: bool = Field(True, description="Whether trigger is enabled")
+    region: ScreenRegion = Field(..., description="Screen rectangle to monitor")
+    rule: RegionRule = Field(RegionRule.PERCENT, description="How the region is evaluated")
+    color: Optional[ColorInfo] = Field(None, description="Target color for PERCENT and MEAN_COLOR rules")
+    min_percent: float = Field(50.0, gt=0.0, le=100.0, description="Share of pixels that must match for PERCENT")
+    template_path: Optional[str] = Field(None, description="Template image for the TEMPLATE rule")
+    template_tolerance: int = Field(16, ge=0, le=255, description="Mean per-channel difference allowed for a template match")
+    check_interval_ms: int = Field(250, ge=50, le=5000, description="Check interval in milliseconds")
+    edge: TriggerEdge = Field(TriggerEdge.RISING, description="Fire on rising edge, falling edge or level")
+    debounce_samples: int = Field(1, ge=1, le=100, description="Consecutive samples required to change state")
+    cooldown_ms: int = Field(0, ge=0, le=3600000, description="Minimum time between fires")
+    
+    @validator('color', always=True)
+    def validate_color(cls, v, values):
+        if values.get('rule') in [RegionRule.PERCENT, RegionRule.MEAN_COLOR] and v is None:
+            raise ValueError("color is required for PERCENT and MEAN_COLOR rules")
+        return v
+    
+    @validator('template_path', always=True)
+    def validate_template_path(cls, v, values):
+        if values.get('rule') == RegionRule.TEMPLATE and not v:
+            raise ValueError("template_path is required for the TEMPLATE rule")
+        return v
 
 
 class ScheduleTrigger(BaseModel):
@@ -157,6 +278,15 @@ class TimingConfig(BaseModel):
         min_interval = self.interval_ms * (1 - jitter)
         max_interval = self.interval_ms * (1 + jitter)
         return random.uniform(min_interval, max_interval) / 1000.0
+    
+    def get_jitter_offset(self) -> float:
+        """Calculate a random offset in seconds to apply around a deadline."""
+        import random
+        if self.jitter_percent == 0:
+            return 0.0
+        
+        max_offset = self.interval_ms * (self.jitter_percent / 100.0)
+        return random.uniform(-max_offset, max_offset) / 1000.0
 
 
 class Profile(BaseModel):
@@ -177,21 +307,36 @@ class Profile(BaseModel):
     # Limits
     limits: ClickLimits = Field(default_factory=ClickLimits, description="Click limits")
     
+    # Motion
+    motion: MotionConfig = Field(default_factory=MotionConfig, description="Cursor motion configuration")
+    
     # Macro steps
     macro_steps: List[MacroStep] = Field(default_factory=list, description="Macro sequence steps")
+    macro_repeat: MacroRepeat = Field(default_factory=MacroRepeat, description="Macro sequence repeat")
+    macro_storage: MacroStorage = Field(MacroStorage.JSON, description="On-disk encoding of macro steps (json, binary)")
+    
+    # Input
+    input_backend: Optional[str] = Field(None, description="Input backend override (pyautogui, pynput, xtest, recording)")
+    input_priority: int = Field(0, description="Turn priority on the input device while other profiles run (higher first)")
     
     # Triggers
     trigger_type: TriggerType = Field(TriggerType.MANUAL, description="How automation is triggered")
     pixel_trigger: Optional[PixelTrigger] = Field(None, description="Pixel-based trigger")
+    region_trigger: Optional[RegionTrigger] = Field(None, description="Region-based trigger")
     schedule_trigger: Optional[ScheduleTrigger] = Field(None, description="Scheduled trigger")
     
     # Execution state
     is_active: bool = Field(False, description="Whether profile is currently running")
     is_paused: bool = Field(False, description="Whether profile is paused")
     
-    @validator('modified_at', always=True)
-    def update_modified_at(cls, v):
-        return datetime.now()
+    @classmethod
+    def from_trusted_dict(cls, data: Dict[str, Any]) -> 'Profile':
+        """
+        Build a profile from JSON data the application serialized itself,
+        without validation (see _TrustedBuilder). The dict is consumed.
+        Anything else must go through Profile(**data).
+        """
+        return construct_trusted(cls, data)
     
     def to_json_file(self, filepath: str) -> None:
         """Save profile to JSON file."""
@@ -206,6 +351,145 @@ class Profile(BaseModel):
         return cls(**data)
 
 
+class _TrustedBuilder:
+    """
+    Constructs one model class from trusted data the way model_construct
+    does, minus its per-call overhead: the fields that need converting
+    (nested models, enums, datetimes) are worked out once per class and
+    everything else is taken as is. No validators run.
+    """
+    
+    def __init__(self, cls: type):
+        self._cls = cls
+        self._fields = cls.model_fields
+        self._names = frozenset(self._fields)
+        self._converters: List[Tuple[str, Callable[[Any], Any]]] = []
+        for name, field in self._fields.items():
+            converter = _trusted_converter(field.annotation)
+            if converter is not None:
+                self._converters.append((name, converter))
+    
+    def build(self, data: Dict[str, Any]) -> BaseModel:
+        # None stays None: trusted data only has it where the field is optional
+        for name, converter in self._converters:
+            value = data.get(name)
+            if value is not None:
+                data[name] = converter(value)
+        
+        fields_set = set(data)
+        if fields_set != self._names:
+            for name in fields_set - self._names:
+                del data[name]
+            fields_set &= self._names
+            for name in self._names - fields_set:
+                data[name] = self._fields[name].get_default(call_default_factory=True, validated_data=data)
+        
+        return self.build_typed(data, fields_set)
+    
+    def build_typed(self, data: Dict[str, Any], fields_set: Optional[set] = None) -> BaseModel:
+        """Build from data that already holds every field with its final type."""
+        model = self._cls.__new__(self._cls)
+        _object_setattr(model, '__dict__', data)
+        _object_setattr(model, '__pydantic_fields_set__', set(data) if fields_set is None else fields_set)
+        _object_setattr(model, '__pydantic_extra__', None)
+        _object_setattr(model, '__pydantic_private__', None)
+        return model
+
+
+_object_setattr = object.__setattr__
+_trusted_builders: Dict[type, _TrustedBuilder] = {}
+
+
+def _trusted_builder(cls: type) -> _TrustedBuilder:
+    builder = _trusted_builders.get(cls)
+    if builder is None:
+        builder = _trusted_builders[cls] = _TrustedBuilder(cls)
+    return builder
+
+
+def construct_trusted(cls: type, data: Dict[str, Any], typed: bool = False) -> BaseModel:
+    """
+    Build a model from trusted JSON data without validation; the dict is
+    consumed. With typed=True the data must already hold every field with
+    its final type (enum members, nested models), and is used as is.
+    """
+    builder = _trusted_builder(cls)
+    return builder.build_typed(data) if typed else builder.build(data)
+
+
+def trusted_factory(cls: type) -> Callable[[Dict[str, Any]], BaseModel]:
+    """construct_trusted(cls, data, typed=True) as one bound call, for building many models in a loop."""
+    return _trusted_builder(cls).build_typed
+
+
+# Builds of fewer models gain less from pausing collection than the pause costs other threads
+GC_PAUSE_MIN_MODELS = 5000
+
+_gc_pause_lock = threading.Lock()
+_gc_pauses = 0
+_gc_resume = False
+
+
+@contextmanager
+def gc_paused(models: int) -> Iterator[None]:
+    """
+    Hold off cyclic garbage collection while building `models` models that
+    all stay alive; otherwise every few hundred allocations trigger a
+    collection that scans everything built so far, which about doubles the
+    time of a large build. Collection is process-wide, so the pause is only
+    taken for builds of at least GC_PAUSE_MIN_MODELS and lasts no longer
+    than the build (tens of milliseconds per 10k models). Other threads
+    keep freeing memory by reference counting meanwhile; only their cyclic
+    garbage waits. Concurrent pauses nest: collection resumes when the last
+    one ends, and only if it was enabled when the first began.
+    """
+    if models < GC_PAUSE_MIN_MODELS:
+        yield
+        return
+    
+    global _gc_pauses, _gc_resume
+    with _gc_pause_lock:
+        if _gc_pauses == 0:
+            _gc_resume = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_pause_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_resume:
+                gc.enable()
+
+
+def _trusted_converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """Converter from a non-null JSON value to the field's type, or None if the value is used as is."""
+    if annotation in (str, int, float, bool, Any):
+        return None
+    
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return _trusted_converter(args[0])
+    elif origin is list:
+        inner = _trusted_converter(get_args(annotation)[0])
+        if inner is None:
+            return None
+        return lambda values: [inner(value) for value in values]
+    elif isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return _trusted_builder(annotation).build
+        if issubclass(annotation, Enum):
+            # Plain lookup instead of the much slower Enum call; unknown values raise KeyError
+            return {member.value: member for member in annotation}.__getitem__
+        if annotation is datetime:
+            return datetime.fromisoformat
+    
+    # Rare types (timedelta, dicts, ...) are left to pydantic
+    return TypeAdapter(annotation).validate_python
+
+
 class ExecutionLog(BaseModel):
     """Log entry for profile execution."""
     id: str = Field(..., description="Unique log entry identifier")
@@ -260,10 +544,19 @@ class AppSettings(BaseModel):
     failsafe_corner: str = Field("top-left", description="Failsafe corner (top-left, top-right, etc.)")
     single_instance: bool = Field(True, description="Enforce single application instance")
     
+    # Input
+    input_backend: str = Field("pyautogui", description="Default input backend (pyautogui, pynput, xtest, recording)")
+    max_concurrent_runs: int = Field(4, ge=1, description="Maximum number of profiles running at once")
+    
     # Paths
     profiles_directory: str = Field("app/data/profiles", description="Directory for profile files")
     logs_directory: str = Field("app/data/logs", description="Directory for log files")
     
+    # Storage
+    storage_backend: str = Field("files", description="Profile and log storage (files, sqlite)")
+    database_path: str = Field("app/data/clickweave.db", description="SQLite database for the sqlite backend")
+    watch_profiles: bool = Field(True, description="Reload profile files changed by other tools (files backend)")
+    
     # Performance
     max_log_entries: int = Field(1000, ge=100, description="Maximum log entries to keep")
     ui_update_interval_ms: int = Field(100, ge=50, description="UI update interval")
@@ -297,7 +590,8 @@ class HotkeyStatus(BaseModel):
 class ApplicationState(BaseModel):
     """Current application state."""
     is_running: bool = Field(False, description="Whether any automation is running")
-    active_profile_id: Optional[str] = Field(None, description="Currently active profile ID")
+    active_profile_id: Optional[str] = Field(None, description="Most recently started running profile ID")
+    active_profile_ids: List[str] = Field(default_factory=list, description="IDs of all running profiles")
     total_profiles: int = Field(0, description="Total number of profiles")
     hotkey_status: HotkeyStatus = Field(default_factory=HotkeyStatus, description="Hotkey registration status")
     last_action_time: Optional[datetime] = Field(None, description="Time of last automated action")
\ No newline at end of file
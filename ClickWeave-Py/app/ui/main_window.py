@@ -201,7 +201,7 @@ class MainWindow:
         
         # Create new profile
         profile = self.app.create_profile(
-            name=f"New Profile {len(self.app.get_all_profiles()) + 1}",
+            name=f"New Profile {self.app.get_profile_count() + 1}",
             description="New automation profile"
         )
         
@@ -349,7 +349,7 @@ Developed for productivity and UI testing purposes.
     
     def _on_profile_stopped(self, profile: Profile) -> None:
         """Handle profile stop."""
-        success = self.app.stop_automation()
+        success = self.app.stop_automation(profile.id)
         if not success:
             messagebox.showerror(
                 "Stop Failed",
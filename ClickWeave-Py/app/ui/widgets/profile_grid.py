@@ -6,6 +6,7 @@ import customtkinter as ctk
 from typing import Optional, Callable, Dict, Any, List
 import logging
 
+from ...core.profile_store import ProfileSummary
 from ...models.models import Profile
 
 
@@ -52,9 +53,9 @@ class ProfileGrid(ctk.CTkScrollableFrame):
             self._callbacks['new_profile']()
     
     def refresh_profiles(self):
-        """Refresh the profile display."""
+        """Refresh the profile display from the profile index."""
         try:
-            profiles = self.app.get_all_profiles()
+            profiles = self.app.get_profile_summaries()
             
             # Clear existing profile widgets (except header and new button)
             for widget in self.winfo_children()[2:]:
@@ -75,8 +76,8 @@ class ProfileGrid(ctk.CTkScrollableFrame):
         except Exception as e:
             logger.error(f"Error refreshing profiles: {e}")
     
-    def _create_profile_card(self, profile: Profile, row: int):
-        """Create a profile card widget."""
+    def _create_profile_card(self, profile: ProfileSummary, row: int):
+        """Create a profile card widget. The full profile is loaded when a button is used."""
         # Profile frame
         card = ctk.CTkFrame(self)
         card.grid(row=row, column=0, pady=5, sticky="ew", padx=10)
@@ -91,8 +92,9 @@ class ProfileGrid(ctk.CTkScrollableFrame):
         name_label.grid(row=0, column=0, columnspan=2, sticky="w", padx=10, pady=(10, 5))
         
         # Status
-        status_text = "Running" if profile.is_active else "Stopped"
-        status_color = "green" if profile.is_active else "gray"
+        is_active = profile.id in self.app.get_application_state().active_profile_ids
+        status_text = "Running" if is_active else "Stopped"
+        status_color = "green" if is_active else "gray"
         status_label = ctk.CTkLabel(
             card,
             text=f"Status: {status_text}",
@@ -114,13 +116,13 @@ class ProfileGrid(ctk.CTkScrollableFrame):
         btn_frame.grid(row=3, column=0, columnspan=2, sticky="ew", padx=10, pady=10)
         
         # Start/Stop button
-        if profile.is_active:
+        if is_active:
             action_btn = ctk.CTkButton(
                 btn_frame,
                 text="Stop",
                 fg_color="red",
                 hover_color="darkred",
-                command=lambda: self._trigger_callback('profile_stopped', profile)
+                command=lambda: self._trigger_profile_callback('profile_stopped', profile.id)
             )
         else:
             action_btn = ctk.CTkButton(
@@ -128,7 +130,7 @@ class ProfileGrid(ctk.CTkScrollableFrame):
                 text="Start",
                 fg_color="green",
                 hover_color="darkgreen",
-                command=lambda: self._trigger_callback('profile_started', profile)
+                command=lambda: self._trigger_profile_callback('profile_started', profile.id)
             )
         action_btn.pack(side="left", padx=(0, 5))
         
@@ -136,7 +138,7 @@ class ProfileGrid(ctk.CTkScrollableFrame):
         edit_btn = ctk.CTkButton(
             btn_frame,
             text="Edit",
-            command=lambda: self._trigger_callback('profile_edited', profile)
+            command=lambda: self._trigger_profile_callback('profile_edited', profile.id)
         )
         edit_btn.pack(side="left", padx=5)
         
@@ -146,7 +148,7 @@ class ProfileGrid(ctk.CTkScrollableFrame):
             text="Delete",
             fg_color="red",
             hover_color="darkred",
-            command=lambda: self._trigger_callback('profile_deleted', profile)
+            command=lambda: self._trigger_profile_callback('profile_deleted', profile.id)
         )
         delete_btn.pack(side="right")
     
@@ -154,6 +156,14 @@ class ProfileGrid(ctk.CTkScrollableFrame):
         """Register callback for events."""
         self._callbacks[event] = callback
     
+    def _trigger_profile_callback(self, event: str, profile_id: str):
+        """Load a profile and pass it to the registered callback."""
+        profile = self.app.get_profile(profile_id)
+        if profile is None:
+            logger.error(f"Profile {profile_id} could not be loaded for {event}")
+            return
+        self._trigger_callback(event, profile)
+    
     def _trigger_callback(self, event: str, data=None):
         """Trigger registered callback."""
         if event in self._callbacks:
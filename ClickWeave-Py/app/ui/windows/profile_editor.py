@@ -197,6 +197,8 @@ class ProfileEditorWindow:
                     x, y = pyautogui.position()
                     self.x_var.set(str(x))
                     self.y_var.set(str(y))
+                    color = self.app.frame_service.get_pixel(x, y)
+                    logger.info(f"Picked position ({x}, {y}) with color {color}")
                     captured = True
                 elif event.name == 'esc' and event.event_type == keyboard.KEY_DOWN:
                     captured = True
@@ -208,7 +210,7 @@ class ProfileEditorWindow:
                 time.sleep(0.1)
             
             keyboard.unhook_all()
-            
+        
         except ImportError:
             messagebox.showerror(
                 "Error",
@@ -8,8 +8,6 @@ import customtkinter as ctk
 from typing import Optional
 import logging
 
-from ...models.models import AppSettings
-
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +28,7 @@ class SettingsWindow:
         self.hotkey_start_stop_var = tk.StringVar(value=self.settings.hotkey_start_stop)
         self.hotkey_pause_resume_var = tk.StringVar(value=self.settings.hotkey_pause_resume)
         self.hotkey_emergency_var = tk.StringVar(value=self.settings.hotkey_emergency_stop)
+        self.input_backend_var = tk.StringVar(value=self.settings.input_backend)
     
     def show(self):
         """Show the settings window."""
@@ -136,6 +135,25 @@ class SettingsWindow:
         )
         failsafe_check.pack(anchor="w", padx=15, pady=(5, 15))
         
+        # Input
+        input_frame = ctk.CTkFrame(main_frame)
+        input_frame.pack(fill="x", pady=(0, 20))
+        
+        ctk.CTkLabel(
+            input_frame,
+            text="Input",
+            font=ctk.CTkFont(size=18, weight="bold")
+        ).pack(anchor="w", padx=15, pady=(15, 10))
+        
+        # Input backend
+        ctk.CTkLabel(input_frame, text="Input backend:").pack(anchor="w", padx=15)
+        backend_menu = ctk.CTkOptionMenu(
+            input_frame,
+            variable=self.input_backend_var,
+            values=["pyautogui", "pynput", "xtest"]
+        )
+        backend_menu.pack(anchor="w", padx=15, pady=(5, 15))
+        
         # Buttons
         button_frame = ctk.CTkFrame(self.window, fg_color="transparent")
         button_frame.pack(side="bottom", fill="x", padx=20, pady=10)
@@ -157,15 +175,17 @@ class SettingsWindow:
     def _save(self):
         """Save settings."""
         try:
-            # Create new settings
-            new_settings = AppSettings(
-                theme=self.theme_var.get(),
-                language=self.language_var.get(),
-                failsafe_enabled=self.failsafe_var.get(),
-                hotkey_start_stop=self.hotkey_start_stop_var.get(),
-                hotkey_pause_resume=self.hotkey_pause_resume_var.get(),
-                hotkey_emergency_stop=self.hotkey_emergency_var.get()
-            )
+            # Update the current settings; those without a control here (storage backend,
+            # concurrent runs, ...) keep their values
+            new_settings = self.settings.copy(update={
+                'theme': self.theme_var.get(),
+                'language': self.language_var.get(),
+                'failsafe_enabled': self.failsafe_var.get(),
+                'hotkey_start_stop': self.hotkey_start_stop_var.get(),
+                'hotkey_pause_resume': self.hotkey_pause_resume_var.get(),
+                'hotkey_emergency_stop': self.hotkey_emergency_var.get(),
+                'input_backend': self.input_backend_var.get()
+            })
             
             # Update application settings
             if self.app.update_settings(new_settings):
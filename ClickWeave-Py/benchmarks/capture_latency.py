@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Capture latency benchmark for the shared frame service.
+
+Reports p50/p99 latency of 1x1, 64x64 and full-screen grabs through
+FrameService (per-thread mss contexts), from the main thread and from a
+worker thread. Runs against $DISPLAY, or starts a private Xvfb display:
+
+    python benchmarks/capture_latency.py --xvfb
+    python benchmarks/capture_latency.py --iterations 500 --size 2560x1440
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.screen_capture import FrameService
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def measure(service, region, iterations, warmup=5):
+    """Grab a region repeatedly and return the latencies in milliseconds."""
+    for _ in range(warmup):
+        service.capture_regions([region])
+    
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        frames = service.capture_regions([region])
+        samples.append((time.perf_counter() - start) * 1000.0)
+        if frames is None:
+            raise RuntimeError(f"Capture of {region} failed")
+    return samples
+
+
+def run_cases(service, cases, iterations):
+    """Measure every case on the calling thread."""
+    results = []
+    for name, region in cases:
+        samples = measure(service, region, iterations)
+        results.append((name, percentile(samples, 0.50), percentile(samples, 0.99)))
+    service.release_thread()
+    return results
+
+
+def screen_size():
+    """Size of the primary monitor."""
+    import mss
+    with mss.mss() as sct:
+        monitor = sct.monitors[1]
+        return monitor["width"], monitor["height"]
+
+
+def start_xvfb(size):
+    """Start Xvfb on a free display number and point DISPLAY at it."""
+    if shutil.which("Xvfb") is None:
+        sys.exit("Xvfb is not installed")
+    
+    width, height = size
+    for display in range(99, 199):
+        if not os.path.exists(f"/tmp/.X11-unix/X{display}"):
+            break
+    
+    process = subprocess.Popen(
+        ["Xvfb", f":{display}", "-screen", "0", f"{width}x{height}x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(50):
+        if os.path.exists(f"/tmp/.X11-unix/X{display}"):
+            break
+        time.sleep(0.1)
+    else:
+        process.terminate()
+        sys.exit("Xvfb did not start")
+    
+    os.environ["DISPLAY"] = f":{display}"
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure screen capture latency")
+    parser.add_argument("--iterations", type=int, default=200, help="grabs per case")
+    parser.add_argument("--xvfb", action="store_true", help="run on a private Xvfb display")
+    parser.add_argument("--size", default="1920x1080", help="Xvfb screen size (WIDTHxHEIGHT)")
+    args = parser.parse_args()
+    
+    xvfb = start_xvfb(tuple(int(v) for v in args.size.split("x"))) if args.xvfb else None
+    service = FrameService()
+    
+    try:
+        width, height = screen_size()
+        cases = [
+            ("1x1", (0, 0, 1, 1)),
+            ("64x64", (0, 0, 64, 64)),
+            (f"full ({width}x{height})", (0, 0, width, height))
+        ]
+        
+        results = {"main thread": run_cases(service, cases, args.iterations)}
+        worker_results = []
+        worker = threading.Thread(
+            target=lambda: worker_results.extend(run_cases(service, cases, args.iterations))
+        )
+        worker.start()
+        worker.join()
+        results["worker thread"] = worker_results
+        
+        print(f"Capture latency on {os.environ.get('DISPLAY', 'default display')}, "
+              f"{args.iterations} grabs per case")
+        print(f"{'thread':<15}{'region':<22}{'p50 ms':>10}{'p99 ms':>10}")
+        for thread_name, rows in results.items():
+            for name, p50, p99 in rows:
+                print(f"{thread_name:<15}{name:<22}{p50:>10.3f}{p99:>10.3f}")
+        print(f"contexts: {service.get_stats()['contexts']}")
+    
+    finally:
+        service.close()
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
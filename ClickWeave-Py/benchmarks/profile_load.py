@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Profile load benchmark.
+
+Reports the best and median time of decoding a macro profile the store
+wrote (trusted, built without validation) against the same profile
+without its checksum header (fully validated), and of loading it through
+ProfileStore with its steps stored as JSON and as a binary steps file:
+    
+    python benchmarks/profile_load.py
+    python benchmarks/profile_load.py --steps 20000 --repeat 15
+"""
+
+import sys
+import json
+import tempfile
+import time
+import uuid
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.profile_store import ProfileStore, encode_profile, decode_profile
+from app.models.models import Profile, MacroStorage, MacroStep, MacroStepType, ClickType, Coordinates
+
+
+def recorded_macro(count):
+    """A recorded mouse path: moves with a click or a delay every few steps."""
+    steps = []
+    x, y = 500, 400
+    for i in range(count):
+        x, y = x + (i % 7) - 3, y + (i % 5) - 2
+        step_id = str(uuid.uuid4())
+        if i % 10 == 0:
+            steps.append(MacroStep(id=step_id, type=MacroStepType.DELAY, delay_ms=10 + i % 40))
+        elif i % 10 == 9:
+            steps.append(MacroStep(id=step_id, type=MacroStepType.CLICK, click_type=ClickType.LEFT,
+                                   coordinates=Coordinates(x=x, y=y)))
+        else:
+            steps.append(MacroStep(id=step_id, type=MacroStepType.MOVE, coordinates=Coordinates(x=x, y=y)))
+    return steps
+
+
+def measure(load, repeat):
+    """Run load repeatedly and return the timings in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def stored(directory, profile, storage):
+    """A store holding the profile with its steps in the given storage."""
+    store = ProfileStore(str(Path(directory) / storage.value), write_delay=0)
+    store.save(profile.copy(update={'macro_storage': storage}))
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure profile load times")
+    parser.add_argument("--steps", type=int, default=10000, help="macro steps in the profile")
+    parser.add_argument("--repeat", type=int, default=9, help="loads per case")
+    args = parser.parse_args()
+    
+    profile = Profile(id="bench", name="Benchmark", macro_steps=recorded_macro(args.steps))
+    text, _ = encode_profile(profile)
+    unchecked = json.dumps(json.loads(text))
+    
+    with tempfile.TemporaryDirectory() as directory:
+        json_store = stored(directory, profile, MacroStorage.JSON)
+        binary_store = stored(directory, profile, MacroStorage.BINARY)
+        cases = [
+            ("trusted decode", lambda: decode_profile(text)),
+            ("validated decode", lambda: decode_profile(unchecked)),
+            ("store load, JSON", lambda: json_store.load("bench")),
+            ("store load, binary", lambda: binary_store.load("bench")),
+        ]
+        
+        print(f"Profile load, {args.steps} macro steps, {args.repeat} loads per case")
+        print(f"{'case':<24}{'best ms':>10}{'median ms':>12}")
+        for name, load in cases:
+            samples = measure(load, args.repeat)
+            print(f"{name:<24}{min(samples):>10.1f}{statistics.median(samples):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
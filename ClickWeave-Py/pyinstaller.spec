@@ -30,6 +30,7 @@ a = Analysis(
         'PIL.Image',
         'PIL.ImageGrab',
         'mss',
+        'numpy',
         'apscheduler',
         'apscheduler.schedulers.background',
         'apscheduler.triggers.date',
@@ -60,7 +61,6 @@ a = Analysis(
     excludes=[
         # Exclude unnecessary modules to reduce size
         'matplotlib',
-        'numpy',
         'pandas',
         'scipy',
         'jupyter',
@@ -0,0 +1,108 @@
+"""
+Unit tests for how the application arms and disarms pixel triggers.
+"""
+
+import pytest
+import time
+import uuid
+from zoneinfo import ZoneInfoNotFoundError
+
+import numpy as np
+
+from app.core.application import ClickWeaveApplication
+from app.core.input_backend import RecordingBackend
+from app.core.pixel_watcher import PixelWatcher
+from app.core.screen_capture import FrameService
+from app.models.models import (
+    Profile, TriggerType, PixelTrigger, Coordinates, ColorInfo, TimingConfig, ClickLimits,
+    MotionConfig, MotionMode
+)
+from tests.test_pixel_triggers import ArrayScreen
+
+
+def wait_for(predicate, timeout=5.0):
+    """Poll until predicate is true or timeout expires."""
+    end_time = time.perf_counter() + timeout
+    while time.perf_counter() < end_time:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def triggered_profile(clicks=3):
+    """A profile started when the pixel at (50, 50) turns red."""
+    return Profile(
+        id=str(uuid.uuid4()),
+        name="Triggered",
+        coordinates=Coordinates(x=10, y=10),
+        timing=TimingConfig(interval_ms=10),
+        limits=ClickLimits(max_clicks=clicks),
+        motion=MotionConfig(mode=MotionMode.INSTANT, settle_ms=0),
+        trigger_type=TriggerType.PIXEL_COLOR,
+        pixel_trigger=PixelTrigger(coordinates=Coordinates(x=50, y=50), color=ColorInfo(r=255, g=0, b=0),
+                                   check_interval_ms=50)
+    )
+
+
+@pytest.fixture
+def screen():
+    return np.zeros((200, 200, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def application(tmp_path, monkeypatch, screen):
+    # Settings, profiles and logs live under the working directory
+    monkeypatch.chdir(tmp_path)
+    try:
+        application = ClickWeaveApplication()
+    except ZoneInfoNotFoundError as e:
+        pytest.skip(f"The scheduler needs the local time zone: {e}")
+    
+    application.pixel_watcher = PixelWatcher(frame_service=FrameService(grabber=ArrayScreen(screen)))
+    application.engine_pool.set_input_backend(RecordingBackend())
+    application.engine_pool.set_failsafe(False)
+    application.event_bus.start()
+    yield application
+    application.shutdown()
+
+
+class TestPixelTriggeredRuns:
+    """Test that triggers outlive the runs they start."""
+    
+    def test_trigger_restarts_a_profile_whose_run_completed(self, application, screen):
+        profile = triggered_profile()
+        application.save_profile(profile)
+        
+        assert application.start_automation(profile.id)
+        assert wait_for(lambda: len(application.get_execution_logs()) == 1)
+        assert application.pixel_watcher.has_triggers()
+        
+        screen[50, 50] = (255, 0, 0)
+        assert wait_for(lambda: len(application.get_execution_logs()) == 2)
+        assert all(log.total_clicks == 3 for log in application.get_execution_logs())
+        
+        # Rising edge: the pixel staying red does not start the profile again
+        time.sleep(0.3)
+        assert len(application.get_execution_logs()) == 2
+    
+    def test_stopping_disarms_the_trigger(self, application):
+        profile = triggered_profile(clicks=None)
+        application.save_profile(profile)
+        
+        assert application.start_automation(profile.id)
+        assert application.pixel_watcher.is_running()
+        
+        assert application.stop_automation(profile.id)
+        assert not application.pixel_watcher.has_triggers()
+        assert not application.pixel_watcher.is_running()
+    
+    def test_deleting_an_idle_profile_disarms_its_trigger(self, application):
+        profile = triggered_profile()
+        application.save_profile(profile)
+        assert application.start_automation(profile.id)
+        assert wait_for(lambda: not application.is_automation_running(profile.id))
+        
+        assert application.delete_profile(profile.id)
+        assert not application.pixel_watcher.has_triggers()
+        assert not application.pixel_watcher.is_running()
\ No newline at end of file
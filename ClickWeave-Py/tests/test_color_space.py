@@ -0,0 +1,135 @@
+"""
+Unit tests for Lab conversion and perceptual color matching.
+"""
+
+import pytest
+import time
+import numpy as np
+
+from app.core.color_space import rgb_to_lab, delta_e76, delta_e2000, color_distance
+from app.core.pixel_triggers import CompiledTriggerSet
+from app.core.pixel_watcher import PixelWatcher
+from app.core.region_triggers import CompiledRegionSet
+from app.core.screen_capture import FrameService
+from app.models.models import ColorMetric, ColorCondition, ColorInfo, RegionTrigger, ScreenRegion
+from tests.test_pixel_triggers import ArrayScreen, random_screen, make_trigger
+
+
+# Reference pairs from Sharma, Wu and Dalal's CIEDE2000 test data
+SHARMA_PAIRS = [
+    ((50.0000, 2.6772, -79.7751), (50.0000, 0.0000, -82.7485), 2.0425),
+    ((50.0000, 0.0000, 0.0000), (50.0000, -1.0000, 2.0000), 2.3669),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0011), 7.2195),
+    ((50.0000, 2.5000, 0.0000), (73.0000, 25.0000, -18.0000), 27.1492),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ((22.7233, 20.0904, -46.6940), (23.0331, 14.9730, -42.5619), 2.0373),
+    ((2.0776, 0.0795, -1.1350), (0.9033, -0.0636, -0.5514), 0.9082)
+]
+
+
+class TestColorSpace:
+    """Test sRGB to Lab conversion and color differences."""
+    
+    def test_rgb_to_lab_reference_colors(self):
+        lab = rgb_to_lab([(255, 255, 255), (0, 0, 0), (255, 0, 0)])
+        assert lab[0] == pytest.approx([100.0, 0.0, 0.0], abs=0.01)
+        assert lab[1] == pytest.approx([0.0, 0.0, 0.0], abs=0.01)
+        assert lab[2] == pytest.approx([53.24, 80.09, 67.20], abs=0.01)
+    
+    def test_delta_e2000_reference_pairs(self):
+        lab1 = np.array([pair[0] for pair in SHARMA_PAIRS])
+        lab2 = np.array([pair[1] for pair in SHARMA_PAIRS])
+        expected = [pair[2] for pair in SHARMA_PAIRS]
+        
+        assert delta_e2000(lab1, lab2) == pytest.approx(expected, abs=1e-4)
+        assert delta_e2000(lab2, lab1) == pytest.approx(expected, abs=1e-4)
+    
+    def test_delta_e76_is_euclidean(self):
+        assert delta_e76(np.array([50.0, 0.0, 0.0]), np.array([53.0, 4.0, 0.0])) == pytest.approx(5.0)
+    
+    def test_color_distance_rgb_is_per_channel(self):
+        assert color_distance((10, 20, 30), (15, 18, 30), ColorMetric.RGB) == 5
+        assert color_distance(np.array([[0, 0, 0]], dtype=np.uint8), (255, 0, 0), ColorMetric.RGB).tolist() == [255]
+    
+    def test_perceptual_distance_weights_visible_shifts(self):
+        # The same 8-level RGB step tints dark gray visibly blue but barely
+        # changes the brightness of mid green
+        dark = color_distance((20, 20, 20), (20, 20, 28), ColorMetric.DELTA_E2000)
+        green = color_distance((0, 160, 0), (0, 168, 0), ColorMetric.DELTA_E2000)
+        assert color_distance((20, 20, 20), (20, 20, 28), ColorMetric.RGB) == 8
+        assert color_distance((0, 160, 0), (0, 168, 0), ColorMetric.RGB) == 8
+        assert green < 3.0 < dark
+
+
+class TestPerceptualTriggers:
+    """Test perceptual metrics in compiled trigger sets."""
+    
+    @pytest.mark.parametrize("metric", [ColorMetric.DELTA_E76, ColorMetric.DELTA_E2000])
+    def test_matches_scalar_evaluation(self, metric):
+        rgb = random_screen(5, 400, 300)
+        service = FrameService(grabber=ArrayScreen(rgb))
+        watcher = PixelWatcher(frame_service=service)
+        rng = np.random.default_rng(6)
+        
+        triggers = []
+        initial_colors = {}
+        for i in range(300):
+            x, y = int(rng.integers(0, 400)), int(rng.integers(0, 300))
+            target = np.clip(rgb[y, x].astype(int) + rng.integers(-12, 13, 3), 0, 255)
+            condition = [ColorCondition.EXACT, ColorCondition.SIMILAR, ColorCondition.CHANGED][i % 3]
+            trigger = make_trigger(x, y, [int(c) for c in target], int(rng.integers(1, 10)), condition)
+            trigger.color.metric = metric if i % 4 else ColorMetric.RGB
+            triggers.append((f"t{i}", trigger))
+            initial_colors[f"t{i}"] = tuple(int(c) for c in target)
+        
+        compiled = CompiledTriggerSet(triggers, initial_colors)
+        fired, _ = compiled.evaluate(service.capture_regions(service.plan(compiled.points)))
+        
+        watcher._initial_colors.update(initial_colors)
+        expected = [
+            i for i, (trigger_id, trigger) in enumerate(triggers)
+            if watcher._check_trigger_condition(
+                trigger_id, trigger, tuple(int(c) for c in rgb[trigger.coordinates.y, trigger.coordinates.x]))
+        ]
+        assert fired.tolist() == expected
+        assert 0 < len(expected) < len(triggers)
+    
+    def test_perceptual_cost_per_tick(self):
+        rgb = random_screen(7)
+        service = FrameService(grabber=ArrayScreen(rgb))
+        rng = np.random.default_rng(8)
+        triggers = []
+        for i in range(5000):
+            trigger = make_trigger(int(rng.integers(0, 1920)), int(rng.integers(0, 1080)), (0, 0, 0), 10)
+            trigger.color.metric = ColorMetric.DELTA_E2000
+            triggers.append((f"t{i}", trigger))
+        
+        compiled = CompiledTriggerSet(triggers)
+        frames = service.capture_regions(service.plan(compiled.points))
+        colors, _ = compiled.sample(frames)
+        compiled.matches(colors)
+        
+        runs = 20
+        start = time.perf_counter()
+        for _ in range(runs):
+            compiled.matches(colors)
+        assert (time.perf_counter() - start) / runs < 0.005
+
+
+class TestPerceptualRegions:
+    """Test perceptual metrics in region color rules."""
+    
+    def test_percent_rule_with_delta_e(self):
+        rgb = np.zeros((40, 40, 3), dtype=np.uint8)
+        rgb[0:10, 0:10] = (0, 164, 0)
+        rgb[10:20, 0:10] = (20, 20, 28)
+        service = FrameService(grabber=ArrayScreen(rgb))
+        green = ColorInfo(r=0, g=160, b=0, tolerance=3, metric=ColorMetric.DELTA_E2000)
+        gray = ColorInfo(r=20, g=20, b=20, tolerance=3, metric=ColorMetric.DELTA_E2000)
+        regions = CompiledRegionSet([
+            ("green", RegionTrigger(region=ScreenRegion(x=0, y=0, width=10, height=10), color=green, min_percent=99)),
+            ("gray", RegionTrigger(region=ScreenRegion(x=0, y=10, width=10, height=10), color=gray, min_percent=99))
+        ])
+        
+        fired, _, _ = regions.evaluate(service.capture_regions(regions.regions))
+        assert fired.tolist() == [0]
\ No newline at end of file
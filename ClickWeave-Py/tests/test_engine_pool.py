@@ -0,0 +1,244 @@
+"""
+Unit tests for concurrent runs and input arbitration.
+"""
+
+import pytest
+import threading
+import time
+import uuid
+
+from app.core.click_engine import ClickEngine
+from app.core.engine_pool import EnginePool
+from app.core.input_arbiter import InputArbiter, ArbitratedBackend
+from app.core.input_backend import RecordingBackend
+from app.models.models import (
+    Profile, Coordinates, TimingConfig, ClickLimits, MacroStep, MacroStepType, ClickType,
+    MotionConfig, MotionMode
+)
+
+
+def wait_for(predicate, timeout=5.0):
+    """Poll until predicate is true or timeout expires."""
+    end_time = time.perf_counter() + timeout
+    while time.perf_counter() < end_time:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def click_profile(name, x, clicks=None, interval_ms=10, priority=0):
+    return Profile(
+        id=str(uuid.uuid4()),
+        name=name,
+        coordinates=Coordinates(x=x, y=x),
+        timing=TimingConfig(interval_ms=interval_ms),
+        limits=ClickLimits(max_clicks=clicks) if clicks else ClickLimits(),
+        motion=MotionConfig(mode=MotionMode.INSTANT, settle_ms=0),
+        input_priority=priority
+    )
+
+
+def macro_profile(name, x, delay_ms=5000):
+    return Profile(
+        id=str(uuid.uuid4()),
+        name=name,
+        macro_steps=[
+            MacroStep(id="c", type=MacroStepType.CLICK, click_type=ClickType.RIGHT, coordinates=Coordinates(x=x, y=x)),
+            MacroStep(id="d", type=MacroStepType.DELAY, delay_ms=delay_ms)
+        ]
+    )
+
+
+@pytest.fixture
+def pool():
+    pool = EnginePool(max_runs=3, backend=RecordingBackend())
+    pool.set_failsafe(False)
+    yield pool
+    pool.emergency_stop()
+    pool.wait_idle(timeout=2.0)
+
+
+class TestInputArbiter:
+    """Test turn taking on the shared device."""
+    
+    def test_waiters_are_served_by_priority_then_arrival(self):
+        arbiter = InputArbiter()
+        order = []
+        arbiter.acquire()
+        
+        threads = []
+        for name, priority in [("low", 0), ("high", 5), ("low2", 0), ("mid", 2)]:
+            def take(name=name, priority=priority):
+                with arbiter.turn(priority):
+                    order.append(name)
+            thread = threading.Thread(target=take, daemon=True)
+            thread.start()
+            threads.append(thread)
+            assert wait_for(lambda: arbiter.get_stats()['waiting'] == len(threads))
+        
+        arbiter.release()
+        for thread in threads:
+            thread.join(timeout=2.0)
+        
+        assert order == ["high", "mid", "low", "low2"]
+        assert arbiter.get_stats()['contended'] == 4
+    
+    def test_turns_are_reentrant(self):
+        arbiter = InputArbiter()
+        backend = ArbitratedBackend(RecordingBackend(), arbiter)
+        
+        with backend.exclusive():
+            backend.move_to(3, 4)
+            backend.click('left')
+        
+        assert backend.backend.actions() == [('move', 3, 4), ('click', 'left', 1)]
+        assert arbiter.get_stats()['turns'] == 1
+        with pytest.raises(RuntimeError):
+            arbiter.release()
+    
+    def test_plain_backends_are_not_shared(self):
+        backend = RecordingBackend()
+        with backend.exclusive():
+            backend.click('left')
+        assert backend.actions('click') == [('click', 'left', 1)]
+
+
+class TestEnginePool:
+    """Test running several profiles at once."""
+    
+    def test_profiles_run_concurrently_with_own_logs(self, pool):
+        backend = RecordingBackend()
+        pool.set_input_backend(backend)
+        stopped = []
+        pool.register_callback('stopped', stopped.append)
+        
+        first = pool.start(click_profile("First", 100, clicks=5))
+        second = pool.start(click_profile("Second", 200, clicks=5))
+        macro = pool.start(macro_profile("Macro", 300, delay_ms=10))
+        assert first and second and macro
+        assert pool.is_running(first.profile_id) and len(pool.runs()) == 3
+        
+        assert pool.wait_idle(timeout=5.0)
+        assert sorted(event['reason'] for event in stopped) == ['completed', 'limits_reached', 'limits_reached']
+        assert {event['run'].id for event in stopped} == {first.id, second.id, macro.id}
+        
+        assert first.execution_log is not second.execution_log
+        assert first.execution_log.profile_id == first.profile_id
+        assert first.get_stats()['click_count'] == second.get_stats()['click_count'] == 5
+        assert macro.get_stats()['step_count'] == 2
+        
+        # Every click lands where its own run moved the cursor
+        position = None
+        for action in backend.actions():
+            if action[0] == 'move':
+                position = action[1:]
+            elif action[1] == 'right':
+                assert position == (300, 300)
+            else:
+                assert position in ((100, 100), (200, 200))
+        assert backend.actions('click').count(('click', 'right', 1)) == 1
+    
+    def test_a_profile_runs_once_and_the_pool_is_bounded(self, pool):
+        profiles = [click_profile(f"P{i}", i, interval_ms=1000) for i in range(4)]
+        
+        assert pool.start(profiles[0])
+        assert pool.start(profiles[0]) is None
+        assert pool.start(profiles[1]) and pool.start(profiles[2])
+        assert pool.start(profiles[3]) is None
+        assert pool.get_stats()['rejected'] == 1
+        
+        assert pool.stop(profiles[1].id)
+        assert not pool.is_running(profiles[1].id)
+        assert pool.start(profiles[3])
+    
+    def test_engines_are_reused(self, pool):
+        for i in range(3):
+            run = pool.start(click_profile(f"Run {i}", 10, clicks=1))
+            assert run.wait(timeout=2.0)
+            assert run.stop_reason == 'limits_reached'
+        
+        stats = pool.get_stats()
+        assert stats['engines_created'] == 1
+        assert stats['started'] == stats['finished'] == 3
+    
+    def test_instant_macros_free_their_engine(self, pool):
+        profile = Profile(id=str(uuid.uuid4()), name="Instant",
+                          macro_steps=[MacroStep(id="k", type=MacroStepType.KEY, key="a")])
+        
+        for _ in range(3):
+            run = pool.start(profile)
+            assert run is not None
+            assert run.wait(timeout=2.0)
+            assert run.stop_reason == 'completed'
+            assert run.execution_log is not None and run.execution_log.profile_id == profile.id
+        
+        assert pool.get_stats()['engines_created'] == 1
+    
+    def test_winding_down_engine_does_not_block_the_pool(self, pool):
+        run = pool.start(click_profile("First", 1, clicks=1))
+        assert run.wait(timeout=2.0)
+        
+        # The idle engine's previous worker takes a while to exit
+        engine = pool._idle['click'][0]
+        joining = threading.Event()
+        def slow_join(timeout=None):
+            joining.set()
+            time.sleep(0.5)
+            return True
+        engine.join = slow_join
+        
+        starter = threading.Thread(target=pool.start, args=(click_profile("Second", 2, clicks=1),), daemon=True)
+        starter.start()
+        assert joining.wait(timeout=2.0)
+        
+        began = time.perf_counter()
+        assert pool.runs() == [] and not pool.is_running()
+        assert time.perf_counter() - began < 0.1
+        starter.join(timeout=2.0)
+    
+    def test_pause_and_stop_single_run(self, pool):
+        slow = pool.start(click_profile("Slow", 1, interval_ms=20))
+        other = pool.start(macro_profile("Other", 2))
+        
+        assert pool.pause(slow.profile_id)
+        assert pool.is_paused(slow.profile_id) and not pool.is_paused(other.profile_id)
+        assert pool.resume(slow.profile_id)
+        
+        assert pool.stop(other.profile_id)
+        assert other.stop_reason == 'manual' and not other.is_running
+        assert slow.is_running
+    
+    def test_priority_decides_contended_turns(self):
+        backend = RecordingBackend()
+        pool = EnginePool(backend=backend)
+        pool.set_failsafe(False)
+        low = click_profile("Low", 1, clicks=3, interval_ms=10, priority=0)
+        high = click_profile("High", 2, clicks=3, interval_ms=10, priority=10)
+        
+        # Hold the device so both runs queue up behind it
+        with pool.arbiter.turn():
+            assert pool.start(low) and pool.start(high)
+            assert wait_for(lambda: pool.arbiter.get_stats()['waiting'] == 2)
+        assert pool.wait_idle(timeout=5.0)
+        
+        assert backend.actions()[0] == ('move', 2, 2)
+
+
+class TestClickEngineSelfStop:
+    """Test that a click run ending on its own frees the engine."""
+    
+    def test_limits_end_the_run(self):
+        engine = ClickEngine(backend=RecordingBackend())
+        engine.set_failsafe(False)
+        reasons = []
+        engine.register_callback('stopped', lambda data: reasons.append(data['reason']))
+        
+        assert engine.start(click_profile("Limited", 5, clicks=2))
+        assert wait_for(lambda: not engine.is_running)
+        assert engine.join(timeout=2.0)
+        
+        assert reasons == ['limits_reached']
+        assert engine.execution_log.stopped_by == "limits"
+        assert engine.start(click_profile("Again", 5, clicks=1))
+        assert wait_for(lambda: not engine.is_running)
\ No newline at end of file
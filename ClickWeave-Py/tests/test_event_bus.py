@@ -0,0 +1,203 @@
+"""
+Unit tests for the event bus.
+"""
+
+import pytest
+import threading
+import uuid
+
+from app.core.click_engine import ClickEngine
+from app.core.engine_pool import EnginePool
+from app.core.event_bus import EventBus, EventType, EventSpec, EventPolicy
+from app.core.input_backend import RecordingBackend
+from app.core.macro_engine import MacroEngine
+from app.models.models import (
+    Profile, Coordinates, TimingConfig, ClickLimits, MotionConfig, MotionMode, MacroStep, MacroStepType, MacroRepeat
+)
+
+
+def click_profile(name, clicks=None, interval_ms=10):
+    return Profile(
+        id=str(uuid.uuid4()),
+        name=name,
+        coordinates=Coordinates(x=10, y=10),
+        timing=TimingConfig(interval_ms=interval_ms),
+        limits=ClickLimits(max_clicks=clicks) if clicks else ClickLimits(),
+        motion=MotionConfig(mode=MotionMode.INSTANT, settle_ms=0)
+    )
+
+
+@pytest.fixture
+def bus():
+    bus = EventBus()
+    yield bus
+    bus.stop()
+
+
+class TestEventBus:
+    """Test queueing and delivery."""
+    
+    def test_events_are_delivered_in_order_on_the_dispatcher(self, bus):
+        received = []
+        for event_type in (EventType.RUN_STARTED, EventType.RUN_STOPPED):
+            bus.subscribe(event_type, lambda data, event_type=event_type: received.append(
+                (event_type, data, threading.current_thread().name)))
+        bus.start()
+        
+        bus.publish(EventType.RUN_STARTED, 1)
+        bus.publish(EventType.RUN_STOPPED, 1)
+        bus.publish(EventType.RUN_STARTED, 2)
+        assert bus.flush(timeout=2.0)
+        
+        assert [(event_type, data) for event_type, data, _ in received] == [
+            (EventType.RUN_STARTED, 1), (EventType.RUN_STOPPED, 1), (EventType.RUN_STARTED, 2)]
+        assert {thread for _, _, thread in received} == {"EventBus"}
+    
+    def test_events_without_subscribers_are_not_queued(self, bus):
+        assert not bus.has_subscribers(EventType.CLICK)
+        assert not bus.publish(EventType.CLICK, {'click_count': 1})
+        assert bus.get_stats()['queued'] == 0
+        
+        handler = lambda data: None
+        bus.subscribe('click', handler)
+        assert bus.has_subscribers(EventType.CLICK)
+        assert bus.unsubscribe(EventType.CLICK, handler)
+        assert not bus.has_subscribers('click')
+    
+    def test_coalescing_keeps_the_latest_event_per_key(self, bus):
+        received = []
+        bus.subscribe(EventType.CLICK, received.append)
+        
+        for count in range(1, 6):
+            bus.publish(EventType.CLICK, ('a', count), key='a')
+        bus.publish(EventType.CLICK, ('b', 1), key='b')
+        bus.publish(EventType.CLICK, ('a', 6), key='a')
+        
+        assert bus.dispatch_pending() == 2
+        assert received == [('a', 6), ('b', 1)]
+        stats = bus.get_stats()['events']['click']
+        assert (stats['published'], stats['coalesced'], stats['delivered']) == (2, 5, 2)
+    
+    def test_full_queues_drop_new_events(self):
+        bus = EventBus({EventType.HOTKEY_START_STOP: EventSpec(EventPolicy.DROP, max_queued=2)})
+        received = []
+        bus.subscribe(EventType.HOTKEY_START_STOP, received.append)
+        
+        assert bus.publish(EventType.HOTKEY_START_STOP, 1)
+        assert bus.publish(EventType.HOTKEY_START_STOP, 2)
+        assert not bus.publish(EventType.HOTKEY_START_STOP, 3)
+        bus.dispatch_pending()
+        
+        assert received == [1, 2]
+        assert bus.get_stats()['events']['hotkey_start_stop']['dropped'] == 1
+    
+    def test_handler_errors_do_not_stop_delivery(self, bus):
+        received = []
+        bus.subscribe(EventType.SCHEDULE_ERROR, lambda data: 1 / 0)
+        bus.subscribe(EventType.SCHEDULE_ERROR, received.append)
+        bus.start()
+        
+        bus.publish(EventType.SCHEDULE_ERROR, "boom")
+        assert bus.flush(timeout=2.0)
+        
+        assert received == ["boom"]
+        assert bus.get_stats()['events']['schedule_error']['errors'] == 1
+    
+    def test_handlers_may_publish(self, bus):
+        received = []
+        bus.subscribe(EventType.RUN_STARTED, lambda data: bus.publish(EventType.RUN_STOPPED, data))
+        bus.subscribe(EventType.RUN_STOPPED, received.append)
+        bus.start()
+        
+        bus.publish(EventType.RUN_STARTED, "run")
+        assert bus.flush(timeout=2.0)
+        assert received == ["run"]
+
+
+class TestEngineEvents:
+    """Test engines and the pool publishing on the bus."""
+    
+    def test_clicks_are_not_reported_without_listeners(self, bus):
+        engine = ClickEngine(backend=RecordingBackend())
+        engine.set_failsafe(False)
+        engine.set_event_bus(bus)
+        
+        assert not engine._listening('click')
+        bus.subscribe(EventType.RUN_STOPPED, lambda data: None)
+        assert not engine._listening('click')
+        bus.subscribe(EventType.CLICK, lambda data: None)
+        assert engine._listening('click')
+    
+    def test_iterations_are_not_reported_without_listeners(self, bus):
+        engine = MacroEngine(backend=RecordingBackend())
+        engine.set_failsafe(False)
+        engine.set_event_bus(bus)
+        profile = Profile(
+            id=str(uuid.uuid4()),
+            name="Iterations",
+            macro_steps=[MacroStep(id="k", type=MacroStepType.KEY, key="a")],
+            macro_repeat=MacroRepeat(mode='count', count=3)
+        )
+        reported = []
+        trigger_callback = engine._trigger_callback
+        
+        def record(event, data=None):
+            reported.append(event)
+            trigger_callback(event, data)
+        
+        engine._trigger_callback = record
+        
+        def play():
+            reported.clear()
+            assert engine.start(profile)
+            engine._worker_thread.join(timeout=5.0)
+            return reported.count('iteration_completed')
+        
+        assert play() == 0
+        bus.subscribe(EventType.ITERATION_COMPLETED, lambda data: None)
+        assert play() == 3
+    
+    def test_pool_publishes_run_and_progress_events(self, bus):
+        stopped, clicks = [], []
+        bus.subscribe(EventType.RUN_STOPPED, stopped.append)
+        bus.subscribe(EventType.CLICK, clicks.append)
+        bus.start()
+        
+        pool = EnginePool(backend=RecordingBackend(), event_bus=bus)
+        pool.set_failsafe(False)
+        run = pool.start(click_profile("Bus", clicks=5))
+        assert run.wait(timeout=5.0)
+        assert bus.flush(timeout=2.0)
+        
+        assert [event['run'] for event in stopped] == [run]
+        assert stopped[0]['reason'] == 'limits_reached'
+        assert 1 <= len(clicks) <= 5
+        assert clicks[-1]['click_count'] == 5
+        assert {event['profile_id'] for event in clicks} == {run.profile_id}
+    
+    def test_stopping_while_holding_a_handler_lock_does_not_deadlock(self, bus):
+        # The application stops runs under its lock; its run handlers take the same lock
+        app_lock = threading.Lock()
+        stopped = []
+        
+        def on_stopped(data):
+            with app_lock:
+                stopped.append(data['reason'])
+        
+        bus.subscribe(EventType.RUN_STOPPED, on_stopped)
+        bus.start()
+        pool = EnginePool(backend=RecordingBackend(), event_bus=bus)
+        pool.set_failsafe(False)
+        run = pool.start(click_profile("Held", interval_ms=20))
+        
+        done = threading.Event()
+        
+        def stop_under_lock():
+            with app_lock:
+                pool.stop(run.profile_id)
+            done.set()
+        
+        threading.Thread(target=stop_under_lock, daemon=True).start()
+        assert done.wait(timeout=5.0)
+        assert bus.flush(timeout=2.0)
+        assert stopped == ['manual']
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Unit tests for the in-memory execution history.
+"""
+
+import pytest
+import time
+from datetime import datetime, timedelta
+
+from app.core.execution_history import ExecutionHistory
+from app.models.models import ExecutionLog
+
+
+def make_log(i, profile_id="p1", stopped_by="completed", clicks=1, interval=None):
+    start = datetime(2024, 5, 1) + timedelta(seconds=i)
+    return ExecutionLog(id=f"log{i}", profile_id=profile_id, profile_name=profile_id, start_time=start,
+                        total_clicks=clicks, average_interval_ms=interval, stopped_by=stopped_by)
+
+
+def ids(records):
+    return [record.id for record in records]
+
+
+class TestExecutionHistory:
+    """Test the ring buffer, indexes and reads."""
+    
+    def test_keeps_the_newest_records(self):
+        history = ExecutionHistory(capacity=5)
+        for i in range(12):
+            history.append(make_log(i))
+        
+        assert len(history) == 5
+        assert ids(history.iter_records()) == ["log11", "log10", "log9", "log8", "log7"]
+        assert ids(history.iter_records(newest_first=False)) == ["log7", "log8", "log9", "log10", "log11"]
+    
+    def test_indexes_follow_evictions(self):
+        history = ExecutionHistory(capacity=10)
+        for i in range(100):
+            history.append(make_log(i, profile_id=f"p{i % 3}", stopped_by="error" if i % 7 == 0 else "completed"))
+        
+        assert ids(history.iter_records(profile_id="p0")) == ["log99", "log96", "log93", "log90"]
+        assert ids(history.iter_records(stopped_by="error")) == ["log98", "log91"]
+        assert ids(history.iter_records(profile_id="p2", stopped_by="error")) == ["log98"]
+        assert history.count(profile_id="p1") == 3
+        assert history.count(stopped_by="completed") == 8
+        assert list(history.iter_records(profile_id="gone")) == []
+    
+    def test_pages(self):
+        history = ExecutionHistory(capacity=50)
+        for i in range(60):
+            history.append(make_log(i, profile_id=f"p{i % 2}"))
+        
+        assert ids(history.page(offset=0, limit=3)) == ["log59", "log58", "log57"]
+        assert ids(history.page(offset=48, limit=5)) == ["log11", "log10"]
+        assert ids(history.page(offset=2, limit=2, newest_first=False)) == ["log12", "log13"]
+        assert ids(history.page(offset=1, limit=2, profile_id="p0")) == ["log56", "log54"]
+        assert history.page(offset=100) == []
+    
+    def test_iteration_survives_concurrent_appends(self):
+        history = ExecutionHistory(capacity=4)
+        for i in range(4):
+            history.append(make_log(i))
+        
+        seen = []
+        for record in history.iter_records(profile_id="p1", newest_first=False):
+            seen.append(record.id)
+            history.append(make_log(100 + len(seen), profile_id="p9"))
+            history.append(make_log(200 + len(seen), profile_id="p1"))
+        
+        # Evicted records are skipped and new ones are not visited
+        assert seen == ["log0", "log2"]
+    
+    def test_profile_counters(self):
+        history = ExecutionHistory(capacity=3)
+        for i in range(6):
+            history.append(make_log(i, profile_id="p1", clicks=10, interval=100.0 + i * 10))
+        history.append(make_log(6, profile_id="p2", clicks=5))
+        
+        stats = history.profile_stats("p1")
+        assert stats.runs == 6
+        assert stats.clicks == 60
+        assert stats.mean_interval_ms == pytest.approx(125.0)
+        assert history.profile_stats("p2").mean_interval_ms is None
+        assert history.profile_stats("missing") is None
+    
+    def test_records_rebuild_logs(self):
+        history = ExecutionHistory(capacity=3)
+        log = make_log(1, interval=50.0)
+        log.end_time = log.start_time + timedelta(seconds=4)
+        history.append(log)
+        
+        rebuilt = history.page()[0].to_log()
+        assert rebuilt.to_csv_row() == log.to_csv_row()
+    
+    def test_resize_keeps_newest(self):
+        history = ExecutionHistory(capacity=10)
+        for i in range(10):
+            history.append(make_log(i, profile_id=f"p{i % 2}"))
+        
+        history.resize(4)
+        assert ids(history.iter_records()) == ["log9", "log8", "log7", "log6"]
+        assert ids(history.iter_records(profile_id="p0")) == ["log8", "log6"]
+        
+        history.append(make_log(10, profile_id="p0"))
+        assert ids(history.iter_records(profile_id="p0")) == ["log10", "log8"]
+    
+    def test_append_cost_is_constant(self):
+        history = ExecutionHistory(capacity=1000)
+        logs = [make_log(i, profile_id=f"p{i % 10}") for i in range(5000)]
+        
+        start = time.perf_counter()
+        for log in logs:
+            history.append(log)
+        assert (time.perf_counter() - start) / len(logs) < 0.0001
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Unit tests for the event-driven failsafe monitor.
+"""
+
+import pytest
+import threading
+import time
+import uuid
+
+from app.core.failsafe import FailsafeMonitor
+from app.core.input_backend import RecordingBackend
+from app.core.click_engine import ClickEngine
+from app.core.macro_engine import MacroEngine
+from app.models.models import (
+    Profile, MacroStep, MacroStepType, Coordinates, TimingConfig
+)
+
+
+class DeadListener:
+    """Pointer listener whose thread died before it became ready."""
+    
+    def wait(self):
+        threading.Event().wait()
+    
+    def is_alive(self):
+        return False
+    
+    def stop(self):
+        pass
+
+
+class TestFailsafeMonitor:
+    """Test corner detection and geometry caching."""
+    
+    @pytest.mark.parametrize("corner,position", [
+        ("top-left", (0, 0)),
+        ("top-right", (1919, 10)),
+        ("bottom-left", (5, 1079)),
+        ("bottom-right", (1900, 1070))
+    ])
+    def test_corners(self, corner, position):
+        monitor = FailsafeMonitor(geometry_provider=lambda: (1920, 1080))
+        monitor.configure(True, corner)
+        
+        assert monitor.is_in_corner(*position)
+        assert not monitor.is_in_corner(960, 540)
+    
+    def test_fires_once_on_entering_corner(self):
+        monitor = FailsafeMonitor(geometry_provider=lambda: (1920, 1080))
+        fired = []
+        monitor.register_callback('test', fired.append)
+        
+        for position in [(500, 500), (10, 10), (5, 5), (500, 500), (0, 0)]:
+            monitor.check_position(*position)
+        
+        assert len(fired) == 2
+        assert fired[0]['corner'] == 'top-left'
+    
+    def test_disabled_monitor_never_fires(self):
+        monitor = FailsafeMonitor(geometry_provider=lambda: (1920, 1080))
+        monitor.configure(False)
+        fired = []
+        monitor.register_callback('test', fired.append)
+        
+        assert not monitor.check_position(0, 0)
+        assert fired == []
+    
+    def test_geometry_is_cached(self):
+        calls = []
+        
+        def provider():
+            calls.append(1)
+            return (1920, 1080)
+        
+        monitor = FailsafeMonitor(geometry_provider=provider)
+        for x in range(100, 200):
+            monitor.check_position(x, 300)
+        assert len(calls) == 1
+        
+        # A pointer outside the cached bounds means the display changed
+        monitor.check_position(2500, 300)
+        assert len(calls) == 2
+    
+    def test_dead_listener_is_not_running(self):
+        monitor = FailsafeMonitor(geometry_provider=lambda: (1920, 1080))
+        monitor.START_TIMEOUT = 0.05
+        listener = DeadListener()
+        
+        # A listener that died leaves the engines polling again
+        assert not monitor._wait_ready(listener)
+        monitor._listener, monitor._running = listener, True
+        assert not monitor.is_running()
+
+
+class TestSharedFailsafe:
+    """Test that one monitor stops both engines."""
+    
+    def test_monitor_stops_click_and_macro_engines(self):
+        monitor = FailsafeMonitor(geometry_provider=lambda: (1920, 1080))
+        click_engine = ClickEngine(backend=RecordingBackend())
+        macro_engine = MacroEngine(backend=RecordingBackend())
+        click_engine.set_failsafe_monitor(monitor)
+        macro_engine.set_failsafe_monitor(monitor)
+        
+        reasons = []
+        click_engine.register_callback('stopped', lambda data: reasons.append(('click', data['reason'])))
+        macro_engine.register_callback('stopped', lambda data: reasons.append(('macro', data['reason'])))
+        
+        click_profile = Profile(
+            id=str(uuid.uuid4()),
+            name="Clicks",
+            coordinates=Coordinates(x=500, y=500),
+            timing=TimingConfig(interval_ms=1000)
+        )
+        macro_profile = Profile(
+            id=str(uuid.uuid4()),
+            name="Macro",
+            macro_steps=[MacroStep(id="d", type=MacroStepType.DELAY, delay_ms=5000)]
+        )
+        
+        assert click_engine.start(click_profile)
+        assert macro_engine.start(macro_profile)
+        time.sleep(0.05)
+        
+        start = time.perf_counter()
+        monitor.check_position(0, 0)
+        while len(reasons) < 2 and time.perf_counter() - start < 2:
+            time.sleep(0.005)
+        
+        assert sorted(reasons) == [('click', 'failsafe'), ('macro', 'failsafe')]
+        assert click_engine.execution_log.stopped_by == 'failsafe'
+        assert macro_engine.execution_log.stopped_by == 'failsafe'
\ No newline at end of file
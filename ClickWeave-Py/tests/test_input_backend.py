@@ -0,0 +1,131 @@
+"""
+Unit tests for input backends and headless engine execution.
+"""
+
+import pytest
+import time
+import uuid
+
+from app.core.input_backend import RecordingBackend, create_input_backend, INPUT_BACKENDS
+from app.core.click_engine import ClickEngine
+from app.core.macro_engine import MacroEngine
+from app.models.models import (
+    Profile, MacroStep, MacroStepType, ClickType, Coordinates,
+    TimingConfig, ClickLimits
+)
+
+
+def wait_for(predicate, timeout=5.0):
+    """Poll until predicate is true or timeout expires."""
+    end_time = time.perf_counter() + timeout
+    while time.perf_counter() < end_time:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestRecordingBackend:
+    """Test the in-memory recording backend."""
+    
+    def test_records_actions(self):
+        backend = RecordingBackend()
+        backend.move_to(10, 20)
+        backend.click('right', clicks=2)
+        backend.press('a')
+        backend.scroll(-3)
+        
+        assert backend.position() == (10, 20)
+        assert backend.actions() == [
+            ('move', 10, 20),
+            ('click', 'right', 2),
+            ('press', 'a'),
+            ('scroll', -3)
+        ]
+        assert backend.actions('click') == [('click', 'right', 2)]
+    
+    def test_move_with_duration_interpolates(self):
+        backend = RecordingBackend()
+        backend.set_position(0, 0)
+        backend.move_to(100, 0, duration=0.05)
+        
+        moves = backend.actions('move')
+        assert len(moves) > 1
+        assert moves[-1] == ('move', 100, 0)
+    
+    def test_registry(self):
+        assert set(INPUT_BACKENDS) == {'pyautogui', 'pynput', 'xtest', 'recording'}
+        assert isinstance(create_input_backend('recording'), RecordingBackend)
+        
+        with pytest.raises(ValueError):
+            create_input_backend('nonexistent')
+
+
+class TestHeadlessEngines:
+    """Test engines driven through the recording backend."""
+    
+    def test_click_engine_respects_click_limit(self):
+        backend = RecordingBackend()
+        engine = ClickEngine(backend=backend)
+        engine.set_failsafe(False)
+        
+        profile = Profile(
+            id=str(uuid.uuid4()),
+            name="Headless Clicks",
+            coordinates=Coordinates(x=300, y=400),
+            click_type=ClickType.DOUBLE,
+            timing=TimingConfig(interval_ms=10),
+            limits=ClickLimits(max_clicks=3)
+        )
+        
+        assert engine.start(profile)
+        assert wait_for(lambda: engine.click_count >= 3)
+        engine.stop()
+        
+        assert backend.actions('click') == [('click', 'left', 2)] * 3
+        assert backend.position() == (300, 400)
+    
+    def test_profile_backend_override(self):
+        default_backend = RecordingBackend()
+        engine = ClickEngine(backend=default_backend)
+        engine.set_failsafe(False)
+        
+        profile = Profile(
+            id=str(uuid.uuid4()),
+            name="Override",
+            coordinates=Coordinates(x=1, y=1),
+            input_backend='recording',
+            limits=ClickLimits(max_clicks=1)
+        )
+        
+        assert engine.start(profile)
+        assert wait_for(lambda: engine.click_count >= 1)
+        engine.stop()
+        
+        assert default_backend.events == []
+    
+    def test_macro_engine_key_and_scroll_steps(self):
+        backend = RecordingBackend()
+        engine = MacroEngine(backend=backend)
+        
+        profile = Profile(
+            id=str(uuid.uuid4()),
+            name="Headless Macro",
+            macro_steps=[
+                MacroStep(id="k", type=MacroStepType.KEY, key="s", modifiers=["Control", "shift"]),
+                MacroStep(id="s", type=MacroStepType.SCROLL, scroll_direction="down", scroll_amount=2)
+            ]
+        )
+        
+        assert engine.start(profile)
+        assert wait_for(lambda: engine.step_count >= 2)
+        engine.stop()
+        
+        assert backend.actions() == [
+            ('key_down', 'ctrl'),
+            ('key_down', 'shift'),
+            ('press', 's'),
+            ('key_up', 'shift'),
+            ('key_up', 'ctrl'),
+            ('scroll', -2)
+        ]
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""
+Unit tests for the background execution log writer.
+"""
+
+import pytest
+import csv
+import time
+import threading
+from datetime import datetime, timedelta
+
+from app.core.log_writer import ExecutionLogWriter, CsvLogSink, SQLiteLogSink, CSV_HEADER
+from app.core.storage import SQLiteStorage
+from app.models.models import ExecutionLog
+
+
+def make_log(i):
+    start = datetime(2024, 5, 1, 12, 0, 0) + timedelta(seconds=i)
+    return ExecutionLog(id=f"log{i:04d}", profile_id="p1", profile_name="Profile",
+                        start_time=start, end_time=start + timedelta(seconds=1), total_clicks=i)
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+class RecordingSink:
+    """Sink recording the batches it receives."""
+    
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+        self.closed = False
+        self.threads = set()
+    
+    def write(self, logs):
+        time.sleep(self.delay)
+        self.threads.add(threading.get_ident())
+        self.batches.append([log.id for log in logs])
+    
+    def close(self):
+        self.closed = True
+
+
+class TestExecutionLogWriter:
+    """Test batching, flushing and shutdown."""
+    
+    def test_logs_are_written_in_batches_off_thread(self):
+        sink = RecordingSink()
+        writer = ExecutionLogWriter(sink, batch_size=10, flush_interval=10.0)
+        writer.start()
+        
+        for i in range(25):
+            assert writer.submit(make_log(i))
+        assert writer.flush()
+        
+        assert [len(batch) for batch in sink.batches] == [10, 10, 5]
+        assert threading.get_ident() not in sink.threads
+        writer.close()
+    
+    def test_partial_batch_is_written_after_flush_interval(self):
+        sink = RecordingSink()
+        writer = ExecutionLogWriter(sink, batch_size=100, flush_interval=0.05)
+        writer.start()
+        
+        writer.submit(make_log(0))
+        writer.submit(make_log(1))
+        time.sleep(0.2)
+        
+        assert sink.batches == [["log0000", "log0001"]]
+        writer.close()
+    
+    def test_close_writes_queued_logs(self):
+        sink = RecordingSink(delay=0.01)
+        writer = ExecutionLogWriter(sink, batch_size=4, flush_interval=10.0)
+        writer.start()
+        
+        for i in range(20):
+            writer.submit(make_log(i))
+        writer.close()
+        
+        assert sum(len(batch) for batch in sink.batches) == 20
+        assert sink.closed
+        assert writer.get_stats()['written'] == 20
+        assert writer.submit(make_log(99)) is False
+    
+    def test_submit_does_not_block_on_slow_sink(self):
+        sink = RecordingSink(delay=0.2)
+        writer = ExecutionLogWriter(sink, batch_size=1, flush_interval=0.0)
+        writer.start()
+        
+        start = time.perf_counter()
+        for i in range(5):
+            writer.submit(make_log(i))
+        assert time.perf_counter() - start < 0.1
+        writer.close()
+    
+    def test_full_queue_drops_logs(self):
+        writer = ExecutionLogWriter(RecordingSink(), queue_size=2)
+        
+        assert writer.submit(make_log(0))
+        assert writer.submit(make_log(1))
+        assert writer.submit(make_log(2)) is False
+        assert writer.get_stats()['dropped'] == 1
+        
+        writer.close()
+        assert writer.get_stats()['written'] == 2
+
+
+class TestLogSinks:
+    """Test CSV output, rotation and the SQLite sink."""
+    
+    def test_header_written_once(self, tmp_path):
+        sink = CsvLogSink(str(tmp_path), clock=lambda: datetime(2024, 5, 3))
+        sink.write([make_log(0)])
+        sink.close()
+        sink.write([make_log(1), make_log(2)])
+        sink.close()
+        
+        rows = read_rows(tmp_path / "execution_log_2024_05.csv")
+        assert rows[0] == CSV_HEADER
+        assert [row[0] for row in rows[1:]] == ["log0000", "log0001", "log0002"]
+    
+    def test_rotates_by_month(self, tmp_path):
+        now = [datetime(2024, 5, 31, 23, 59)]
+        sink = CsvLogSink(str(tmp_path), clock=lambda: now[0])
+        sink.write([make_log(0)])
+        now[0] = datetime(2024, 6, 1, 0, 1)
+        sink.write([make_log(1)])
+        sink.close()
+        
+        assert [row[0] for row in read_rows(tmp_path / "execution_log_2024_05.csv")[1:]] == ["log0000"]
+        assert [row[0] for row in read_rows(tmp_path / "execution_log_2024_06.csv")[1:]] == ["log0001"]
+        assert sink.rotations == 1
+    
+    def test_rotates_by_size(self, tmp_path):
+        sink = CsvLogSink(str(tmp_path), max_bytes=400, clock=lambda: datetime(2024, 5, 3))
+        sink.write([make_log(i) for i in range(10)])
+        sink.close()
+        
+        files = sorted(path.name for path in tmp_path.iterdir())
+        assert files[0] == "execution_log_2024_05.csv"
+        assert len(files) > 1
+        ids = []
+        for name in ["execution_log_2024_05.csv"] + [f"execution_log_2024_05_{i}.csv" for i in range(1, len(files))]:
+            rows = read_rows(tmp_path / name)
+            assert rows[0] == CSV_HEADER
+            ids += [row[0] for row in rows[1:]]
+        assert ids == [f"log{i:04d}" for i in range(10)]
+        
+        # A new sink continues in the newest file
+        sink = CsvLogSink(str(tmp_path), max_bytes=400, clock=lambda: datetime(2024, 5, 3))
+        sink.write([make_log(10)])
+        assert sink.path.endswith(f"execution_log_2024_05_{len(files) - 1}.csv") or \
+            sink.path.endswith(f"execution_log_2024_05_{len(files)}.csv")
+        sink.close()
+    
+    def test_sqlite_sink(self, tmp_path):
+        storage = SQLiteStorage(str(tmp_path / "logs.db"))
+        writer = ExecutionLogWriter(SQLiteLogSink(storage), batch_size=8)
+        writer.start()
+        for i in range(20):
+            writer.submit(make_log(i))
+        writer.close()
+        
+        assert len(storage.recent_execution_logs(limit=100)) == 20
+        assert storage.get_stats()['transactions'] == 3
+        storage.close()
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+Unit tests for the binary macro steps encoding.
+"""
+
+import pytest
+import gc
+import os
+import json
+import uuid
+
+from app.core import macro_codec
+from app.core.macro_codec import encode_macro_steps, decode_macro_steps, read_macro_steps, steps_digest
+from app.core.profile_store import ProfileStore, encode_profile, decode_profile
+from app.models.models import (
+    Profile, MacroStep, MacroStepType, MacroStorage, ClickType, Coordinates, MotionConfig, MotionMode,
+    GC_PAUSE_MIN_MODELS
+)
+
+
+def recorded_path(count, start=(500, 400)):
+    """A mouse path like the recorder produces: small moves, delays and clicks."""
+    x, y = start
+    steps = []
+    for i in range(count):
+        x, y = x + (i % 7) - 3, y + (i % 5) - 2
+        if i % 10 == 0:
+            steps.append(MacroStep(id=f"d{i}", type=MacroStepType.DELAY, delay_ms=10 + i % 40))
+        elif i % 10 == 9:
+            steps.append(MacroStep(id=f"c{i}", type=MacroStepType.CLICK, click_type=ClickType.LEFT,
+                                   coordinates=Coordinates(x=x, y=y)))
+        else:
+            steps.append(MacroStep(id=f"m{i}", type=MacroStepType.MOVE, coordinates=Coordinates(x=x, y=y)))
+    return steps
+
+
+def unusual_steps():
+    return [
+        MacroStep(id="k", type=MacroStepType.KEY, key="a", modifiers=["ctrl", "shift"], enabled=False,
+                  motion=MotionConfig(mode=MotionMode.CURVED)),
+        MacroStep(id="s", type=MacroStepType.SCROLL, scroll_direction="down", scroll_amount=-3, loop_count=4,
+                  coordinates=Coordinates(x=-5, y=2 ** 40, relative_to_window="Editor")),
+        MacroStep(id="é", type=MacroStepType.CLICK, click_type=ClickType.DOUBLE, coordinates=Coordinates(x=0, y=0))
+    ]
+
+
+class TestMacroCodec:
+    """Test encoding and decoding step lists."""
+    
+    @pytest.mark.parametrize("steps", [[], recorded_path(200), unusual_steps(), recorded_path(50) + unusual_steps()])
+    def test_round_trip_is_lossless(self, steps):
+        assert decode_macro_steps(encode_macro_steps(steps)) == steps
+    
+    def test_every_field_round_trips(self):
+        step = MacroStep(id="all", type=MacroStepType.SCROLL, enabled=False,
+                         coordinates=Coordinates(x=3, y=-4, relative_to_window="Editor"),
+                         click_type=ClickType.RIGHT, delay_ms=5, key="a", modifiers=["alt"],
+                         scroll_direction="up", scroll_amount=2, loop_count=3,
+                         motion=MotionConfig(mode=MotionMode.CURVED, settle_ms=0))
+        # Fields added to the models must be set above, so the codec is shown to keep them
+        assert step.model_fields_set == set(MacroStep.model_fields)
+        assert step.coordinates.model_fields_set == set(Coordinates.model_fields)
+        
+        assert decode_macro_steps(encode_macro_steps([step])) == [step]
+        assert decode_macro_steps(encode_macro_steps([step] + recorded_path(5)))[0] == step
+    
+    def test_uuid_ids_round_trip(self):
+        steps = [step.model_copy(update={'id': str(uuid.uuid4())}) for step in recorded_path(20)]
+        assert decode_macro_steps(encode_macro_steps(steps)) == steps
+    
+    def test_recorded_paths_are_much_smaller_than_json(self):
+        steps = recorded_path(1000)
+        blob = encode_macro_steps(steps)
+        text = json.dumps([step.dict() for step in steps], separators=(',', ':'), default=str)
+        assert len(blob) * 10 < len(text)
+    
+    def test_large_decode_pauses_garbage_collection_only_while_building(self, monkeypatch):
+        collecting = []
+        trusted_factory = macro_codec.trusted_factory
+        
+        def recording_factory(cls):
+            build = trusted_factory(cls)
+            
+            def record(data):
+                collecting.append(gc.isenabled())
+                return build(data)
+            return record
+        
+        monkeypatch.setattr(macro_codec, 'trusted_factory', recording_factory)
+        blob = encode_macro_steps(recorded_path(GC_PAUSE_MIN_MODELS))
+        
+        assert len(decode_macro_steps(blob)) == GC_PAUSE_MIN_MODELS
+        assert collecting and not any(collecting)
+        assert gc.isenabled()
+    
+    def test_rejects_foreign_data(self):
+        with pytest.raises(ValueError):
+            decode_macro_steps(b'{"macro_steps": []}' + bytes(32))
+    
+    def test_read_checks_digest(self, tmp_path):
+        blob = encode_macro_steps(recorded_path(30))
+        path = tmp_path / "m.steps"
+        path.write_bytes(blob)
+        
+        assert read_macro_steps(str(path), steps_digest(blob)) == recorded_path(30)
+        with pytest.raises(ValueError):
+            read_macro_steps(str(path), steps_digest(blob + b'x'))
+
+
+class TestBinaryProfiles:
+    """Test storing profiles with macro_storage BINARY."""
+    
+    def binary_profile(self, count=100):
+        return Profile(id="rec", name="Recording", macro_storage=MacroStorage.BINARY, macro_steps=recorded_path(count))
+    
+    def steps_files(self, directory):
+        return sorted(name for name in os.listdir(directory) if name.endswith('.steps'))
+    
+    def test_steps_are_written_beside_the_profile(self, tmp_path):
+        profile = self.binary_profile()
+        ProfileStore(str(tmp_path), write_delay=0).save(profile)
+        
+        assert len(self.steps_files(tmp_path)) == 1
+        data = json.loads((tmp_path / "rec.json").read_text())
+        assert data['macro_steps'] == []
+        assert data['macro_steps_file']['count'] == 100
+        
+        store = ProfileStore(str(tmp_path))
+        store.refresh()
+        assert store.get("rec") == profile
+        assert store.get_stats()['trusted_loads'] == 1
+    
+    def test_changed_steps_replace_the_old_file(self, tmp_path):
+        store = ProfileStore(str(tmp_path), write_delay=0)
+        profile = self.binary_profile()
+        store.save(profile)
+        first = self.steps_files(tmp_path)
+        
+        profile.name = "Renamed"
+        store.save(profile)
+        assert self.steps_files(tmp_path) == first
+        
+        profile.macro_steps = recorded_path(120)
+        store.save(profile)
+        assert len(self.steps_files(tmp_path)) == 1
+        assert self.steps_files(tmp_path) != first
+        assert ProfileStore(str(tmp_path)).get("rec").macro_steps == recorded_path(120)
+    
+    def test_switching_storage_keeps_the_steps(self, tmp_path):
+        store = ProfileStore(str(tmp_path), write_delay=0)
+        profile = self.binary_profile()
+        store.save(profile)
+        
+        profile.macro_storage = MacroStorage.JSON
+        store.save(profile)
+        assert self.steps_files(tmp_path) == []
+        assert ProfileStore(str(tmp_path)).get("rec") == profile
+        
+        profile.macro_storage = MacroStorage.BINARY
+        store.save(profile)
+        assert ProfileStore(str(tmp_path)).get("rec") == profile
+    
+    def test_delete_removes_steps_file(self, tmp_path):
+        store = ProfileStore(str(tmp_path), write_delay=0)
+        store.save(self.binary_profile())
+        store.save(Profile(id="rec.other", name="Other", macro_storage=MacroStorage.BINARY,
+                           macro_steps=recorded_path(5)))
+        
+        assert store.delete("rec")
+        remaining = self.steps_files(tmp_path)
+        assert len(remaining) == 1 and remaining[0].startswith("rec.other.")
+        assert store.get("rec.other") is not None
+    
+    def test_missing_steps_file_fails_the_load(self, tmp_path):
+        ProfileStore(str(tmp_path), write_delay=0).save(self.binary_profile())
+        for name in self.steps_files(tmp_path):
+            os.remove(tmp_path / name)
+        
+        assert ProfileStore(str(tmp_path)).get("rec") is None
+    
+    def test_decode_needs_a_steps_loader(self):
+        profile = self.binary_profile(10)
+        blob = encode_macro_steps(profile.macro_steps)
+        text, digest = encode_profile(profile, blob)
+        
+        with pytest.raises(ValueError):
+            decode_profile(text)
+        load_steps = lambda profile_id, steps_digest: decode_macro_steps(blob)
+        loaded, loaded_digest, trusted = decode_profile(text, load_steps)
+        assert trusted and loaded == profile and loaded_digest == digest
+        
+        # A validated load of the same file agrees on the content hash
+        validated = decode_profile(json.dumps(json.loads(text), indent=1), load_steps)
+        assert validated[0] == profile and validated[1] == digest and not validated[2]
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+Unit tests for macro program compilation and caching.
+"""
+
+import pytest
+import uuid
+from datetime import datetime, timedelta
+
+from app.core.input_backend import RecordingBackend
+from app.core.macro_engine import MacroEngine
+from app.core.macro_program import (
+    MacroOp, MacroProgramCache, MacroCompileError, compile_macro
+)
+from app.models.models import (
+    Profile, MacroStep, MacroStepType, ClickType, Coordinates, MotionConfig, MotionMode
+)
+
+
+def make_profile(steps):
+    """Create a macro profile with the given steps."""
+    return Profile(
+        id=str(uuid.uuid4()),
+        name="Program Test",
+        macro_steps=steps,
+        motion=MotionConfig(mode=MotionMode.INSTANT, settle_ms=0, loop_delay_ms=0)
+    )
+
+
+def make_handlers():
+    """Handlers that record their arguments."""
+    calls = []
+    handlers = {
+        op: (lambda *args, op=op: calls.append((op, args)) or True)
+        for op in MacroOp
+    }
+    return handlers, calls
+
+
+class KeyResolvingBackend(RecordingBackend):
+    """Recording backend that resolves key names to upper case tokens."""
+    
+    def resolve_key(self, key):
+        return key.upper()
+
+
+class TestCompileMacro:
+    """Test macro compilation."""
+    
+    def test_strips_disabled_and_encodes_loops(self):
+        profile = make_profile([
+            MacroStep(id="a", type=MacroStepType.DELAY, delay_ms=10, loop_count=3),
+            MacroStep(id="b", type=MacroStepType.DELAY, delay_ms=10, enabled=False),
+            MacroStep(id="c", type=MacroStepType.MOVE, coordinates=Coordinates(x=5, y=6))
+        ])
+        handlers, _ = make_handlers()
+        program = compile_macro(profile, RecordingBackend(), handlers)
+        
+        assert [i.step.id for i in program] == ["a", "c"]
+        assert program.instructions[0].repeat == 3
+        assert program.instructions[0].args == (0.01,)
+        assert program.instructions[0].handler is handlers[MacroOp.DELAY]
+        assert program.total_actions == 4
+    
+    def test_resolves_keys_and_modifiers(self):
+        profile = make_profile([
+            MacroStep(id="k", type=MacroStepType.KEY, key="a",
+                      modifiers=["Control", "ctrl", "win"])
+        ])
+        handlers, _ = make_handlers()
+        program = compile_macro(profile, KeyResolvingBackend(), handlers)
+        
+        assert program.instructions[0].args == ("A", ("CTRL", "CMD"))
+    
+    def test_encodes_click_and_scroll(self):
+        profile = make_profile([
+            MacroStep(id="c", type=MacroStepType.CLICK, click_type=ClickType.DOUBLE,
+                      coordinates=Coordinates(x=1, y=2)),
+            MacroStep(id="s", type=MacroStepType.SCROLL, scroll_direction="down", scroll_amount=4)
+        ])
+        handlers, _ = make_handlers()
+        program = compile_macro(profile, RecordingBackend(), handlers)
+        
+        assert program.instructions[0].args[:5] == (1, 2, 'left', 2, False)
+        assert program.instructions[1].args == (-4,)
+    
+    @pytest.mark.parametrize("step", [
+        MacroStep(id="x", type=MacroStepType.CLICK),
+        MacroStep(id="x", type=MacroStepType.KEY, key="a", modifiers=["hyper"]),
+        MacroStep(id="x", type=MacroStepType.SCROLL, scroll_direction="left", scroll_amount=1)
+    ])
+    def test_invalid_steps_fail_at_compile_time(self, step):
+        handlers, _ = make_handlers()
+        with pytest.raises(MacroCompileError):
+            compile_macro(make_profile([step]), RecordingBackend(), handlers)
+    
+    def test_program_is_immutable(self):
+        profile = make_profile([MacroStep(id="a", type=MacroStepType.DELAY, delay_ms=1)])
+        handlers, _ = make_handlers()
+        program = compile_macro(profile, RecordingBackend(), handlers)
+        
+        with pytest.raises(AttributeError):
+            program.instructions[0].repeat = 5
+        with pytest.raises(AttributeError):
+            program.instructions = ()
+
+
+class TestMacroProgramCache:
+    """Test per-profile program caching."""
+    
+    def test_reuses_until_modified(self):
+        profile = make_profile([MacroStep(id="a", type=MacroStepType.DELAY, delay_ms=1)])
+        backend = RecordingBackend()
+        handlers, _ = make_handlers()
+        cache = MacroProgramCache()
+        
+        first = cache.get(profile, backend, handlers)
+        assert cache.get(profile, backend, handlers) is first
+        
+        profile.macro_steps[0].delay_ms = 2
+        profile.modified_at = datetime.now() + timedelta(seconds=1)
+        second = cache.get(profile, backend, handlers)
+        
+        assert second is not first
+        assert second.instructions[0].args == (0.002,)
+        assert cache.get_stats()['hits'] == 1
+        assert cache.get_stats()['misses'] == 2
+    
+    def test_reloaded_profile_is_recompiled(self):
+        profile = make_profile([MacroStep(id="a", type=MacroStepType.DELAY, delay_ms=1)])
+        backend = RecordingBackend()
+        handlers, _ = make_handlers()
+        cache = MacroProgramCache()
+        cache.get(profile, backend, handlers)
+        
+        # Edited outside the app, keeping modified_at, and loaded again
+        data = profile.dict()
+        data['macro_steps'][0]['delay_ms'] = 5
+        reloaded = Profile(**data)
+        assert reloaded.modified_at == profile.modified_at
+        
+        assert cache.get(reloaded, backend, handlers).instructions[0].args == (0.005,)
+    
+    def test_recompiles_for_new_backend(self):
+        profile = make_profile([MacroStep(id="a", type=MacroStepType.DELAY, delay_ms=1)])
+        handlers, _ = make_handlers()
+        cache = MacroProgramCache()
+        
+        first = cache.get(profile, RecordingBackend(), handlers)
+        assert cache.get(profile, RecordingBackend(), handlers) is not first
+
+
+class TestCompiledExecution:
+    """Test the macro engine running compiled programs."""
+    
+    def test_engine_rejects_invalid_macro(self):
+        engine = MacroEngine(backend=RecordingBackend())
+        profile = make_profile([MacroStep(id="x", type=MacroStepType.MOVE)])
+        
+        assert engine.start(profile) is False
+        assert not engine.is_running
+    
+    def test_engine_executes_resolved_keys(self):
+        backend = KeyResolvingBackend()
+        engine = MacroEngine(backend=backend)
+        profile = make_profile([
+            MacroStep(id="k", type=MacroStepType.KEY, key="v", modifiers=["ctrl"], loop_count=2)
+        ])
+        
+        executed = []
+        engine.register_callback('step_executed', lambda data: executed.append(data['step'].id))
+        
+        assert engine.start(profile)
+        engine._worker_thread.join(timeout=5.0)
+        
+        assert backend.actions() == [
+            ('key_down', 'CTRL'), ('press', 'V'), ('key_up', 'CTRL')
+        ] * 2
+        assert executed == ["k", "k"]
\ No newline at end of file
@@ -3,13 +3,15 @@ Unit tests for Pydantic models.
 """
 
 import pytest
+import gc
+import json
 from datetime import datetime, timedelta
 import uuid
 
 from app.models.models import (
     Profile, MacroStep, MacroStepType, ClickType, Coordinates,
     TimingConfig, ClickLimits, ColorInfo, PixelTrigger, ColorCondition,
-    ScheduleTrigger, AppSettings, ExecutionLog
+    ScheduleTrigger, AppSettings, ExecutionLog, TriggerType, gc_paused, GC_PAUSE_MIN_MODELS
 )
 
 
@@ -203,6 +205,67 @@ class TestProfile:
         assert restored_profile.name == profile.name
         assert restored_profile.coordinates.x == 50
         assert restored_profile.timing.interval_ms == 2000
+    
+    def test_stored_modified_at_is_kept(self):
+        modified_at = datetime(2024, 5, 1, 12, 30)
+        profile = Profile(id="p1", name="Stamped", modified_at=modified_at)
+        
+        assert profile.modified_at == modified_at
+        assert Profile(**json.loads(json.dumps(profile.dict(), default=str))).modified_at == modified_at
+    
+    def test_trusted_construction_matches_validation(self):
+        profile = Profile(
+            id="p1", name="Trusted",
+            coordinates=Coordinates(x=5, y=6),
+            macro_steps=[
+                MacroStep(id="s1", type=MacroStepType.CLICK, click_type=ClickType.RIGHT, coordinates=Coordinates(x=1, y=2)),
+                MacroStep(id="s2", type=MacroStepType.KEY, key="a", modifiers=["ctrl"]),
+                MacroStep(id="s3", type=MacroStepType.DELAY, delay_ms=25)
+            ],
+            trigger_type=TriggerType.SCHEDULED,
+            schedule_trigger=ScheduleTrigger(start_datetime=datetime(2030, 1, 1), repeat_interval=timedelta(days=1, minutes=5))
+        )
+        data = json.loads(json.dumps(profile.dict(), default=str))
+        
+        trusted = Profile.from_trusted_dict(data)
+        assert trusted == profile
+        assert trusted.macro_steps[0].click_type is ClickType.RIGHT
+        assert isinstance(trusted.macro_steps[0].coordinates, Coordinates)
+        assert trusted.schedule_trigger.repeat_interval == timedelta(days=1, minutes=5)
+        assert trusted.created_at == profile.created_at
+    
+    def test_trusted_construction_fills_missing_fields(self):
+        trusted = Profile.from_trusted_dict({'id': "p1", 'name': "Old", 'unknown': 1})
+        
+        assert trusted.timing == TimingConfig()
+        assert trusted.macro_steps == []
+        assert not hasattr(trusted, 'unknown')
+
+
+class TestGcPaused:
+    """Test pausing garbage collection around bulk model builds."""
+    
+    def test_small_builds_do_not_pause(self):
+        with gc_paused(GC_PAUSE_MIN_MODELS - 1):
+            assert gc.isenabled()
+    
+    def test_overlapping_pauses_resume_after_the_last(self):
+        first, second = gc_paused(GC_PAUSE_MIN_MODELS), gc_paused(GC_PAUSE_MIN_MODELS)
+        first.__enter__()
+        second.__enter__()
+        first.__exit__(None, None, None)
+        assert not gc.isenabled()
+        second.__exit__(None, None, None)
+        assert gc.isenabled()
+    
+    def test_collection_disabled_before_stays_disabled(self):
+        gc.disable()
+        try:
+            with gc_paused(GC_PAUSE_MIN_MODELS):
+                assert not gc.isenabled()
+            assert not gc.isenabled()
+        finally:
+            gc.enable()
 
 
 class TestExecutionLog:
@@ -0,0 +1,71 @@
+"""
+Unit tests for the cursor motion planner.
+"""
+
+import pytest
+import time
+
+from app.core.input_backend import RecordingBackend
+from app.core.motion import MotionPlanner
+from app.models.models import MotionConfig, MotionMode
+
+
+class TestMotionPlanner:
+    """Test path planning and replay."""
+    
+    def test_instant_move_is_single_point(self):
+        planner = MotionPlanner()
+        config = MotionConfig(mode=MotionMode.INSTANT)
+        
+        assert planner.plan((0, 0), (500, 300), config) == ((500, 300, 0.0),)
+    
+    def test_linear_path_is_evenly_timed(self):
+        planner = MotionPlanner()
+        config = MotionConfig(mode=MotionMode.LINEAR, duration_ms=100)
+        path = planner.plan((0, 0), (100, 0), config)
+        
+        assert len(path) == 10
+        assert path[-1] == (100, 0, 0.1)
+        assert all(y == 0 for _, y, _ in path)
+        assert [x for x, _, _ in path] == sorted(x for x, _, _ in path)
+    
+    def test_curved_path_leaves_the_straight_line(self):
+        planner = MotionPlanner()
+        config = MotionConfig(mode=MotionMode.CURVED, duration_ms=100, curvature=0.3)
+        path = planner.plan((0, 0), (200, 0), config)
+        
+        assert path[-1][:2] == (200, 0)
+        assert max(abs(y) for _, y, _ in path) > 20
+    
+    def test_paths_are_cached(self):
+        planner = MotionPlanner()
+        config = MotionConfig(duration_ms=50)
+        
+        first = planner.plan((0, 0), (10, 10), config)
+        second = planner.plan((0, 0), (10, 10), config)
+        
+        assert first is second
+        assert planner.get_stats()['cache_hits'] == 1
+    
+    def test_skip_when_already_at_target(self):
+        planner = MotionPlanner()
+        backend = RecordingBackend()
+        backend.set_position(40, 40)
+        
+        assert not planner.move(backend, 40, 40, MotionConfig())
+        assert backend.events == []
+        assert planner.get_stats()['moves_skipped'] == 1
+    
+    def test_move_replays_path_in_time(self):
+        planner = MotionPlanner()
+        backend = RecordingBackend()
+        backend.set_position(0, 0)
+        config = MotionConfig(mode=MotionMode.LINEAR, duration_ms=50)
+        
+        start = time.perf_counter()
+        assert planner.move(backend, 50, 50, config)
+        elapsed = time.perf_counter() - start
+        
+        assert backend.position() == (50, 50)
+        assert len(backend.actions('move')) == 5
+        assert elapsed == pytest.approx(0.05, abs=0.02)
\ No newline at end of file
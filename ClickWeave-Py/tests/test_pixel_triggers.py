@@ -0,0 +1,300 @@
+"""
+Unit tests for compiled, vectorized pixel trigger evaluation.
+"""
+
+import pytest
+import time
+import numpy as np
+
+from app.core.pixel_triggers import CompiledTriggerSet
+from app.core.pixel_watcher import PixelWatcher
+from app.core.screen_capture import FrameService
+from app.models.models import PixelTrigger, Coordinates, ColorInfo, ColorCondition, TriggerEdge
+
+
+class ArrayScreen:
+    """Grabber backed by a NumPy RGB image."""
+    
+    def __init__(self, rgb):
+        self.rgb = rgb
+        self.grabs = 0
+    
+    def __call__(self, region):
+        self.grabs += 1
+        left, top, width, height = region
+        patch = self.rgb[top:top + height, left:left + width]
+        bgra = np.empty((height, width, 4), dtype=np.uint8)
+        bgra[..., :3] = patch[..., ::-1]
+        bgra[..., 3] = 255
+        return bytearray(bgra.tobytes())
+
+
+def random_screen(seed=0, width=1920, height=1080):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+
+def make_trigger(x, y, color, tolerance, condition=ColorCondition.SIMILAR):
+    return PixelTrigger(
+        coordinates=Coordinates(x=x, y=y),
+        color=ColorInfo(r=color[0], g=color[1], b=color[2], tolerance=tolerance),
+        condition=condition
+    )
+
+
+class TestCompiledTriggerSet:
+    """Test vectorized evaluation against the scalar implementation."""
+    
+    def test_matches_scalar_evaluation(self):
+        rgb = random_screen()
+        service = FrameService(grabber=ArrayScreen(rgb))
+        rng = np.random.default_rng(1)
+        watcher = PixelWatcher(frame_service=service)
+        
+        triggers = []
+        initial_colors = {}
+        for i in range(500):
+            x, y = int(rng.integers(0, 1920)), int(rng.integers(0, 1080))
+            actual = rgb[y, x]
+            # Half the targets are near the real pixel, half are random
+            if i % 2:
+                target = np.clip(actual.astype(int) + rng.integers(-20, 21, 3), 0, 255)
+            else:
+                target = rng.integers(0, 256, 3)
+            condition = [ColorCondition.EXACT, ColorCondition.SIMILAR, ColorCondition.CHANGED][i % 3]
+            trigger = make_trigger(x, y, [int(c) for c in target], int(rng.integers(0, 30)), condition)
+            triggers.append((f"t{i}", trigger))
+            if condition == ColorCondition.CHANGED:
+                initial_colors[f"t{i}"] = tuple(int(c) for c in target)
+        
+        compiled = CompiledTriggerSet(triggers, initial_colors)
+        frames = service.capture_regions(service.plan(compiled.points))
+        fired, colors = compiled.evaluate(frames)
+        
+        watcher._initial_colors.update(initial_colors)
+        expected = [
+            i for i, (trigger_id, trigger) in enumerate(triggers)
+            if watcher._check_trigger_condition(
+                trigger_id, trigger, tuple(int(c) for c in rgb[trigger.coordinates.y, trigger.coordinates.x]))
+        ]
+        assert fired.tolist() == expected
+        assert 0 < len(expected) < len(triggers)
+        assert colors[0].tolist() == rgb[triggers[0][1].coordinates.y, triggers[0][1].coordinates.x].tolist()
+    
+    def test_changed_without_initial_color_never_fires(self):
+        rgb = np.zeros((10, 10, 3), dtype=np.uint8)
+        service = FrameService(grabber=ArrayScreen(rgb))
+        compiled = CompiledTriggerSet([
+            ("c", make_trigger(1, 1, (255, 255, 255), 0, ColorCondition.CHANGED))
+        ])
+        
+        fired, _ = compiled.evaluate(service.capture(compiled.points))
+        assert len(fired) == 0
+    
+    def test_thousands_of_triggers_per_tick(self):
+        rgb = random_screen(2)
+        service = FrameService(grabber=ArrayScreen(rgb))
+        rng = np.random.default_rng(3)
+        triggers = [
+            (f"t{i}", make_trigger(int(rng.integers(0, 1920)), int(rng.integers(0, 1080)), (0, 0, 0), 10))
+            for i in range(5000)
+        ]
+        
+        compiled = CompiledTriggerSet(triggers)
+        frames = service.capture_regions(service.plan(compiled.points))
+        compiled.evaluate(frames)  # Builds the gather layout
+        
+        runs = 50
+        start = time.perf_counter()
+        for _ in range(runs):
+            compiled.evaluate(frames)
+        per_tick = (time.perf_counter() - start) / runs
+        
+        assert per_tick < 0.002
+
+
+class TestPixelWatcherCompiled:
+    """Test PixelWatcher recompiling when triggers change."""
+    
+    def test_recompiles_on_trigger_changes(self):
+        rgb = np.zeros((100, 100, 3), dtype=np.uint8)
+        rgb[10, 10] = (200, 100, 50)
+        watcher = PixelWatcher(frame_service=FrameService(grabber=ArrayScreen(rgb)))
+        
+        watcher.add_trigger("a", make_trigger(10, 10, (200, 100, 50), 0))
+        assert len(watcher._compile()) == 1
+        
+        watcher.add_trigger("b", make_trigger(20, 20, (0, 0, 0), 0))
+        assert not watcher._compiled
+        assert len(watcher._compile()) == 2
+        
+        watcher.remove_trigger("a")
+        assert watcher._compile() == ["b"]
+    
+    def test_change_during_compile_is_not_lost(self, monkeypatch):
+        import app.core.pixel_watcher as pixel_watcher
+        
+        rgb = np.zeros((100, 100, 3), dtype=np.uint8)
+        watcher = PixelWatcher(frame_service=FrameService(grabber=ArrayScreen(rgb)))
+        watcher.add_trigger("a", make_trigger(10, 10, (0, 0, 0), 0))
+        
+        # Another thread adds a trigger while the first compile is under way
+        original = pixel_watcher.CompiledRegionSet
+        def add_while_compiling(*args):
+            monkeypatch.setattr(pixel_watcher, 'CompiledRegionSet', original)
+            watcher.add_trigger("b", make_trigger(20, 20, (0, 0, 0), 0))
+            return original(*args)
+        monkeypatch.setattr(pixel_watcher, 'CompiledRegionSet', add_while_compiling)
+        
+        watcher._compile()
+        assert not watcher._compiled
+        assert len(watcher._compile()) == 2
+        assert watcher._compiled
+
+class TestPixelWatcherScheduling:
+    """Test per-trigger sample intervals."""
+    
+    def test_slow_triggers_are_not_oversampled(self):
+        rgb = np.zeros((100, 100, 3), dtype=np.uint8)
+        watcher = PixelWatcher(frame_service=FrameService(grabber=ArrayScreen(rgb)))
+        
+        trigger = make_trigger(1, 1, (255, 255, 255), 0)
+        trigger.check_interval_ms = 50
+        watcher.add_trigger("fast", trigger)
+        for i in range(100):
+            slow = make_trigger(i % 100, 50, (255, 255, 255), 0)
+            slow.check_interval_ms = 5000
+            watcher.add_trigger(f"slow{i}", slow)
+        
+        assert watcher.start()
+        time.sleep(0.52)
+        watcher.stop()
+        
+        stats = watcher.get_stats()
+        rates = stats['sample_rates']
+        assert rates['slow0']['samples'] == 1
+        assert rates['slow0']['requested_hz'] == pytest.approx(0.2)
+        assert 9 <= rates['fast']['samples'] <= 12
+        assert rates['fast']['achieved_hz'] == pytest.approx(20.0, rel=0.15)
+        
+        # The first tick sampled both groups with a single capture
+        assert stats['ticks'] == rates['fast']['samples']
+    
+    def test_groups_due_together_share_capture(self):
+        rgb = np.zeros((100, 100, 3), dtype=np.uint8)
+        screen = ArrayScreen(rgb)
+        watcher = PixelWatcher(frame_service=FrameService(grabber=screen))
+        
+        for i, interval in enumerate([100, 200]):
+            trigger = make_trigger(10 * i, 10, (0, 0, 0), 0)
+            trigger.check_interval_ms = interval
+            watcher.add_trigger(f"t{i}", trigger)
+        
+        assert watcher.start()
+        time.sleep(0.45)
+        watcher.stop()
+        
+        rates = watcher.get_stats()['sample_rates']
+        # Every 200 ms sample coincides with a 100 ms sample
+        assert watcher.get_stats()['ticks'] == rates['t0']['samples']
+        assert rates['t1']['samples'] == 3
+
+def run_samples(compiled, samples, interval=0.1):
+    """Feed raw results for a single trigger; returns the sample indices that fired."""
+    fired = []
+    for i, raw in enumerate(samples):
+        if compiled.update(np.array([raw], dtype=bool), now=i * interval)[0]:
+            fired.append(i)
+    return fired
+
+
+class TestTriggerEdges:
+    """Test edge detection, debounce and cooldown."""
+    
+    def compile(self, **options):
+        trigger = make_trigger(0, 0, (0, 0, 0), 0)
+        for name, value in options.items():
+            setattr(trigger, name, value)
+        return CompiledTriggerSet([("t", trigger)])
+    
+    def test_rising_edge_fires_once_per_activation(self):
+        compiled = self.compile()
+        assert run_samples(compiled, [0, 1, 1, 1, 0, 1, 1]) == [1, 5]
+    
+    def test_falling_edge(self):
+        compiled = self.compile(edge=TriggerEdge.FALLING)
+        assert run_samples(compiled, [1, 1, 0, 0, 1, 0]) == [2, 5]
+    
+    def test_level_fires_while_true(self):
+        compiled = self.compile(edge=TriggerEdge.LEVEL)
+        assert run_samples(compiled, [0, 1, 1, 0, 1]) == [1, 2, 4]
+    
+    def test_debounce_ignores_glitches(self):
+        compiled = self.compile(debounce_samples=3)
+        assert run_samples(compiled, [1, 0, 1, 1, 0, 1, 1, 1, 1]) == [7]
+    
+    def test_cooldown_limits_fire_rate(self):
+        compiled = self.compile(edge=TriggerEdge.LEVEL, cooldown_ms=250)
+        # Samples every 100 ms: at most one fire per 250 ms
+        assert run_samples(compiled, [1] * 10) == [0, 3, 6, 9]
+    
+    def test_state_survives_recompile(self):
+        rgb = np.zeros((20, 20, 3), dtype=np.uint8)
+        watcher = PixelWatcher(frame_service=FrameService(grabber=ArrayScreen(rgb)))
+        fires = []
+        watcher.register_callback("a", fires.append)
+        watcher.add_trigger("a", make_trigger(1, 1, (0, 0, 0), 0))
+        
+        watcher._compile()
+        watcher._sample_due_groups()
+        assert len(fires) == 1
+        
+        # Adding another trigger recompiles; "a" is still active so it must not re-fire
+        watcher.add_trigger("b", make_trigger(2, 2, (255, 255, 255), 0))
+        watcher._compile()
+        watcher._sample_due_groups()
+        assert len(fires) == 1
+        assert watcher.get_stats()['fires'] == 1
+
+class TestFrameSkipping:
+    """Test reuse of results for unchanged frames."""
+    
+    def test_unchanged_frames_reuse_results(self):
+        rgb = random_screen(4, 200, 100)
+        screen = ArrayScreen(rgb)
+        service = FrameService(grabber=screen)
+        triggers = []
+        initial_colors = {}
+        for i, condition in enumerate([ColorCondition.EXACT, ColorCondition.SIMILAR, ColorCondition.CHANGED] * 4):
+            x, y = 10 * i, 5 * i
+            trigger = make_trigger(x, y, tuple(int(c) for c in rgb[y, x]), 5, condition)
+            trigger.edge = TriggerEdge.LEVEL
+            triggers.append((f"t{i}", trigger))
+            initial_colors[f"t{i}"] = (0, 0, 0)
+        compiled = CompiledTriggerSet(triggers, initial_colors)
+        regions = service.plan(compiled.points)
+        
+        first, _ = compiled.evaluate(service.capture_regions(regions), now=0.0)
+        for now in (1.0, 2.0):
+            fired, _ = compiled.evaluate(service.capture_regions(regions), now=now)
+            assert fired.tolist() == first.tolist()
+        assert compiled.frames_skipped == 2
+        assert service.get_stats()['unchanged_grabs'] == 2 * len(regions)
+        
+        # A changed pixel invalidates the reuse
+        rgb[30, 60] = (0, 0, 0)
+        fired, _ = compiled.evaluate(service.capture_regions(regions), now=3.0)
+        assert compiled.frames_skipped == 2
+        assert fired.tolist() == [i for i in first.tolist() if i != 6]
+    
+    def test_watcher_counts_skipped_frames(self):
+        rgb = np.zeros((50, 50, 3), dtype=np.uint8)
+        watcher = PixelWatcher(frame_service=FrameService(grabber=ArrayScreen(rgb)))
+        watcher.add_trigger("a", make_trigger(1, 1, (0, 0, 0), 0))
+        
+        watcher._compile()
+        watcher._sample_due_groups()
+        watcher._schedule = [(0.0, 0)]  # Due again right away
+        watcher._sample_due_groups()
+        
+        assert watcher.get_stats()['frames_skipped'] == 1
\ No newline at end of file
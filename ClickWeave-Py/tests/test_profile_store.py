@@ -0,0 +1,325 @@
+"""
+Unit tests for the indexed profile store.
+"""
+
+import pytest
+import os
+import json
+import time
+from datetime import datetime, timedelta
+
+from app.core.profile_store import ProfileStore, PROFILE_SCHEMA_VERSION, encode_profile, decode_profile
+from app.models.models import (
+    Profile, TriggerType, PixelTrigger, Coordinates, ColorInfo, MacroStep, MacroStepType, ClickType
+)
+
+
+def write_profiles(directory, count):
+    """Save count profiles through a throwaway store."""
+    store = ProfileStore(str(directory))
+    for i in range(count):
+        store.save(Profile(id=f"p{i:03d}", name=f"Profile {i:03d}", description=f"number {i}"))
+    store.flush()
+
+
+def touch(path, data):
+    """Rewrite a profile file with different content."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class TestProfileIndex:
+    """Test building and refreshing the index."""
+    
+    def test_listing_does_not_parse_profiles(self, tmp_path):
+        write_profiles(tmp_path, 20)
+        
+        store = ProfileStore(str(tmp_path))
+        assert store.refresh() == 20
+        
+        summaries = store.summaries()
+        assert [summary.name for summary in summaries[:2]] == ["Profile 000", "Profile 001"]
+        assert summaries[0].description == "number 0"
+        assert summaries[0].trigger_type == TriggerType.MANUAL
+        assert summaries[0].size == os.path.getsize(tmp_path / "p000.json")
+        
+        stats = store.get_stats()
+        assert stats['profiles_parsed'] == 0
+        assert stats['summaries_read'] == 0
+    
+    def test_refresh_reads_only_changed_files(self, tmp_path):
+        write_profiles(tmp_path, 10)
+        store = ProfileStore(str(tmp_path))
+        store.refresh()
+        
+        data = json.loads((tmp_path / "p003.json").read_text())
+        data['name'] = "Renamed"
+        data['trigger_type'] = "pixel_color"
+        touch(tmp_path / "p003.json", data)
+        os.remove(tmp_path / "p004.json")
+        Profile(id="new", name="Added").to_json_file(str(tmp_path / "new.json"))
+        
+        assert store.refresh() == 10
+        assert store.get_stats()['summaries_read'] == 2
+        assert store.get_summary("p003").name == "Renamed"
+        assert store.get_summary("p003").trigger_type == TriggerType.PIXEL_COLOR
+        assert "p004" not in store
+        assert "new" in store
+        
+        # The refreshed index was written back
+        fresh = ProfileStore(str(tmp_path))
+        fresh.refresh()
+        assert fresh.get_stats()['summaries_read'] == 0
+        assert fresh.get_summary("p003").name == "Renamed"
+    
+    def test_unreadable_index_is_rebuilt(self, tmp_path):
+        write_profiles(tmp_path, 3)
+        (tmp_path / ProfileStore.INDEX_FILENAME).write_text("not json")
+        
+        store = ProfileStore(str(tmp_path))
+        assert store.refresh() == 3
+        assert store.get_stats()['summaries_read'] == 3
+    
+    def test_broken_profile_file_is_skipped(self, tmp_path):
+        write_profiles(tmp_path, 2)
+        (tmp_path / "broken.json").write_text("{")
+        
+        store = ProfileStore(str(tmp_path))
+        assert store.refresh() == 2
+        assert "broken" not in store
+    
+    def test_missing_directory(self, tmp_path):
+        assert ProfileStore(str(tmp_path / "missing")).refresh() == 0
+
+
+class TestProfileCache:
+    """Test lazy loading and the LRU cache."""
+    
+    def test_profiles_are_parsed_on_demand_and_cached(self, tmp_path):
+        write_profiles(tmp_path, 5)
+        store = ProfileStore(str(tmp_path))
+        store.refresh()
+        
+        profile = store.get("p002")
+        assert profile.name == "Profile 002"
+        assert store.get("p002") is profile
+        
+        stats = store.get_stats()
+        assert stats['profiles_parsed'] == 1
+        assert stats['cache_hits'] == 1
+    
+    def test_least_recently_used_profile_is_evicted(self, tmp_path):
+        write_profiles(tmp_path, 5)
+        store = ProfileStore(str(tmp_path), cache_size=2)
+        store.refresh()
+        
+        first = store.get("p000")
+        store.get("p001")
+        store.get("p000")
+        store.get("p002")  # Evicts p001
+        
+        assert store.get("p000") is first
+        assert store.get_stats()['cached_profiles'] == 2
+        store.get("p001")
+        assert store.get_stats()['profiles_parsed'] == 4
+    
+    def test_changed_file_drops_cached_profile(self, tmp_path):
+        write_profiles(tmp_path, 2)
+        store = ProfileStore(str(tmp_path))
+        store.refresh()
+        store.get("p000")
+        
+        data = json.loads((tmp_path / "p000.json").read_text())
+        data['name'] = "Edited elsewhere"
+        touch(tmp_path / "p000.json", data)
+        store.refresh()
+        
+        assert store.get("p000").name == "Edited elsewhere"
+    
+    def test_save_and_delete_update_the_index(self, tmp_path):
+        store = ProfileStore(str(tmp_path))
+        store.refresh()
+        
+        profile = Profile(
+            id="pix", name="Pixel", trigger_type=TriggerType.PIXEL_COLOR,
+            pixel_trigger=PixelTrigger(coordinates=Coordinates(x=1, y=1), color=ColorInfo(r=1, g=2, b=3))
+        )
+        store.save(profile)
+        assert store.get("pix") is profile
+        assert store.get_summary("pix").trigger_type == TriggerType.PIXEL_COLOR
+        assert store.get_stats()['profiles_parsed'] == 0
+        
+        assert store.delete("pix") is True
+        assert "pix" not in store
+        assert store.get("pix") is None
+        assert not (tmp_path / "pix.json").exists()
+        assert store.delete("pix") is False
+    
+    def test_load_all(self, tmp_path):
+        write_profiles(tmp_path, 4)
+        store = ProfileStore(str(tmp_path))
+        store.refresh()
+        
+        assert [profile.id for profile in store.load_all()] == ["p000", "p001", "p002", "p003"]
+
+class TestWriteBehind:
+    """Test coalesced, atomic and skipped profile writes."""
+    
+    def test_saves_within_the_window_are_coalesced(self, tmp_path):
+        store = ProfileStore(str(tmp_path), write_delay=0.1)
+        store.refresh()
+        
+        profile = Profile(id="p1", name="First")
+        for i in range(10):
+            profile.name = f"Name {i}"
+            store.save(profile)
+        assert not (tmp_path / "p1.json").exists()
+        assert store.get_summary("p1").name == "Name 9"
+        assert store.load("p1") is profile
+        
+        time.sleep(0.4)
+        assert json.loads((tmp_path / "p1.json").read_text())['name'] == "Name 9"
+        stats = store.get_stats()
+        assert stats['saves'] == 10
+        assert stats['writes'] == 1
+        assert stats['pending_writes'] == 0
+        store.close()
+    
+    def test_files_are_compact_and_replaced_atomically(self, tmp_path):
+        store = ProfileStore(str(tmp_path), write_delay=0)
+        store.save(Profile(id="p1", name="Compact"))
+        
+        text = (tmp_path / "p1.json").read_text()
+        assert "\n" not in text and ", " not in text
+        assert Profile.from_json_file(str(tmp_path / "p1.json")).name == "Compact"
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["p1.json"]
+        assert store.get_summary("p1").is_current(os.stat(tmp_path / "p1.json"))
+    
+    def test_failed_write_keeps_the_old_file(self, tmp_path, monkeypatch):
+        store = ProfileStore(str(tmp_path), write_delay=0)
+        profile = Profile(id="p1", name="Original")
+        store.save(profile)
+        
+        def fail(*args):
+            raise OSError("disk full")
+        monkeypatch.setattr(os, "replace", fail)
+        profile.name = "Changed"
+        store.save(profile)
+        
+        assert json.loads((tmp_path / "p1.json").read_text())['name'] == "Original"
+        assert not (tmp_path / "p1.json.tmp").exists()
+        assert store.get_stats()['write_errors'] == 1
+        assert store.get_stats()['pending_writes'] == 1
+        
+        monkeypatch.undo()
+        store.flush()
+        assert json.loads((tmp_path / "p1.json").read_text())['name'] == "Changed"
+    
+    def test_unchanged_content_is_not_rewritten(self, tmp_path):
+        write_profiles(tmp_path, 1)
+        store = ProfileStore(str(tmp_path), write_delay=0)
+        store.refresh()
+        mtime_ns = os.stat(tmp_path / "p000.json").st_mtime_ns
+        
+        profile = store.get("p000")
+        profile.modified_at = datetime.now() + timedelta(minutes=1)
+        store.save(profile)
+        assert os.stat(tmp_path / "p000.json").st_mtime_ns == mtime_ns
+        assert store.get_stats()['writes_skipped'] == 1
+        
+        profile.description = "edited"
+        store.save(profile)
+        assert json.loads((tmp_path / "p000.json").read_text())['description'] == "edited"
+        assert store.get_stats()['writes'] == 1
+    
+    def test_close_writes_pending_profiles(self, tmp_path):
+        store = ProfileStore(str(tmp_path), write_delay=60.0)
+        store.save(Profile(id="p1", name="Pending"))
+        store.close()
+        
+        fresh = ProfileStore(str(tmp_path))
+        assert fresh.refresh() == 1
+        assert fresh.get_stats()['summaries_read'] == 0
+        assert fresh.get("p1").name == "Pending"
+    
+    def test_delete_cancels_pending_write(self, tmp_path):
+        store = ProfileStore(str(tmp_path), write_delay=60.0)
+        store.save(Profile(id="p1", name="Doomed"))
+        assert store.delete("p1") is True
+        store.close()
+        
+        assert not (tmp_path / "p1.json").exists()
+
+class TestTrustedLoad:
+    """Test checksummed fast loading of profiles the store wrote."""
+    
+    def macro_profile(self):
+        return Profile(
+            id="macro", name="Macro", modified_at=datetime(2024, 5, 1, 12, 30),
+            macro_steps=[MacroStep(id=f"s{i}", type=MacroStepType.CLICK, click_type=ClickType.LEFT,
+                                   coordinates=Coordinates(x=i, y=i)) for i in range(50)]
+        )
+    
+    def test_store_written_file_loads_without_validation(self, tmp_path):
+        profile = self.macro_profile()
+        ProfileStore(str(tmp_path), write_delay=0).save(profile)
+        
+        text = (tmp_path / "macro.json").read_text()
+        assert text.startswith(f'{{"schema_version":{PROFILE_SCHEMA_VERSION},"checksum":"')
+        
+        store = ProfileStore(str(tmp_path))
+        store.refresh()
+        loaded = store.get("macro")
+        assert loaded == profile
+        assert loaded.modified_at == datetime(2024, 5, 1, 12, 30)
+        assert store.get_stats()['trusted_loads'] == 1
+    
+    def test_hand_edited_file_is_validated(self, tmp_path):
+        ProfileStore(str(tmp_path), write_delay=0).save(self.macro_profile())
+        path = tmp_path / "macro.json"
+        path.write_text(path.read_text().replace('"click_type":"left"', '"click_type":null', 1))
+        
+        store = ProfileStore(str(tmp_path))
+        store.refresh()
+        assert store.get("macro") is None
+        assert store.get_stats()['trusted_loads'] == 0
+    
+    def test_other_files_are_validated(self, tmp_path):
+        profile = self.macro_profile()
+        profile.to_json_file(str(tmp_path / "macro.json"))
+        text, _ = encode_profile(profile)
+        (tmp_path / "future.json").write_text(text.replace('"schema_version":1,', '"schema_version":99,', 1)
+                                              .replace('"id":"macro"', '"id":"future"', 1))
+        
+        store = ProfileStore(str(tmp_path))
+        store.refresh()
+        assert store.get("macro") == profile
+        assert store.get("future").id == "future"
+        assert store.get_stats()['trusted_loads'] == 0
+    
+    def test_trusted_and_validated_loads_agree_on_content_hash(self):
+        text, digest = encode_profile(self.macro_profile())
+        
+        trusted, trusted_digest, was_trusted = decode_profile(text)
+        validated, validated_digest, was_validated = decode_profile(json.dumps(json.loads(text), indent=2))
+        assert was_trusted and not was_validated
+        assert trusted == validated
+        assert trusted_digest == validated_digest == digest
+    
+    def test_trusted_load_runs_no_validation(self, monkeypatch):
+        text, _ = encode_profile(self.macro_profile())
+        
+        class NoValidation:
+            def __getattr__(self, name):
+                raise AssertionError(f"{name} called on a trusted load")
+        
+        for model in (Profile, MacroStep, Coordinates):
+            monkeypatch.setattr(model, '__pydantic_validator__', NoValidation())
+        
+        profile, _, trusted = decode_profile(text)
+        assert trusted
+        assert len(profile.macro_steps) == 50
+        with pytest.raises(AssertionError):
+            decode_profile(json.dumps(json.loads(text)))
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Unit tests for the profile directory watcher.
+"""
+
+import pytest
+import os
+import time
+from datetime import datetime, timedelta
+
+from app.core.profile_store import ProfileStore
+from app.core.profile_watcher import ProfileWatcher, InotifyDirectoryWatcher, PollingDirectoryWatcher
+from app.models.models import Profile, ScheduleTrigger
+
+
+def write_file(directory, profile):
+    """Write a profile file the way external tooling would."""
+    profile.to_json_file(str(directory / f"{profile.id}.json"))
+    path = directory / f"{profile.id}.json"
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def scheduled_profile(profile_id, hours=1, name="Scheduled"):
+    return Profile(id=profile_id, name=name,
+                   schedule_trigger=ScheduleTrigger(start_datetime=datetime(2030, 1, 1) + timedelta(hours=hours)))
+
+
+class RecordingScheduler:
+    """Scheduler stand-in recording reschedules."""
+    
+    def __init__(self):
+        self.scheduled = {}
+        self.updates = []
+        self.removed = []
+    
+    def get_scheduled_profiles(self):
+        return dict(self.scheduled)
+    
+    def update_profile_schedule(self, profile):
+        self.updates.append(profile.id)
+        self.scheduled.pop(profile.id, None)
+        if profile.schedule_trigger and profile.schedule_trigger.enabled:
+            self.scheduled[profile.id] = profile
+        return True
+    
+    def unschedule_profile(self, profile_id):
+        self.removed.append(profile_id)
+        self.scheduled.pop(profile_id, None)
+        return True
+
+
+@pytest.fixture
+def library(tmp_path):
+    store = ProfileStore(str(tmp_path), write_delay=0)
+    for i in range(5):
+        store.save(Profile(id=f"p{i}", name=f"Profile {i}"))
+    store.close()
+    
+    store = ProfileStore(str(tmp_path), write_delay=0)
+    store.refresh()
+    return store
+
+
+class TestDirectoryWatchers:
+    """Test the change sources."""
+    
+    def test_polling_reports_added_changed_and_removed_files(self, tmp_path):
+        (tmp_path / "a.json").write_text("{}")
+        (tmp_path / "b.json").write_text("{}")
+        watcher = PollingDirectoryWatcher(str(tmp_path))
+        
+        (tmp_path / "a.json").write_text('{"name": "changed"}')
+        os.remove(tmp_path / "b.json")
+        (tmp_path / "c.json").write_text("{}")
+        
+        assert watcher.read(0) == {"a.json", "b.json", "c.json"}
+        assert watcher.read(0) == set()
+    
+    @pytest.mark.skipif(not InotifyDirectoryWatcher.is_available(), reason="inotify not available")
+    def test_inotify_reports_writes_renames_and_deletes(self, tmp_path):
+        (tmp_path / "old.json").write_text("{}")
+        watcher = InotifyDirectoryWatcher(str(tmp_path))
+        try:
+            (tmp_path / "new.json.tmp").write_text("{}")
+            os.replace(tmp_path / "new.json.tmp", tmp_path / "new.json")
+            os.remove(tmp_path / "old.json")
+            
+            names = set()
+            deadline = time.monotonic() + 2.0
+            while "old.json" not in names and time.monotonic() < deadline:
+                names |= watcher.read(0.1)
+            assert {"new.json", "new.json.tmp", "old.json"} <= names
+        finally:
+            watcher.close()
+
+
+class TestProfileWatcher:
+    """Test feeding changes into the store and scheduler."""
+    
+    def test_only_changed_files_are_read(self, tmp_path, library):
+        watcher = ProfileWatcher(library)
+        library.get("p1")
+        
+        write_file(tmp_path, Profile(id="p1", name="Edited"))
+        write_file(tmp_path, Profile(id="p9", name="Dropped in"))
+        os.remove(tmp_path / "p2.json")
+        
+        assert watcher.apply_changes({"p1", "p2", "p3", "p9"}) == 3
+        assert library.get_summary("p1").name == "Edited"
+        assert library.get_summary("p9").name == "Dropped in"
+        assert "p2" not in library
+        
+        stats = library.get_stats()
+        assert stats['summaries_read'] == 2
+        assert stats['profiles_parsed'] == 1
+        assert library.get("p1").name == "Edited"
+        
+        watcher_stats = watcher.get_stats()
+        assert (watcher_stats['added'], watcher_stats['modified'], watcher_stats['deleted']) == (1, 1, 1)
+        assert watcher_stats['ignored'] == 1
+    
+    def test_store_writes_are_ignored(self, library):
+        watcher = ProfileWatcher(library)
+        profile = library.get("p0")
+        profile.description = "saved by the app"
+        library.save(profile)
+        
+        assert watcher.apply_changes({"p0"}) == 0
+        assert library.get("p0") is profile
+    
+    def test_reschedules_only_when_schedule_changes(self, tmp_path, library):
+        scheduler = RecordingScheduler()
+        watcher = ProfileWatcher(library, scheduler)
+        
+        write_file(tmp_path, scheduled_profile("s1"))
+        watcher.apply_changes({"s1"})
+        assert scheduler.updates == ["s1"]
+        
+        # Renaming keeps the schedule
+        write_file(tmp_path, scheduled_profile("s1", name="Renamed"))
+        watcher.apply_changes({"s1"})
+        assert scheduler.updates == ["s1"]
+        
+        write_file(tmp_path, scheduled_profile("s1", hours=2))
+        watcher.apply_changes({"s1"})
+        assert scheduler.updates == ["s1", "s1"]
+        
+        os.remove(tmp_path / "s1.json")
+        watcher.apply_changes({"s1"})
+        assert scheduler.removed == ["s1"]
+        assert watcher.get_stats()['rescheduled'] == 3
+    
+    def test_unscheduled_profiles_are_not_parsed(self, tmp_path, library):
+        scheduler = RecordingScheduler()
+        watcher = ProfileWatcher(library, scheduler)
+        
+        write_file(tmp_path, Profile(id="p1", name="Edited"))
+        watcher.apply_changes({"p1"})
+        
+        assert scheduler.updates == []
+        assert library.get_stats()['profiles_parsed'] == 0
+    
+    @pytest.mark.parametrize("use_inotify", [False, True])
+    def test_watch_thread_picks_up_new_files(self, tmp_path, library, use_inotify):
+        if use_inotify and not InotifyDirectoryWatcher.is_available():
+            pytest.skip("inotify not available")
+        
+        changes = []
+        watcher = ProfileWatcher(library, poll_interval=0.05, use_inotify=use_inotify)
+        watcher.register_callback('profile_changed', changes.append)
+        assert watcher.start()
+        assert watcher.mode == ('inotify' if use_inotify else 'polling')
+        try:
+            write_file(tmp_path, Profile(id="live", name="Live"))
+            deadline = time.monotonic() + 3.0
+            while "live" not in library and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            watcher.stop()
+        
+        assert library.get_summary("live").name == "Live"
+        assert changes == [{'profile_id': "live", 'change': "added"}]
+        assert not watcher.is_running()
\ No newline at end of file
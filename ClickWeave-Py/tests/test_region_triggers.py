@@ -0,0 +1,254 @@
+"""
+Unit tests for region triggers and template matching.
+"""
+
+import pytest
+import time
+import numpy as np
+from PIL import Image
+
+from app.core.region_triggers import TemplateMatcher, CompiledRegionSet, downsample, integral_image, window_sums
+from app.core.pixel_watcher import PixelWatcher
+from app.core.screen_capture import FrameService
+from app.models.models import RegionTrigger, RegionRule, ScreenRegion, ColorInfo, TriggerEdge
+from tests.test_pixel_triggers import ArrayScreen
+
+
+def blocky_screen(seed=0, width=640, height=480, block=8):
+    """Random flat-colored blocks, roughly like UI widgets."""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, size=(height // block, width // block, 3), dtype=np.uint8)
+    return np.kron(small, np.ones((block, block, 1), dtype=np.uint8))
+
+
+def make_template(seed=1, size=32):
+    """Random RGB icon; matchers fed from captured frames need it as BGR."""
+    rng = np.random.default_rng(seed)
+    icon = rng.integers(0, 256, size=(size // 4, size // 4, 3), dtype=np.uint8)
+    return np.kron(icon, np.ones((4, 4, 1), dtype=np.uint8))
+
+
+def region_trigger(x, y, width, height, **options):
+    return RegionTrigger(region=ScreenRegion(x=x, y=y, width=width, height=height), **options)
+
+
+class TestImageHelpers:
+    """Test pyramid and integral image helpers."""
+    
+    def test_window_sums_match_direct_sums(self):
+        image = np.random.default_rng(0).integers(0, 256, size=(20, 30, 3), dtype=np.uint8)
+        sums = window_sums(integral_image(image), 5, 7)
+        
+        assert sums.shape == (16, 24, 3)
+        assert sums[3, 11].tolist() == image[3:8, 11:18].sum(axis=(0, 1)).tolist()
+    
+    def test_downsample_sums_blocks(self):
+        image = np.arange(5 * 4 * 3, dtype=np.uint8).reshape(5, 4, 3)
+        small = downsample(image)
+        
+        assert small.shape == (2, 2, 3)
+        assert small[1, 0].tolist() == image[2:4, 0:2].sum(axis=(0, 1)).tolist()
+
+
+class TestTemplateMatcher:
+    """Test coarse-to-fine template search."""
+    
+    @pytest.mark.parametrize("x, y", [(0, 0), (77, 123), (301, 157), (608, 448), (415, 3)])
+    def test_finds_template_at_any_alignment(self, x, y):
+        screen = blocky_screen()
+        template = make_template()
+        screen[y:y + 32, x:x + 32] = template
+        
+        matched, location = TemplateMatcher(template, 16).match(screen)
+        assert matched is True
+        assert location == (x, y)
+    
+    def test_tolerates_small_differences(self):
+        screen = blocky_screen()
+        template = make_template()
+        noisy = template.astype(int) + np.random.default_rng(2).integers(-8, 9, template.shape)
+        screen[200:232, 100:132] = np.clip(noisy, 0, 255)
+        
+        assert TemplateMatcher(template, 16).match(screen) == (True, (100, 200))
+        assert TemplateMatcher(template, 2).match(screen) == (False, None)
+    
+    def test_missing_template(self):
+        matcher = TemplateMatcher(make_template(), 16)
+        assert matcher.match(blocky_screen()) == (False, None)
+        assert matcher.match(blocky_screen()[:10, :10]) == (False, None)
+    
+    def test_last_match_is_checked_first(self):
+        screen = blocky_screen()
+        template = make_template()
+        screen[40:72, 50:82] = template
+        matcher = TemplateMatcher(template, 16)
+        
+        matcher.match(screen)
+        start = time.perf_counter()
+        assert matcher.match(screen) == (True, (50, 40))
+        assert time.perf_counter() - start < 0.005
+        assert matcher.get_stats()['hint_hits'] == 1
+        
+        # A moved template is found again by a full search
+        moved = blocky_screen()
+        moved[300:332, 500:532] = template
+        assert matcher.match(moved) == (True, (500, 300))
+        assert matcher.get_stats()['hint_hits'] == 1
+    
+    def test_expired_deadline_is_inconclusive(self):
+        matcher = TemplateMatcher(make_template(), 16)
+        assert matcher.match(blocky_screen(), deadline=0.0) == (None, None)
+        assert matcher.get_stats()['budget_exhausted'] == 1
+
+
+class TestCompiledRegionSet:
+    """Test region rules against captured frames."""
+    
+    def capture(self, rgb, regions):
+        service = FrameService(grabber=ArrayScreen(rgb))
+        return service.capture_regions(regions)
+    
+    def test_percent_rule(self):
+        rgb = np.zeros((100, 100, 3), dtype=np.uint8)
+        rgb[10:20, 10:15] = (250, 0, 0)  # Left half of the region is red
+        red = ColorInfo(r=255, g=0, b=0, tolerance=10)
+        regions = CompiledRegionSet([
+            ("low", region_trigger(10, 10, 10, 10, color=red, min_percent=40)),
+            ("high", region_trigger(10, 10, 10, 10, color=red, min_percent=60))
+        ])
+        
+        fired, colors, _ = regions.evaluate(self.capture(rgb, regions.regions))
+        assert fired.tolist() == [0]
+        assert colors[0].tolist() == [125, 0, 0]
+    
+    def test_mean_color_rule(self):
+        rgb = np.zeros((50, 50, 3), dtype=np.uint8)
+        rgb[:, :, 1] = 100
+        rgb[0:5, 0:10, 1] = 120
+        regions = CompiledRegionSet([
+            ("mean", region_trigger(0, 0, 10, 10, rule=RegionRule.MEAN_COLOR,
+                                    color=ColorInfo(r=0, g=110, b=0, tolerance=2)))
+        ])
+        
+        fired, _, _ = regions.evaluate(self.capture(rgb, regions.regions))
+        assert fired.tolist() == [0]
+    
+    def test_template_rule_reports_screen_location(self):
+        rgb = blocky_screen()
+        template = make_template()
+        rgb[250:282, 333:365] = template
+        trigger = region_trigger(300, 200, 200, 150, rule=RegionRule.TEMPLATE, template_path="icon.png")
+        regions = CompiledRegionSet([("t", trigger)], {"t": TemplateMatcher(template[..., ::-1], 16)})
+        
+        fired, _, locations = regions.evaluate(self.capture(rgb, regions.regions))
+        assert fired.tolist() == [0]
+        assert locations == [(333, 250)]
+    
+    def test_out_of_budget_search_keeps_previous_result(self):
+        rgb = blocky_screen()
+        template = make_template()
+        rgb[10:42, 10:42] = template
+        triggers = [
+            (f"t{i}", region_trigger(0, 0, 320, 240, rule=RegionRule.TEMPLATE,
+                                     template_path="icon.png", edge=TriggerEdge.LEVEL))
+            for i in range(2)
+        ]
+        matchers = {trigger_id: TemplateMatcher(template[..., ::-1], 16) for trigger_id, _ in triggers}
+        regions = CompiledRegionSet(triggers, matchers)
+        frames = self.capture(rgb, regions.regions)
+        
+        # Only the first search of a sample runs past the deadline
+        fired, _, _ = regions.evaluate(frames, now=0.0, deadline=0.0)
+        assert fired.tolist() == [0]
+        
+        # The starting trigger rotates, so the other template gets its turn
+        fired, _, _ = regions.evaluate(frames, now=1.0, deadline=0.0)
+        assert sorted(fired.tolist()) == [0, 1]
+
+
+class TestRegionTriggerModel:
+    """Test RegionTrigger validation."""
+    
+    def test_rules_require_their_inputs(self):
+        with pytest.raises(ValueError):
+            region_trigger(0, 0, 10, 10)
+        with pytest.raises(ValueError):
+            region_trigger(0, 0, 10, 10, rule=RegionRule.TEMPLATE)
+        
+        trigger = region_trigger(0, 0, 10, 10, rule=RegionRule.TEMPLATE, template_path="icon.png")
+        assert trigger.color is None
+
+
+class TestPixelWatcherRegions:
+    """Test region triggers scheduled by the PixelWatcher."""
+    
+    def test_template_trigger_fires_with_location(self, tmp_path):
+        rgb = blocky_screen()
+        template = make_template()
+        rgb[120:152, 90:122] = template
+        path = tmp_path / "icon.png"
+        Image.fromarray(template).save(path)
+        
+        watcher = PixelWatcher(frame_service=FrameService(grabber=ArrayScreen(rgb)))
+        fires = []
+        watcher.register_callback("t", fires.append)
+        watcher.add_region_trigger("t", region_trigger(
+            64, 64, 256, 128, rule=RegionRule.TEMPLATE, template_path=str(path)))
+        
+        watcher._compile()
+        watcher._sample_due_groups()
+        
+        assert len(fires) == 1
+        assert fires[0]['location'] == (90, 120)
+        assert watcher.get_stats()['templates']['t']['searches'] == 1
+    
+    def test_missing_template_file_never_fires(self, tmp_path):
+        watcher = PixelWatcher(frame_service=FrameService(grabber=ArrayScreen(blocky_screen())))
+        fires = []
+        watcher.register_callback("t", fires.append)
+        watcher.add_region_trigger("t", region_trigger(
+            0, 0, 64, 64, rule=RegionRule.TEMPLATE, template_path=str(tmp_path / "missing.png")))
+        
+        watcher._compile()
+        watcher._sample_due_groups()
+        assert fires == []
+    
+    def test_pixel_and_region_triggers_share_capture(self):
+        rgb = np.zeros((100, 100, 3), dtype=np.uint8)
+        screen = ArrayScreen(rgb)
+        watcher = PixelWatcher(frame_service=FrameService(grabber=screen))
+        fires = []
+        black = ColorInfo(r=0, g=0, b=0, tolerance=0)
+        
+        from tests.test_pixel_triggers import make_trigger
+        watcher.register_callback("pixel", fires.append)
+        watcher.register_callback("region", fires.append)
+        watcher.add_trigger("pixel", make_trigger(5, 5, (0, 0, 0), 0))
+        watcher.add_region_trigger("region", region_trigger(50, 50, 20, 20, color=black, check_interval_ms=100))
+        
+        watcher._compile()
+        watcher._sample_due_groups()
+        
+        assert sorted(data['trigger_id'] for data in fires) == ["pixel", "region"]
+        assert watcher.get_stats()['ticks'] == 1
+        assert screen.grabs == 2
+    
+    def test_unchanged_region_skips_template_search(self):
+        rgb = blocky_screen()
+        template = make_template()
+        rgb[120:152, 90:122] = template
+        screen = ArrayScreen(rgb)
+        service = FrameService(grabber=screen)
+        trigger = region_trigger(64, 64, 256, 128, rule=RegionRule.TEMPLATE, template_path="icon.png")
+        matcher = TemplateMatcher(template[..., ::-1], 16)
+        regions = CompiledRegionSet([("t", trigger)], {"t": matcher})
+        
+        for _ in range(3):
+            fired, _, locations = regions.evaluate(service.capture_regions(regions.regions))
+        assert matcher.get_stats()['searches'] == 1
+        assert regions.frames_skipped == 2
+        assert locations == [(90, 120)]
+        
+        rgb[120:152, 90:122] = 0
+        regions.evaluate(service.capture_regions(regions.regions))
+        assert matcher.get_stats()['searches'] == 2
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Unit tests for the shared run state primitive.
+"""
+
+import pytest
+import threading
+import time
+import uuid
+
+from app.core.run_state import RunState
+from app.core.click_engine import ClickEngine
+from app.core.macro_engine import MacroEngine
+from app.core.input_backend import RecordingBackend
+from app.models.models import (
+    Profile, Coordinates, TimingConfig, MacroStep, MacroStepType, MotionConfig, MotionMode
+)
+
+
+def run_in_thread(target):
+    """Run target in a thread, returning (thread, result list)."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(target()), daemon=True)
+    thread.start()
+    return thread, result
+
+
+class TestRunState:
+    """Test blocking waits and wakeups."""
+    
+    def test_sleep_until_reaches_deadline(self):
+        state = RunState()
+        deadline = time.perf_counter() + 0.02
+        
+        assert state.sleep_until(deadline)
+        assert time.perf_counter() >= deadline
+    
+    def test_stop_wakes_sleeper_immediately(self):
+        state = RunState()
+        thread, result = run_in_thread(lambda: state.sleep_until(time.perf_counter() + 10.0))
+        time.sleep(0.05)
+        
+        stopped_at = time.perf_counter()
+        state.stop()
+        thread.join(timeout=1.0)
+        
+        assert result == [False]
+        assert time.perf_counter() - stopped_at < 0.05
+        assert state.stop_event.is_set()
+    
+    def test_pause_wakes_sleeper(self):
+        state = RunState()
+        thread, result = run_in_thread(lambda: state.sleep_until(time.perf_counter() + 10.0))
+        time.sleep(0.05)
+        
+        assert state.pause()
+        thread.join(timeout=1.0)
+        assert result == [False]
+    
+    def test_wait_if_paused_blocks_without_polling(self):
+        state = RunState()
+        assert state.wait_if_paused() == 0.0
+        
+        state.pause()
+        thread, result = run_in_thread(state.wait_if_paused)
+        time.sleep(0.2)
+        assert thread.is_alive()
+        
+        state.resume()
+        thread.join(timeout=1.0)
+        
+        assert result[0] == pytest.approx(0.2, abs=0.1)
+        # A single wakeup for the resume, not one per polling tick
+        assert state.get_stats()['wakeups'] == 1
+    
+    def test_stop_releases_pause(self):
+        state = RunState()
+        state.pause()
+        thread, result = run_in_thread(state.wait_if_paused)
+        
+        state.stop()
+        thread.join(timeout=1.0)
+        assert not thread.is_alive()
+        assert not state.pause()
+    
+    def test_reset_clears_state(self):
+        state = RunState()
+        state.pause()
+        state.stop()
+        state.reset()
+        
+        assert not state.is_paused
+        assert not state.is_stopped
+
+
+class TestEngineRunState:
+    """Test engines using the shared run state."""
+    
+    def test_click_engine_pause_shifts_timeline(self):
+        backend = RecordingBackend()
+        engine = ClickEngine(backend=backend)
+        engine.set_failsafe(False)
+        profile = Profile(
+            id=str(uuid.uuid4()),
+            name="Pause Test",
+            coordinates=Coordinates(x=5, y=5),
+            timing=TimingConfig(interval_ms=50),
+            motion=MotionConfig(mode=MotionMode.INSTANT, settle_ms=0)
+        )
+        
+        assert engine.start(profile)
+        time.sleep(0.12)
+        engine.pause()
+        clicks_at_pause = engine.click_count
+        time.sleep(0.2)
+        assert engine.click_count == clicks_at_pause
+        
+        engine.resume()
+        time.sleep(0.12)
+        stopped_at = time.perf_counter()
+        engine.stop()
+        
+        assert time.perf_counter() - stopped_at < 0.1
+        assert engine.click_count > clicks_at_pause
+        assert engine.get_stats()['run_state']['pauses'] == 1
+    
+    def test_macro_stop_interrupts_long_delay(self):
+        engine = MacroEngine(backend=RecordingBackend())
+        profile = Profile(
+            id=str(uuid.uuid4()),
+            name="Long Delay",
+            macro_steps=[MacroStep(id="d", type=MacroStepType.DELAY, delay_ms=10000)]
+        )
+        
+        assert engine.start(profile)
+        time.sleep(0.05)
+        
+        stopped_at = time.perf_counter()
+        engine.stop()
+        
+        assert time.perf_counter() - stopped_at < 0.1
+        assert not engine._worker_thread.is_alive()
\ No newline at end of file
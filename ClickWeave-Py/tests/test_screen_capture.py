@@ -0,0 +1,239 @@
+"""
+Unit tests for the shared frame capture service.
+"""
+
+import pytest
+import time
+import threading
+
+from app.core.screen_capture import FrameService, CapturePool, plan_regions
+from app.core.pixel_watcher import PixelWatcher
+from app.models.models import PixelTrigger, Coordinates, ColorInfo, ColorCondition
+
+
+def screen_color(x, y):
+    """Deterministic synthetic screen content."""
+    return (x % 256, y % 256, (x + y) % 256)
+
+
+class FakeScreen:
+    """Grabber producing BGRA buffers from a synthetic screen."""
+    
+    def __init__(self, color_fn=screen_color):
+        self.color_fn = color_fn
+        self.regions = []
+    
+    def __call__(self, region):
+        self.regions.append(region)
+        left, top, width, height = region
+        raw = bytearray(width * height * 4)
+        for row in range(height):
+            for col in range(width):
+                r, g, b = self.color_fn(left + col, top + row)
+                o = (row * width + col) * 4
+                raw[o:o + 4] = bytes((b, g, r, 255))
+        return raw
+
+
+class TestPlanRegions:
+    """Test grouping of points into capture regions."""
+    
+    def test_nearby_points_share_one_region(self):
+        regions = plan_regions([(10, 10), (20, 15), (12, 30)])
+        assert regions == [(10, 10, 11, 21)]
+    
+    def test_distant_clusters_stay_separate(self):
+        regions = plan_regions([(0, 0), (2, 2), (1900, 1000), (1902, 1003)])
+        assert regions == [(0, 0, 3, 3), (1900, 1000, 3, 4)]
+    
+    def test_region_count_is_bounded(self):
+        points = [(x * 400, y * 400) for x in range(5) for y in range(3)]
+        regions = plan_regions(points, max_regions=4)
+        
+        assert len(regions) <= 4
+        for x, y in points:
+            assert any(l <= x < l + w and t <= y < t + h for l, t, w, h in regions)
+
+
+class TestFrameService:
+    """Test batched capture and pixel reads."""
+    
+    def test_batched_capture_reads_correct_pixels(self):
+        screen = FakeScreen()
+        service = FrameService(grabber=screen)
+        points = [(5, 5), (40, 60), (700, 300), (710, 305)]
+        
+        frames = service.capture(points)
+        
+        assert len(screen.regions) == 2
+        for x, y in points:
+            assert frames.pixel(x, y) == screen_color(x, y)
+        assert frames.pixel(2000, 2000) is None
+    
+    def test_buffer_is_a_view(self):
+        service = FrameService(grabber=FakeScreen())
+        frame = service.capture([(3, 4)]).frames[0]
+        
+        assert isinstance(frame.buffer, memoryview)
+        assert frame.buffer.nbytes == 4
+    
+    def test_recent_frame_is_reused(self):
+        screen = FakeScreen()
+        service = FrameService(grabber=screen)
+        
+        service.capture([(1, 1), (50, 50)])
+        assert service.get_pixel(20, 20, max_age=1.0) == screen_color(20, 20)
+        assert len(screen.regions) == 1
+        assert service.get_stats()['reused_frames'] == 1
+    
+    def test_failed_grab_returns_none(self):
+        def broken(region):
+            raise OSError("no display")
+        
+        service = FrameService(grabber=broken)
+        assert service.capture([(1, 1)]) is None
+        assert service.get_stats()['errors'] == 1
+
+
+class PooledScreen:
+    """Capture context factory recording which thread owns each context."""
+    
+    def __init__(self):
+        self.contexts = []
+    
+    def __call__(self):
+        screen = FakeScreen()
+        screen.owner = threading.get_ident()
+        screen.closed = False
+        screen.used_by = set()
+        
+        def grab(region):
+            screen.used_by.add(threading.get_ident())
+            assert not screen.closed
+            return screen(region)
+        
+        def close():
+            screen.closed = True
+        
+        grab.close = close
+        self.contexts.append(screen)
+        return grab
+
+
+def in_thread(fn):
+    """Run fn on a new thread and wait for it."""
+    thread = threading.Thread(target=fn)
+    thread.start()
+    thread.join()
+
+
+class TestCapturePool:
+    """Test per-thread capture contexts."""
+    
+    def test_each_thread_gets_its_own_context(self):
+        factory = PooledScreen()
+        service = FrameService(pool=CapturePool(factory))
+        
+        service.get_pixel(1, 1)
+        service.get_pixel(2, 2)
+        in_thread(lambda: service.get_pixel(3, 3))
+        
+        assert len(factory.contexts) == 2
+        for screen in factory.contexts:
+            assert screen.used_by == {screen.owner}
+    
+    def test_release_closes_the_thread_context(self):
+        factory = PooledScreen()
+        service = FrameService(pool=CapturePool(factory))
+        
+        def worker():
+            service.get_pixel(1, 1)
+            service.release_thread()
+        
+        in_thread(worker)
+        assert factory.contexts[0].closed
+        assert service.get_stats()['contexts'] == {'open': 0, 'created': 1, 'closed': 1}
+    
+    def test_contexts_of_exited_threads_are_reaped(self):
+        factory = PooledScreen()
+        service = FrameService(pool=CapturePool(factory))
+        
+        in_thread(lambda: service.get_pixel(1, 1))
+        assert not factory.contexts[0].closed
+        
+        service.get_pixel(2, 2)
+        assert factory.contexts[0].closed
+        assert service.get_stats()['contexts']['open'] == 1
+    
+    def test_close_never_closes_a_live_thread_context(self):
+        factory = PooledScreen()
+        service = FrameService(pool=CapturePool(factory))
+        captured, closed, done = threading.Event(), threading.Event(), threading.Event()
+        
+        def worker():
+            service.get_pixel(1, 1)
+            captured.set()
+            closed.wait()
+            # The stale context is replaced on next use
+            service.get_pixel(2, 2)
+            done.set()
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        captured.wait()
+        service.get_pixel(3, 3)
+        service.close()
+        
+        assert factory.contexts[1].closed
+        assert not factory.contexts[0].closed
+        closed.set()
+        thread.join()
+        
+        assert done.is_set()
+        assert factory.contexts[0].closed
+        assert len(factory.contexts) == 3
+    
+    def test_watcher_releases_its_context_on_stop(self):
+        factory = PooledScreen()
+        watcher = PixelWatcher(frame_service=FrameService(pool=CapturePool(factory)))
+        watcher.add_trigger("t", PixelTrigger(
+            coordinates=Coordinates(x=1, y=1),
+            color=ColorInfo(r=0, g=0, b=0, tolerance=0),
+            condition=ColorCondition.EXACT,
+            check_interval_ms=50
+        ))
+        
+        assert watcher.start()
+        time.sleep(0.05)
+        watcher.stop()
+        
+        assert len(factory.contexts) == 1
+        assert factory.contexts[0].closed
+
+
+class TestPixelWatcherCapture:
+    """Test PixelWatcher on the shared frame service."""
+    
+    def test_one_capture_per_tick_for_all_triggers(self):
+        screen = FakeScreen(lambda x, y: (255, 0, 0))
+        watcher = PixelWatcher(frame_service=FrameService(grabber=screen))
+        
+        fired = []
+        for i in range(20):
+            trigger_id = f"t{i}"
+            watcher.add_trigger(trigger_id, PixelTrigger(
+                coordinates=Coordinates(x=10 + i, y=10),
+                color=ColorInfo(r=255, g=0, b=0, tolerance=0),
+                condition=ColorCondition.EXACT,
+                check_interval_ms=50
+            ))
+            watcher.register_callback(trigger_id, lambda data: fired.append(data['trigger_id']))
+        
+        assert watcher.start()
+        time.sleep(0.12)
+        watcher.stop()
+        
+        stats = watcher.get_stats()
+        assert stats['ticks'] >= 1
+        assert stats['capture']['grabs'] == stats['ticks']
+        assert set(fired) == {f"t{i}" for i in range(20)}
\ No newline at end of file
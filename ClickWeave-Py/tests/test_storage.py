@@ -0,0 +1,167 @@
+"""
+Unit tests for the SQLite storage backend.
+"""
+
+import pytest
+import os
+import csv
+import sqlite3
+from datetime import datetime, timedelta
+
+from app.core.storage import SQLiteStorage, SQLiteProfileStore
+from app.core.profile_store import ProfileStore
+from app.models.models import Profile, ExecutionLog, TriggerType, PixelTrigger, Coordinates, ColorInfo
+
+
+def pixel_profile(profile_id, name):
+    return Profile(
+        id=profile_id, name=name, trigger_type=TriggerType.PIXEL_COLOR,
+        pixel_trigger=PixelTrigger(coordinates=Coordinates(x=1, y=2), color=ColorInfo(r=1, g=2, b=3))
+    )
+
+
+def make_log(i, profile_id="p1", stopped_by="completed"):
+    start = datetime(2024, 5, 1, 12, 0, 0) + timedelta(minutes=i)
+    return ExecutionLog(
+        id=f"log{i:04d}", profile_id=profile_id, profile_name=f"Profile {profile_id}",
+        start_time=start, end_time=start + timedelta(seconds=30),
+        total_clicks=i, average_interval_ms=100.0, stopped_by=stopped_by
+    )
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "clickweave.db"))
+    yield storage
+    storage.close()
+
+
+class TestSQLiteStorage:
+    """Test profile and log persistence."""
+    
+    def test_database_uses_wal(self, storage):
+        with sqlite3.connect(storage.path) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    
+    def test_profile_round_trip(self, storage):
+        profile = pixel_profile("p1", "Pixel")
+        assert storage.save_profile(profile) is True
+        
+        loaded = storage.load_profile("p1")
+        assert loaded.name == "Pixel"
+        assert loaded.pixel_trigger.color.b == 3
+        assert storage.load_profile("missing") is None
+        
+        assert storage.delete_profile("p1") is True
+        assert storage.delete_profile("p1") is False
+        assert storage.load_profile("p1") is None
+    
+    def test_profile_summaries_by_trigger_type(self, storage):
+        storage.save_profiles([
+            Profile(id="m1", name="beta"),
+            pixel_profile("p1", "Alpha"),
+            pixel_profile("p2", "gamma")
+        ])
+        
+        assert [summary.name for summary in storage.profile_summaries()] == ["Alpha", "beta", "gamma"]
+        pixel = storage.profile_summaries(TriggerType.PIXEL_COLOR)
+        assert [summary.id for summary in pixel] == ["p1", "p2"]
+        assert pixel[0].trigger_type == TriggerType.PIXEL_COLOR
+    
+    def test_recent_execution_logs(self, storage):
+        storage.save_execution_logs([make_log(i, profile_id=f"p{i % 2}") for i in range(300)])
+        storage.save_execution_log(make_log(300, profile_id="p0", stopped_by="error"))
+        
+        recent = storage.recent_execution_logs(profile_id="p1", limit=100)
+        assert len(recent) == 100
+        assert recent[0].id == "log0299"
+        assert all(log.profile_id == "p1" for log in recent)
+        assert recent[0].duration == timedelta(seconds=30)
+        
+        errors = storage.recent_execution_logs(stopped_by="error")
+        assert [log.id for log in errors] == ["log0300"]
+    
+    def test_batch_is_one_transaction(self, storage):
+        before = storage.get_stats()['transactions']
+        with storage.transaction():
+            storage.save_profile(Profile(id="a", name="A"))
+            storage.save_execution_logs([make_log(i) for i in range(10)])
+        assert storage.get_stats()['transactions'] == before + 1
+    
+    def test_failed_batch_is_rolled_back(self, storage):
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.save_profile(Profile(id="a", name="A"))
+                raise RuntimeError("abort")
+        
+        assert storage.load_profile("a") is None
+
+
+class TestMigration:
+    """Test the one-shot import of JSON profiles and CSV logs."""
+    
+    def write_files(self, tmp_path):
+        profiles_dir = tmp_path / "profiles"
+        logs_dir = tmp_path / "logs"
+        profiles_dir.mkdir()
+        logs_dir.mkdir()
+        
+        store = ProfileStore(str(profiles_dir))
+        store.save(Profile(id="p1", name="Profile p1"))
+        store.save(pixel_profile("p2", "Pixel"))
+        store.flush()
+        (profiles_dir / "broken.json").write_text("{")
+        
+        with open(logs_dir / "execution_log_2024_05.csv", 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['ID', 'Profile Name', 'Start Time', 'End Time', 'Total Clicks', 'Total Steps',
+                             'Average Interval (ms)', 'Duration (s)', 'Stopped By', 'Error Message'])
+            for i in range(5):
+                writer.writerow(make_log(i).to_csv_row())
+        return str(profiles_dir), str(logs_dir)
+    
+    def test_migrates_profiles_and_logs_once(self, tmp_path, storage):
+        profiles_dir, logs_dir = self.write_files(tmp_path)
+        
+        counts = storage.migrate_from_files(profiles_dir, logs_dir)
+        assert counts == {'profiles': 2, 'logs': 5, 'failed': 1}
+        
+        assert storage.load_profile("p2").trigger_type == TriggerType.PIXEL_COLOR
+        logs = storage.recent_execution_logs(profile_id="p1")
+        assert [log.id for log in logs] == [f"log{i:04d}" for i in reversed(range(5))]
+        assert logs[0].end_time == logs[0].start_time + timedelta(seconds=30)
+        
+        assert storage.migrate_from_files(profiles_dir, logs_dir) == {'profiles': 0, 'logs': 0, 'failed': 0}
+
+
+class TestSQLiteProfileStore:
+    """Test the ProfileStore interface over SQLite."""
+    
+    def test_index_and_lazy_loading(self, storage):
+        storage.save_profiles([Profile(id=f"p{i}", name=f"Profile {i}") for i in range(5)])
+        store = SQLiteProfileStore(storage)
+        
+        assert store.refresh() == 5
+        assert store.get_stats()['profiles_parsed'] == 0
+        assert store.summaries()[0].name == "Profile 0"
+        
+        profile = store.get("p3")
+        assert store.get("p3") is profile
+        assert store.get_stats()['profiles_parsed'] == 1
+        
+        store.refresh()
+        assert store.get("p3") is profile
+    
+    def test_save_and_delete(self, storage):
+        store = SQLiteProfileStore(storage)
+        store.refresh()
+        
+        profile = pixel_profile("p1", "Pixel")
+        store.save(profile)
+        assert store.get_summary("p1").trigger_type == TriggerType.PIXEL_COLOR
+        store.flush()
+        assert storage.load_profile("p1").name == "Pixel"
+        
+        assert store.delete("p1") is True
+        assert "p1" not in store
+        assert storage.load_profile("p1") is None
\ No newline at end of file
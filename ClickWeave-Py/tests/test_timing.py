@@ -5,10 +5,12 @@ Unit tests for timing and jitter functionality.
 import pytest
 import time
 import statistics
-from unittest.mock import Mock, patch
 
 from app.models.models import TimingConfig
 from app.core.click_engine import ClickEngine
+from app.core.input_backend import RecordingBackend
+from app.core.macro_engine import MacroEngine
+from app.core.timing import DeadlineScheduler, PlaybackTimeline, wait_until
 
 
 class TestTimingConfig:
@@ -104,19 +106,215 @@ class TestPreciseTiming:
         assert std_dev <= 0.005
 
 
+class TestDeadlineScheduler:
+    """Test absolute-deadline scheduling."""
+    
+    def test_deadlines_are_absolute(self):
+        """Deadlines are origin + N * interval, independent of when advance() runs."""
+        schedule = DeadlineScheduler(0.01)
+        origin = schedule.start()
+        
+        deadlines = [schedule.advance() for _ in range(5)]
+        for n, deadline in enumerate(deadlines, start=1):
+            assert deadline == pytest.approx(origin + n * 0.01)
+    
+    def test_jitter_offset_is_bounded(self):
+        """Jitter offsets stay within the configured percentage of the interval."""
+        timing = TimingConfig(interval_ms=100, jitter_percent=20)
+        offsets = [timing.get_jitter_offset() for _ in range(1000)]
+        
+        assert all(-0.02 <= offset <= 0.02 for offset in offsets)
+        assert abs(statistics.mean(offsets)) < 0.005
+        assert TimingConfig(interval_ms=100).get_jitter_offset() == 0.0
+    
+    def test_missed_deadlines_are_skipped(self):
+        """Falling behind skips missed slots instead of bursting."""
+        schedule = DeadlineScheduler(0.01)
+        schedule.start(time.perf_counter() - 0.055)
+        
+        deadline = schedule.advance()
+        assert deadline >= time.perf_counter() - 0.01
+        assert schedule.get_stats()['missed_deadlines'] >= 4
+    
+    def test_shift_moves_timeline(self):
+        """Shifting the timeline moves all future deadlines."""
+        schedule = DeadlineScheduler(0.1)
+        origin = schedule.start()
+        schedule.shift(1.0)
+        
+        assert schedule.advance() == pytest.approx(origin + 1.1)
+    
+    @pytest.mark.parametrize("interval_ms", [10, 20, 50])
+    def test_nominal_rate_without_drift(self, interval_ms):
+        """A simulated action costing most of the interval does not stretch the rate."""
+        interval = interval_ms / 1000.0
+        schedule = DeadlineScheduler(interval)
+        start = schedule.start()
+        fires = 20
+        
+        for _ in range(fires):
+            schedule.record_fire()
+            time.sleep(interval * 0.5)  # Simulated click cost
+            assert wait_until(schedule.advance())
+        
+        elapsed = time.perf_counter() - start
+        assert elapsed == pytest.approx(fires * interval, rel=0.1)
+        assert schedule.get_stats()['mean_drift_ms'] < interval_ms * 0.25
+    
+    def test_wait_until_stops_early(self):
+        """A set stop event interrupts the wait immediately."""
+        import threading
+        stop_event = threading.Event()
+        stop_event.set()
+        
+        start = time.perf_counter()
+        assert not wait_until(start + 1.0, stop_event)
+        assert time.perf_counter() - start < 0.05
+
+
+class TestPlaybackTimeline:
+    """Test the macro playback timeline."""
+    
+    def test_offsets_are_absolute(self):
+        """Deadlines are origin plus the sum of nominal durations."""
+        timeline = PlaybackTimeline()
+        origin = timeline.start()
+        
+        timeline.advance(0.1)
+        timeline.advance(0.25)
+        assert timeline.deadline == pytest.approx(origin + 0.35)
+        
+        timeline.shift(1.0)
+        assert timeline.deadline == pytest.approx(origin + 1.35)
+    
+    def test_large_lag_resyncs(self):
+        """Falling far behind re-anchors the timeline instead of rushing."""
+        timeline = PlaybackTimeline()
+        timeline.start(time.perf_counter() - 5.0)
+        
+        timeline.record_start()
+        stats = timeline.get_stats()
+        assert stats['late_actions'] == 1
+        assert stats['resyncs'] == 1
+        assert timeline.deadline == pytest.approx(time.perf_counter(), abs=0.05)
+
+
+class TestMacroRepeat:
+    """Test sequence-level macro repeats on the playback timeline."""
+    
+    def make_profile(self, repeat, steps=None, limits=None):
+        from app.models.models import (
+            Profile, MacroStep, MacroStepType, MacroRepeat, ClickLimits, MotionConfig
+        )
+        import uuid
+        
+        return Profile(
+            id=str(uuid.uuid4()),
+            name="Repeat Test",
+            macro_steps=steps or [
+                MacroStep(id="k", type=MacroStepType.KEY, key="a"),
+                MacroStep(id="d", type=MacroStepType.DELAY, delay_ms=10)
+            ],
+            macro_repeat=MacroRepeat(**repeat),
+            limits=limits or ClickLimits(),
+            motion=MotionConfig(loop_delay_ms=0)
+        )
+    
+    def run_to_end(self, engine, profile):
+        reasons = []
+        engine.register_callback('stopped', lambda data: reasons.append(data['reason']))
+        assert engine.start(profile)
+        engine._worker_thread.join(timeout=5.0)
+        return reasons
+    
+    def test_count_repeats_in_one_worker(self):
+        """COUNT mode plays the sequence N times without restarting."""
+        backend = RecordingBackend()
+        engine = MacroEngine(backend=backend)
+        profile = self.make_profile({'mode': 'count', 'count': 5})
+        
+        start = time.perf_counter()
+        reasons = self.run_to_end(engine, profile)
+        elapsed = time.perf_counter() - start
+        
+        assert reasons == ['completed']
+        assert engine.iteration_count == 5
+        assert len(backend.actions('press')) == 5
+        assert not engine.is_running
+        assert elapsed == pytest.approx(0.05, abs=0.03)
+    
+    def test_timeline_absorbs_step_overhead(self):
+        """Step overhead does not accumulate over many iterations."""
+        engine = MacroEngine(backend=RecordingBackend())
+        original_run_key = engine._run_key
+        
+        def slow_key(*args):
+            time.sleep(0.003)  # Simulated input cost
+            return original_run_key(*args)
+        
+        from app.core.macro_program import MacroOp
+        engine._handlers[MacroOp.KEY] = slow_key
+        
+        profile = self.make_profile({'mode': 'count', 'count': 20})
+        start = time.perf_counter()
+        self.run_to_end(engine, profile)
+        elapsed = time.perf_counter() - start
+        
+        # 20 iterations of a 10 ms delay; 3 ms key cost is absorbed by the delay
+        assert elapsed == pytest.approx(0.2, abs=0.04)
+    
+    def test_duration_mode(self):
+        """DURATION mode repeats until the play time has elapsed."""
+        engine = MacroEngine(backend=RecordingBackend())
+        profile = self.make_profile({'mode': 'duration', 'duration_seconds': 1, 'interval_ms': 90})
+        
+        reasons = self.run_to_end(engine, profile)
+        
+        assert reasons == ['completed']
+        assert 8 <= engine.iteration_count <= 11
+    
+    def test_infinite_honours_click_limits(self):
+        """INFINITE mode stops at the ClickLimits step limit."""
+        from app.models.models import ClickLimits
+        
+        backend = RecordingBackend()
+        engine = MacroEngine(backend=backend)
+        profile = self.make_profile({'mode': 'infinite'}, limits=ClickLimits(max_clicks=7))
+        
+        reasons = self.run_to_end(engine, profile)
+        
+        assert reasons == ['limits_reached']
+        assert engine.step_count == 7
+        assert engine.execution_log.stopped_by == "limits"
+    
+    def test_instant_macro_reports_start_before_stop(self):
+        """A macro that ends at once still leaves the engine stopped and reusable."""
+        from app.models.models import MacroStep, MacroStepType
+        
+        engine = MacroEngine(backend=RecordingBackend())
+        events = []
+        engine.register_callback('started', lambda data: events.append('started'))
+        profile = self.make_profile({'mode': 'once'}, steps=[MacroStep(id="k", type=MacroStepType.KEY, key="a")])
+        
+        for _ in range(20):
+            events.extend(self.run_to_end(engine, profile))
+            assert not engine.is_running
+        assert events == ['started', 'completed'] * 20
+    
+    def test_duration_requires_seconds(self):
+        from app.models.models import MacroRepeat
+        
+        with pytest.raises(ValueError):
+            MacroRepeat(mode='duration')
+
+
 class TestClickEngineTimingIntegration:
     """Test timing integration in ClickEngine."""
     
-    @patch('app.core.click_engine.pyautogui')
-    def test_click_engine_timing_integration(self, mock_pyautogui):
+    def test_click_engine_timing_integration(self):
         """Test that ClickEngine respects timing configuration."""
-        # Mock pyautogui functions
-        mock_pyautogui.position.return_value = (100, 100)
-        mock_pyautogui.size.return_value = (1920, 1080)
-        mock_pyautogui.click = Mock()
-        mock_pyautogui.moveTo = Mock()
-        
-        engine = ClickEngine()
+        # Record input instead of driving the real display
+        engine = ClickEngine(backend=RecordingBackend())
         
         # Create a mock profile with specific timing
         from app.models.models import Profile, Coordinates, TimingConfig, ClickType
@@ -134,6 +332,34 @@ class TestClickEngineTimingIntegration:
         timing_interval = profile.timing.get_jittered_interval()
         assert timing_interval == 0.1  # 100ms with no jitter
     
+    @pytest.mark.parametrize("interval_ms", [10, 20, 50])
+    def test_fast_profile_hits_nominal_rate(self, interval_ms):
+        """Instant motion keeps fast profiles at their configured rate."""
+        from app.models.models import Profile, Coordinates, ClickLimits, MotionConfig, MotionMode
+        import uuid
+        
+        engine = ClickEngine(backend=RecordingBackend())
+        engine.set_failsafe(False)
+        clicks = 20
+        profile = Profile(
+            id=str(uuid.uuid4()),
+            name="Fast Clicks",
+            coordinates=Coordinates(x=10, y=10),
+            timing=TimingConfig(interval_ms=interval_ms),
+            limits=ClickLimits(max_clicks=clicks),
+            motion=MotionConfig(mode=MotionMode.INSTANT, settle_ms=0)
+        )
+        
+        start_time = time.perf_counter()
+        assert engine.start(profile)
+        while engine.click_count < clicks and time.perf_counter() - start_time < 5:
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start_time
+        engine.stop()
+        
+        # The last click fires at (clicks - 1) intervals after the first
+        assert elapsed == pytest.approx((clicks - 1) * interval_ms / 1000.0, rel=0.15, abs=0.01)
+    
     def test_jitter_calculations_consistency(self):
         """Test that jitter calculations are mathematically consistent."""
         base_intervals = [100, 500, 1000, 5000]  # Various base intervals